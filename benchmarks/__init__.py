@@ -0,0 +1,18 @@
+"""
+Latency benchmarks for the question pipeline (run with ``python -m benchmarks.run``).
+
+Every backend is stubbed, so like the unit tests the benchmarks only need
+placeholder settings to import ``dtce_ai_bot``. Real values from the
+environment win.
+"""
+
+import os
+
+for _name, _value in {
+    "AZURE_OPENAI_API_KEY": "benchmark",
+    "AZURE_OPENAI_ENDPOINT": "https://benchmark.openai.azure.com",
+    "AZURE_SEARCH_SERVICE_ENDPOINT": "https://benchmark.search.windows.net",
+    "AZURE_SEARCH_API_KEY": "benchmark",
+    "OPENAI_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,91 @@
+"""
+Compare two benchmark result files (see benchmarks/run.py):
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Prints per-target, per-stage p50/p95/p99 deltas and exits 1 when any p95
+(stage or end-to-end) got slower by more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+METRICS = ("p50", "p95", "p99")
+
+# Below this the percentage change is timer noise, not a regression
+MIN_COMPARABLE_MS = 1.0
+
+
+def _rows(summary: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    rows = dict(summary.get("stages", {}))
+    rows["end_to_end"] = summary.get("end_to_end_ms", {})
+    return rows
+
+
+def _change(before: float, after: float) -> Optional[float]:
+    if before < MIN_COMPARABLE_MS and after < MIN_COMPARABLE_MS:
+        return None
+    return (after - before) / before * 100 if before else None
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], threshold: float) -> Tuple[List[str], List[str]]:
+    """Report lines and the regressions (p95 slower than ``threshold`` percent) between two result files."""
+    lines, regressions = [], []
+    for target, after_summary in after.get("targets", {}).items():
+        before_summary = before.get("targets", {}).get(target)
+        if before_summary is None:
+            lines.append(f"\n{target}: not in the baseline")
+            continue
+
+        lines.append(f"\n{target}")
+        lines.append(f"  {'stage':<18}" + "".join(f"{metric + ' ms':>22}" for metric in METRICS))
+        before_rows = _rows(before_summary)
+        for name, after_row in _rows(after_summary).items():
+            before_row = before_rows.get(name)
+            if before_row is None:
+                lines.append(f"  {name:<18}  (new stage)")
+                continue
+            cells = []
+            for metric in METRICS:
+                old, new = before_row.get(metric, 0.0), after_row.get(metric, 0.0)
+                change = _change(old, new)
+                cells.append(f"{old:>8.1f} -> {new:<8.1f}" + (f"{change:+.0f}%" if change is not None else ""))
+                if metric == "p95" and change is not None and change > threshold:
+                    regressions.append(f"{target}.{name} p95 {old:.1f} -> {new:.1f} ms ({change:+.0f}%)")
+            lines.append(f"  {name:<18}" + "".join(f"{cell:>22}" for cell in cells))
+
+        for key in ("prompt_tokens", "completion_tokens"):
+            old, new = before_summary.get(key, {}).get("mean", 0), after_summary.get(key, {}).get("mean", 0)
+            lines.append(f"  {key}/request: {old:.0f} -> {new:.0f}")
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files")
+    parser.add_argument("before", help="Baseline results JSON")
+    parser.add_argument("after", help="Candidate results JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 slowdown in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding="utf-8") as before_file, open(args.after, encoding="utf-8") as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+
+    for label, results in (("before", before), ("after", after)):
+        meta = results.get("meta", {})
+        print(f"{label}: {meta.get('git_commit')} at {meta.get('created_at')}")
+    if before.get("meta", {}).get("config") != after.get("meta", {}).get("config"):
+        print("warning: the runs used different benchmark configurations")
+
+    lines, regressions = compare(before, after, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} p95 regression(s) over {args.threshold:.0f}%:")
+        print("\n".join(f"  {regression}" for regression in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
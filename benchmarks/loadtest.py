@@ -0,0 +1,377 @@
+"""
+Load test for /documents/ask and the Bot Framework /api/messages endpoint.
+
+Starts the backend stand-ins (benchmarks.standins) and the app
+(benchmarks.serve) as separate processes, then ramps closed-loop virtual
+users through ``--users`` steps. Each user sends a weighted mix of
+``/documents/ask`` calls, Teams message activities and greetings, then thinks
+for an exponential pause. The report gives, per step and per second:
+- throughput
+- latency percentiles
+- error rates
+- the app's event-loop lag
+- the stand-ins' call and 429 counts
+
+    python -m benchmarks.loadtest --users 5,10,20,40 --step-seconds 60 --openai-429-rate 0.02
+    python -m benchmarks.loadtest --app-url http://staging:8000 --standins-url http://standins:8765
+
+A bot reply counts towards the /api/messages latency, because the adapter posts it
+to the connector stand-in before the request returns. Requests still in
+flight when a step ends complete and count towards the step they started in.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .questions import load_questions
+from .run import _git_commit, distribution
+from .standins import StandinConfig
+
+KINDS = ("ask", "message", "greeting")
+
+GREETINGS = ("hi", "hello", "help", "good morning")
+
+STARTUP_TIMEOUT_SECONDS = 90
+
+
+@dataclass
+class LoadConfig:
+    users: List[int] = field(default_factory=lambda: [5, 10, 20])
+    step_seconds: float = 30.0
+    think_ms: float = 1000.0
+    mix: Dict[str, float] = field(default_factory=lambda: {"ask": 5, "message": 4, "greeting": 1})
+    messages_path: str = "/api/messages"
+    timeout_seconds: float = 120.0
+    seed: int = 0
+    app_url: str = ""  # Use a running app instead of launching one
+    standins_url: str = ""  # Use running stand-ins instead of launching them
+    standins: StandinConfig = field(default_factory=StandinConfig)
+
+
+@dataclass
+class RequestRecord:
+    started: float  # seconds since the run started
+    users: int  # step the request started in
+    kind: str
+    latency: float
+    status: int  # 0 when the request never got a response
+    error: str = ""
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.error) or self.status == 0 or self.status >= 400
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def message_activity(text: str, user: int, sequence: int, service_url: str) -> Dict[str, Any]:
+    """A Teams personal-chat message activity as the Bot Framework channel would post it."""
+    return {
+        "type": "message",
+        "id": f"activity-{user}-{sequence}",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "serviceUrl": service_url,
+        "channelId": "msteams",
+        "from": {"id": f"load-user-{user}", "name": f"Load User {user}"},
+        "conversation": {"id": f"load-conversation-{user}", "conversationType": "personal", "tenantId": "loadtest"},
+        "recipient": {"id": "dtce-bot", "name": "DTCE AI"},
+        "text": text,
+        "locale": "en-NZ",
+        "channelData": {"tenant": {"id": "loadtest"}},
+    }
+
+
+def _body_error(response: httpx.Response) -> str:
+    """Error signalled in a 200 body (the endpoints degrade instead of failing)."""
+    try:
+        body = response.json()
+    except ValueError:
+        return ""
+    if isinstance(body, dict) and (body.get("confidence") == "error" or body.get("status") == "error"):
+        return str(body.get("answer") or body.get("message") or "error")[:200]
+    return ""
+
+
+class LoadTest:
+    def __init__(self, config: LoadConfig):
+        self.config = config
+        self.records: List[RequestRecord] = []
+        self.client_lag: List[float] = []
+        self._processes: List[subprocess.Popen] = []
+        self._questions = [question for _, question in load_questions()]
+        self.lag_log = os.path.join(tempfile.mkdtemp(prefix="dtce-loadtest-"), "loop_lag.jsonl")
+        self.app_url = config.app_url.rstrip("/")
+        self.standins_url = config.standins_url.rstrip("/")
+        self.run_start = 0.0
+        self.epoch_start = 0.0
+
+    # -- processes ----------------------------------------------------------------------------
+
+    def _spawn(self, args: List[str], env: Dict[str, str]) -> None:
+        self._processes.append(subprocess.Popen([sys.executable, "-m", *args], env=env,
+                                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+    async def _wait_ready(self, url: str) -> None:
+        deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+        async with httpx.AsyncClient(timeout=2) as client:
+            while time.monotonic() < deadline:
+                if any(process.poll() is not None for process in self._processes):
+                    raise RuntimeError(f"A load-test process exited while waiting for {url}")
+                try:
+                    if (await client.get(url)).status_code < 500:
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.5)
+        raise RuntimeError(f"{url} did not come up within {STARTUP_TIMEOUT_SECONDS}s")
+
+    async def start(self) -> None:
+        env = dict(os.environ)
+        if not self.standins_url:
+            port = _free_port()
+            self.standins_url = f"http://127.0.0.1:{port}"
+            self._spawn(["benchmarks.standins", "--port", str(port), "--config", json.dumps(asdict(self.config.standins))], env)
+            await self._wait_ready(f"{self.standins_url}/__stats")
+
+        if not self.app_url:
+            port = _free_port()
+            self.app_url = f"http://127.0.0.1:{port}"
+            env.update({
+                "AZURE_OPENAI_ENDPOINT": self.standins_url,
+                "AZURE_OPENAI_API_KEY": "loadtest",
+                "AZURE_SEARCH_SERVICE_ENDPOINT": self.standins_url,
+                "AZURE_SEARCH_API_KEY": "loadtest",
+                "AZURE_SEARCH_ADMIN_KEY": "loadtest",
+                "SEARCH_BACKEND": "azure",
+                "GOOGLE_SHEETS_EXPORT_URL": f"{self.standins_url}/sheets.csv",
+                "HTTP_CASSETTE_MODE": "",
+                # No app registration: the adapter skips JWT validation and connector tokens
+                "MICROSOFT_APP_ID": "", "MICROSOFT_APP_PASSWORD": "", "MICROSOFTAPPID": "", "MICROSOFTAPPPASSWORD": "",
+            })
+            self._spawn(["benchmarks.serve", "--port", str(port), "--lag-log", self.lag_log], env)
+            await self._wait_ready(f"{self.app_url}/")
+
+    def stop(self) -> None:
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    # -- load ---------------------------------------------------------------------------------
+
+    async def _send(self, client: httpx.AsyncClient, kind: str, user: int, sequence: int,
+                    rng: random.Random) -> httpx.Response:
+        if kind == "ask":
+            return await client.post(f"{self.app_url}/documents/ask", params={"question": rng.choice(self._questions)})
+        text = rng.choice(GREETINGS) if kind == "greeting" else rng.choice(self._questions)
+        return await client.post(f"{self.app_url}{self.config.messages_path}",
+                                 json=message_activity(text, user, sequence, self.standins_url))
+
+    async def _virtual_user(self, client: httpx.AsyncClient, user: int, users: int, deadline: float) -> None:
+        rng = random.Random(self.config.seed * 100_003 + user)
+        kinds = [kind for kind in KINDS if self.config.mix.get(kind, 0) > 0]
+        weights = [self.config.mix[kind] for kind in kinds]
+        sequence = 0
+        while time.perf_counter() < deadline:
+            sequence += 1
+            kind = rng.choices(kinds, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await self._send(client, kind, user, sequence, rng)
+                record = RequestRecord(started - self.run_start, users, kind, time.perf_counter() - started,
+                                       response.status_code, _body_error(response))
+            except httpx.HTTPError as e:
+                record = RequestRecord(started - self.run_start, users, kind, time.perf_counter() - started, 0,
+                                       f"{type(e).__name__}: {e}"[:200])
+            self.records.append(record)
+            if self.config.think_ms > 0:
+                await asyncio.sleep(min(rng.expovariate(1000 / self.config.think_ms), max(0.0, deadline - time.perf_counter())))
+
+    async def _sample_client_lag(self, interval: float = 0.1) -> None:
+        expected = time.perf_counter() + interval
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            self.client_lag.append(max(0.0, now - expected) * 1000)
+            expected = now + interval
+
+    async def run(self) -> None:
+        limits = httpx.Limits(max_connections=max(self.config.users) + 10, max_keepalive_connections=max(self.config.users))
+        async with httpx.AsyncClient(timeout=self.config.timeout_seconds, limits=limits) as client:
+            lag_task = asyncio.create_task(self._sample_client_lag())
+            self.run_start, self.epoch_start = time.perf_counter(), time.time()
+            try:
+                for users in self.config.users:
+                    deadline = time.perf_counter() + self.config.step_seconds
+                    await asyncio.gather(*[self._virtual_user(client, user, users, deadline) for user in range(users)])
+            finally:
+                lag_task.cancel()
+
+    async def standin_stats(self) -> Dict[str, Any]:
+        try:
+            async with httpx.AsyncClient(timeout=5) as client:
+                return (await client.get(f"{self.standins_url}/__stats")).json()
+        except (httpx.HTTPError, ValueError) as e:
+            return {"error": str(e)}
+
+    def app_loop_lag(self) -> List[Dict[str, float]]:
+        """Lag samples from the app, with ``t`` rebased to seconds since the run started."""
+        if not os.path.exists(self.lag_log):
+            return []
+        with open(self.lag_log, encoding="utf-8") as log:
+            samples = [json.loads(line) for line in log if line.strip()]
+        return [{"t": sample["t"] - self.epoch_start, "lag_ms": sample["lag_ms"]}
+                for sample in samples if sample["t"] >= self.epoch_start]
+
+
+def _records_summary(records: List[RequestRecord], seconds: float) -> Dict[str, Any]:
+    statuses: Dict[str, int] = {}
+    for record in records:
+        statuses[str(record.status)] = statuses.get(str(record.status), 0) + 1
+    failed = [record for record in records if record.failed]
+    return {
+        "requests": len(records),
+        "throughput_rps": round(len(records) / seconds, 3) if seconds else 0.0,
+        "error_rate": round(len(failed) / len(records), 4) if records else 0.0,
+        "latency_ms": distribution([record.latency * 1000 for record in records]),
+        "statuses": statuses,
+        "sample_errors": sorted({record.error for record in failed if record.error})[:5],
+    }
+
+
+def build_report(test: LoadTest, standin_stats: Dict[str, Any]) -> Dict[str, Any]:
+    config = test.config
+    lag = test.app_loop_lag()
+    steps = []
+    for index, users in enumerate(config.users):
+        start, end = index * config.step_seconds, (index + 1) * config.step_seconds
+        records = [record for record in test.records if record.users == users and start <= record.started < end]
+        step = {"users": users, **_records_summary(records, config.step_seconds)}
+        step["by_kind"] = {kind: _records_summary([record for record in records if record.kind == kind], config.step_seconds)
+                           for kind in KINDS if any(record.kind == kind for record in records)}
+        step["loop_lag_ms"] = distribution([sample["lag_ms"] for sample in lag if start <= sample["t"] < end])
+        steps.append(step)
+
+    timeline = []
+    total_seconds = int(len(config.users) * config.step_seconds)
+    for second in range(total_seconds):
+        records = [record for record in test.records if second <= record.started + record.latency < second + 1]
+        lags = [sample["lag_ms"] for sample in lag if second <= sample["t"] < second + 1]
+        timeline.append({
+            "t": second,
+            "users": config.users[min(int(second // config.step_seconds), len(config.users) - 1)],
+            "completed": len(records),
+            "errors": sum(record.failed for record in records),
+            "p50_ms": round(distribution([record.latency * 1000 for record in records])["p50"], 1),
+            "p95_ms": round(distribution([record.latency * 1000 for record in records])["p95"], 1),
+            "loop_lag_max_ms": max(lags) if lags else 0.0,
+        })
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "app_url": test.app_url,
+            "config": asdict(config),
+        },
+        "steps": steps,
+        "timeline": timeline,
+        "standins": standin_stats,
+        "client_loop_lag_ms": distribution(test.client_lag),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"  {'users':>5}{'req':>7}{'rps':>8}{'err %':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'lag p95':>9}{'lag max':>9}"]
+    for step in report["steps"]:
+        latency, lag = step["latency_ms"], step["loop_lag_ms"]
+        lines.append(f"  {step['users']:>5}{step['requests']:>7}{step['throughput_rps']:>8.2f}{step['error_rate'] * 100:>7.1f}"
+                     f"{latency['p50']:>9.0f}{latency['p95']:>9.0f}{latency['p99']:>9.0f}{lag['p95']:>9.1f}{lag['max']:>9.1f}")
+    stats = report["standins"]
+    if "requests" in stats:
+        lines.append(f"  stand-ins: {stats['requests']} throttled={stats.get('throttled', {})} errors={stats.get('errors', {})}")
+    if report["client_loop_lag_ms"]["max"] > 250:
+        lines.append("  warning: the load generator's own event loop lagged; latencies include client-side delay")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test /documents/ask and /api/messages against stand-in backends")
+    parser.add_argument("--users", default="5,10,20", help="Concurrent virtual users per step, comma separated")
+    parser.add_argument("--step-seconds", type=float, default=30.0)
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="Mean pause between a user's requests")
+    parser.add_argument("--mix", default="ask=5,message=4,greeting=1", help="Relative weights of ask/message/greeting")
+    parser.add_argument("--messages-path", default="/api/messages", help="Bot endpoint (/api/messages or /api/teams/messages)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request (seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app-url", default="", help="Load an already running app instead of launching one")
+    parser.add_argument("--standins-url", default="", help="Use already running stand-ins")
+    parser.add_argument("--openai-latency-ms", type=float, default=600.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=60.0)
+    parser.add_argument("--search-latency-ms", type=float, default=120.0)
+    parser.add_argument("--openai-429-rate", type=float, default=0.0, help="Fraction of OpenAI calls answered 429")
+    parser.add_argument("--search-error-rate", type=float, default=0.0, help="Fraction of search calls answered 503")
+    parser.add_argument("--corpus", default="", help="JSONL corpus snapshot for the search stand-in")
+    parser.add_argument("--output", default="benchmarks/results/loadtest.json")
+    return parser.parse_args(argv)
+
+
+def config_from_args(args: argparse.Namespace) -> LoadConfig:
+    mix = {name.strip(): float(weight) for name, weight in (part.split("=") for part in args.mix.split(",") if part)}
+    unknown = set(mix) - set(KINDS)
+    if unknown:
+        raise SystemExit(f"Unknown request kinds in --mix: {', '.join(sorted(unknown))}")
+    return LoadConfig(
+        users=[int(users) for users in args.users.split(",") if users], step_seconds=args.step_seconds,
+        think_ms=args.think_ms, mix=mix, messages_path=args.messages_path, timeout_seconds=args.timeout,
+        seed=args.seed, app_url=args.app_url, standins_url=args.standins_url,
+        standins=StandinConfig(openai_latency_ms=args.openai_latency_ms, embedding_latency_ms=args.embedding_latency_ms,
+                               search_latency_ms=args.search_latency_ms, openai_429_rate=args.openai_429_rate,
+                               search_error_rate=args.search_error_rate, corpus_path=args.corpus, seed=args.seed),
+    )
+
+
+async def run_load_test(config: LoadConfig) -> Dict[str, Any]:
+    test = LoadTest(config)
+    try:
+        await test.start()
+        await test.run()
+        return build_report(test, await test.standin_stats())
+    finally:
+        test.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_load_test(config_from_args(args)))
+    print(format_report(report))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
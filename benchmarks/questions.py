@@ -0,0 +1,91 @@
+"""
+Fixed question set for the latency benchmarks.
+
+The categories are the RAG.TXT compliance questions from
+tests/test_all_rag_questions.py, plus a greeting and a short policy question so
+the greeting and Sheets knowledge-base paths are exercised too. Keep the list
+stable: result files are only comparable when they ran the same questions.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+QUESTION_SET: Dict[str, List[str]] = {
+    'NZ Standards & Codes': [
+        'Please tell me the minimum clear cover requirements as per NZS code in designing a concrete element.',
+        'Tell me what particular clause talks about the detailing requirements in designing a beam.',
+        "Tell me the strength reduction factors used when I'm designing a beam or when considering seismic actions.",
+        "Tell me what particular NZS structural code to refer to if I'm designing a composite slab to make it a floor diaphragm?",
+    ],
+    'Past Project References': [
+        'I am designing a precast panel, please tell me all past projects that have a scope about the following keywords or description: Precast Panel, Precast, Precast Connection, Unispans',
+        "I am designing a timber retaining wall, it's going to be 3m tall; can you provide me example past projects and help me draft a design philosophy?",
+        'Please advise me on what DTCE has done in the past for a 2-storey concrete precast panel building maybe with a timber-framed structure on top?',
+    ],
+    'Product Specifications': [
+        "I'm looking for a specific proprietary product that's suitable to provide a waterproofing layer to a concrete block wall that DTCE has used in the past.",
+        'I need timber connection details for joining a timber beam to a column. Please provide specifications for the proprietary products DTCE usually refers to, as well as other options to consider.',
+        'What are the available sizes of LVL timber on the market? Please list all links containing the sizes and price per length. Also, confirm if the suppliers are located near Wellington.',
+    ],
+    'Online References': [
+        "I am currently designing a composite beam but need to make it haunched/tapered. Please provide related references or online threads mentioning the keyword 'tapered composite beam', preferably from anonymous structural engineers.",
+        'Please provide design guidelines for a reinforced concrete column to withstand both seismic and gravity actions. If possible, include a legitimate link that gives direct access to the specific design guidelines.',
+    ],
+    'Builder/Contact Information': [
+        "My client is asking about builders that we've worked with before. Can you find any companies and/or contact details that constructed a design for us in the past 3 years and didn't seem to have too many issues during construction? The design job I'm dealing with now is a steel structure retrofit of an old brick building.",
+    ],
+    'Templates & Forms': [
+        'Please provide me with the template we generally use for preparing a PS1. Also, please provide me with the direct link to access it on SuiteFiles.',
+        "I wasn't able to find a PS3 template in SuiteFiles. Please provide me with a legitimate link to a general PS3 template that can be submitted to any council in New Zealand.",
+        'Please provide me with the link or the file for the timber beam design spreadsheet that DTCE usually uses or has used.',
+    ],
+    'Scenario-Based Technical': [
+        "Show me examples of mid-rise timber frame buildings in high wind zones that we've designed.",
+        'What foundation systems have we used for houses on steep slopes in Wellington?',
+        'Find projects where we designed concrete shear walls for seismic strengthening.',
+        'What connection details have we used for balconies on coastal apartment buildings?',
+    ],
+    'Problem-Solving & Lessons Learned': [
+        'What issues have we run into when using screw piles in soft soils?',
+        'Summarise any lessons learned from projects where retaining walls failed during construction.',
+        'What waterproofing methods have worked best for basement walls in high water table areas?',
+    ],
+    'Regulatory & Consent Precedents': [
+        'Give me examples of projects where council questioned our wind load calculations.',
+        'How have we approached alternative solution applications for non-standard stair designs?',
+        'Show me precedent for using non-standard bracing in heritage building retrofits.',
+    ],
+    'Cost & Time Insights': [
+        'How long does it typically take from concept to PS1 for small commercial alterations?',
+        "What's the typical cost range for structural design of multi-unit residential projects?",
+        'Find projects where the structural scope expanded significantly after concept design.',
+    ],
+    'Best Practices & Templates': [
+        "What's our standard approach to designing steel portal frames for industrial buildings?",
+        'Show me our best example drawings for timber diaphragm design.',
+        'What calculation templates do we have for multi-storey timber buildings?',
+    ],
+    'Materials & Methods Comparisons': [
+        'When have we chosen precast concrete over in-situ concrete for floor slabs, and why?',
+        'What timber treatment levels have we specified for exterior beams in coastal conditions?',
+        "Compare different seismic retrofit methods we've used for unreinforced masonry buildings.",
+    ],
+    'Internal Knowledge Mapping': [
+        'Which engineers have experience with tilt-slab construction?',
+        'Who has documented expertise in pile design for soft coastal soils?',
+        'Show me project notes authored by our senior engineer on seismic strengthening.',
+    ],
+    "Greetings": [
+        "hello",
+    ],
+    "Company Policy": [
+        "What is our wellness policy?",
+        "How do I apply for annual leave?",
+    ],
+}
+
+
+def load_questions(categories: Optional[List[str]] = None, limit: int = 0) -> List[Tuple[str, str]]:
+    """(category, question) pairs in a fixed order, optionally restricted to some categories."""
+    pairs = [(category, question) for category, questions in QUESTION_SET.items()
+             if not categories or category in categories for question in questions]
+    return pairs[:limit] if limit else pairs
@@ -0,0 +1,324 @@
+"""
+End-to-end latency benchmark for the question pipeline.
+
+Drives ``DocumentQAService.answer_question`` (greeting check, Sheets KB, then
+RAG) and ``AzureRAGService.process_query`` over the fixed question set against
+stub backends with configurable latency, and reports p50/p95/p99 per pipeline
+stage plus end-to-end wall time, CPU time, peak allocations and tokens:
+
+    python -m benchmarks.run --repeat 5 --output benchmarks/results/before.json
+    python -m benchmarks.run --openai-latency-ms 0 --search-latency-ms 0   # our own overhead only
+    python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+
+Services (and the process-wide document content cache) are rebuilt every
+round, so later rounds are not just cache hits; the untimed warm-up round only
+primes imports and the stub backends. Peak allocations come from one extra
+round under tracemalloc, kept apart from the timed rounds because it slows
+the pipeline several-fold. The answer cache is off unless ``--answer-cache``
+is given.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from unittest import mock
+
+import structlog
+
+from dtce_ai_bot.services import document_qa as document_qa_module
+from dtce_ai_bot.services import rag_handler as rag_handler_module
+from dtce_ai_bot.services import prompt_registry
+from dtce_ai_bot.services.azure_rag_service_v2 import AzureRAGService
+from dtce_ai_bot.services.document_qa import DocumentQAService
+from dtce_ai_bot.utils.content_cache import get_document_content_cache
+from dtce_ai_bot.utils.stage_timer import StageRecorder, record_stages
+
+from .questions import load_questions
+from .stubs import (
+    EMBEDDING_DIMENSIONS, Latency, StubOpenAI, StubSyncOpenAI, build_search_client, stub_sheets_pairs
+)
+
+TARGETS = ("document_qa", "rag_service")
+
+# Report order; stages recorded under other names are appended after these
+STAGES = (
+    "greeting_check", "sheets_kb", "intent", "answer_cache", "embedding", "search",
+    "hydration", "context_build", "synthesis", "post_processing",
+)
+
+PERCENTILES = (50, 95, 99)
+
+BENCHMARK_DEPLOYMENT = "gpt-4o"
+
+
+@dataclass
+class BenchmarkConfig:
+    repeat: int = 3
+    warmup: int = 1
+    openai_latency_ms: float = 600.0
+    embedding_latency_ms: float = 60.0
+    search_latency_ms: float = 120.0
+    sheets_latency_ms: float = 250.0
+    jitter: float = 0.25
+    seed: int = 0
+    documents: int = 500
+    dimensions: int = EMBEDDING_DIMENSIONS
+    corpus_path: str = ""
+    targets: Tuple[str, ...] = TARGETS
+    categories: List[str] = field(default_factory=list)
+    limit: int = 0
+    allocations: bool = True
+    answer_cache: bool = False
+
+
+@dataclass
+class Sample:
+    """One timed request."""
+    target: str
+    category: str
+    question: str
+    wall_seconds: float
+    cpu_seconds: float
+    recorder: StageRecorder
+
+
+@dataclass
+class TargetRun:
+    samples: List[Sample] = field(default_factory=list)
+    peak_bytes: List[int] = field(default_factory=list)  # per question, from the allocation round
+
+
+class Backends:
+    """The stub OpenAI, Search and Sheets backends shared by every round of a run."""
+
+    def __init__(self, config: BenchmarkConfig):
+        self.chat_latency = Latency(config.openai_latency_ms, config.jitter, config.seed)
+        self.embedding_latency = Latency(config.embedding_latency_ms, config.jitter, config.seed + 1)
+        self.search_latency = Latency(config.search_latency_ms, config.jitter, config.seed + 2)
+        self.sheets_latency = Latency(config.sheets_latency_ms, config.jitter, config.seed + 3)
+        self.openai = StubOpenAI(self.chat_latency, self.embedding_latency, config.dimensions)
+        self.sync_openai = StubSyncOpenAI(self.embedding_latency, config.dimensions)
+        self.search_client = build_search_client(self.search_latency, config.corpus_path, config.documents,
+                                                 config.dimensions, config.seed)
+
+
+def build_target(name: str, backends: Backends, config: BenchmarkConfig) -> Callable[[str], Awaitable[Dict[str, Any]]]:
+    """A fresh service for ``name`` wired to the stub backends; returns its entry point."""
+    if name == "rag_service":
+        service = AzureRAGService(backends.search_client, backends.openai, BENCHMARK_DEPLOYMENT, BENCHMARK_DEPLOYMENT)
+        if not config.answer_cache:
+            service.answer_cache = None
+        return service.process_query
+
+    if name == "document_qa":
+        # DocumentQAService and RAGHandler build their own OpenAI clients from settings
+        with mock.patch.object(document_qa_module, "create_async_openai_client", return_value=backends.openai), \
+                mock.patch.object(rag_handler_module, "create_async_openai_client", return_value=backends.openai):
+            service = DocumentQAService(backends.search_client)
+        service.google_sheets_service._get_qa_pairs = stub_sheets_pairs(backends.sheets_latency)
+        service.google_sheets_service._openai_client = backends.sync_openai
+        if not config.answer_cache:
+            service.rag_handler.rag_service_v2.answer_cache = None
+        return service.answer_question
+
+    raise ValueError(f"Unknown benchmark target: {name}")
+
+
+async def _ask_all(answer: Callable[[str], Awaitable[Dict[str, Any]]], questions: List[Tuple[str, str]],
+                   on_answered: Callable[[str, str], None] = None) -> None:
+    for category, question in questions:
+        await answer(question)
+        if on_answered:
+            on_answered(category, question)
+
+
+async def run_target(name: str, backends: Backends, config: BenchmarkConfig,
+                     questions: List[Tuple[str, str]]) -> TargetRun:
+    run = TargetRun()
+    for _ in range(config.warmup):
+        get_document_content_cache().clear()
+        await _ask_all(build_target(name, backends, config), questions)
+
+    for _ in range(config.repeat):
+        get_document_content_cache().clear()
+        answer = build_target(name, backends, config)
+        for category, question in questions:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            with record_stages() as recorder:
+                await answer(question)
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            run.samples.append(Sample(name, category, question, wall, cpu, recorder))
+
+    if config.allocations:
+        # A separate round: tracemalloc slows allocation-heavy code several-fold, so it never overlaps the timings
+        get_document_content_cache().clear()
+        tracemalloc.start()
+        try:
+            def record_peak(category: str, question: str) -> None:
+                run.peak_bytes.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+
+            await _ask_all(build_target(name, backends, config), questions, record_peak)
+        finally:
+            tracemalloc.stop()
+    return run
+
+
+async def run_benchmark(config: BenchmarkConfig) -> Dict[str, TargetRun]:
+    questions = load_questions(config.categories, config.limit)
+    backends = Backends(config)
+    return {name: await run_target(name, backends, config, questions) for name in config.targets}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile (same as numpy's default)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    summary = {f"p{pct}": round(percentile(values, pct), 3) for pct in PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values), 3) if values else 0.0
+    summary["max"] = round(max(values), 3) if values else 0.0
+    return summary
+
+
+def summarize(run: TargetRun) -> Dict[str, Any]:
+    """Per-target report: end-to-end and per-stage distributions (ms), CPU, allocations, tokens."""
+    samples = run.samples
+    recorded = {name for sample in samples for name in sample.recorder.wall_seconds}
+    stage_names = [name for name in STAGES if name in recorded] + sorted(recorded - set(STAGES))
+
+    stages = {}
+    for name in stage_names:
+        ran = [sample.recorder for sample in samples if name in sample.recorder.wall_seconds]
+        stages[name] = {
+            "requests": len(ran),
+            **distribution([sum(recorder.wall_seconds[name]) * 1000 for recorder in ran]),
+            "cpu_ms_mean": round(sum(recorder.cpu_seconds[name] for recorder in ran) * 1000 / len(ran), 3),
+        }
+
+    def tokens(key: str) -> Dict[str, float]:
+        values = [sample.recorder.values.get(key, 0.0) for sample in samples]
+        return {"total": sum(values), "mean": round(sum(values) / len(values), 1) if values else 0.0}
+
+    report = {
+        "requests": len(samples),
+        "end_to_end_ms": distribution([sample.wall_seconds * 1000 for sample in samples]),
+        "cpu_ms": distribution([sample.cpu_seconds * 1000 for sample in samples]),
+        "prompt_tokens": tokens("prompt_tokens"),
+        "completion_tokens": tokens("completion_tokens"),
+        "stages": stages,
+    }
+    if run.peak_bytes:
+        report["peak_alloc_kb"] = distribution([peak / 1024 for peak in run.peak_bytes])
+    return report
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_report(config: BenchmarkConfig, results: Dict[str, TargetRun]) -> Dict[str, Any]:
+    config_dict = asdict(config)
+    config_dict["targets"] = list(config.targets)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "token_counter": "tiktoken" if prompt_registry.tiktoken is not None else "estimate",
+            "questions": len(load_questions(config.categories, config.limit)),
+            "config": config_dict,
+        },
+        "targets": {name: summarize(run) for name, run in results.items()},
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = []
+    for target, summary in report["targets"].items():
+        end_to_end, cpu = summary["end_to_end_ms"], summary["cpu_ms"]
+        lines.append(f"\n{target}: {summary['requests']} requests, "
+                     f"{summary['prompt_tokens']['mean']:.0f} prompt tokens/request")
+        lines.append(f"  {'stage':<18}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'cpu ms':>10}")
+        for name, stage_summary in summary["stages"].items():
+            lines.append(f"  {name:<18}{stage_summary['requests']:>6}{stage_summary['p50']:>11.1f}"
+                         f"{stage_summary['p95']:>11.1f}{stage_summary['p99']:>11.1f}{stage_summary['cpu_ms_mean']:>10.1f}")
+        lines.append(f"  {'end_to_end':<18}{summary['requests']:>6}{end_to_end['p50']:>11.1f}"
+                     f"{end_to_end['p95']:>11.1f}{end_to_end['p99']:>11.1f}{cpu['mean']:>10.1f}")
+        if "peak_alloc_kb" in summary:
+            lines.append(f"  peak allocations: p50 {summary['peak_alloc_kb']['p50']:.0f} KB, "
+                         f"max {summary['peak_alloc_kb']['max']:.0f} KB")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> Tuple[BenchmarkConfig, argparse.Namespace]:
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark with per-stage breakdown")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed rounds over the question set")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds first (fill stub backend memos, imports, prompt caches)")
+    parser.add_argument("--openai-latency-ms", type=float, default=600.0, help="Mean chat completion latency")
+    parser.add_argument("--embedding-latency-ms", type=float, default=60.0, help="Mean embeddings latency")
+    parser.add_argument("--search-latency-ms", type=float, default=120.0, help="Mean search/get_document latency")
+    parser.add_argument("--sheets-latency-ms", type=float, default=250.0, help="Mean Google Sheets fetch latency")
+    parser.add_argument("--jitter", type=float, default=0.25, help="Uniform latency jitter as a fraction of the mean")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--documents", type=int, default=500, help="Synthetic corpus size")
+    parser.add_argument("--dimensions", type=int, default=EMBEDDING_DIMENSIONS, help="Embedding dimensions")
+    parser.add_argument("--corpus", default="", help="JSONL corpus snapshot (scripts/export_search_corpus.py) instead of the synthetic one")
+    parser.add_argument("--target", action="append", choices=TARGETS, help="Only benchmark this entry point (repeatable)")
+    parser.add_argument("--category", action="append", help="Only questions from this category (repeatable)")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N questions")
+    parser.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc allocation round")
+    parser.add_argument("--answer-cache", action="store_true", help="Leave the semantic answer cache enabled")
+    parser.add_argument("--output", default="benchmarks/results/latest.json", help="Where to write the JSON results")
+    parser.add_argument("--log-level", default="WARNING", help="Pipeline log level while benchmarking")
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(
+        repeat=args.repeat, warmup=args.warmup, openai_latency_ms=args.openai_latency_ms, embedding_latency_ms=args.embedding_latency_ms,
+        search_latency_ms=args.search_latency_ms, sheets_latency_ms=args.sheets_latency_ms, jitter=args.jitter,
+        seed=args.seed, documents=args.documents, dimensions=args.dimensions, corpus_path=args.corpus,
+        targets=tuple(args.target or TARGETS), categories=args.category or [], limit=args.limit,
+        allocations=not args.no_allocations, answer_cache=args.answer_cache,
+    )
+    return config, args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config, args = parse_args(argv)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, args.log_level.upper())))
+
+    results = asyncio.run(run_benchmark(config))
+    report = build_report(config, results)
+    print(format_report(report))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Run the app under uvicorn for a load test, sampling event-loop lag.
+
+A background task sleeps ``--lag-interval-ms`` at a time and appends how late
+it woke up to a JSONL file (``{"t": <epoch seconds>, "lag_ms": ...}``). The
+load test lines those samples up against the load it was applying. Point the
+app at the stand-ins through the usual settings environment variables
+(benchmarks.loadtest does this when it launches the app itself):
+
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8765 AZURE_SEARCH_SERVICE_ENDPOINT=http://127.0.0.1:8765 \\
+        python -m benchmarks.serve --port 8000 --lag-log /tmp/lag.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import uvicorn
+
+
+async def sample_loop_lag(path: str, interval: float) -> None:
+    with open(path, "a", encoding="utf-8", buffering=1) as log:
+        expected = time.perf_counter() + interval
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            log.write(json.dumps({"t": round(time.time(), 3), "lag_ms": round(max(0.0, now - expected) * 1000, 2)}) + "\n")
+            expected = now + interval
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the app for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--lag-log", default="", help="JSONL file for event-loop lag samples")
+    parser.add_argument("--lag-interval-ms", type=float, default=100.0)
+    args = parser.parse_args(argv)
+
+    from dtce_ai_bot.core.app import app
+
+    if args.lag_log:
+        tasks = []
+
+        async def start_lag_sampler():
+            tasks.append(asyncio.create_task(sample_loop_lag(args.lag_log, args.lag_interval_ms / 1000)))
+
+        app.router.on_startup.append(start_lag_sampler)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
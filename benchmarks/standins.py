@@ -0,0 +1,261 @@
+"""
+Local HTTP stand-ins for the services the app calls, for load tests.
+
+One aiohttp server plays:
+- Azure OpenAI: chat completions and embeddings (replies from benchmarks.stubs)
+- Azure AI Search: ``docs/search.post.search`` and ``docs('key')`` over a
+  ``LocalSearchIndex`` (synthetic corpus or a JSONL snapshot)
+- the Bot Framework connector the bot posts its replies to (``serviceUrl``)
+- the Google Sheets CSV export
+
+Every route sleeps for a seeded latency first. OpenAI answers 429 with
+``retry-after`` and Search answers 503 at configurable rates, so
+the app's limiter and retry paths get exercised. ``GET /__stats`` returns
+per-service request, throttle and error counters.
+
+    python -m benchmarks.standins --port 8765 --openai-latency-ms 600 --openai-429-rate 0.05
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from dtce_ai_bot.integrations.local_search import LocalCaption, LocalSearchIndex
+from dtce_ai_bot.services.prompt_registry import count_tokens
+
+from .stubs import EMBEDDING_DIMENSIONS, SHEETS_QA_PAIRS, Latency, stub_embedding, stub_reply, synthetic_corpus
+
+SEARCH_ROUTE = re.compile(r"^/indexes\('(?P<index>[^']+)'\)/docs(?:\('(?P<key>[^']+)'\)|/search\.post\.search)$")
+
+# REST body field -> LocalSearchIndex.search keyword
+SEARCH_ARGUMENTS = {
+    "filter": "filter", "top": "top", "skip": "skip", "searchMode": "search_mode", "queryType": "query_type",
+    "facets": "facets", "highlight": "highlight_fields", "captions": "query_caption",
+}
+
+# Distinct search bodies remembered; the ranking work is the real service's, not ours
+SEARCH_MEMO_ENTRIES = 20_000
+
+
+@dataclass
+class StandinConfig:
+    openai_latency_ms: float = 600.0
+    embedding_latency_ms: float = 60.0
+    search_latency_ms: float = 120.0
+    connector_latency_ms: float = 80.0
+    sheets_latency_ms: float = 250.0
+    jitter: float = 0.25
+    openai_429_rate: float = 0.0  # Fraction of OpenAI calls answered 429 + retry-after
+    search_error_rate: float = 0.0  # Fraction of search calls answered 503
+    retry_after_seconds: float = 1.0
+    documents: int = 500
+    dimensions: int = EMBEDDING_DIMENSIONS
+    corpus_path: str = ""
+    seed: int = 0
+
+
+def _csv(pairs) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Question", "Answer"])
+    writer.writerows((pair["question"], pair["answer"]) for pair in pairs)
+    return buffer.getvalue()
+
+
+def _rest_result(row: Dict[str, Any]) -> Dict[str, Any]:
+    """A LocalSearchIndex result in the REST wire shape the SDK deserializes."""
+    result = {key: value for key, value in row.items() if not key.startswith("@search.")}
+    result["@search.score"] = float(row.get("@search.score") or 0.0)
+    if row.get("@search.reranker_score") is not None:
+        result["@search.rerankerScore"] = float(row["@search.reranker_score"])
+    if row.get("@search.highlights"):
+        result["@search.highlights"] = row["@search.highlights"]
+    if row.get("@search.captions"):
+        result["@search.captions"] = [
+            {"text": caption.text, "highlights": caption.highlights} if isinstance(caption, LocalCaption) else caption
+            for caption in row["@search.captions"]
+        ]
+    return result
+
+
+class Standins:
+    """The stand-in services and their counters."""
+
+    def __init__(self, config: StandinConfig):
+        self.config = config
+        self.chat_latency = Latency(config.openai_latency_ms, config.jitter, config.seed)
+        self.embedding_latency = Latency(config.embedding_latency_ms, config.jitter, config.seed + 1)
+        self.search_latency = Latency(config.search_latency_ms, config.jitter, config.seed + 2)
+        self.sheets_latency = Latency(config.sheets_latency_ms, config.jitter, config.seed + 3)
+        self.connector_latency = Latency(config.connector_latency_ms, config.jitter, config.seed + 4)
+        self._random = random.Random(config.seed)
+        self.index = (LocalSearchIndex.from_jsonl(config.corpus_path) if config.corpus_path
+                      else LocalSearchIndex(synthetic_corpus(config.documents, config.dimensions, config.seed)))
+        self._search_memo: Dict[str, Dict[str, Any]] = {}
+        self.requests: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.started = time.time()
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/openai/deployments/{deployment}/chat/completions", self.chat_completions)
+        app.router.add_post("/openai/deployments/{deployment}/embeddings", self.embeddings)
+        app.router.add_route("*", "/indexes{rest:.*}", self.search)
+        app.router.add_route("*", "/v3/conversations/{rest:.*}", self.connector)
+        app.router.add_get("/sheets.csv", self.sheets)
+        app.router.add_get("/__stats", self.stats)
+        return app
+
+    def _reject(self, service: str, rate: float) -> Optional[web.Response]:
+        """An injected failure for ``service`` at ``rate``, or None."""
+        self.requests[service] += 1
+        if rate <= 0 or self._random.random() >= rate:
+            return None
+        if service.startswith("openai"):
+            self.throttled[service] += 1
+            return web.json_response(
+                {"error": {"code": "429", "message": "Requests to the deployment have exceeded the rate limit (stand-in)."}},
+                status=429, headers={"retry-after": str(self.config.retry_after_seconds),
+                                     "retry-after-ms": str(int(self.config.retry_after_seconds * 1000))})
+        self.errors[service] += 1
+        return web.json_response({"error": {"code": "ServiceUnavailable", "message": "Stand-in outage"}}, status=503)
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        rejected = self._reject("openai_chat", self.config.openai_429_rate)
+        if rejected:
+            return rejected
+        body = await request.json()
+        await self.chat_latency.wait()
+        text = stub_reply(body.get("messages", []))
+        prompt_tokens = count_tokens("\n".join(str(message.get("content") or "") for message in body.get("messages", [])))
+        completion_tokens = count_tokens(text)
+        return web.json_response({
+            "id": f"chatcmpl-{self.requests['openai_chat']}", "object": "chat.completion", "created": int(time.time()),
+            "model": request.match_info["deployment"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        rejected = self._reject("openai_embeddings", self.config.openai_429_rate)
+        if rejected:
+            return rejected
+        body = await request.json()
+        await self.embedding_latency.wait()
+        texts = body.get("input")
+        texts = texts if isinstance(texts, list) else [texts]
+        tokens = sum(count_tokens(str(text)) for text in texts)
+        return web.json_response({
+            "object": "list", "model": request.match_info["deployment"],
+            "data": [{"object": "embedding", "index": i, "embedding": stub_embedding(str(text), self.config.dimensions)}
+                     for i, text in enumerate(texts)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    async def search(self, request: web.Request) -> web.Response:
+        match = SEARCH_ROUTE.match(request.path)
+        if not match:
+            return web.json_response({"error": {"code": "NotFound", "message": request.path}}, status=404)
+        rejected = self._reject("search", self.config.search_error_rate)
+        if rejected:
+            return rejected
+        await self.search_latency.wait()
+
+        if match.group("key"):
+            document = self.index.get(match.group("key"))
+            if document is None:
+                return web.json_response({"error": {"code": "NotFound", "message": "Document not found"}}, status=404)
+            select = request.query.get("$select")
+            fields = select.split(",") if select else list(document)
+            return web.json_response({field: document.get(field) for field in fields})
+
+        raw = await request.text()
+        if raw not in self._search_memo:
+            self._search_memo[raw] = self._run_search(json.loads(raw or "{}"))
+            if len(self._search_memo) > SEARCH_MEMO_ENTRIES:
+                self._search_memo.pop(next(iter(self._search_memo)))
+        return web.json_response(self._search_memo[raw])
+
+    def _run_search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        kwargs = {name: body[key] for key, name in SEARCH_ARGUMENTS.items() if key in body}
+        if body.get("select"):
+            kwargs["select"] = body["select"].split(",")
+        if body.get("orderby"):
+            kwargs["order_by"] = body["orderby"].split(",")
+        if body.get("searchFields"):
+            kwargs["search_fields"] = body["searchFields"].split(",")
+        kwargs["vector_queries"] = [
+            SimpleNamespace(vector=query.get("vector"), k_nearest_neighbors=query.get("k"), fields=query.get("fields"))
+            for query in body.get("vectorQueries") or [] if query.get("vector")
+        ]
+        rows, count, facets = self.index.search(body.get("search"), **kwargs)
+        response: Dict[str, Any] = {"value": [_rest_result(row) for row in rows]}
+        if body.get("count"):
+            response["@odata.count"] = count
+        if facets:
+            response["@search.facets"] = facets
+        return response
+
+    async def connector(self, request: web.Request) -> web.Response:
+        self.requests["bot_connector"] += 1
+        await request.read()
+        await self.connector_latency.wait()
+        return web.json_response({"id": f"reply-{self.requests['bot_connector']}"})
+
+    async def sheets(self, request: web.Request) -> web.Response:
+        self.requests["sheets"] += 1
+        await self.sheets_latency.wait()
+        return web.Response(text=_csv(SHEETS_QA_PAIRS), content_type="text/csv")
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": dict(self.requests),
+            "throttled": dict(self.throttled),
+            "errors": dict(self.errors),
+            "config": asdict(self.config),
+        })
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve OpenAI / Search / Bot connector / Sheets stand-ins")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", default="", help="StandinConfig as JSON (overrides the flags below)")
+    parser.add_argument("--openai-latency-ms", type=float, default=600.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=60.0)
+    parser.add_argument("--search-latency-ms", type=float, default=120.0)
+    parser.add_argument("--openai-429-rate", type=float, default=0.0)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--corpus", default="", help="JSONL corpus snapshot instead of the synthetic one")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.config:
+        config = StandinConfig(**json.loads(args.config))
+    else:
+        config = StandinConfig(openai_latency_ms=args.openai_latency_ms, embedding_latency_ms=args.embedding_latency_ms,
+                               search_latency_ms=args.search_latency_ms, openai_429_rate=args.openai_429_rate,
+                               search_error_rate=args.search_error_rate, corpus_path=args.corpus)
+    standins = Standins(config)
+    standins.index.search("*", top=1)  # build the index before the first request
+    web.run_app(standins.build_app(), host=args.host, port=args.port, print=None,
+                access_log=None, handle_signals=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Stub backends for the latency benchmarks.
+
+Each stub sleeps for a configurable, seeded latency and then answers
+deterministically, so a run measures our own code (prompt building, ranking,
+context assembly, parsing) on top of a fixed, known backend cost:
+
+- ``StubOpenAI`` / ``StubSyncOpenAI``: chat completions (intent labels for the
+  classifier, a cited answer for synthesis) and hash-seeded
+  embeddings, with token usage filled in
+- ``LatencySearchClient``: the offline ``AsyncLocalSearchClient`` behind a
+  network delay, over a synthetic corpus or a JSONL snapshot
+- ``stub_sheets_pairs``: the Google Sheets Q&A fetch
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from dtce_ai_bot.integrations.local_search import AsyncLocalSearchClient, AsyncLocalSearchResults, LocalSearchIndex
+from dtce_ai_bot.services.prompt_registry import count_tokens
+from dtce_ai_bot.utils.document_fields import derive_document_fields
+
+EMBEDDING_DIMENSIONS = 1536
+
+# Keyword -> intent label returned for the classification prompt (first match wins)
+INTENT_KEYWORDS = (
+    ("template", "Template"),
+    ("policy", "Policy"),
+    ("leave", "Policy"),
+    ("nzs", "Standards"),
+    ("clause", "Standards"),
+    ("client", "Client"),
+    ("builder", "Client"),
+    ("project", "Project"),
+    ("how ", "Procedure"),
+)
+
+SHEETS_QA_PAIRS = [
+    {"question": "What is our wellness policy?", "answer": "See the Wellness Policy in Policies/HR."},
+    {"question": "Where is the PS1 template?", "answer": "Templates/Producer Statements/PS1.docx"},
+    {"question": "Who do I ask about IT access?", "answer": "Raise a ticket with the IT helpdesk."},
+    {"question": "What are the office hours?", "answer": "8:30am to 5pm, Monday to Friday."},
+    {"question": "How do I book a site vehicle?", "answer": "Use the vehicle calendar in Outlook."},
+]
+
+# Vocabulary the synthetic corpus is drawn from (overlaps the benchmark questions)
+CORPUS_VOCABULARY = (
+    "seismic strengthening retrofit timber steel concrete precast panel composite beam slab diaphragm "
+    "foundation pile retaining wall basement waterproofing bracing portal frame connection balcony "
+    "coastal wind load council consent producer statement design philosophy calculation drawing report "
+    "specification clause cover reinforcement masonry heritage building residential commercial industrial "
+    "geotechnical soil slope wellington apartment lvl treatment durability inspection construction builder"
+).split()
+
+CORPUS_FOLDERS = (
+    "Projects/{year}/{job}/03 Calcs/", "Projects/{year}/{job}/04 Reports/", "Projects/{year}/{job}/02 Drawings/",
+    "Policies/HR/", "Policies/Health and Safety/", "Templates/Producer Statements/", "Templates/Calculations/",
+    "Engineering/Standards/", "Clients/Contacts/",
+)
+
+
+@dataclass
+class Latency:
+    """A backend delay of ``mean_ms`` with uniform +/- ``jitter`` (a fraction of the mean)."""
+    mean_ms: float = 0.0
+    jitter: float = 0.25
+    seed: int = 0
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    def sample(self) -> float:
+        if self.mean_ms <= 0:
+            return 0.0
+        spread = self.mean_ms * self.jitter
+        return max(0.0, self.mean_ms + self._random.uniform(-spread, spread)) / 1000
+
+    async def wait(self) -> None:
+        await asyncio.sleep(self.sample())
+
+    def block(self) -> None:
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+
+@lru_cache(maxsize=4096)
+def _seeded_unit_vector(text: str, dimensions: int) -> Tuple[float, ...]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return tuple((vector / np.linalg.norm(vector)).tolist())
+
+
+def stub_embedding(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> List[float]:
+    """Unit vector seeded from the text, so the same text always embeds the same way."""
+    return list(_seeded_unit_vector(text, dimensions))
+
+
+def _message_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(message.get("content") or "") for message in messages)
+
+
+def stub_reply(messages: List[Dict[str, Any]]) -> str:
+    """The completion text a real deployment would plausibly return for these messages."""
+    system = str(messages[0].get("content") or "").lower() if messages else ""
+    prompt = _message_text(messages)
+
+    if "classify queries into knowledge categories" in system:
+        query = prompt.rsplit('User Query: "', 1)[-1].split('"', 1)[0].lower()
+        return next((label for keyword, label in INTENT_KEYWORDS if keyword in query), "General_Knowledge")
+    if "Context from DTCE Knowledge Base" in prompt:
+        return ("ANSWER:\nBased on our records, the closest matches are summarised below. "
+                "The design followed the relevant NZS requirements and the calculations are filed with the job "
+                "[Source 1]. A similar approach was taken on an earlier project [Source 2].\n\n"
+                "SOURCES:\n- [Source 1]\n- [Source 2]")
+    return "Thanks for the question - here is what our knowledge base says about it."
+
+
+def _completion(text: str, messages: List[Dict[str, Any]]) -> SimpleNamespace:
+    prompt_tokens = count_tokens(_message_text(messages))
+    completion_tokens = count_tokens(text)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=0, finish_reason="stop", message=SimpleNamespace(role="assistant", content=text))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                              total_tokens=prompt_tokens + completion_tokens),
+    )
+
+
+def _embeddings(input: Any, dimensions: int) -> SimpleNamespace:
+    texts = input if isinstance(input, list) else [input]
+    return SimpleNamespace(
+        data=[SimpleNamespace(index=i, embedding=stub_embedding(text, dimensions)) for i, text in enumerate(texts)],
+        usage=SimpleNamespace(prompt_tokens=sum(count_tokens(text) for text in texts), total_tokens=0),
+    )
+
+
+class StubOpenAI:
+    """Async stand-in for AsyncAzureOpenAI (chat.completions and embeddings only)."""
+
+    def __init__(self, chat_latency: Latency, embedding_latency: Latency, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.chat_latency = chat_latency
+        self.embedding_latency = embedding_latency
+        self.dimensions = dimensions
+        self.max_retries = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+        self.embeddings = SimpleNamespace(create=self._create_embedding)
+
+    async def _create_completion(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> SimpleNamespace:
+        await self.chat_latency.wait()
+        return _completion(stub_reply(messages), messages)
+
+    async def _create_embedding(self, model: str, input: Any, **kwargs) -> SimpleNamespace:
+        await self.embedding_latency.wait()
+        return _embeddings(input, self.dimensions)
+
+
+class StubSyncOpenAI:
+    """Blocking stand-in for AzureOpenAI, used by the Sheets similarity check."""
+
+    def __init__(self, embedding_latency: Latency, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.embedding_latency = embedding_latency
+        self.dimensions = dimensions
+        self.embeddings = SimpleNamespace(create=self._create_embedding)
+
+    def _create_embedding(self, model: str, input: Any, **kwargs) -> SimpleNamespace:
+        self.embedding_latency.block()
+        return _embeddings(input, self.dimensions)
+
+
+def _request_key(args: tuple, kwargs: Dict[str, Any]) -> str:
+    def plain(value: Any) -> Any:
+        if hasattr(value, "vector"):  # VectorizedQuery
+            return {"vector": hash(tuple(value.vector or ())), "k": value.k_nearest_neighbors, "fields": value.fields}
+        if isinstance(value, (list, tuple)):
+            return [plain(item) for item in value]
+        return value
+
+    return repr((plain(list(args)), sorted((name, plain(value)) for name, value in kwargs.items())))
+
+
+class LatencySearchClient:
+    """
+    Adds a network delay in front of an offline search client's calls.
+
+    Answers are memoized per request, so once the warm-up round has run the
+    in-process ranking work (which the real service does remotely) no longer
+    shows up in the pipeline's CPU time.
+    """
+
+    def __init__(self, client: AsyncLocalSearchClient, latency: Latency):
+        self._client = client
+        self._latency = latency
+        self._searches: Dict[str, Tuple[List[Dict[str, Any]], int, Dict[str, Any]]] = {}
+        self._documents: Dict[str, Dict[str, Any]] = {}
+
+    async def search(self, *args, **kwargs) -> AsyncLocalSearchResults:
+        await self._latency.wait()
+        key = _request_key(args, kwargs)
+        if key not in self._searches:
+            results = await self._client.search(*args, **kwargs)
+            self._searches[key] = ([row async for row in results], await results.get_count(), await results.get_facets())
+        rows, count, facets = self._searches[key]
+        return AsyncLocalSearchResults([dict(row) for row in rows], count, facets)
+
+    async def get_document(self, *args, **kwargs) -> Dict[str, Any]:
+        await self._latency.wait()
+        key = _request_key(args, kwargs)
+        if key not in self._documents:
+            self._documents[key] = await self._client.get_document(*args, **kwargs)
+        return dict(self._documents[key])
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+def synthetic_corpus(documents: int = 500, dimensions: int = EMBEDDING_DIMENSIONS, seed: int = 0,
+                     words_per_document: int = 600) -> List[Dict[str, Any]]:
+    """Documents shaped like the production index (structured fields, vectors, realistic lengths)."""
+    rng = random.Random(seed)
+    corpus = []
+    for number in range(documents):
+        year = rng.choice(("219", "220", "221", "222", "223", "224", "225"))
+        job = f"{year}{rng.randint(1, 400):03d}"
+        folder = rng.choice(CORPUS_FOLDERS).format(year=year, job=job)
+        title = " ".join(rng.choice(CORPUS_VOCABULARY) for _ in range(3)).title()
+        filename = f"{job} {title}.pdf" if folder.startswith("Projects/") else f"{title}.pdf"
+        blob_name = folder + filename
+        length = max(20, int(rng.gauss(words_per_document, words_per_document / 3)))
+        words = [rng.choice(CORPUS_VOCABULARY) for _ in range(length)]
+        content = ". ".join(" ".join(words[i:i + 12]).capitalize() for i in range(0, length, 12)) + "."
+        corpus.append({
+            "id": f"doc-{number:05d}",
+            "filename": filename,
+            "folder": folder,
+            "blob_name": blob_name,
+            "blob_url": f"https://benchmark.blob.core.windows.net/dtce-documents/{blob_name}",
+            "project_name": job if folder.startswith("Projects/") else "",
+            "content": content,
+            "content_vector": stub_embedding(blob_name, dimensions),
+            **derive_document_fields(blob_name),
+        })
+    return corpus
+
+
+def build_search_client(latency: Latency, corpus_path: str = "", documents: int = 500,
+                        dimensions: int = EMBEDDING_DIMENSIONS, seed: int = 0) -> LatencySearchClient:
+    index = (LocalSearchIndex.from_jsonl(corpus_path) if corpus_path
+             else LocalSearchIndex(synthetic_corpus(documents, dimensions, seed)))
+    return LatencySearchClient(AsyncLocalSearchClient(index), latency)
+
+
+def stub_sheets_pairs(latency: Latency):
+    """Replacement for GoogleSheetsKnowledgeService._get_qa_pairs (the CSV export fetch)."""
+
+    async def get_qa_pairs() -> List[Dict[str, str]]:
+        await latency.wait()
+        return list(SHEETS_QA_PAIRS)
+
+    return get_qa_pairs
@@ -9,7 +9,16 @@ __version__ = "1.0.0"
 __author__ = "DTCE Engineering Team"
 __email__ = "engineering@dtce.com"
 
-from .core.app import create_app
-from .bot.teams_bot import DTCETeamsBot
-
 __all__ = ["create_app", "DTCETeamsBot"]
+
+
+def __getattr__(name):
+    # Resolved on first use: importing any submodule (settings, the extraction
+    # workers' local_extractors, ...) must not build the FastAPI app and bot.
+    if name == "create_app":
+        from .core.app import create_app
+        return create_app
+    if name == "DTCETeamsBot":
+        from .bot.teams_bot import DTCETeamsBot
+        return DTCETeamsBot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,24 @@
+"""
+Admin token check for the /admin/* routers and X-Profile request profiling.
+
+Nothing is open by default: until ``admin_token`` is set, every admin
+endpoint answers 403 and ``X-Profile`` headers are ignored.
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from ..config.settings import get_settings
+
+
+def admin_authorized(token: str, supplied: str) -> bool:
+    """Whether ``supplied`` matches the configured token (never, when none is configured)."""
+    return bool(token) and hmac.compare_digest(token.encode("utf-8"), supplied.encode("utf-8"))
+
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Router dependency: 403 unless ``X-Admin-Token`` matches ``admin_token``."""
+    if not admin_authorized(get_settings().admin_token, x_admin_token or ""):
+        raise HTTPException(status_code=403, detail="X-Admin-Token required")
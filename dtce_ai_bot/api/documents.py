@@ -14,15 +14,20 @@ from datetime import datetime
 from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Query
 from fastapi.responses import JSONResponse
 import structlog
-from azure.storage.blob import BlobServiceClient
-from azure.search.documents import SearchClient
+from azure.storage.blob.aio import BlobServiceClient
+from azure.search.documents.aio import SearchClient
 
 from ..config.settings import get_settings
 from ..models.document import DocumentMetadata, DocumentSearchResult, DocumentUploadResponse
-from ..integrations.azure_search import get_search_client
-from ..integrations.azure_storage import get_storage_client
+from ..integrations.azure_search import get_async_search_client
+from ..integrations.azure_storage import get_async_storage_client
+from ..integrations.shared_clients import close_shared_clients
 from ..utils.document_extractor import get_document_extractor
 from ..utils.openai_document_extractor import get_openai_document_extractor
+from ..utils.extraction_router import get_extraction_router
+from ..utils.document_fields import derive_document_fields
+from ..utils.index_version import bump_index_version
+from ..utils.stage_timer import requested_timings, stage
 from ..integrations.microsoft_graph import get_graph_client, MicrosoftGraphClient
 from ..services.document_qa import DocumentQAService
 from ..services.document_sync_service import get_document_sync_service
@@ -37,7 +42,7 @@ settings = get_settings()
 async def upload_document(
     file: UploadFile = File(...),
     folder: Optional[str] = None,
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> DocumentUploadResponse:
     """
     Upload a document to Azure Blob Storage.
@@ -99,7 +104,8 @@ async def upload_document(
             "folder": folder or ""
         }
         
-        blob_client.upload_blob(content, overwrite=True, metadata=metadata)
+        with stage("blob_upload"):
+            await blob_client.upload_blob(content, overwrite=True, metadata=metadata)
         blob_url = blob_client.url
         
         logger.info("Document uploaded successfully", blob_name=blob_name, blob_url=blob_url)
@@ -121,7 +127,7 @@ async def upload_document(
 @router.post("/extract")
 async def extract_text(
     blob_name: str,
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     Extract text content from a document using Azure Form Recognizer.
@@ -144,106 +150,119 @@ async def extract_text(
         )
         
         # Check if blob exists
-        if not blob_client.exists():
+        if not await blob_client.exists():
             raise HTTPException(status_code=404, detail="Document not found")
         
         # Get blob properties for metadata
-        blob_properties = blob_client.get_blob_properties()
+        blob_properties = await blob_client.get_blob_properties()
         content_type = blob_properties.content_settings.content_type
         
-        # Try Form Recognizer first (proper document processing), fallback to OpenAI
+        # Cheapest route first: text-layer PDFs and local formats never touch paid OCR
+        extraction_result = None
         try:
-            # Initialize Form Recognizer extractor with your new endpoint
-            extractor = get_document_extractor(
-                settings.azure_form_recognizer_endpoint,
-                settings.azure_form_recognizer_key
-            )
-            
-            # Extract text using Form Recognizer
-            extraction_result = await extractor.extract_text_from_blob(blob_client, content_type)
-            
-            # Check if extraction was successful
-            if not extraction_result.get("extraction_success", True):
-                raise Exception("Form Recognizer extraction failed")
-                
-            logger.info("Form Recognizer extraction successful", blob_name=blob_name)
-                
-        except Exception as form_recognizer_error:
-            logger.warning(
-                "Form Recognizer extraction failed, trying OpenAI extractor", 
-                blob_name=blob_name, 
-                error=str(form_recognizer_error)
-            )
-            
-            # Fallback to OpenAI extractor
+            with stage("blob_download"):
+                blob_data = await (await blob_client.download_blob()).readall()
+            routed_result = await get_extraction_router().extract(blob_data, blob_name, content_type)
+            if routed_result.get("route") not in (None, "metadata_only"):
+                extraction_result = routed_result
+        except Exception as router_error:
+            logger.warning("Extraction router failed, using extractor cascade", blob_name=blob_name, error=str(router_error))
+        
+        if extraction_result is None:
+            # Try Form Recognizer first (proper document processing), fallback to OpenAI
             try:
-                openai_extractor = get_openai_document_extractor(
-                    settings.azure_openai_endpoint,
-                    settings.azure_openai_api_key,
-                    settings.azure_openai_deployment_name
+                # Initialize Form Recognizer extractor with your new endpoint
+                extractor = get_document_extractor(
+                    settings.azure_form_recognizer_endpoint,
+                    settings.azure_form_recognizer_key
                 )
+            
+                # Extract text using Form Recognizer
+                extraction_result = await extractor.extract_text_from_blob(blob_client, content_type)
+            
+                # Check if extraction was successful
+                if not extraction_result.get("extraction_success", True):
+                    raise Exception("Form Recognizer extraction failed")
                 
-                extraction_result = await openai_extractor.extract_text_from_blob(blob_client, content_type)
-                logger.info("OpenAI fallback extraction successful", blob_name=blob_name)
+                logger.info("Form Recognizer extraction successful", blob_name=blob_name)
                 
-            except Exception as openai_error:
+            except Exception as form_recognizer_error:
                 logger.warning(
-                    "Both Form Recognizer and OpenAI extraction failed, trying local DocumentProcessor", 
+                    "Form Recognizer extraction failed, trying OpenAI extractor", 
                     blob_name=blob_name, 
-                    form_recognizer_error=str(form_recognizer_error),
-                    openai_error=str(openai_error)
+                    error=str(form_recognizer_error)
                 )
-                
-                # Try local DocumentProcessor as final fallback
+            
+                # Fallback to OpenAI extractor
                 try:
-                    from dtce_ai_bot.utils.document_processor import DocumentProcessor
+                    openai_extractor = get_openai_document_extractor(
+                        settings.azure_openai_endpoint,
+                        settings.azure_openai_api_key,
+                        settings.azure_openai_deployment_name
+                    )
+                
+                    extraction_result = await openai_extractor.extract_text_from_blob(blob_client, content_type)
+                    logger.info("OpenAI fallback extraction successful", blob_name=blob_name)
+                
+                except Exception as openai_error:
+                    logger.warning(
+                        "Both Form Recognizer and OpenAI extraction failed, trying local DocumentProcessor", 
+                        blob_name=blob_name, 
+                        form_recognizer_error=str(form_recognizer_error),
+                        openai_error=str(openai_error)
+                    )
+                
+                    # Try local DocumentProcessor as final fallback
+                    try:
+                        from dtce_ai_bot.utils.document_processor import DocumentProcessor
                     
-                    # Download blob content
-                    blob_data = blob_client.download_blob().readall()
+                        # Download blob content
+                        with stage("blob_download"):
+                            blob_data = await (await blob_client.download_blob()).readall()
                     
-                    # Determine file extension from blob name
-                    file_extension = "." + blob_name.lower().split(".")[-1] if "." in blob_name else ""
+                        # Determine file extension from blob name
+                        file_extension = "." + blob_name.lower().split(".")[-1] if "." in blob_name else ""
                     
-                    # Create a simple metadata object
-                    class SimpleMetadata:
-                        def __init__(self, file_type, file_name):
-                            self.file_type = file_type
-                            self.file_name = file_name
-                            self.extracted_text = ""
+                        # Create a simple metadata object
+                        class SimpleMetadata:
+                            def __init__(self, file_type, file_name):
+                                self.file_type = file_type
+                                self.file_name = file_name
+                                self.extracted_text = ""
                     
-                    metadata = SimpleMetadata(file_extension, blob_name)
+                        metadata = SimpleMetadata(file_extension, blob_name)
                     
-                    # Process with local DocumentProcessor
-                    processor = DocumentProcessor()
-                    result = await processor.process_document(metadata, blob_data)
+                        # Process with local DocumentProcessor
+                        processor = DocumentProcessor()
+                        result = await processor.process_document(metadata, blob_data)
                     
-                    if result.extracted_text and result.extracted_text.strip():
+                        if result.extracted_text and result.extracted_text.strip():
+                            extraction_result = {
+                                "extracted_text": result.extracted_text,
+                                "character_count": len(result.extracted_text),
+                                "page_count": 1,
+                                "extraction_method": "local_processor",
+                                "success": True
+                            }
+                            logger.info("Local DocumentProcessor extraction successful", blob_name=blob_name)
+                        else:
+                            raise Exception("No text extracted by local processor")
+                        
+                    except Exception as local_error:
+                        logger.error(
+                            "All extraction methods failed including local processor", 
+                            blob_name=blob_name, 
+                            local_error=str(local_error)
+                        )
+                    
+                        # Return minimal extraction result with document name for indexing
                         extraction_result = {
-                            "extracted_text": result.extracted_text,
-                            "character_count": len(result.extracted_text),
+                            "extracted_text": f"Document: {blob_name}",
+                            "character_count": len(blob_name),
                             "page_count": 1,
-                            "extraction_method": "local_processor",
-                            "success": True
+                            "extraction_method": "filename_only",
+                            "error": f"Form Recognizer: {form_recognizer_error}, OpenAI: {openai_error}, Local: {local_error}"
                         }
-                        logger.info("Local DocumentProcessor extraction successful", blob_name=blob_name)
-                    else:
-                        raise Exception("No text extracted by local processor")
-                        
-                except Exception as local_error:
-                    logger.error(
-                        "All extraction methods failed including local processor", 
-                        blob_name=blob_name, 
-                        local_error=str(local_error)
-                    )
-                    
-                    # Return minimal extraction result with document name for indexing
-                    extraction_result = {
-                        "extracted_text": f"Document: {blob_name}",
-                        "character_count": len(blob_name),
-                        "page_count": 1,
-                        "extraction_method": "filename_only",
-                        "error": f"Form Recognizer: {form_recognizer_error}, OpenAI: {openai_error}, Local: {local_error}"
-                    }
         
         # Log success
         logger.info(
@@ -264,11 +283,21 @@ async def extract_text(
         logger.error("Text extraction failed", error=str(e), blob_name=blob_name)
         raise HTTPException(status_code=500, detail=f"Text extraction failed: {str(e)}")
 
+
+@router.get("/extraction/stats")
+async def get_extraction_stats() -> JSONResponse:
+    """Per-route extraction timings and success rates since this worker started."""
+    return JSONResponse({
+        "routes": get_extraction_router().get_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+
 @router.post("/index")
 async def index_document(
     blob_name: str,
-    search_client: SearchClient = Depends(get_search_client),
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    search_client: SearchClient = Depends(get_async_search_client),
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     Index a document in Azure Cognitive Search after extracting its text.
@@ -290,11 +319,11 @@ async def index_document(
             blob=blob_name
         )
         
-        if not blob_client.exists():
+        if not await blob_client.exists():
             raise HTTPException(status_code=404, detail="Document not found")
         
         # Get blob metadata
-        blob_properties = blob_client.get_blob_properties()
+        blob_properties = await blob_client.get_blob_properties()
         metadata = blob_properties.metadata or {}
         
         # Extract text (reuse extraction logic) - skip if Form Recognizer unavailable
@@ -316,7 +345,8 @@ async def index_document(
                 processor = DocumentProcessor()
                 
                 # Download blob content
-                blob_data = blob_client.download_blob().readall()
+                with stage("blob_download"):
+                    blob_data = await (await blob_client.download_blob()).readall()
                 
                 # Create a mock document metadata object
                 from ..models.legacy_models import DocumentMetadata
@@ -404,11 +434,13 @@ async def index_document(
             "last_modified": blob_properties.last_modified.isoformat(),
             "created_date": blob_properties.creation_time.isoformat() if blob_properties.creation_time else blob_properties.last_modified.isoformat(),
             "project_name": project_name,
-            "year": year
+            "year": year,
+            **derive_document_fields(blob_name)
         }
         
         # Upload to search index
-        result = search_client.upload_documents([search_document])
+        result = await search_client.upload_documents([search_document])
+        bump_index_version(f"indexed {blob_name}")
         
         logger.info("Document indexed successfully", blob_name=blob_name, document_id=document_id)
         
@@ -430,7 +462,7 @@ async def search_documents(
     query: str,
     top: int = 10,
     filter_folder: Optional[str] = None,
-    search_client: SearchClient = Depends(get_search_client)
+    search_client: SearchClient = Depends(get_async_search_client)
 ) -> List[DocumentSearchResult]:
     """
     Search indexed documents using Azure Cognitive Search.
@@ -451,7 +483,7 @@ async def search_documents(
         search_filter = f"folder eq '{filter_folder}'" if filter_folder else None
         
         # Perform search
-        results = search_client.search(
+        results = await search_client.search(
             search_text=query,
             top=top,
             filter=search_filter,
@@ -461,7 +493,7 @@ async def search_documents(
         
         # Format results
         search_results = []
-        for result in results:
+        async for result in results:
             highlights = result.get("@search.highlights", {}).get("content", [])
             
             search_results.append(DocumentSearchResult(
@@ -1014,7 +1046,7 @@ async def list_documents(
     folder: Optional[str] = None,
     source: str = "suitefiles",  # Default to suitefiles, can be "storage" for blob storage
     graph_client: MicrosoftGraphClient = Depends(get_graph_client),
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     List ALL documents from Suitefiles (SharePoint) or Azure Blob Storage.
@@ -1100,7 +1132,7 @@ async def list_documents(
             blobs = container_client.list_blobs(name_starts_with=blob_prefix)
             
             documents = []
-            for blob in blobs:
+            async for blob in blobs:
                 documents.append({
                     "blob_name": blob.name,
                     "filename": blob.metadata.get("original_filename", blob.name) if blob.metadata else blob.name,
@@ -1128,8 +1160,8 @@ async def list_documents(
 @router.delete("/{blob_name}")
 async def delete_document(
     blob_name: str,
-    storage_client: BlobServiceClient = Depends(get_storage_client),
-    search_client: SearchClient = Depends(get_search_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client),
+    search_client: SearchClient = Depends(get_async_search_client)
 ) -> JSONResponse:
     """
     Delete a document from both storage and search index.
@@ -1151,8 +1183,8 @@ async def delete_document(
             blob=blob_name
         )
         
-        if blob_client.exists():
-            blob_client.delete_blob()
+        if await blob_client.exists():
+            await blob_client.delete_blob()
             storage_deleted = True
         else:
             storage_deleted = False
@@ -1160,7 +1192,8 @@ async def delete_document(
         # Delete from search index
         document_id = blob_name.replace("/", "_").replace(".", "_")
         try:
-            search_client.delete_documents([{"id": document_id}])
+            await search_client.delete_documents([{"id": document_id}])
+            bump_index_version(f"deleted {blob_name}")
             index_deleted = True
         except Exception:
             index_deleted = False
@@ -1182,7 +1215,7 @@ async def delete_document(
 @router.delete("/cleanup-duplicates/{project_id}")
 async def cleanup_duplicate_folders(
     project_id: str,
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     Clean up duplicate folders that exist outside the correct SharePoint structure.
@@ -1203,14 +1236,14 @@ async def cleanup_duplicate_folders(
         ]
         
         deleted_files = []
-        for blob in blobs:
+        async for blob in blobs:
             for pattern in duplicate_patterns:
                 if blob.name.startswith(pattern):
                     blob_client = storage_client.get_blob_client(
                         container=settings.azure_storage_container,
                         blob=blob.name
                     )
-                    blob_client.delete_blob()
+                    await blob_client.delete_blob()
                     deleted_files.append(blob.name)
                     logger.info(f"Deleted duplicate file: {blob.name}")
                     break
@@ -1253,7 +1286,7 @@ async def sync_suitefiles_documents(
     drive: Optional[str] = Query(None, description="Specific drive/library name (e.g. 'Templates', 'Shared Documents') to sync only that drive"),
     force: bool = Query(False, description="Force re-sync all files even if they appear up-to-date"),
     graph_client: MicrosoftGraphClient = Depends(get_graph_client),
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     Sync documents from specific SharePoint path or all documents.
@@ -1323,7 +1356,7 @@ async def sync_suitefiles_async(
     path: Optional[str] = Query(None, description="Specific SharePoint path (e.g. 'Projects/219', 'Projects/219/Drawings', 'Engineering/Marketing') or empty for all"),
     force: bool = Query(False, description="Force re-sync all files even if they appear up-to-date"),
     graph_client: MicrosoftGraphClient = Depends(get_graph_client),
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     REAL ASYNC version of sync-suitefiles: Actually syncs documents from Suitefiles to blob storage.
@@ -1425,7 +1458,7 @@ async def get_sync_schedule() -> JSONResponse:
 async def sync_now(
     background: bool = False,
     graph_client: MicrosoftGraphClient = Depends(get_graph_client),
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     Trigger an immediate sync (same as sync-suitefiles but with scheduling context).
@@ -1439,7 +1472,19 @@ async def sync_now(
         
         def background_sync():
             import asyncio
-            asyncio.run(sync_suitefiles_documents(graph_client, storage_client))
+            
+            async def run_sync():
+                # aio clients are bound to their event loop - this thread runs its own
+                try:
+                    return await sync_suitefiles_documents(
+                        path=None, drive=None, force=False,
+                        graph_client=graph_client,
+                        storage_client=await get_async_storage_client()
+                    )
+                finally:
+                    await close_shared_clients()
+            
+            asyncio.run(run_sync())
         
         thread = threading.Thread(target=background_sync)
         thread.start()
@@ -1450,15 +1495,19 @@ async def sync_now(
             "check_status": "Monitor logs or call GET /documents/list?source=storage"
         })
     else:
-        return await sync_suitefiles_documents(graph_client, storage_client)
+        return await sync_suitefiles_documents(
+            path=None, drive=None, force=False,
+            graph_client=graph_client,
+            storage_client=storage_client
+        )
 
 
 @router.post("/auto-sync")
 async def auto_sync_changes(
     force_full_sync: bool = False,
     graph_client: MicrosoftGraphClient = Depends(get_graph_client),
-    storage_client: BlobServiceClient = Depends(get_storage_client),
-    search_client: SearchClient = Depends(get_search_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client),
+    search_client: SearchClient = Depends(get_async_search_client)
 ) -> JSONResponse:
     """
     Automatically detect and sync only changed/new files from Suitefiles with quality extraction.
@@ -1529,11 +1578,11 @@ async def auto_sync_changes(
                 blob=blob_name
             )
             
-            if not blob_client.exists():
+            if not await blob_client.exists():
                 return f"Document: {blob_name}"
             
             # Get blob properties for content type
-            blob_properties = blob_client.get_blob_properties()
+            blob_properties = await blob_client.get_blob_properties()
             content_type = blob_properties.content_settings.content_type
             
             # Try Form Recognizer first
@@ -1620,12 +1669,12 @@ async def auto_sync_changes(
                     blob=blob_name
                 )
                 
-                is_new_file = not blob_client.exists()
+                is_new_file = not await blob_client.exists()
                 is_updated_file = False
                 
                 if not is_new_file and not force_full_sync:
                     # Check if file was modified since last sync
-                    properties = blob_client.get_blob_properties()
+                    properties = await blob_client.get_blob_properties()
                     doc_modified = doc.get("modified", "")
                     blob_modified = properties.last_modified.isoformat()
                     
@@ -1680,7 +1729,8 @@ async def auto_sync_changes(
                         "extraction_method": "quality_pipeline"
                     }
                     
-                    blob_client.upload_blob(file_content, overwrite=True, metadata=metadata)
+                    with stage("blob_upload"):
+                        await blob_client.upload_blob(file_content, overwrite=True, metadata=metadata)
                     
                     # Real-time indexing with quality extraction
                     try:
@@ -1749,7 +1799,7 @@ async def auto_sync_changes(
 @router.get("/test-changes")
 async def test_file_changes(
     graph_client: MicrosoftGraphClient = Depends(get_graph_client),
-    storage_client: BlobServiceClient = Depends(get_storage_client)
+    storage_client: BlobServiceClient = Depends(get_async_storage_client)
 ) -> JSONResponse:
     """
     Test endpoint to verify that changes in Suitefiles appear correctly.
@@ -1781,15 +1831,15 @@ async def test_file_changes(
             analysis = {
                 "filename": doc['name'],
                 "suitefiles_modified": doc.get('modified', 'unknown'),
-                "exists_in_storage": blob_client.exists(),
+                "exists_in_storage": await blob_client.exists(),
                 "storage_modified": None,
                 "change_detected": False,
                 "status": "unknown"
             }
             
-            if blob_client.exists():
+            if await blob_client.exists():
                 try:
-                    properties = blob_client.get_blob_properties()
+                    properties = await blob_client.get_blob_properties()
                     analysis["storage_modified"] = properties.last_modified.isoformat()
                     
                     # Compare modification dates
@@ -1845,7 +1895,7 @@ async def test_file_changes(
 async def ask_question(
     question: str,
     project_id: Optional[str] = None,
-    search_client: SearchClient = Depends(get_search_client)
+    search_client: SearchClient = Depends(get_async_search_client)
 ) -> JSONResponse:
     """
     Ask a question about your engineering documents using GPT.
@@ -1877,7 +1927,7 @@ async def ask_question(
                    confidence=result['confidence'],
                    sources_count=len(result['sources']))
         
-        return JSONResponse({
+        body = {
             "question": question,
             "answer": result['answer'],
             "confidence": result['confidence'],
@@ -1888,7 +1938,11 @@ async def ask_question(
                 "project_filter": project_id,
                 "timestamp": datetime.utcnow().isoformat()
             }
-        })
+        }
+        timings = requested_timings()
+        if timings is not None:
+            body["timings"] = timings
+        return JSONResponse(body)
         
     except Exception as e:
         logger.error("Question processing failed", error=str(e), question=question)
@@ -1904,7 +1958,7 @@ async def ask_question(
 @router.get("/ai/document-summary")
 async def get_document_summary(
     project_id: Optional[str] = None,
-    search_client: SearchClient = Depends(get_search_client)
+    search_client: SearchClient = Depends(get_async_search_client)
 ) -> JSONResponse:
     """
     Get an AI-powered summary of available documents.
@@ -1949,7 +2003,7 @@ async def get_document_summary(
 async def ask_batch_questions(
     questions: List[str],
     project_id: Optional[str] = None,
-    search_client: SearchClient = Depends(get_search_client)
+    search_client: SearchClient = Depends(get_async_search_client)
 ) -> JSONResponse:
     """
     Ask multiple questions at once for efficient processing.
@@ -2197,13 +2251,13 @@ async def get_index_status():
         settings = get_settings()
         index_client = get_search_index_client()
         
-        # Get index information
-        index = index_client.get_index(settings.azure_search_index_name)
+        # Get index information (management client is sync-only here, keep it off the loop)
+        index = await asyncio.to_thread(index_client.get_index, settings.azure_search_index_name)
         
         # Count documents (approximate)
-        search_client = get_search_client()
-        results = search_client.search("*", include_total_count=True, top=1)
-        doc_count = results.get_count() or 0
+        search_client = await get_async_search_client()
+        results = await search_client.search("*", include_total_count=True, top=1)
+        doc_count = await results.get_count() or 0
         
         return JSONResponse({
             "status": "success",
@@ -6,6 +6,14 @@ from fastapi import APIRouter
 from datetime import datetime
 from typing import Dict, Any
 
+from ..integrations.model_router import get_model_router
+from ..integrations.openai_limiter import get_openai_limiter_stats
+from ..integrations.shared_state import get_shared_state
+from ..integrations.usage_ledger import get_usage_ledger
+from ..services.conversation_store import get_conversation_store
+from ..services.prompt_registry import get_prompt_registry
+from ..utils.loop_monitor import get_loop_monitor
+
 router = APIRouter()
 
 
@@ -34,5 +42,12 @@ async def detailed_health_check() -> Dict[str, Any]:
             "azure_search": "not_implemented", 
             "azure_openai": "not_implemented",
             "sharepoint": "not_implemented"
-        }
+        },
+        "openai_limiter": get_openai_limiter_stats(),
+        "model_routes": get_model_router().get_stats(),
+        "prompts": get_prompt_registry().get_stats(),
+        "conversations": get_conversation_store().get_stats(),
+        "usage": get_usage_ledger().get_stats(),
+        "event_loop": get_loop_monitor().get_stats(),
+        "shared_state": get_shared_state().get_stats()
     }
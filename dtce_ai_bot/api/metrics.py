@@ -0,0 +1,127 @@
+"""
+Prometheus ``/metrics`` endpoint.
+
+Request and stage histograms are recorded by the tracing middleware; the
+collectors below turn the stats the components already keep into metric
+families at scrape time.
+"""
+
+from typing import Iterable, List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..integrations.model_router import get_model_router
+from ..integrations.openai_limiter import get_openai_limiter_stats
+from ..services.conversation_store import get_conversation_store
+from ..services.prompt_registry import get_prompt_registry
+from ..utils import extraction_router, single_flight
+from ..utils.answer_cache import get_answer_cache
+from ..utils.content_cache import get_document_content_cache
+from ..utils.metrics import MetricFamily, MetricsRegistry, get_metrics_registry
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def collect_model_routes() -> List[MetricFamily]:
+    calls = MetricFamily("dtce_model_calls_total", "counter", "Model router calls by route")
+    escalations = MetricFamily("dtce_model_escalations_total", "counter", "Calls re-sent to a larger deployment")
+    failures = MetricFamily("dtce_model_failures_total", "counter", "Calls that failed on every deployment")
+    tokens = MetricFamily("dtce_model_tokens_total", "counter", "Tokens used by route and kind")
+    cost = MetricFamily("dtce_model_cost_usd_total", "counter", "Estimated spend by route")
+    by_deployment = MetricFamily("dtce_model_deployment_calls_total", "counter", "Model calls by route and deployment")
+    for route, stats in get_model_router().get_stats().items():
+        calls.add(stats["calls"], route=route)
+        escalations.add(stats["escalations"], route=route)
+        failures.add(stats["failures"], route=route)
+        tokens.add(stats["prompt_tokens"], route=route, kind="prompt")
+        tokens.add(stats["completion_tokens"], route=route, kind="completion")
+        cost.add(stats["cost_usd"], route=route)
+        for deployment, count in stats["by_deployment"].items():
+            by_deployment.add(count, route=route, deployment=deployment)
+    return [calls, escalations, failures, tokens, cost, by_deployment]
+
+
+def collect_openai_limiter() -> List[MetricFamily]:
+    counters = {
+        name: MetricFamily(f"dtce_openai_{name}_total", "counter", f"Azure OpenAI limiter {name} requests")
+        for name in ("granted", "throttled", "queued")
+    }
+    gauges = {
+        name: MetricFamily(f"dtce_openai_{name}", "gauge", f"Azure OpenAI limiter {name.replace('_', ' ')}")
+        for name in ("in_flight", "queue_depth", "concurrency_limit", "tokens_last_minute")
+    }
+    for deployment, stats in get_openai_limiter_stats().items():
+        for name, family in {**counters, **gauges}.items():
+            family.add(stats.get(name, 0), deployment=deployment)
+    return list(counters.values()) + list(gauges.values())
+
+
+def collect_caches() -> List[MetricFamily]:
+    hits = MetricFamily("dtce_cache_hits_total", "counter", "Cache hits by cache and kind")
+    misses = MetricFamily("dtce_cache_misses_total", "counter", "Cache misses by cache")
+    entries = MetricFamily("dtce_cache_entries", "gauge", "Entries held by cache")
+    ratio = MetricFamily("dtce_cache_hit_ratio", "gauge", "Hits / lookups since start by cache")
+
+    answers = get_answer_cache().get_stats()
+    hits.add(answers["exact_hits"], cache="answer", kind="exact")
+    hits.add(answers["semantic_hits"], cache="answer", kind="semantic")
+    misses.add(answers["misses"], cache="answer")
+    entries.add(answers["entries"], cache="answer")
+    ratio.add(answers["hit_rate"], cache="answer")
+
+    content = get_document_content_cache().get_stats()
+    hits.add(content["hits"], cache="document_content", kind="exact")
+    misses.add(content["misses"], cache="document_content")
+    entries.add(content["entries"], cache="document_content")
+    ratio.add(content["hit_rate"], cache="document_content")
+
+    coalesced = MetricFamily("dtce_single_flight_total", "counter", "Single-flight calls by group and role")
+    for name, group in list(single_flight._groups.items()):
+        stats = group.get_stats()
+        coalesced.add(stats["leaders"], group=name, role="leader")
+        coalesced.add(stats["followers"], group=name, role="follower")
+    return [hits, misses, entries, ratio, coalesced]
+
+
+def collect_extraction() -> Iterable[MetricFamily]:
+    # Only report a router that exists; building one here would construct the extractors
+    if extraction_router._extraction_router is None:
+        return []
+    attempts = MetricFamily("dtce_extraction_attempts_total", "counter", "Extraction attempts by route")
+    successes = MetricFamily("dtce_extraction_successes_total", "counter", "Successful extractions by route")
+    for route, stats in extraction_router._extraction_router.get_stats().items():
+        attempts.add(stats["attempts"], route=route)
+        successes.add(stats["successes"], route=route)
+    return [attempts, successes]
+
+
+def collect_conversations_and_prompts() -> List[MetricFamily]:
+    sessions = MetricFamily("dtce_conversation_sessions", "gauge", "Conversation sessions held in memory")
+    events = MetricFamily("dtce_conversation_events_total", "counter", "Conversation store evictions, expiries, summaries")
+    stats = get_conversation_store().get_stats()
+    sessions.add(stats["sessions"])
+    for event in ("evicted", "expired", "summarized", "reloaded"):
+        events.add(stats.get(event, 0), event=event)
+
+    renders = MetricFamily("dtce_prompt_renders_total", "counter", "Prompt renders by template variant")
+    prompt_tokens = MetricFamily("dtce_prompt_tokens_total", "counter", "Prompt tokens by template variant and part")
+    for key, prompt in get_prompt_registry().get_stats().items():
+        renders.add(prompt.get("renders", 0), prompt=key)
+        prompt_tokens.add(prompt.get("prefix_tokens", 0), prompt=key, part="prefix")
+        prompt_tokens.add(prompt.get("request_tokens", 0), prompt=key, part="request")
+    return [sessions, events, renders, prompt_tokens]
+
+
+def register_default_collectors(registry: MetricsRegistry) -> None:
+    for collector in (collect_model_routes, collect_openai_limiter, collect_caches, collect_extraction,
+                      collect_conversations_and_prompts):
+        registry.add_collector(collector)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(get_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE)
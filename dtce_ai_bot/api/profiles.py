@@ -0,0 +1,43 @@
+"""
+Request profile admin endpoints (see utils/request_profiler.py); X-Admin-Token required.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from ..utils.request_profiler import PROFILE_FILES, get_request_profiler
+from .admin_auth import require_admin_token
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/")
+async def list_profiles() -> Dict[str, Any]:
+    """Stored profiles (newest first) and the profiler's current settings."""
+    profiler = get_request_profiler()
+    return {"profiler": profiler.get_stats(), "profiles": profiler.store.list()}
+
+
+@router.post("/settings")
+async def update_profiler(
+    enabled: Optional[bool] = Query(None),
+    sample_every: Optional[int] = Query(None, ge=0, description="Profile one in N sampled-path requests (0 = off)"),
+) -> Dict[str, Any]:
+    """Turn profiling or one-in-N sampling on and off at runtime (not persisted across restarts)."""
+    profiler = get_request_profiler()
+    if enabled is not None:
+        profiler.enabled = enabled
+    if sample_every is not None:
+        profiler.sample_every = sample_every
+    return profiler.get_stats()
+
+
+@router.get("/{profile_id}/{kind}")
+async def download_profile(profile_id: str, kind: str) -> FileResponse:
+    """Download one file of a profile: ``html``, ``speedscope.json``, ``prof`` or ``txt``."""
+    path = get_request_profiler().store.file_path(profile_id, kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type=PROFILE_FILES[kind], filename=f"{profile_id}.{kind}")
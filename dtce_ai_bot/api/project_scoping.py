@@ -209,18 +209,27 @@ async def _extract_text_from_file(content: bytes, filename: str, content_type: O
     This function implements the Single Responsibility Principle by focusing only on text extraction.
     """
     try:
-        # Create a temporary blob-like object for our extractors
-        class MockBlobClient:
+        # Create a temporary blob-like object for our extractors (mirrors the aio BlobClient surface)
+        class MockBlobData:
             def __init__(self, content: bytes):
                 self._content = content
+                self.size = len(content)
+                
+            async def readall(self):
+                return self._content
+        
+        class MockBlobClient:
+            def __init__(self, content: bytes, blob_name: str):
+                self._content = content
+                self.blob_name = blob_name
+                
+            async def get_blob_properties(self):
+                return MockBlobData(self._content)
                 
             async def download_blob(self):
-                class MockBlobData:
-                    def readall(self):
-                        return self._content
-                return MockBlobData()
+                return MockBlobData(self._content)
         
-        mock_blob = MockBlobClient(content)
+        mock_blob = MockBlobClient(content, filename)
         
         # Try Form Recognizer first
         try:
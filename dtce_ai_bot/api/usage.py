@@ -0,0 +1,67 @@
+"""
+Token usage admin endpoints (see integrations/usage_ledger.py); X-Admin-Token
+required, since usage can be grouped per user (AAD object id).
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..integrations.usage_ledger import get_usage_ledger
+from .admin_auth import require_admin_token
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+def _dimensions(group_by: str) -> List[str]:
+    return [dimension.strip() for dimension in group_by.split(",") if dimension.strip()]
+
+
+@router.get("/")
+async def usage_buckets(
+    period: str = Query("minute", description="minute or day"),
+    group_by: str = Query("call_site", description="Comma-separated: intent, call_site, deployment, user, kind"),
+    last: int = Query(60, ge=1, le=1440, description="Number of most recent buckets"),
+) -> Dict[str, Any]:
+    """Token usage per minute or per day, grouped by tag."""
+    try:
+        buckets = get_usage_ledger().summary(period, _dimensions(group_by), last)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"period": period, "group_by": _dimensions(group_by), "buckets": buckets}
+
+
+@router.get("/top")
+async def usage_top(
+    group_by: str = Query("call_site", description="Comma-separated: intent, call_site, deployment, user, kind"),
+    minutes: int = Query(60, ge=1, le=1440),
+) -> Dict[str, Any]:
+    """Largest token consumers over the last ``minutes`` minutes."""
+    try:
+        rows = get_usage_ledger().totals(_dimensions(group_by), minutes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"minutes": minutes, "group_by": _dimensions(group_by), "totals": rows}
+
+
+@router.get("/history")
+async def usage_history(
+    group_by: str = Query("call_site", description="Comma-separated: intent, call_site, deployment, user, kind"),
+    hours: float = Query(24, gt=0, le=24 * 90),
+) -> Dict[str, Any]:
+    """Totals over the last ``hours`` from the persisted ledger (empty unless ``usage_ledger_path`` is set)."""
+    ledger = get_usage_ledger()
+    try:
+        rows = await asyncio.to_thread(ledger.history, time.time() - hours * 3600, None, _dimensions(group_by))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"hours": hours, "group_by": _dimensions(group_by), "persistent": ledger.backend is not None,
+            "totals": rows}
+
+
+@router.get("/stats")
+async def usage_stats() -> Dict[str, Any]:
+    """Ledger counters and the last hour's totals."""
+    return get_usage_ledger().get_stats()
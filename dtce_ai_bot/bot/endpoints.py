@@ -8,20 +8,22 @@ from botbuilder.core import (
     BotFrameworkAdapterSettings,
     ConversationState,
     UserState,
-    MemoryStorage,
     TurnContext,
 )
 from botbuilder.schema import Activity
 from fastapi import APIRouter, Request, HTTPException
-from openai import AsyncAzureOpenAI
 import structlog
 
 from azure.core.credentials import AzureKeyCredential
 from azure.search.documents.aio import SearchClient
 
 from ..config.settings import get_settings
+from ..integrations.http_cassette import azure_transport_kwargs
+from ..integrations.local_search import AsyncLocalSearchClient, get_local_search_index
+from ..integrations.openai_limiter import create_async_openai_client
 from ..services.azure_rag_service_v2 import AzureRAGService
 from ..services.document_qa import DocumentQAService
+from .state_storage import SharedStateStorage
 from .teams_bot import DTCETeamsBot
 
 logger = structlog.get_logger(__name__)
@@ -52,13 +54,17 @@ async def check_bot_config():
 settings = get_settings()
 
 # Use async clients for bot endpoints
-search_client_async = SearchClient(
-    endpoint=settings.azure_search_service_endpoint,
-    index_name=settings.azure_search_index_name,
-    credential=AzureKeyCredential(settings.azure_search_api_key)
-)
-
-openai_client_async = AsyncAzureOpenAI(
+if settings.search_backend == "local":
+    search_client_async = AsyncLocalSearchClient(get_local_search_index())
+else:
+    search_client_async = SearchClient(
+        endpoint=settings.azure_search_service_endpoint,
+        index_name=settings.azure_search_index_name,
+        credential=AzureKeyCredential(settings.azure_search_api_key),
+        **azure_transport_kwargs()
+    )
+
+openai_client_async = create_async_openai_client(
     azure_endpoint=settings.azure_openai_endpoint,
     api_key=settings.azure_openai_api_key,
     api_version="2024-05-01-preview"
@@ -69,7 +75,7 @@ rag_service = AzureRAGService(
     search_client=search_client_async,
     openai_client=openai_client_async,
     model_name=settings.azure_openai_deployment_name,
-    intent_model_name=settings.azure_openai_deployment_name  # Use the main model for intent
+    intent_model_name=settings.azure_openai_deployment_name  # Escalation target; the model router tries the mini deployment first
 )
 
 # This is a legacy service, we will phase it out
@@ -99,10 +105,10 @@ async def on_error(context: TurnContext, error: Exception):
 
 ADAPTER.on_turn_error = on_error
 
-# Create storage and state
-MEMORY_STORAGE = MemoryStorage()
-CONVERSATION_STATE = ConversationState(MEMORY_STORAGE)
-USER_STATE = UserState(MEMORY_STORAGE)
+# Create storage and state (shared by all worker processes when shared_state_url is set)
+STATE_STORAGE = SharedStateStorage()
+CONVERSATION_STATE = ConversationState(STATE_STORAGE)
+USER_STATE = UserState(STATE_STORAGE)
 
 # Initialize bot instance
 BOT = DTCETeamsBot(
@@ -0,0 +1,72 @@
+"""
+Bot Framework ``Storage`` on the cross-process shared state.
+
+Replaces ``MemoryStorage`` for ``ConversationState`` / ``UserState`` so a
+conversation's bot state is the same whichever worker receives the next
+activity. Follows ``MemoryStorage``'s e-tag rules: an item only gets an e-tag
+once the stored item had one, and a write carrying a stale e-tag (other than
+``*``) is rejected with ``KeyError``. Entries expire after
+``conversation_idle_ttl_seconds`` without a write, like conversation memory.
+"""
+
+import asyncio
+import uuid
+from typing import Dict, List, Optional
+
+from botbuilder.core import Storage
+
+from ..config.settings import get_settings
+from ..integrations.shared_state import SharedState, get_shared_state
+
+NAMESPACE = "bot_state"
+
+
+def _e_tag(item) -> str:
+    return item.get("e_tag") if isinstance(item, dict) else getattr(item, "e_tag", None)
+
+
+class SharedStateStorage(Storage):
+    def __init__(self, state: SharedState = None, ttl_seconds: Optional[float] = None):
+        super().__init__()
+        self.state = state or get_shared_state()
+        self.ttl_seconds = get_settings().conversation_idle_ttl_seconds if ttl_seconds is None else ttl_seconds
+
+    async def read(self, keys: List[str]):
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._read, keys)
+
+    async def write(self, changes: Dict[str, object]):
+        if changes is None:
+            raise Exception("Changes are required when writing")
+        if changes:
+            await asyncio.to_thread(self._write, changes)
+
+    async def delete(self, keys: List[str]):
+        await asyncio.to_thread(self._delete, keys)
+
+    def _read(self, keys: List[str]) -> Dict[str, dict]:
+        items = {}
+        for key in keys:
+            item = self.state.get(NAMESPACE, key)
+            if item is not None:
+                items[key] = item
+        return items
+
+    def _write(self, changes: Dict[str, object]) -> None:
+        for key, change in changes.items():
+            item = dict(change) if isinstance(change, dict) else dict(vars(change))
+            new_e_tag = item.get("e_tag")
+            if new_e_tag == "":
+                raise Exception("shared_state_storage.write(): etag missing")
+            stored = self.state.get(NAMESPACE, key)
+            old_e_tag = _e_tag(stored) if stored is not None else None
+            if old_e_tag is not None and new_e_tag is not None and new_e_tag not in ("*", old_e_tag):
+                raise KeyError(f"Etag conflict.\nOriginal: {new_e_tag}\r\nCurrent: {old_e_tag}")
+            if old_e_tag:
+                item["e_tag"] = uuid.uuid4().hex
+            self.state.set(NAMESPACE, key, item, ttl=self.ttl_seconds)
+
+    def _delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self.state.delete(NAMESPACE, key)
@@ -16,6 +16,8 @@ from typing import List, Optional, Dict
 from ..services.document_qa import DocumentQAService
 from ..services.project_scoping import get_project_scoping_service
 from ..services.azure_rag_service_v2 import AzureRAGService
+from ..services.conversation_store import get_conversation_store
+from ..integrations.usage_ledger import tag_usage
 
 logger = structlog.get_logger(__name__)
 
@@ -32,8 +34,9 @@ class DTCETeamsBot(ActivityHandler):
         self.project_scoping_service = get_project_scoping_service()
         self.qa_service = None  # Initialized on each turn
         
-        # Create conversation history accessor
-        self.conversation_history_accessor = self.conversation_state.create_property("conversation_history")
+        # Conversation history lives in the bounded, summarizing store (not in MemoryStorage,
+        # which never evicts)
+        self.conversation_store = get_conversation_store()
 
     async def on_turn(self, turn_context: TurnContext):
         # Initialize DocumentQAService for the current turn
@@ -131,14 +134,11 @@ class DTCETeamsBot(ActivityHandler):
         """Handle incoming messages from users."""
         user_input = turn_context.activity.text
         logger.info("Received user message", user_input=user_input)
+        tag_usage(user=self._user_id(turn_context))
 
         try:
-            # Get conversation history from state
-            conversation_history = await self.conversation_history_accessor.get(turn_context, [])
-            
-            # Limit history to last 10 turns to avoid token limits
-            if len(conversation_history) > 20:  # 10 exchanges = 20 messages
-                conversation_history = conversation_history[-20:]
+            # Bounded history: rolling summary of older turns + the most recent ones
+            conversation_history = await self._get_conversation_history(turn_context)
             
             logger.info("Using conversation history", history_length=len(conversation_history))
             
@@ -153,12 +153,10 @@ class DTCETeamsBot(ActivityHandler):
                 source_links = "\n\n**Sources:**\n" + "\n".join([f"- {s['filename']}" for s in sources])
                 answer += source_links
             
-            # Update conversation history
-            conversation_history.append({"role": "user", "content": user_input})
-            conversation_history.append({"role": "assistant", "content": answer})
-            await self.conversation_history_accessor.set(turn_context, conversation_history)
-            
             await self._send_teams_message(turn_context, answer)
+            
+            # Update conversation history (after replying; summarization runs in the background)
+            await self._store_conversation_turn(turn_context, user_input, answer)
 
         except Exception as e:
             logger.error("Error during message processing", error=str(e))
@@ -329,39 +327,30 @@ class DTCETeamsBot(ActivityHandler):
         """Get recent conversation history for context."""
         
         try:
-            # Get conversation data from state
-            conversation_data = await self.conversation_state.create_property("conversation_history").get(
-                turn_context, lambda: {"history": []}
-            )
-            
-            # Return last few turns for context (limit to avoid token overflow)
-            return conversation_data.get("history", [])[-6:]  # Last 6 turns (3 exchanges)
+            # Already bounded by the store (summary + recent turns)
+            return await self.conversation_store.get_history(self._session_id(turn_context))
             
         except Exception as e:
             logger.warning("Failed to get conversation history", error=str(e))
             return []
     
+    def _user_id(self, turn_context: TurnContext) -> str:
+        """Usage ledger tag for the sender: the Azure AD object id, else the channel account id."""
+        sender = turn_context.activity.from_property
+        if sender is None:
+            return ""
+        return getattr(sender, "aad_object_id", None) or sender.id or ""
+
+    def _session_id(self, turn_context: TurnContext) -> str:
+        """Conversation store key for this Teams conversation."""
+        conversation = turn_context.activity.conversation
+        return conversation.id if conversation and conversation.id else "default"
+    
     async def _store_conversation_turn(self, turn_context: TurnContext, user_message: str, bot_response: str):
         """Store conversation turn for future context."""
         
         try:
-            # Get conversation data
-            conversation_accessor = self.conversation_state.create_property("conversation_history")
-            conversation_data = await conversation_accessor.get(turn_context, lambda: {"history": []})
-            
-            # Add new turns
-            conversation_data["history"].extend([
-                {"role": "user", "content": user_message},
-                {"role": "assistant", "content": bot_response}
-            ])
-            
-            # Keep only recent history (limit storage)
-            if len(conversation_data["history"]) > 20:  # Keep last 20 turns
-                conversation_data["history"] = conversation_data["history"][-20:]
-            
-            # Save state
-            await conversation_accessor.set(turn_context, conversation_data)
-            await self.conversation_state.save_changes(turn_context)
+            await self.conversation_store.append(self._session_id(turn_context), user_message, bot_response)
             
         except Exception as e:
             logger.warning("Failed to store conversation turn", error=str(e))
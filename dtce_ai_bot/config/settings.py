@@ -4,7 +4,7 @@ Application settings and configuration.
 
 from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Any, Dict, List
 
 
 class Settings(BaseSettings):
@@ -28,15 +28,107 @@ class Settings(BaseSettings):
     azure_search_index_name: str = ""
     azure_search_api_key: str = ""
     azure_search_admin_key: str = ""
+    search_two_phase_retrieval: bool = True  # Fetch candidates without content, hydrate only the ones used
+    search_content_cache_entries: int = 512  # In-process LRU of hydrated document content (0 disables)
+    search_content_cache_ttl_seconds: int = 3600
+    search_multi_query: bool = True  # Run query variants concurrently and fuse them with reciprocal-rank fusion
+    search_multi_query_max_variants: int = 4
+    search_rrf_k: int = 60
+    search_query_cache_ttl_seconds: int = 300  # Per-question cache of variants and fused results
+    index_version_path: str = ""  # Optional shared marker file so reindex scripts invalidate API caches
+    search_backend: str = "azure"  # "local" serves search in-process from local_search_corpus_path (offline benchmarking)
+    local_search_corpus_path: str = ""  # JSONL corpus snapshot, one index document per line
+    http_cassette_mode: str = ""  # "record" or "replay" OpenAI/Search/Graph HTTP traffic; empty disables
+    http_cassette_path: str = ""  # Cassette JSON file
+    http_cassette_replay_latency: str = "none"  # none | recorded | sampled (seeded draw from the recorded distribution)
+
+    # Answer cache (exact + embedding-similarity lookup, dropped when the index version changes)
+    answer_cache_enabled: bool = True
+    answer_cache_entries: int = 1000
+    answer_cache_ttl_seconds: int = 86400
+    answer_cache_similarity_threshold: float = 0.95
+
+    # Concurrent identical questions / embeddings / searches share one in-flight call
+    single_flight_timeout_seconds: float = 120  # Longest a caller waits on a shared computation (0 = no limit)
+
+    # Conversation memory (see services/conversation_store.py)
+    conversation_store_path: str = ""  # SQLite file for sessions; empty = in-process memory only
+    conversation_max_sessions: int = 1000  # Least recently used sessions beyond this are dropped from memory
+    conversation_idle_ttl_seconds: int = 14400  # Sessions idle longer than this are forgotten
+    conversation_max_turns: int = 12  # Messages kept verbatim before older ones are summarized
+    conversation_keep_recent_turns: int = 6  # Messages left verbatim after summarizing
+    conversation_summary_max_chars: int = 1200
+
+    # Multi-worker serving (see integrations/shared_state.py)
+    shared_state_url: str = ""  # "" = in-process (one worker); "sqlite:///path/state.db" or "redis://host:6379/0"
+    web_concurrency: int = 1  # Worker processes started by startup.py; more than 1 needs shared_state_url
+    sync_job_ttl_seconds: int = 604800  # Finished sync jobs stay visible this long
 
     # Azure OpenAI settings
     azure_openai_endpoint: str = ""
     azure_openai_api_key: str = ""
     azure_openai_deployment_name: str = ""
+    azure_openai_mini_deployment_name: str = ""  # Small-tier deployment (e.g. gpt-4o-mini); empty = use the main one
+
+    # Per-call-site model routing (see integrations/model_router.py), e.g.
+    # {"synthesis_short": {"tier": "large"}, "intent": {"max_tokens": 20, "timeout_seconds": 5}}
+    model_routes: Dict[str, Dict[str, Any]] = {}
+    openai_token_costs: Dict[str, List[float]] = {  # USD per 1K prompt / completion tokens, by deployment
+        "gpt-4o": [0.0025, 0.01],
+        "gpt-4o-mini": [0.00015, 0.0006],
+    }
+
+    # Process-wide Azure OpenAI limiter (see integrations/openai_limiter.py)
+    openai_limiter_enabled: bool = True
+    openai_requests_per_minute: int = 0  # Default per-deployment RPM budget (0 = only 429-driven limits)
+    openai_tokens_per_minute: int = 0  # Default per-deployment TPM budget (0 = only 429-driven limits)
+    openai_deployment_limits: Dict[str, Dict[str, int]] = {}  # e.g. {"gpt-4o": {"rpm": 300, "tpm": 50000}}
+    openai_initial_concurrency: int = 8
+    openai_max_concurrency: int = 32
+    openai_throttle_retries: int = 5  # 429s re-queued inside the limiter before the SDK sees one
+
+    # Request tracing and Prometheus metrics (see core/request_tracing.py, api/metrics.py)
+    metrics_enabled: bool = True  # Serve /metrics and record per-request stage timings
+    debug_timings_enabled: bool = True  # Honour X-Debug-Timings / ?debug_timings=1 on API responses
+
+    # Token usage ledger (see integrations/usage_ledger.py)
+    usage_ledger_enabled: bool = True
+    usage_ledger_path: str = ""  # SQLite file for per-call usage events; empty = in-process rolling counters only
+    usage_ledger_minutes: int = 180  # Per-minute buckets kept in memory
+    usage_ledger_days: int = 35  # Per-day buckets kept in memory
+    usage_ledger_retention_days: int = 90  # Persisted events older than this are purged (0 = keep forever)
+
+    # Admin endpoints and header-triggered profiling (see api/admin_auth.py)
+    admin_token: str = ""  # X-Admin-Token must match; empty = /admin/* answers 403 and X-Profile is ignored
+
+    # On-demand request profiling (see utils/request_profiler.py)
+    profiling_enabled: bool = True  # Honour X-Profile: 1 (with X-Admin-Token) and sampling at all
+    profiling_sample_every: int = 0  # Profile one in N requests to profiling_sample_paths (0 = header-triggered only)
+    profiling_sample_paths: List[str] = ["/documents/ask", "/api/messages"]
+    profiling_dir: str = ""  # Profile files; empty = <tempdir>/dtce-profiles
+    profiling_max_profiles: int = 50
+    profiling_max_total_mb: int = 200
+    profiling_interval_ms: float = 1.0  # pyinstrument sampling interval
+
+    # Event-loop lag monitor (see utils/loop_monitor.py)
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_ms: int = 100  # Heartbeat period; lag = how late each heartbeat wakes up
+    loop_block_threshold_ms: int = 250  # A loop stalled this long gets its blocking stack logged
+    loop_monitor_debug: bool = False  # asyncio debug mode: log every callback slower than the threshold (costly)
     
     # Azure Form Recognizer settings
     azure_form_recognizer_endpoint: str = ""
     azure_form_recognizer_key: str = ""
+    form_recognizer_split_min_pages: int = 40  # PDFs with at least this many pages are analyzed in page ranges
+    form_recognizer_pages_per_range: int = 20
+    form_recognizer_max_concurrency: int = 4  # In-flight analyze calls per worker, shared by all extractions
+    
+    # Local (PyPDF2/python-docx/openpyxl) extraction runs in killable worker processes
+    local_extraction_workers: int = 2
+    local_extraction_timeout_seconds: int = 60  # Wall-clock budget per file; the worker is killed on overrun
+    local_extraction_memory_limit_mb: int = 1024  # Address-space cap per worker (0 disables)
+    local_extraction_quarantine_after: int = 2  # Timeouts/memory overruns before a file is refused
+    local_extraction_quarantine_path: str = ""  # Optional JSON file so the quarantine survives restarts
     
     # Bot Framework settings (Microsoft App registration)
     microsoft_app_id: str = ""
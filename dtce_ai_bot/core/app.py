@@ -2,6 +2,7 @@
 Core FastAPI application factory.
 """
 
+import asyncio
 import os
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,12 +17,21 @@ from ..api.health import router as health_router
 from ..bot.endpoints import router as bot_router
 from ..api.documents import router as documents_router
 from ..api.project_scoping import router as project_scoping_router
+from ..api.metrics import router as metrics_router, register_default_collectors
+from ..utils.metrics import get_metrics_registry
+from ..api.usage import router as usage_router
+from ..api.profiles import router as profiles_router
+from ..integrations.shared_state import get_shared_state
+from ..integrations.usage_ledger import tag_usage
+from .request_profiling import RequestProfilingMiddleware
+from .request_tracing import RequestTracingMiddleware
 
 
 def configure_logging():
     """Configure structured logging."""
     structlog.configure(
         processors=[
+            structlog.contextvars.merge_contextvars,
             structlog.stdlib.filter_by_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
@@ -62,6 +72,15 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+    # On-demand profiling runs inside tracing so profiles are named after the request id
+    app.add_middleware(RequestProfilingMiddleware, token=settings.admin_token)
+
+    # Request ids, per-request stage timings and /metrics
+    if settings.metrics_enabled:
+        register_default_collectors(get_metrics_registry())
+        app.add_middleware(RequestTracingMiddleware, allow_debug_timings=settings.debug_timings_enabled)
+        app.include_router(metrics_router, tags=["metrics"])
     
     # Initialize Azure Search Index on startup
     @app.on_event("startup")
@@ -76,22 +95,42 @@ def create_app() -> FastAPI:
         except Exception as e:
             logger.error("Failed to check Azure Search index", error=str(e))
     
+    @app.on_event("startup")
+    async def start_loop_monitor():
+        """Watch the event loop for lag and calls that block it."""
+        if settings.loop_monitor_enabled:
+            from ..utils.loop_monitor import get_loop_monitor
+            get_loop_monitor().start()
+    
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Close the shared aio Azure clients and stop local extraction workers."""
+        from ..integrations.shared_clients import close_shared_clients
+        from ..utils.extraction_pool import close_local_extraction_pool
+        from ..utils.loop_monitor import get_loop_monitor
+        await get_loop_monitor().stop()
+        await close_shared_clients()
+        close_local_extraction_pool()
+    
     # Include routers
     app.include_router(health_router, prefix="/health", tags=["health"])
     app.include_router(bot_router, prefix="/api/teams", tags=["teams-bot"])
     app.include_router(documents_router, prefix="/documents", tags=["documents"])
     app.include_router(project_scoping_router, prefix="/projects", tags=["project-scoping"])
+    app.include_router(usage_router, prefix="/admin/usage", tags=["admin"])
+    app.include_router(profiles_router, prefix="/admin/profiles", tags=["admin"])
     
-    # Track Bot Framework calls - simple counter without exposing keys
-    bot_calls = {"count": 0, "last_call": None}
+    # Track Bot Framework calls - simple counter without exposing keys (shared across workers)
+    shared_state = get_shared_state()
     
     @app.get("/debug/bot-calls")
     async def get_bot_calls():
         """Check if Bot Framework is calling our endpoint."""
+        bot_calls = await asyncio.to_thread(shared_state.values, "bot_calls")
         return {
-            "total_calls": bot_calls["count"],
-            "last_call_time": bot_calls["last_call"],
-            "status": "Bot Framework is calling our endpoint" if bot_calls["count"] > 0 else "No Bot Framework calls detected"
+            "total_calls": bot_calls.get("count", 0),
+            "last_call_time": bot_calls.get("last_call"),
+            "status": "Bot Framework is calling our endpoint" if bot_calls.get("count") else "No Bot Framework calls detected"
         }
     
     # Bot Framework with proper Single Tenant authentication
@@ -124,6 +163,9 @@ def create_app() -> FastAPI:
             logger = structlog.get_logger()
             user_message = turn_context.activity.text
             logger.info("🔥 BOT RECEIVED MESSAGE", text=user_message)
+            sender = turn_context.activity.from_property
+            if sender is not None:
+                tag_usage(user=getattr(sender, "aad_object_id", None) or sender.id or "")
             
             # Check if it's a greeting or help request
             if self.is_greeting_or_help(user_message):
@@ -146,10 +188,10 @@ def create_app() -> FastAPI:
                 
                 # Import the documents ask function directly instead of HTTP call
                 from ..api.documents import ask_question
-                from ..integrations.azure_search import get_search_client
+                from ..integrations.azure_search import get_async_search_client
                 
-                # Get search client (not async)
-                search_client = get_search_client()
+                # Shared aio search client for this event loop
+                search_client = await get_async_search_client()
                 
                 # Call the ask function directly
                 response = await ask_question(
@@ -201,10 +243,10 @@ def create_app() -> FastAPI:
         try:
             # Track Bot Framework calls
             from datetime import datetime
-            bot_calls["count"] += 1
-            bot_calls["last_call"] = datetime.now().isoformat()
+            call_number = await asyncio.to_thread(shared_state.incr, "bot_calls", "count")
+            await asyncio.to_thread(shared_state.set, "bot_calls", "last_call", datetime.now().isoformat())
             
-            logger.info("🔥 API/MESSAGES HIT!", call_number=bot_calls["count"])
+            logger.info("🔥 API/MESSAGES HIT!", call_number=call_number)
             
             # Get the request body as JSON and auth header
             body_json = await request.json()
@@ -252,7 +294,10 @@ def create_app() -> FastAPI:
                 "sync_async_cancel": "/documents/sync-async/cancel/{job_id}",
                 "list_documents": "/documents/list",
                 "test_connection": "/documents/test-connection",
-                "project_scoping": "/projects"
+                "project_scoping": "/projects",
+                "metrics": "/metrics",
+                "usage": "/admin/usage",
+                "profiles": "/admin/profiles"
             }
         }
     
@@ -0,0 +1,54 @@
+"""
+Request profiling middleware.
+
+A request is profiled when it carries ``X-Profile: 1`` plus an
+``X-Admin-Token`` matching ``admin_token`` (the header is ignored while no
+token is configured), or when it is the one-in-N sample of the configured
+paths. The profile id is returned in
+``X-Profile-Id``; the files are listed and downloaded under
+``/admin/profiles`` (see api/profiles.py and utils/request_profiler.py).
+"""
+
+import uuid
+
+from ..api.admin_auth import admin_authorized
+from ..utils.request_profiler import RequestProfiler, get_request_profiler, new_profile_id
+from ..utils.stage_timer import current_request_id
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, app, profiler: RequestProfiler = None, token: str = ""):
+        self.app = app
+        self.profiler = profiler
+        self.token = token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profiler = self.profiler or get_request_profiler()
+        if not (profiler.enabled and (self._requested(scope) or profiler.should_sample(scope.get("path", "")))):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id(current_request_id() or uuid.uuid4().hex)
+
+        async with profiler.session(profile_id, {"path": scope.get("path", ""), "method": scope.get("method", ""),
+                                                 "request_id": current_request_id()}) as profiling:
+            async def send_with_profile_id(message):
+                if profiling and message["type"] == "http.response.start":
+                    message = {**message, "headers": list(message.get("headers") or []) +
+                               [(b"x-profile-id", profile_id.encode("latin-1"))]}
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile_id)
+
+    def _requested(self, scope) -> bool:
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER, b"").decode("latin-1").lower() not in TRUTHY:
+            return False
+        return admin_authorized(self.token, headers.get(ADMIN_TOKEN_HEADER, b"").decode("latin-1"))
@@ -0,0 +1,101 @@
+"""
+Per-request tracing middleware.
+
+Every HTTP request gets a request id (the caller's ``X-Request-ID`` if it sent
+one) that is echoed back, bound into structlog's contextvars so log lines carry
+it, and stamped on a ``StageRecorder`` so the pipeline's ``stage()`` spans are
+collected for that request. When the request finishes, its duration and stage
+timings are folded into the process-wide metrics.
+
+Callers can ask for the timings with ``X-Debug-Timings: 1`` (or
+``?debug_timings=1``): the response then carries a ``Server-Timing`` header,
+and endpoints that build JSON bodies (``/documents/ask``) include a
+``timings`` object.
+
+Written as plain ASGI rather than ``BaseHTTPMiddleware`` so the recorder's
+contextvar is visible to the endpoint's own task.
+"""
+
+import time
+import uuid
+from urllib.parse import parse_qs
+
+import structlog
+
+from ..utils.metrics import MetricsRegistry, get_metrics_registry
+from ..utils.stage_timer import StageRecorder, record_stages
+
+REQUEST_ID_HEADER = b"x-request-id"
+DEBUG_TIMINGS_HEADER = b"x-debug-timings"
+TRUTHY = {"1", "true", "yes", "on"}
+MAX_REQUEST_ID_LENGTH = 64
+
+
+class RequestTracingMiddleware:
+    def __init__(self, app, registry: MetricsRegistry = None, allow_debug_timings: bool = True):
+        self.app = app
+        registry = registry or get_metrics_registry()
+        self.allow_debug_timings = allow_debug_timings
+        self.requests = registry.counter(
+            "dtce_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+        self.request_seconds = registry.histogram(
+            "dtce_http_request_duration_seconds", "HTTP request duration by route and method", ("route", "method"))
+        self.stage_seconds = registry.histogram(
+            "dtce_stage_duration_seconds", "Wall time of pipeline stages (stages nest)", ("stage",))
+        self.stage_cpu_seconds = registry.counter(
+            "dtce_stage_cpu_seconds_total", "Process CPU time spent inside pipeline stages", ("stage",))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")[:MAX_REQUEST_ID_LENGTH] or uuid.uuid4().hex
+        recorder = StageRecorder(request_id=request_id,
+                                 report_timings=self.allow_debug_timings and self._wants_timings(scope, headers))
+        status = {"code": 500}
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                extra = [(REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+                if recorder.report_timings:
+                    extra.append((b"server-timing", _server_timing(recorder).encode("latin-1")))
+                message = {**message, "headers": list(message.get("headers") or []) + extra}
+            await send(message)
+
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        started = time.perf_counter()
+        try:
+            with record_stages(recorder):
+                await self.app(scope, receive, send_with_headers)
+        finally:
+            structlog.contextvars.unbind_contextvars("request_id")
+            self._observe(scope, status["code"], time.perf_counter() - started, recorder)
+
+    def _observe(self, scope, status: int, seconds: float, recorder: StageRecorder) -> None:
+        route = scope.get("route")
+        # The route template, not the raw path, so ids in URLs do not explode the label set
+        route_label = getattr(route, "path", None) or "unmatched"
+        method = scope.get("method", "")
+        self.requests.inc(route=route_label, method=method, status=status)
+        self.request_seconds.observe(seconds, route=route_label, method=method)
+        for name, durations in recorder.wall_seconds.items():
+            for duration in durations:
+                self.stage_seconds.observe(duration, stage=name)
+            self.stage_cpu_seconds.inc(recorder.cpu_seconds.get(name, 0.0), stage=name)
+
+    @staticmethod
+    def _wants_timings(scope, headers) -> bool:
+        if headers.get(DEBUG_TIMINGS_HEADER, b"").decode("latin-1").lower() in TRUTHY:
+            return True
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        return any(value.lower() in TRUTHY for value in query.get("debug_timings", []))
+
+
+def _server_timing(recorder: StageRecorder) -> str:
+    """``Server-Timing`` header value: one ``name;dur=ms`` entry per stage."""
+    entries = [f"{name};dur={total * 1000:.1f}" for name, total in recorder.totals().items()]
+    entries.append(f"total;dur={(time.perf_counter() - recorder.started) * 1000:.1f}")
+    return ", ".join(entries)
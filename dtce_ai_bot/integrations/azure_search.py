@@ -3,6 +3,7 @@ Azure Search dependency injection for FastAPI.
 """
 
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
     SearchIndex, SearchField, SearchFieldDataType, SimpleField, SearchableField,
@@ -10,6 +11,9 @@ from azure.search.documents.indexes.models import (
 )
 from azure.core.credentials import AzureKeyCredential
 from ..config.settings import get_settings
+from .http_cassette import azure_transport_kwargs
+from .local_search import AsyncLocalSearchClient, LocalSearchClient, get_local_search_index
+from .shared_clients import get_shared_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,15 +33,37 @@ def get_search_endpoint() -> str:
 
 
 def get_search_client() -> SearchClient:
-    """Get Azure Search client."""
+    """Get Azure Search client (the in-process local index when search_backend is "local")."""
     settings = get_settings()
+    if settings.search_backend == "local":
+        return LocalSearchClient(get_local_search_index())
     endpoint = get_search_endpoint()
     if not endpoint:
         raise ValueError("Azure Search endpoint is not configured.")
     return SearchClient(
         endpoint=endpoint,
         index_name=settings.azure_search_index_name,
-        credential=AzureKeyCredential(settings.azure_search_admin_key)
+        credential=AzureKeyCredential(settings.azure_search_admin_key),
+        **azure_transport_kwargs(asynchronous=False)
+    )
+
+
+async def get_async_search_client() -> AsyncSearchClient:
+    """Get the shared aio Azure Search client for the running event loop."""
+    settings = get_settings()
+    if settings.search_backend == "local":
+        return AsyncLocalSearchClient(get_local_search_index())
+    endpoint = get_search_endpoint()
+    if not endpoint:
+        raise ValueError("Azure Search endpoint is not configured.")
+    return get_shared_client(
+        ("search", endpoint, settings.azure_search_index_name),
+        lambda: AsyncSearchClient(
+            endpoint=endpoint,
+            index_name=settings.azure_search_index_name,
+            credential=AzureKeyCredential(settings.azure_search_admin_key),
+            **azure_transport_kwargs()
+        )
     )
 
 
@@ -49,7 +75,8 @@ def get_search_index_client() -> SearchIndexClient:
         raise ValueError("Azure Search endpoint is not configured.")
     return SearchIndexClient(
         endpoint=endpoint,
-        credential=AzureKeyCredential(settings.azure_search_admin_key)
+        credential=AzureKeyCredential(settings.azure_search_admin_key),
+        **azure_transport_kwargs(asynchronous=False)
     )
 
 
@@ -76,6 +103,13 @@ async def create_search_index():
             SimpleField(name="created_date", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
             SearchableField(name="project_name", type=SearchFieldDataType.String, filterable=True, facetable=True),
             SimpleField(name="year", type=SearchFieldDataType.Int32, filterable=True, facetable=True),
+            # Structured fields derived from the blob path at ingest (see utils/document_fields.py)
+            SimpleField(name="project_number", type=SearchFieldDataType.String, filterable=True, facetable=True),
+            SimpleField(name="year_code", type=SearchFieldDataType.String, filterable=True, facetable=True),
+            SimpleField(name="doc_category", type=SearchFieldDataType.String, filterable=True, facetable=True),
+            SimpleField(name="file_extension", type=SearchFieldDataType.String, filterable=True, facetable=True),
+            SimpleField(name="is_superseded", type=SearchFieldDataType.Boolean, filterable=True, facetable=True),
+            SimpleField(name="is_system_file", type=SearchFieldDataType.Boolean, filterable=True, facetable=True),
         ]
         
         # Configure semantic search - only use fields that exist and are searchable
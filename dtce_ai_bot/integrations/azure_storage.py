@@ -3,10 +3,13 @@ Azure Storage dependency injection for FastAPI.
 """
 
 from datetime import datetime, timedelta
+from typing import Union
 
 from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
 
 from ..config.settings import get_settings
+from .shared_clients import get_shared_client
 
 
 def get_storage_client() -> BlobServiceClient:
@@ -15,8 +18,18 @@ def get_storage_client() -> BlobServiceClient:
     return BlobServiceClient.from_connection_string(settings.azure_storage_connection_string)
 
 
+async def get_async_storage_client() -> AsyncBlobServiceClient:
+    """Get the shared aio Azure Blob Storage client for the running event loop."""
+    settings = get_settings()
+    connection_string = settings.azure_storage_connection_string
+    return get_shared_client(
+        ("storage", connection_string),
+        lambda: AsyncBlobServiceClient.from_connection_string(connection_string)
+    )
+
+
 def get_blob_sas_url(
-    storage_client: BlobServiceClient, container_name: str, blob_name: str
+    storage_client: Union[BlobServiceClient, AsyncBlobServiceClient], container_name: str, blob_name: str
 ) -> str:
     """Generate a SAS URL for a specific blob."""
     try:
@@ -0,0 +1,551 @@
+"""
+HTTP Record/Replay
+
+Single Responsibility: Record the HTTP traffic of the OpenAI, Azure Search and
+Microsoft Graph clients to a cassette file and replay it offline, so the full
+``/documents/ask`` pipeline can be profiled and compared between branches
+without live services.
+
+- Requests are keyed on a normalised form - method, path, sorted query string
+  and canonical JSON/form body, host dropped, secrets redacted - so a cassette
+  recorded against one environment replays against any other.
+- Identical requests replay their recorded responses in order (the last one
+  repeats), which keeps concurrent fan-out deterministic.
+- Secrets never reach the file: request headers are not stored, response
+  headers are cut to an allowlist, and tokens/signatures in URLs and bodies
+  are redacted.
+- Replay can sleep for each interaction's recorded latency, or for a latency
+  drawn (seeded) from that service's recorded distribution, so offline runs
+  keep realistic overlap between concurrent calls.
+
+Hooks: the OpenAI client factories (httpx transport), the Search client
+factories and Graph credential (azure-core transport) and ``graph_session``
+(aiohttp) for Graph requests. Enabled with ``http_cassette_mode``.
+"""
+
+import asyncio
+import atexit
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import aiohttp
+import httpx
+import structlog
+from azure.core.pipeline.transport import AioHttpTransport, AsyncHttpTransport, HttpTransport, RequestsTransport
+from azure.core.rest._http_response_impl import HttpResponseImpl
+from azure.core.rest._http_response_impl_async import AsyncHttpResponseImpl
+from azure.core.utils import CaseInsensitiveDict
+
+logger = structlog.get_logger(__name__)
+
+MODES = ("record", "replay")
+REPLAY_LATENCY = ("none", "recorded", "sampled")
+REDACTED = "REDACTED"
+
+SECRET_PARAMS = ("api-key", "key", "sig", "code", "client_secret", "client_assertion", "tempauth",
+                 "access_token", "refresh_token", "password")
+# Response headers worth keeping (content handling and throttling behaviour); everything else is dropped
+RESPONSE_HEADERS = ("content-type", "retry-after", "retry-after-ms",
+                    "x-ratelimit-remaining-requests", "x-ratelimit-remaining-tokens")
+# Hop-by-hop/encoding headers that no longer describe a buffered, decoded body
+_STALE_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+_SECRET_QUERY = re.compile(r"(?i)([?&;](?:%s)=)[^&\"'\s]+" % "|".join(map(re.escape, SECRET_PARAMS)))
+_SECRET_JSON = re.compile(r'(?i)("(?:access_token|refresh_token|id_token|client_secret|password|api[-_]?key)"\s*:\s*")[^"]*(")')
+_BEARER = re.compile(r"(?i)(bearer\s+)[A-Za-z0-9\-._~+/]+=*")
+
+
+class CassetteMiss(Exception):
+    """Replay found no recorded interaction for a request."""
+
+
+def redact(text: str) -> str:
+    """Strip tokens, keys and signatures from a URL or body."""
+    text = _SECRET_QUERY.sub(rf"\g<1>{REDACTED}", text)
+    text = _SECRET_JSON.sub(rf"\g<1>{REDACTED}\g<2>", text)
+    return _BEARER.sub(rf"\g<1>{REDACTED}", text)
+
+
+def normalize_request(method: str, url: str, body: Optional[bytes], content_type: str = "") -> Tuple[str, str]:
+    """Cassette key and readable description of a request (host-independent, secrets redacted)."""
+    parts = urlsplit(url)
+    query = sorted((name, REDACTED if name.lower() in SECRET_PARAMS else value)
+                   for name, value in parse_qsl(parts.query, keep_blank_values=True))
+    target = parts.path + (f"?{urlencode(query)}" if query else "")
+
+    canonical_body = ""
+    if body:
+        try:
+            canonical_body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            if "x-www-form-urlencoded" in content_type:
+                fields = sorted((name, REDACTED if name.lower() in SECRET_PARAMS else value)
+                                for name, value in parse_qsl(body.decode("utf-8", "replace"), keep_blank_values=True))
+                canonical_body = urlencode(fields)
+            else:
+                canonical_body = "sha256:" + hashlib.sha256(body).hexdigest()
+
+    description = f"{method.upper()} {target}"
+    digest = hashlib.sha256(f"{description}\n{canonical_body}".encode("utf-8")).hexdigest()[:24]
+    return digest, description
+
+
+def _kept_headers(headers) -> Dict[str, str]:
+    return {name.lower(): value for name, value in headers.items() if name.lower() in RESPONSE_HEADERS}
+
+
+def _live_headers(headers) -> Dict[str, str]:
+    return {name: value for name, value in headers.items() if name.lower() not in _STALE_HEADERS}
+
+
+class Cassette:
+    """Recorded interactions keyed by normalised request, persisted as a sorted JSON file."""
+
+    def __init__(self, path: str, mode: str, replay_latency: str = "none", seed: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        if replay_latency not in REPLAY_LATENCY:
+            raise ValueError(f"Unknown replay latency '{replay_latency}'")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._rerecorded: set = set()
+        self._cursors: Dict[str, int] = {}
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as cassette_file:
+                self._interactions = json.load(cassette_file).get("interactions", {})
+        elif mode == "replay":
+            raise FileNotFoundError(f"Cassette not found: {path}")
+        self._latencies = self._latency_distribution()
+
+    def record(self, service: str, method: str, url: str, request_body: Optional[bytes], content_type: str,
+               status: int, headers, content: bytes, latency_seconds: float) -> None:
+        key, description = normalize_request(method, url, request_body, content_type)
+        interaction = {
+            "service": service,
+            "request": redact(description),
+            "status": status,
+            "headers": _kept_headers(headers),
+            "latency_ms": round(latency_seconds * 1000),
+        }
+        try:
+            interaction["body"] = redact(content.decode("utf-8"))
+        except UnicodeDecodeError:
+            interaction["body_base64"] = base64.b64encode(content).decode("ascii")
+        with self._lock:
+            if key not in self._rerecorded:
+                # Re-recording a request replaces what an earlier session captured for it
+                self._interactions[key] = []
+                self._rerecorded.add(key)
+            self._interactions[key].append(interaction)
+            self._stats["recorded"] += 1
+
+    async def replay(self, service: str, method: str, url: str, request_body: Optional[bytes],
+                     content_type: str = "") -> Tuple[int, Dict[str, str], bytes]:
+        interaction, delay = self._next(service, method, url, request_body, content_type)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._response(interaction)
+
+    def replay_blocking(self, service: str, method: str, url: str, request_body: Optional[bytes],
+                        content_type: str = "") -> Tuple[int, Dict[str, str], bytes]:
+        interaction, delay = self._next(service, method, url, request_body, content_type)
+        if delay:
+            time.sleep(delay)
+        return self._response(interaction)
+
+    def save(self) -> None:
+        """Write the cassette atomically (sorted keys, so re-recordings diff cleanly)."""
+        if self.mode != "record":
+            return
+        with self._lock:
+            payload = json.dumps({"version": 1, "interactions": self._interactions}, indent=1, sort_keys=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as cassette_file:
+            cassette_file.write(payload)
+        os.replace(temporary_path, self.path)
+        logger.info("HTTP cassette saved", path=self.path, requests=len(self._interactions))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "path": self.path, "requests": len(self._interactions), **self._stats}
+
+    def _next(self, service: str, method: str, url: str, request_body: Optional[bytes],
+              content_type: str) -> Tuple[Dict[str, Any], float]:
+        key, description = normalize_request(method, url, request_body, content_type)
+        with self._lock:
+            recorded = self._interactions.get(key)
+            if not recorded:
+                self._stats["misses"] += 1
+                raise CassetteMiss(f"No recorded {service} response for {redact(description)} (key {key})")
+            position = self._cursors.get(key, 0)
+            self._cursors[key] = position + 1
+            interaction = recorded[min(position, len(recorded) - 1)]
+            self._stats["replayed"] += 1
+            if self.replay_latency == "recorded":
+                delay = interaction.get("latency_ms", 0) / 1000
+            elif self.replay_latency == "sampled" and self._latencies.get(interaction.get("service")):
+                delay = self._random.choice(self._latencies[interaction["service"]]) / 1000
+            else:
+                delay = 0.0
+        return interaction, delay
+
+    @staticmethod
+    def _response(interaction: Dict[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+        if "body_base64" in interaction:
+            content = base64.b64decode(interaction["body_base64"])
+        else:
+            content = interaction.get("body", "").encode("utf-8")
+        return interaction["status"], dict(interaction.get("headers", {})), content
+
+    def _latency_distribution(self) -> Dict[str, List[int]]:
+        latencies: Dict[str, List[int]] = {}
+        for key in sorted(self._interactions):
+            for interaction in self._interactions[key]:
+                latencies.setdefault(interaction.get("service", ""), []).append(interaction.get("latency_ms", 0))
+        return latencies
+
+
+# ---------------------------------------------------------------------------
+# httpx (OpenAI)
+# ---------------------------------------------------------------------------
+
+class CassetteAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records through ``transport`` or replays from the cassette."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.AsyncBaseTransport] = None, service: str = "openai"):
+        self.cassette = cassette
+        self.service = service
+        self._transport = transport or (httpx.AsyncHTTPTransport() if cassette.mode == "record" else None)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request_body = await request.aread()
+        content_type = request.headers.get("content-type", "")
+        if self.cassette.mode == "replay":
+            status, headers, content = await self.cassette.replay(
+                self.service, request.method, str(request.url), request_body, content_type)
+            return httpx.Response(status, headers=headers, content=content, request=request)
+
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        self.cassette.record(self.service, request.method, str(request.url), request_body, content_type,
+                             response.status_code, response.headers, content, time.perf_counter() - started)
+        return httpx.Response(response.status_code, headers=_live_headers(response.headers), content=content, request=request)
+
+    async def aclose(self) -> None:
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """Blocking counterpart of ``CassetteAsyncTransport`` for sync clients."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.BaseTransport] = None, service: str = "openai"):
+        self.cassette = cassette
+        self.service = service
+        self._transport = transport or (httpx.HTTPTransport() if cassette.mode == "record" else None)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request_body = request.read()
+        content_type = request.headers.get("content-type", "")
+        if self.cassette.mode == "replay":
+            status, headers, content = self.cassette.replay_blocking(
+                self.service, request.method, str(request.url), request_body, content_type)
+            return httpx.Response(status, headers=headers, content=content, request=request)
+
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        self.cassette.record(self.service, request.method, str(request.url), request_body, content_type,
+                             response.status_code, response.headers, content, time.perf_counter() - started)
+        return httpx.Response(response.status_code, headers=_live_headers(response.headers), content=content, request=request)
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+
+# ---------------------------------------------------------------------------
+# azure-core (Search, identity)
+# ---------------------------------------------------------------------------
+
+def _azure_request_body(request) -> Optional[bytes]:
+    body = getattr(request, "content", None)
+    if body is None:
+        body = getattr(request, "body", None)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return body if isinstance(body, (bytes, bytearray)) else None
+
+
+def _azure_response_kwargs(request, status: int, headers: Dict[str, str]) -> Dict[str, Any]:
+    headers = CaseInsensitiveDict(headers)
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    return dict(request=request, internal_response=None, status_code=status, reason=reason,
+                content_type=headers.get("content-type"), headers=headers, stream_download_generator=None)
+
+
+class _BufferedAsyncResponse(AsyncHttpResponseImpl):
+    """Fully-read azure-core response (recorded or replayed)."""
+
+    def __init__(self, request, status: int, headers: Dict[str, str], content: bytes):
+        super().__init__(**_azure_response_kwargs(request, status, headers))
+        self._content = content
+
+    async def close(self) -> None:
+        self._is_closed = True
+
+
+class _BufferedResponse(HttpResponseImpl):
+    def __init__(self, request, status: int, headers: Dict[str, str], content: bytes):
+        super().__init__(**_azure_response_kwargs(request, status, headers))
+        self._content = content
+
+    def close(self) -> None:
+        self._is_closed = True
+
+
+def _read_legacy_or_rest(response) -> bytes:
+    return response.content if hasattr(response, "content") and not callable(response.content) else response.body()
+
+
+class CassetteAsyncHttpTransport(AsyncHttpTransport):
+    """azure-core aio transport that records through ``transport`` or replays from the cassette."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[AsyncHttpTransport] = None, service: str = "search"):
+        self.cassette = cassette
+        self.service = service
+        self._transport = transport or (AioHttpTransport() if cassette.mode == "record" else None)
+
+    async def send(self, request, **kwargs):
+        request_body = _azure_request_body(request)
+        content_type = request.headers.get("content-type", "")
+        if self.cassette.mode == "replay":
+            status, headers, content = await self.cassette.replay(
+                self.service, request.method, request.url, request_body, content_type)
+            return _BufferedAsyncResponse(request, status, headers, content)
+
+        started = time.perf_counter()
+        response = await self._transport.send(request, **kwargs)
+        if hasattr(response, "read"):
+            await response.read()
+        else:
+            await response.load_body()
+        content = _read_legacy_or_rest(response)
+        self.cassette.record(self.service, request.method, request.url, request_body, content_type,
+                             response.status_code, response.headers, content, time.perf_counter() - started)
+        return _BufferedAsyncResponse(request, response.status_code, _live_headers(response.headers), content)
+
+    async def open(self) -> None:
+        if self._transport is not None:
+            await self._transport.open()
+
+    async def close(self) -> None:
+        if self._transport is not None:
+            await self._transport.close()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+class CassetteHttpTransport(HttpTransport):
+    """Blocking counterpart of ``CassetteAsyncHttpTransport`` for sync Azure clients."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[HttpTransport] = None, service: str = "search"):
+        self.cassette = cassette
+        self.service = service
+        self._transport = transport or (RequestsTransport() if cassette.mode == "record" else None)
+
+    def send(self, request, **kwargs):
+        request_body = _azure_request_body(request)
+        content_type = request.headers.get("content-type", "")
+        if self.cassette.mode == "replay":
+            status, headers, content = self.cassette.replay_blocking(
+                self.service, request.method, request.url, request_body, content_type)
+            return _BufferedResponse(request, status, headers, content)
+
+        started = time.perf_counter()
+        response = self._transport.send(request, **kwargs)
+        if hasattr(response, "read"):
+            response.read()
+        content = _read_legacy_or_rest(response)
+        self.cassette.record(self.service, request.method, request.url, request_body, content_type,
+                             response.status_code, response.headers, content, time.perf_counter() - started)
+        return _BufferedResponse(request, response.status_code, _live_headers(response.headers), content)
+
+    def open(self) -> None:
+        if self._transport is not None:
+            self._transport.open()
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# aiohttp (Graph)
+# ---------------------------------------------------------------------------
+
+class CassetteClientResponse:
+    """The parts of ``aiohttp.ClientResponse`` the Graph client reads, over a buffered body."""
+
+    def __init__(self, status: int, headers: Dict[str, str], content: bytes):
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        try:
+            self.reason = HTTPStatus(status).phrase
+        except ValueError:
+            self.reason = ""
+        self._content = content
+
+    async def read(self) -> bytes:
+        return self._content
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        return self._content.decode(encoding or "utf-8", "replace")
+
+    async def json(self, **kwargs) -> Any:
+        return json.loads(self._content) if self._content else None
+
+    def release(self) -> None:
+        pass
+
+
+class _CassetteRequest:
+    def __init__(self, session: "CassetteClientSession", method: str, url: str, kwargs: Dict[str, Any]):
+        self.session = session
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+
+    async def __aenter__(self) -> CassetteClientResponse:
+        return await self.session._send(self.method, self.url, self.kwargs)
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class CassetteClientSession:
+    """Stand-in for ``aiohttp.ClientSession`` that records through a real session or replays."""
+
+    def __init__(self, cassette: Cassette, service: str = "graph", **session_kwargs):
+        self.cassette = cassette
+        self.service = service
+        self._session = aiohttp.ClientSession(**session_kwargs) if cassette.mode == "record" else None
+
+    def request(self, method: str, url: str, **kwargs) -> _CassetteRequest:
+        return _CassetteRequest(self, method.upper(), str(url), kwargs)
+
+    def get(self, url: str, **kwargs) -> _CassetteRequest:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> _CassetteRequest:
+        return self.request("POST", url, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self) -> "CassetteClientSession":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def _send(self, method: str, url: str, kwargs: Dict[str, Any]) -> CassetteClientResponse:
+        if "json" in kwargs:
+            request_body, content_type = json.dumps(kwargs["json"]).encode("utf-8"), "application/json"
+        else:
+            data = kwargs.get("data")
+            request_body = data.encode("utf-8") if isinstance(data, str) else data if isinstance(data, bytes) else None
+            content_type = (kwargs.get("headers") or {}).get("Content-Type", "")
+        if kwargs.get("params"):
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(kwargs['params'])}"
+
+        if self.cassette.mode == "replay":
+            return CassetteClientResponse(*await self.cassette.replay(self.service, method, url, request_body, content_type))
+
+        started = time.perf_counter()
+        async with self._session.request(method, url, **kwargs) as response:
+            content = await response.read()
+        self.cassette.record(self.service, method, url, request_body, content_type,
+                             response.status, response.headers, content, time.perf_counter() - started)
+        return CassetteClientResponse(response.status, _live_headers(response.headers), content)
+
+
+# ---------------------------------------------------------------------------
+# Factories
+# ---------------------------------------------------------------------------
+
+_cassette: Optional[Cassette] = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Process-wide cassette from settings, or None when record/replay is off."""
+    global _cassette, _cassette_loaded
+    if not _cassette_loaded:
+        from ..config.settings import get_settings
+
+        with _cassette_lock:
+            if not _cassette_loaded:
+                settings = get_settings()
+                if settings.http_cassette_mode:
+                    _cassette = Cassette(settings.http_cassette_path, settings.http_cassette_mode,
+                                         settings.http_cassette_replay_latency)
+                    if _cassette.mode == "record":
+                        atexit.register(_cassette.save)
+                    logger.info("HTTP cassette active", **_cassette.get_stats())
+                _cassette_loaded = True
+    return _cassette
+
+
+def azure_transport_kwargs(asynchronous: bool = True, service: str = "search") -> Dict[str, Any]:
+    """``transport=`` for an Azure SDK client when record/replay is on, else nothing."""
+    cassette = get_cassette()
+    if cassette is None:
+        return {}
+    transport_class = CassetteAsyncHttpTransport if asynchronous else CassetteHttpTransport
+    return {"transport": transport_class(cassette, service=service)}
+
+
+def graph_session(**kwargs):
+    """aiohttp session for Graph calls, routed through the cassette when one is active."""
+    cassette = get_cassette()
+    if cassette is None:
+        return aiohttp.ClientSession(**kwargs)
+    return CassetteClientSession(cassette, **kwargs)
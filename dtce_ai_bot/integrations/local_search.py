@@ -0,0 +1,731 @@
+"""
+Local Search Backend
+
+Single Responsibility: Serve the subset of the Azure AI Search ``SearchClient``
+surface this codebase uses from an in-process index, so every retrieval path can
+be profiled and load-tested offline against a realistic corpus.
+
+- Full text: BM25 (k1=1.2, b=0.75 - Azure's defaults) per searchable field, summed.
+  Simple query syntax only: terms, quoted phrases as terms, ``term*`` prefixes;
+  ``AND``/``OR``/``NOT`` words are ignored and ``search_mode`` decides any/all.
+- Vectors: brute-force cosine k-NN with NumPy over ``content_vector``; hybrid
+  and multi-vector queries are fused with reciprocal-rank fusion, as Azure does.
+- Filters: the OData subset we emit - eq/ne/gt/ge/lt/le, and/or/not, parentheses,
+  ``search.ismatch`` and ``search.in``. Filters are applied before scoring.
+- select, top, skip, order_by, facets, include_total_count, highlights and
+  extractive captions. There is no semantic reranker: ``@search.reranker_score``
+  is the normalised first-stage score and no semantic answers are returned.
+
+Load a snapshot (one index document per line, index field names as keys) with
+``LocalSearchIndex.from_jsonl``; with ``search_backend = "local"`` the client
+factories in ``azure_search`` return these clients instead of Azure ones.
+"""
+
+import bisect
+import fnmatch
+import json
+import math
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+from ..config.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+SEARCHABLE_FIELDS = ("filename", "content", "folder", "project_name")
+VECTOR_FIELDS = ("content_vector",)
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+DEFAULT_TOP = 50
+CAPTION_MAX_CHARS = 300
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+_WORD = re.compile(r"[a-z0-9]+")
+_QUERY_TERM = re.compile(r"[A-Za-z0-9]+\*?")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def tokenize(text: Any) -> List[str]:
+    return _WORD.findall(str(text).lower()) if text is not None else []
+
+
+# ---------------------------------------------------------------------------
+# OData filters
+# ---------------------------------------------------------------------------
+
+_FILTER_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<string>'(?:[^']|'')*')"
+    r"|(?P<datetime>\d{4}-\d{2}-\d{2}T[\d:.]+(?:Z|[+-]\d{2}:\d{2}))"
+    r"|(?P<number>-?\d+(?:\.\d+)?)(?![\w.])"
+    r"|(?P<punct>[(),])"
+    r"|(?P<name>[A-Za-z_][\w./]*)"
+    r")"
+)
+_COMPARISONS = {
+    'eq': lambda value, literal: value == literal,
+    'ne': lambda value, literal: value != literal,
+    'gt': lambda value, literal: value > literal,
+    'ge': lambda value, literal: value >= literal,
+    'lt': lambda value, literal: value < literal,
+    'le': lambda value, literal: value <= literal,
+}
+_LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+class _FilterParser:
+    """Recursive-descent parser turning an OData filter into a document predicate."""
+
+    def __init__(self, expression: str, default_fields: Tuple[str, ...]):
+        self.expression = expression
+        self.default_fields = default_fields
+        self.tokens = self._tokenize(expression)
+        self.position = 0
+
+    def parse(self) -> Predicate:
+        predicate = self._or()
+        if self.position != len(self.tokens):
+            self._fail(f"unexpected '{self.tokens[self.position][1]}'")
+        return predicate
+
+    def _tokenize(self, expression: str) -> List[Tuple[str, Any]]:
+        tokens, position = [], 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _FILTER_TOKEN.match(expression, position)
+            if not match or match.end() == position:
+                self._fail(f"cannot parse near '{expression[position:position + 20]}'")
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == 'string':
+                tokens.append(('literal', text[1:-1].replace("''", "'")))
+            elif kind == 'datetime':
+                tokens.append(('literal', text))
+            elif kind == 'number':
+                tokens.append(('literal', float(text) if '.' in text else int(text)))
+            elif kind == 'name' and text.lower() in _LITERALS:
+                tokens.append(('literal', _LITERALS[text.lower()]))
+            else:
+                tokens.append((kind, text))
+            position = match.end()
+        return tokens
+
+    def _fail(self, reason: str):
+        raise HttpResponseError(message=f"Invalid expression: {reason} in filter '{self.expression}'")
+
+    def _peek(self) -> Tuple[Optional[str], Any]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _next(self) -> Tuple[str, Any]:
+        token = self._peek()
+        if token[0] is None:
+            self._fail("unexpected end")
+        self.position += 1
+        return token
+
+    def _expect(self, kind: str, text: Optional[str] = None) -> Any:
+        token_kind, token_text = self._next()
+        if token_kind != kind or (text is not None and token_text != text):
+            self._fail(f"expected '{text or kind}' but found '{token_text}'")
+        return token_text
+
+    def _keyword(self, word: str) -> bool:
+        kind, text = self._peek()
+        if kind == 'name' and text.lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def _or(self) -> Predicate:
+        predicates = [self._and()]
+        while self._keyword('or'):
+            predicates.append(self._and())
+        return predicates[0] if len(predicates) == 1 else (lambda doc: any(p(doc) for p in predicates))
+
+    def _and(self) -> Predicate:
+        predicates = [self._unary()]
+        while self._keyword('and'):
+            predicates.append(self._unary())
+        return predicates[0] if len(predicates) == 1 else (lambda doc: all(p(doc) for p in predicates))
+
+    def _unary(self) -> Predicate:
+        if self._keyword('not'):
+            inner = self._unary()
+            return lambda doc: not inner(doc)
+        return self._primary()
+
+    def _primary(self) -> Predicate:
+        kind, text = self._next()
+        if kind == 'punct' and text == '(':
+            predicate = self._or()
+            self._expect('punct', ')')
+            return predicate
+        if kind == 'literal' and isinstance(text, bool):
+            return lambda doc: text
+        if kind != 'name':
+            self._fail(f"unexpected '{text}'")
+        if self._peek() == ('punct', '('):
+            return self._function(text.lower())
+
+        operator_kind, operator = self._peek()
+        if operator_kind == 'name' and operator.lower() in _COMPARISONS:
+            self.position += 1
+            literal_kind, literal = self._next()
+            if literal_kind != 'literal':
+                self._fail(f"expected a literal after '{operator}'")
+            return _comparison(text, operator.lower(), literal)
+        # Bare boolean field
+        return lambda doc: doc.get(text) is True
+
+    def _function(self, name: str) -> Predicate:
+        self._expect('punct', '(')
+        arguments = []
+        while self._peek() != ('punct', ')'):
+            kind, value = self._next()
+            if kind not in ('literal', 'name'):
+                self._fail(f"unexpected '{value}' in {name}()")
+            arguments.append(value)
+            if self._peek() == ('punct', ','):
+                self.position += 1
+        self._expect('punct', ')')
+
+        if name in ('search.ismatch', 'search.ismatchscoring') and arguments:
+            fields = tuple(f.strip() for f in str(arguments[1]).split(',')) if len(arguments) > 1 else self.default_fields
+            search_mode = str(arguments[3]).lower() if len(arguments) > 3 else 'any'
+            return _ismatch(str(arguments[0]), fields, search_mode)
+        if name == 'search.in' and len(arguments) >= 2:
+            delimiters = str(arguments[2]) if len(arguments) > 2 else ' ,'
+            values = {value for value in re.split('|'.join(map(re.escape, delimiters)), str(arguments[1])) if value}
+            field_name = arguments[0]
+            return lambda doc: _any_value(doc.get(field_name), lambda value: value in values)
+        self._fail(f"unsupported function {name}()")
+
+
+def _any_value(value: Any, test: Callable[[Any], bool]) -> bool:
+    """Collection fields match when any element does."""
+    if isinstance(value, list):
+        return any(test(item) for item in value)
+    return test(value)
+
+
+def _comparison(field_name: str, operator: str, literal: Any) -> Predicate:
+    compare = _COMPARISONS[operator]
+
+    def predicate(doc: Dict[str, Any]) -> bool:
+        value = doc.get(field_name)
+        if value is None or literal is None:
+            # Nulls only compare equal to null; ordering against null is false
+            return compare(value, literal) if operator in ('eq', 'ne') else False
+        try:
+            return _any_value(value, lambda item: compare(item, literal))
+        except TypeError:
+            return operator == 'ne'
+    return predicate
+
+
+def _ismatch(query: str, fields: Tuple[str, ...], search_mode: str) -> Predicate:
+    """Term/wildcard match against field tokens (or the whole value, for patterns like ``*225*``)."""
+    patterns = [term.lower() for term in re.findall(r"[A-Za-z0-9*?][\w*?\-./]*", query)
+                if term not in ('AND', 'OR', 'NOT')]
+    combine = all if search_mode == 'all' else any
+
+    def term_matches(pattern: str, doc: Dict[str, Any]) -> bool:
+        for field_name in fields:
+            value = doc.get(field_name)
+            if value is None:
+                continue
+            tokens = tokenize(value)
+            if '*' in pattern or '?' in pattern:
+                if fnmatch.fnmatchcase(str(value).lower(), pattern) or any(fnmatch.fnmatchcase(token, pattern) for token in tokens):
+                    return True
+            elif all(part in tokens for part in tokenize(pattern)):
+                return True
+        return False
+
+    return lambda doc: bool(patterns) and combine(term_matches(pattern, doc) for pattern in patterns)
+
+
+@lru_cache(maxsize=512)
+def parse_filter(expression: str, default_fields: Tuple[str, ...] = SEARCHABLE_FIELDS) -> Predicate:
+    """Compile an OData filter into a predicate over document dicts (raises HttpResponseError like Azure)."""
+    return _FilterParser(expression, default_fields).parse()
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class _FieldIndex:
+    """BM25 postings for one searchable field."""
+
+    def __init__(self, documents: Sequence[Dict[str, Any]], field_name: str):
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.lengths = np.zeros(len(documents), dtype=np.float32)
+        for position, document in enumerate(documents):
+            tokens = tokenize(document.get(field_name))
+            self.lengths[position] = len(tokens)
+            postings = self.postings
+            for token in tokens:
+                counts = postings[token]
+                counts[position] = counts.get(position, 0) + 1
+        self.average_length = float(self.lengths.mean()) if len(documents) and self.lengths.any() else 1.0
+        self.document_count = len(documents)
+
+    def score(self, term: str, scores: Dict[int, float], allowed: Optional[set]) -> None:
+        postings = self.postings.get(term)
+        if not postings:
+            return
+        idf = math.log(1 + (self.document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        for position, frequency in postings.items():
+            if allowed is not None and position not in allowed:
+                continue
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / self.average_length)
+            scores[position] = scores.get(position, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+
+@dataclass
+class LocalCaption:
+    """Extractive caption, shaped like the SDK's ``QueryCaptionResult``."""
+    text: str
+    highlights: Optional[str] = None
+
+
+@dataclass
+class IndexingResult:
+    key: str
+    succeeded: bool
+    status_code: int
+    error_message: Optional[str] = None
+
+
+class LocalSearchIndex:
+    """In-memory document store with BM25 postings and NumPy vector matrices, rebuilt lazily after writes."""
+
+    def __init__(self, documents: Iterable[Dict[str, Any]] = (), key_field: str = "id",
+                 searchable_fields: Sequence[str] = SEARCHABLE_FIELDS, vector_fields: Sequence[str] = VECTOR_FIELDS):
+        self.key_field = key_field
+        self.searchable_fields = tuple(searchable_fields)
+        self.vector_fields = tuple(vector_fields)
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._dirty = True
+        self._ordered: List[Dict[str, Any]] = []
+        self._fields: Dict[str, _FieldIndex] = {}
+        self._vocabulary: List[str] = []
+        self._vectors: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for document in documents:
+            self._documents[str(document[key_field])] = dict(document)
+
+    @classmethod
+    def from_jsonl(cls, path: str, **kwargs) -> "LocalSearchIndex":
+        """Load a corpus snapshot: one JSON document per line, blank lines ignored."""
+        with open(path, encoding="utf-8") as corpus:
+            documents = [json.loads(line) for line in corpus if line.strip()]
+        index = cls(documents, **kwargs)
+        logger.info("Local search corpus loaded", path=path, documents=len(index))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._documents.get(str(key))
+
+    def write(self, action: str, documents: Iterable[Dict[str, Any]]) -> List[IndexingResult]:
+        """Apply an indexing action (upload, merge, mergeOrUpload, delete) to a batch."""
+        results = []
+        with self._lock:
+            for document in documents:
+                key = str(document.get(self.key_field, ""))
+                existing = self._documents.get(key)
+                if not key or (action == "merge" and existing is None):
+                    results.append(IndexingResult(key, False, 404, "Document not found"))
+                    continue
+                if action == "delete":
+                    self._documents.pop(key, None)
+                elif action in ("merge", "mergeOrUpload") and existing is not None:
+                    existing.update(document)
+                else:
+                    self._documents[key] = dict(document)
+                results.append(IndexingResult(key, True, 200))
+            self._dirty = True
+        return results
+
+    def search(self, search_text: Optional[str] = None, *, filter: Optional[str] = None,
+               top: Optional[int] = None, skip: Optional[int] = None, select: Any = None,
+               search_fields: Any = None, search_mode: Optional[str] = None, query_type: Any = None,
+               vector_queries: Optional[List[Any]] = None, facets: Optional[List[str]] = None,
+               order_by: Any = None, highlight_fields: Optional[str] = None,
+               highlight_pre_tag: str = "<em>", highlight_post_tag: str = "</em>",
+               query_caption: Any = None, **unsupported) -> Tuple[List[Dict[str, Any]], int, Dict[str, List[Dict[str, Any]]]]:
+        """Run a query; returns the page of result dicts, the total match count and the facets."""
+        self._ensure_built()
+        with self._lock:
+            documents, field_indexes = self._ordered, self._fields
+            vocabulary, vectors = self._vocabulary, self._vectors
+
+        allowed = None
+        if filter:
+            predicate = parse_filter(filter, self.searchable_fields)
+            allowed = {position for position, document in enumerate(documents) if predicate(document)}
+
+        groups = self._query_terms(search_text, vocabulary)
+        rankings: List[List[Tuple[int, float]]] = []
+        if groups:
+            fields = _as_list(search_fields) or list(self.searchable_fields)
+            rankings.append(self._text_ranking(groups, fields, field_indexes, allowed, str(search_mode or 'any').lower()))
+        for vector_query in vector_queries or []:
+            rankings.append(self._vector_ranking(vector_query, vectors, allowed))
+
+        if not rankings:
+            positions = range(len(documents)) if allowed is None else sorted(allowed)
+            ranked = [(position, 1.0) for position in positions]
+        elif len(rankings) == 1:
+            ranked = rankings[0]
+        else:
+            ranked = _reciprocal_rank_fusion(rankings)
+
+        if order_by:
+            for clause in reversed(_as_list(order_by)):
+                field_name, _, direction = clause.strip().partition(' ')
+                descending = direction.strip().lower() == 'desc'
+                present = [item for item in ranked if documents[item[0]].get(field_name) is not None]
+                missing = [item for item in ranked if documents[item[0]].get(field_name) is None]
+                present.sort(key=lambda item: documents[item[0]][field_name], reverse=descending)
+                ranked = present + missing  # nulls last either way
+
+        facet_results = self._facets(facets, documents, ranked) if facets else {}
+        start = max(skip or 0, 0)
+        page = ranked[start:start + (DEFAULT_TOP if top is None else max(top, 0))]
+
+        semantic = str(getattr(query_type, 'value', query_type) or '').lower() == 'semantic'
+        top_score = max((score for _, score in ranked), default=0.0) or 1.0
+        selected = _as_list(select)
+        query_words = {word for group in groups for word in group}
+        results = []
+        for position, score in page:
+            document = documents[position]
+            result = {key: document.get(key) for key in selected} if selected else dict(document)
+            result['@search.score'] = score
+            result['@search.reranker_score'] = round(4.0 * score / top_score, 4) if semantic else None
+            if highlight_fields and query_words:
+                result['@search.highlights'] = {
+                    field_name: highlights
+                    for field_name in _as_list(highlight_fields)
+                    if (highlights := _highlights(document.get(field_name), query_words, highlight_pre_tag, highlight_post_tag))
+                }
+            if semantic and query_caption:
+                caption = _caption(document.get('content'), query_words)
+                result['@search.captions'] = [caption] if caption else None
+            results.append(result)
+        return results, len(ranked), facet_results
+
+    def _ensure_built(self) -> None:
+        if not self._dirty:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            documents = list(self._documents.values())
+            fields = {field_name: _FieldIndex(documents, field_name) for field_name in self.searchable_fields}
+            vectors = {}
+            for field_name in self.vector_fields:
+                positions = [position for position, document in enumerate(documents) if document.get(field_name)]
+                if not positions:
+                    continue
+                matrix = np.asarray([documents[position][field_name] for position in positions], dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                vectors[field_name] = (np.asarray(positions), matrix / np.where(norms == 0, 1, norms))
+            self._ordered, self._fields, self._vectors = documents, fields, vectors
+            self._vocabulary = sorted({term for index in fields.values() for term in index.postings})
+            self._dirty = False
+            logger.debug("Local search index built", documents=len(documents),
+                         vocabulary=len(self._vocabulary), vector_fields=list(vectors))
+
+    @staticmethod
+    def _query_terms(search_text: Optional[str], vocabulary: List[str]) -> List[List[str]]:
+        """Query terms as groups of alternatives; ``term*`` expands to matching vocabulary words (up to 50)."""
+        if not search_text or search_text.strip() == '*':
+            return []
+        groups = []
+        for raw in _QUERY_TERM.findall(search_text):
+            if raw in ('AND', 'OR', 'NOT'):
+                continue
+            term = raw.lower()
+            if term.endswith('*'):
+                prefix = term[:-1]
+                start = bisect.bisect_left(vocabulary, prefix)
+                group = [word for word in vocabulary[start:start + 50] if word.startswith(prefix)] or [prefix]
+            else:
+                group = [term]
+            if group not in groups:
+                groups.append(group)
+        return groups
+
+    @staticmethod
+    def _text_ranking(groups: List[List[str]], fields: List[str], field_indexes: Dict[str, _FieldIndex],
+                      allowed: Optional[set], search_mode: str) -> List[Tuple[int, float]]:
+        """BM25 summed over fields; with ``search_mode='all'`` every term group must match."""
+        scores: Dict[int, float] = {}
+        groups_matched: Dict[int, int] = defaultdict(int)
+        for group in groups:
+            group_positions = set()
+            for word in group:
+                for field_name in fields:
+                    index = field_indexes.get(field_name)
+                    if index is None:
+                        continue
+                    index.score(word, scores, allowed)
+                    if search_mode == 'all':
+                        group_positions.update(index.postings.get(word, ()))
+            for position in group_positions:
+                groups_matched[position] += 1
+        if search_mode == 'all':
+            scores = {position: score for position, score in scores.items() if groups_matched[position] == len(groups)}
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    @staticmethod
+    def _vector_ranking(vector_query: Any, vectors: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                        allowed: Optional[set]) -> List[Tuple[int, float]]:
+        vector = getattr(vector_query, 'vector', None)
+        if vector is None:
+            raise HttpResponseError(message="Only VectorizedQuery (precomputed vectors) is supported by the local backend")
+        k = getattr(vector_query, 'k_nearest_neighbors', None) or DEFAULT_TOP
+        candidates: Dict[int, float] = {}
+        for field_name in str(getattr(vector_query, 'fields', None) or VECTOR_FIELDS[0]).split(','):
+            if field_name.strip() not in vectors:
+                continue
+            positions, matrix = vectors[field_name.strip()]
+            if allowed is not None:
+                mask = np.fromiter((position in allowed for position in positions), dtype=bool, count=len(positions))
+                positions, matrix = positions[mask], matrix[mask]
+            if not len(positions):
+                continue
+            query = np.asarray(vector, dtype=np.float32)
+            query = query / (np.linalg.norm(query) or 1.0)
+            similarities = matrix @ query
+            best = np.argsort(-similarities)[:k]
+            for index in best:
+                # Azure's cosine score: 1 / (1 + distance), distance = 1 - cosine
+                score = float(1.0 / (2.0 - similarities[index]))
+                position = int(positions[index])
+                candidates[position] = max(candidates.get(position, 0.0), score)
+        return sorted(candidates.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    @staticmethod
+    def _facets(facets: List[str], documents: List[Dict[str, Any]],
+                ranked: List[Tuple[int, float]]) -> Dict[str, List[Dict[str, Any]]]:
+        results = {}
+        for spec in facets:
+            field_name, *options = [part.strip() for part in spec.split(',')]
+            count = 10
+            for option in options:
+                name, _, value = option.partition(':')
+                if name == 'count' and value.isdigit():
+                    count = int(value)
+            counts: Dict[Any, int] = defaultdict(int)
+            for position, _ in ranked:
+                value = documents[position].get(field_name)
+                for item in value if isinstance(value, list) else [value]:
+                    if item is not None:
+                        counts[item] += 1
+            ordered = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))[:count]
+            results[field_name] = [{'value': value, 'count': total} for value, total in ordered]
+        return results
+
+
+def _as_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(',') if part.strip()]
+    return list(value)
+
+
+def _reciprocal_rank_fusion(rankings: List[List[Tuple[int, float]]]) -> List[Tuple[int, float]]:
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, (position, _) in enumerate(ranking):
+            fused[position] += 1.0 / (RRF_K + rank + 1)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _sentences(text: Any) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT.split(str(text or '')) if sentence.strip()]
+
+
+def _highlights(text: Any, words: set, pre_tag: str, post_tag: str, limit: int = 5) -> List[str]:
+    pattern = re.compile(r"\b(" + "|".join(re.escape(word) for word in sorted(words)) + r")\w*", re.IGNORECASE)
+    fragments = []
+    for sentence in _sentences(text):
+        if pattern.search(sentence):
+            fragments.append(pattern.sub(lambda match: f"{pre_tag}{match.group(0)}{post_tag}", sentence[:CAPTION_MAX_CHARS]))
+            if len(fragments) >= limit:
+                break
+    return fragments
+
+
+def _caption(text: Any, words: set) -> Optional[LocalCaption]:
+    """The sentence sharing most words with the query (the first one when nothing matches)."""
+    sentences = _sentences(text)
+    if not sentences:
+        return None
+    best = max(sentences, key=lambda sentence: len(words & set(tokenize(sentence))))
+    return LocalCaption(text=best[:CAPTION_MAX_CHARS])
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+class LocalSearchResults:
+    """Sync result pager: iterate for documents, plus ``get_count`` / ``get_facets`` / ``get_answers``."""
+
+    def __init__(self, results: List[Dict[str, Any]], count: int, facets: Dict[str, List[Dict[str, Any]]]):
+        self._results = results
+        self._count = count
+        self._facets = facets
+
+    def __iter__(self):
+        return iter(self._results)
+
+    def get_count(self) -> int:
+        return self._count
+
+    def get_facets(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._facets
+
+    def get_answers(self) -> Optional[list]:
+        return None
+
+
+class AsyncLocalSearchResults:
+    """aio result pager: ``async for`` plus awaitable ``get_count`` / ``get_facets`` / ``get_answers``."""
+
+    def __init__(self, results: List[Dict[str, Any]], count: int, facets: Dict[str, List[Dict[str, Any]]]):
+        self._results = results
+        self._count = count
+        self._facets = facets
+
+    async def __aiter__(self):
+        for result in self._results:
+            yield result
+
+    async def get_count(self) -> int:
+        return self._count
+
+    async def get_facets(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._facets
+
+    async def get_answers(self) -> Optional[list]:
+        return None
+
+
+class LocalSearchClient:
+    """Drop-in for ``azure.search.documents.SearchClient`` backed by a ``LocalSearchIndex``."""
+
+    def __init__(self, index: LocalSearchIndex):
+        self.index = index
+
+    def search(self, search_text: Optional[str] = None, **kwargs) -> LocalSearchResults:
+        return LocalSearchResults(*self.index.search(search_text, **kwargs))
+
+    def get_document(self, key: str, selected_fields: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        document = self.index.get(key)
+        if document is None:
+            raise ResourceNotFoundError(message=f"Document '{key}' not found")
+        return {field_name: document.get(field_name) for field_name in selected_fields} if selected_fields else dict(document)
+
+    def get_document_count(self, **kwargs) -> int:
+        return len(self.index)
+
+    def upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("upload", documents)
+
+    def merge_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("merge", documents)
+
+    def merge_or_upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("mergeOrUpload", documents)
+
+    def delete_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("delete", documents)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class AsyncLocalSearchClient:
+    """Drop-in for ``azure.search.documents.aio.SearchClient`` backed by a ``LocalSearchIndex``.
+
+    Queries run inline on the loop (no thread hop) so profiles show the pipeline's
+    own overhead rather than executor scheduling.
+    """
+
+    def __init__(self, index: LocalSearchIndex):
+        self._sync = LocalSearchClient(index)
+        self.index = index
+
+    async def search(self, search_text: Optional[str] = None, **kwargs) -> AsyncLocalSearchResults:
+        return AsyncLocalSearchResults(*self.index.search(search_text, **kwargs))
+
+    async def get_document(self, key: str, selected_fields: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        return self._sync.get_document(key, selected_fields)
+
+    async def get_document_count(self, **kwargs) -> int:
+        return len(self.index)
+
+    async def upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("upload", documents)
+
+    async def merge_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("merge", documents)
+
+    async def merge_or_upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("mergeOrUpload", documents)
+
+    async def delete_documents(self, documents: List[Dict[str, Any]], **kwargs) -> List[IndexingResult]:
+        return self.index.write("delete", documents)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+_local_index: Optional[LocalSearchIndex] = None
+_local_index_lock = threading.Lock()
+
+
+def get_local_search_index() -> LocalSearchIndex:
+    """Process-wide local index, loaded once from ``local_search_corpus_path``."""
+    global _local_index
+    with _local_index_lock:
+        if _local_index is None:
+            path = get_settings().local_search_corpus_path
+            if path:
+                _local_index = LocalSearchIndex.from_jsonl(path)
+            else:
+                logger.warning("search_backend is 'local' but no corpus path is set, starting with an empty index")
+                _local_index = LocalSearchIndex()
+    return _local_index
@@ -11,6 +11,8 @@ import structlog
 from azure.identity.aio import ClientSecretCredential
 from ..config.settings import get_settings
 from ..utils.graph_urls import graph_urls
+from ..utils.stage_timer import stage
+from .http_cassette import azure_transport_kwargs, graph_session
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
@@ -37,7 +39,8 @@ class MicrosoftGraphClient:
             self._credential = ClientSecretCredential(
                 tenant_id=self.tenant_id,
                 client_id=self.client_id,
-                client_secret=self.client_secret
+                client_secret=self.client_secret,
+                **azure_transport_kwargs(service="graph")
             )
             print("✅ AUTH: Credential created successfully")
             logger.info("✅ Credential created successfully")
@@ -50,6 +53,11 @@ class MicrosoftGraphClient:
         return token.token
     
     async def _make_request(self, endpoint: str, method: str = "GET") -> Dict[str, Any]:
+        """Make authenticated request to Microsoft Graph API, timed as the ``graph_request`` stage."""
+        with stage("graph_request"):
+            return await self._send_request(endpoint, method)
+
+    async def _send_request(self, endpoint: str, method: str = "GET") -> Dict[str, Any]:
         """Make authenticated request to Microsoft Graph API with improved timeout handling."""
         import asyncio
         
@@ -65,7 +73,7 @@ class MicrosoftGraphClient:
         timeout = aiohttp.ClientTimeout(total=60, connect=15, sock_read=15)
         
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with graph_session(timeout=timeout) as session:
                 print(f"🌐 HTTP: Making Graph API request to: {endpoint}")
                 logger.info(f"Making Graph API request to: {endpoint}")
                 async with session.request(method, url, headers=headers) as response:
@@ -96,6 +104,11 @@ class MicrosoftGraphClient:
             raise
 
     async def _make_paginated_request(self, endpoint: str, method: str = "GET") -> List[Dict[str, Any]]:
+        """Make paginated Graph API request, timed as the ``graph_request`` stage."""
+        with stage("graph_request"):
+            return await self._send_paginated_request(endpoint, method)
+
+    async def _send_paginated_request(self, endpoint: str, method: str = "GET") -> List[Dict[str, Any]]:
         """Make authenticated request to Microsoft Graph API with pagination support."""
         all_items = []
         next_url = f"{graph_urls.graph_base_url()}/{endpoint}"
@@ -110,7 +123,7 @@ class MicrosoftGraphClient:
         page_count = 0
         
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with graph_session(timeout=timeout) as session:
                 while next_url:
                     page_count += 1
                     print(f"🌐 HTTP: Making Graph API paginated request (page {page_count}) to: {next_url}")
@@ -278,6 +291,11 @@ class MicrosoftGraphClient:
             raise
     
     async def download_file(self, site_id: str, drive_id: str, file_id: str) -> bytes:
+        """Download file content from SharePoint, timed as the ``graph_download`` stage."""
+        with stage("graph_download"):
+            return await self._download_file(site_id, drive_id, file_id)
+
+    async def _download_file(self, site_id: str, drive_id: str, file_id: str) -> bytes:
         """Download file content from SharePoint with retry logic for service errors."""
         import asyncio
         
@@ -293,7 +311,7 @@ class MicrosoftGraphClient:
                 headers = {"Authorization": f"Bearer {access_token}"}
                 url = f"{graph_urls.graph_base_url()}/{endpoint}"
                 
-                async with aiohttp.ClientSession() as session:
+                async with graph_session() as session:
                     async with session.get(url, headers=headers) as response:
                         if response.status == 200:
                             content = await response.read()
@@ -524,8 +542,8 @@ class MicrosoftGraphClient:
             print(f"🚀 COMPREHENSIVE IMMEDIATE SYNC: All files will be uploaded instantly as they're processed!")
             
             # IMMEDIATE UPLOAD MODE - Import storage client
-            from ..integrations.azure_storage import get_storage_client
-            storage_client = get_storage_client()
+            from ..integrations.azure_storage import get_async_storage_client
+            storage_client = await get_async_storage_client()
             
             # Find the Suitefiles site
             suitefiles_site = await self.get_site_by_name("suitefiles")
@@ -771,8 +789,8 @@ class MicrosoftGraphClient:
             print(f"⚡ SMART SYNC: Processing '{path}' with document limits to ensure completion")
             
             # IMMEDIATE UPLOAD MODE - Import storage client here
-            from ..integrations.azure_storage import get_storage_client
-            storage_client = get_storage_client()
+            from ..integrations.azure_storage import get_async_storage_client
+            storage_client = await get_async_storage_client()
             
             # NO PLACEHOLDER LOGIC - Just process what actually exists in SharePoint
             documents = []
@@ -856,8 +874,8 @@ class MicrosoftGraphClient:
             )
             
             # Check if already exists and up-to-date
-            if blob_client.exists():
-                properties = blob_client.get_blob_properties()
+            if await blob_client.exists():
+                properties = await blob_client.get_blob_properties()
                 if document.get("modified") and properties.last_modified:
                     doc_modified = document.get("modified")
                     blob_modified = properties.last_modified.isoformat()
@@ -913,7 +931,8 @@ class MicrosoftGraphClient:
                     blob=keep_file_blob_name
                 )
                 
-                keep_file_blob_client.upload_blob(keep_file_content.encode('utf-8'), overwrite=True, metadata=metadata)
+                with stage("blob_upload"):
+                    await keep_file_blob_client.upload_blob(keep_file_content.encode('utf-8'), overwrite=True, metadata=metadata)
                 
             else:
                 # Download and upload file content immediately
@@ -950,7 +969,8 @@ class MicrosoftGraphClient:
                     "is_folder": "false"
                 }
                 
-                blob_client.upload_blob(file_content, overwrite=True, metadata=metadata)
+                with stage("blob_upload"):
+                    await blob_client.upload_blob(file_content, overwrite=True, metadata=metadata)
             
             return True
             
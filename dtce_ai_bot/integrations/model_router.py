@@ -0,0 +1,199 @@
+"""
+Tiered model routing for chat completions.
+
+Each LLM call site names a route instead of a deployment. The route picks the
+deployment tier, ``max_tokens``, timeout and limiter priority:
+
+    intent, normalization, keyword_extraction,
+    query_understanding                         small tier, classification priority
+    rewrite, synthesis_short                    small tier, interactive priority
+    synthesis_long                              large tier, interactive priority
+    summarization                               small tier, background priority
+
+The small tier is ``azure_openai_mini_deployment_name``. When it is not
+configured, every route uses the caller's (large) deployment, as before.
+Small-tier calls escalate once to the large deployment when they time out,
+fail, or return output the caller's ``parse`` function rejects.
+Per-route latency, token and cost stats are kept for ``/health/detailed``.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+from ..utils.stage_timer import count as count_stage_value
+from .openai_limiter import openai_priority
+from .usage_ledger import usage_tags
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class ModelRoute:
+    tier: str  # "small" or "large"
+    max_tokens: int
+    timeout_seconds: float
+    priority: str = "interactive"
+    deployment: Optional[str] = None  # explicit override of the tier's deployment
+
+
+DEFAULT_ROUTES: Dict[str, ModelRoute] = {
+    "intent": ModelRoute("small", 50, 15, "classification"),
+    "normalization": ModelRoute("small", 300, 15, "classification"),
+    "keyword_extraction": ModelRoute("small", 150, 15, "classification"),
+    "query_understanding": ModelRoute("small", 400, 20, "classification"),
+    "rewrite": ModelRoute("small", 500, 30),
+    "synthesis_short": ModelRoute("small", 1500, 60),
+    "synthesis_long": ModelRoute("large", 1500, 90),
+    "summarization": ModelRoute("small", 400, 30, "background"),
+}
+
+
+@dataclass
+class RouteStats:
+    calls: int = 0
+    escalations: int = 0
+    failures: int = 0
+    total_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    by_deployment: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class RoutedCompletion:
+    text: str
+    parsed: Any  # parse(text) result; None when no parse function or every attempt was rejected
+    deployment: str
+    escalated: bool
+
+
+class ModelRouter:
+    """Maps call sites to deployments, escalates unusable small-model output and records stats."""
+
+    def __init__(self, routes: Dict[str, ModelRoute], small_deployment: str = "", large_deployment: str = "",
+                 token_costs: Optional[Dict[str, List[float]]] = None):
+        self.routes = routes
+        self.small_deployment = small_deployment
+        self.large_deployment = large_deployment
+        self.token_costs = token_costs or {}
+        self.stats: Dict[str, RouteStats] = {name: RouteStats() for name in routes}
+
+    def deployments_for(self, route_name: str, default_deployment: Optional[str] = None) -> List[str]:
+        """Deployment to try first, then the escalation target (if different)."""
+        route = self.routes[route_name]
+        large = default_deployment or self.large_deployment
+        if route.deployment:
+            first = route.deployment
+        elif route.tier == "small":
+            first = self.small_deployment or large
+        else:
+            first = large
+        return [first] if first == large else [first, large]
+
+    async def chat(self, client, route_name: str, messages: List[Dict[str, str]],
+                   parse: Optional[Callable[[str], Any]] = None, default_deployment: Optional[str] = None,
+                   **kwargs) -> RoutedCompletion:
+        """
+        Run a chat completion on the route's deployment.
+
+        ``parse`` validates/converts the text; returning None or raising
+        ``ValueError`` marks the output unusable and escalates to the large
+        deployment. Errors from the last deployment are raised to the caller.
+        """
+        route = self.routes[route_name]
+        stats = self.stats[route_name]
+        kwargs.setdefault("max_tokens", route.max_tokens)
+        deployments = self.deployments_for(route_name, default_deployment)
+
+        text, parsed = "", None
+        for attempt, deployment in enumerate(deployments):
+            last = attempt == len(deployments) - 1
+            started = time.perf_counter()
+            stats.calls += 1
+            stats.by_deployment[deployment] = stats.by_deployment.get(deployment, 0) + 1
+            try:
+                with openai_priority(route.priority), usage_tags(call_site=route_name):
+                    response = await asyncio.wait_for(
+                        client.chat.completions.create(model=deployment, messages=messages, **kwargs),
+                        timeout=route.timeout_seconds,
+                    )
+            except Exception as e:
+                stats.failures += 1
+                stats.total_ms += (time.perf_counter() - started) * 1000
+                if last:
+                    raise
+                stats.escalations += 1
+                logger.warning("Model call failed, escalating", route=route_name, deployment=deployment,
+                               error=str(e) or type(e).__name__)
+                continue
+
+            stats.total_ms += (time.perf_counter() - started) * 1000
+            self._record_usage(stats, deployment, getattr(response, "usage", None))
+            text = (response.choices[0].message.content or "").strip()
+            if parse is None:
+                return RoutedCompletion(text, None, deployment, attempt > 0)
+
+            try:
+                parsed = parse(text)
+            except ValueError:
+                parsed = None
+            if parsed is not None:
+                return RoutedCompletion(text, parsed, deployment, attempt > 0)
+            if not last:
+                stats.escalations += 1
+                logger.warning("Unparsable model output, escalating", route=route_name,
+                               deployment=deployment, output=text[:200])
+
+        return RoutedCompletion(text, None, deployments[-1], len(deployments) > 1)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "calls": stats.calls,
+                "escalations": stats.escalations,
+                "failures": stats.failures,
+                "avg_ms": round(stats.total_ms / stats.calls, 1) if stats.calls else 0.0,
+                "prompt_tokens": stats.prompt_tokens,
+                "completion_tokens": stats.completion_tokens,
+                "cost_usd": round(stats.cost_usd, 4),
+                "by_deployment": dict(stats.by_deployment),
+            }
+            for name, stats in self.stats.items()
+        }
+
+    def _record_usage(self, stats: RouteStats, deployment: str, usage) -> None:
+        if usage is None:
+            return
+        prompt, completion = usage.prompt_tokens or 0, usage.completion_tokens or 0
+        count_stage_value("prompt_tokens", prompt)
+        count_stage_value("completion_tokens", completion)
+        stats.prompt_tokens += prompt
+        stats.completion_tokens += completion
+        prices = self.token_costs.get(deployment)
+        if prices:
+            stats.cost_usd += prompt / 1000 * prices[0] + completion / 1000 * prices[1]
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router configured from settings (``model_routes`` overrides the defaults)."""
+    global _model_router
+    if _model_router is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        routes = {name: replace(route, **settings.model_routes.get(name, {})) for name, route in DEFAULT_ROUTES.items()}
+        _model_router = ModelRouter(
+            routes,
+            small_deployment=settings.azure_openai_mini_deployment_name,
+            large_deployment=settings.azure_openai_deployment_name,
+            token_costs=settings.openai_token_costs,
+        )
+    return _model_router
@@ -0,0 +1,411 @@
+"""
+Process-wide Azure OpenAI rate limiter.
+
+Every OpenAI client in the app is built with ``create_async_openai_client`` /
+``create_openai_client``, whose HTTP transport passes each request through one
+limiter per deployment before it leaves the process:
+
+* request-per-minute and token-per-minute budgets (sliding 60 s window; tokens
+  are estimated the way Azure does: prompt size + ``max_tokens``);
+* AIMD concurrency: the in-flight limit grows by one per window of successful
+  calls and halves on a 429, and a 429's ``retry-after-ms`` / ``retry-after``
+  pauses the whole deployment;
+* priority classes: when capacity frees up, queued interactive synthesis goes
+  before classification, which goes before background embedding/extraction.
+
+Throttled requests are re-queued (up to ``openai_throttle_retries`` times)
+instead of being surfaced to the caller, so bursts wait rather than fail.
+
+Priority comes from the ``openai_priority`` context manager around the call;
+without one, chat calls count as interactive and embeddings as background.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+PRIORITIES = {"interactive": 0, "classification": 1, "background": 2}
+
+WINDOW_SECONDS = 60.0
+# Re-check interval for queued requests when nothing else wakes them
+MAX_WAIT_SLICE_SECONDS = 1.0
+DEFAULT_COMPLETION_TOKENS = 1000  # Azure's estimate when max_tokens is not set is higher; this keeps bursts honest
+
+_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("openai_priority", default=None)
+
+_DEPLOYMENT_PATTERN = re.compile(r"/deployments/([^/]+)/")
+
+
+@contextmanager
+def openai_priority(name: str):
+    """Run the OpenAI calls inside the block at the given priority class."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown OpenAI priority '{name}'")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "granted", "cancelled", "_loop", "_future", "_event")
+
+    def __init__(self, priority: int, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.priority = priority
+        self.tokens = tokens
+        self.granted = False
+        self.cancelled = False
+        self._loop = loop
+        self._future = loop.create_future() if loop else None
+        self._event = None if loop else threading.Event()
+
+    def notify(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._resolve)
+        else:
+            self._event.set()
+
+    def _resolve(self) -> None:
+        if not self._future.done():
+            self._future.set_result(None)
+
+
+class DeploymentLimiter:
+    """RPM / TPM budgets and AIMD concurrency for one deployment; safe across threads and event loops."""
+
+    def __init__(self, deployment: str, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 initial_concurrency: int = 8, max_concurrency: int = 32):
+        self.deployment = deployment
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency_limit = float(min(max(1, initial_concurrency), self.max_concurrency))
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._window: Deque[Tuple[float, int]] = deque()  # (start time, estimated tokens)
+        self._window_tokens = 0
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        self.stats = {"granted": 0, "throttled": 0, "queued": 0, "max_queue_depth": 0}
+
+    async def acquire(self, priority: int, tokens: int) -> None:
+        waiter = _Waiter(priority, tokens, asyncio.get_running_loop())
+        delay = self._enqueue(waiter)
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter._future), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = self._dispatch_and_delay()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def acquire_blocking(self, priority: int, tokens: int) -> None:
+        waiter = _Waiter(priority, tokens)
+        delay = self._enqueue(waiter)
+        try:
+            while not waiter.granted:
+                waiter._event.wait(timeout=delay)
+                delay = self._dispatch_and_delay()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(self, throttled: bool = False, retry_after: Optional[float] = None) -> None:
+        """Return a slot; ``throttled`` for a 429 (halves concurrency, pauses for ``retry_after``)."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if throttled:
+                self.stats["throttled"] += 1
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                pause = retry_after if retry_after is not None else 1.0
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            else:
+                self.concurrency_limit = min(float(self.max_concurrency),
+                                             self.concurrency_limit + 1.0 / self.concurrency_limit)
+            self._dispatch()
+
+        if throttled:
+            logger.warning("Azure OpenAI throttled request", deployment=self.deployment,
+                           concurrency_limit=round(self.concurrency_limit, 2), retry_after=retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim_window(time.monotonic())
+            return {
+                **self.stats,
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._queue),
+                "concurrency_limit": round(self.concurrency_limit, 2),
+                "requests_last_minute": len(self._window),
+                "tokens_last_minute": self._window_tokens,
+                "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            }
+
+    def _enqueue(self, waiter: _Waiter) -> float:
+        with self._lock:
+            heapq.heappush(self._queue, (waiter.priority, next(self._sequence), waiter))
+            self._dispatch()
+            if not waiter.granted:
+                self.stats["queued"] += 1
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._queue))
+            return self._next_delay()
+
+    def _dispatch_and_delay(self) -> float:
+        with self._lock:
+            self._dispatch()
+            return self._next_delay()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                # Granted but the caller went away before using it
+                self.in_flight = max(0, self.in_flight - 1)
+                self._dispatch()
+            else:
+                waiter.cancelled = True
+
+    def _dispatch(self) -> None:
+        """Grant queued requests in priority order while every budget allows (lock held)."""
+        now = time.monotonic()
+        self._trim_window(now)
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if not self._has_capacity(waiter.tokens, now):
+                return
+            heapq.heappop(self._queue)
+            self.in_flight += 1
+            self._window.append((now, waiter.tokens))
+            self._window_tokens += waiter.tokens
+            self.stats["granted"] += 1
+            waiter.granted = True
+            waiter.notify()
+
+    def _has_capacity(self, tokens: int, now: float) -> bool:
+        if now < self.paused_until or self.in_flight >= int(self.concurrency_limit):
+            return False
+        if self.requests_per_minute and len(self._window) >= self.requests_per_minute:
+            return False
+        # A single request bigger than the whole budget still goes through once the window is empty
+        if self.tokens_per_minute and self._window and self._window_tokens + tokens > self.tokens_per_minute:
+            return False
+        return True
+
+    def _next_delay(self) -> float:
+        """How long a queued request should sleep before re-checking on its own (lock held)."""
+        now = time.monotonic()
+        delay = MAX_WAIT_SLICE_SECONDS
+        if now < self.paused_until:
+            delay = min(delay, self.paused_until - now)
+        if self._window:
+            delay = min(delay, self._window[0][0] + WINDOW_SECONDS - now)
+        return max(0.01, delay)
+
+    def _trim_window(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+
+
+_limiters: Dict[str, DeploymentLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_openai_limiter(deployment: str) -> DeploymentLimiter:
+    """Process-wide limiter for a deployment, budgets from settings."""
+    limiter = _limiters.get(deployment)
+    if limiter is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        limits = settings.openai_deployment_limits.get(deployment, {})
+        with _limiters_lock:
+            limiter = _limiters.get(deployment)
+            if limiter is None:
+                limiter = _limiters[deployment] = DeploymentLimiter(
+                    deployment,
+                    requests_per_minute=limits.get("rpm", settings.openai_requests_per_minute),
+                    tokens_per_minute=limits.get("tpm", settings.openai_tokens_per_minute),
+                    initial_concurrency=settings.openai_initial_concurrency,
+                    max_concurrency=settings.openai_max_concurrency,
+                )
+    return limiter
+
+
+def get_openai_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {deployment: limiter.get_stats() for deployment, limiter in list(_limiters.items())}
+
+
+def _request_deployment(request: httpx.Request) -> str:
+    match = _DEPLOYMENT_PATTERN.search(request.url.path)
+    if match:
+        return match.group(1)
+    try:
+        return json.loads(request.content).get("model", "default")
+    except Exception:
+        return "default"
+
+
+def _request_priority(request: httpx.Request) -> int:
+    name = _priority.get()
+    if name is None:
+        name = "background" if request.url.path.endswith("/embeddings") else "interactive"
+    return PRIORITIES[name]
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Prompt characters / 4 plus the completion allowance, like Azure's rate-limit estimate."""
+    try:
+        body = json.loads(request.content)
+    except Exception:
+        return DEFAULT_COMPLETION_TOKENS
+
+    if "input" in body:  # embeddings
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        return max(1, sum(len(str(text)) for text in inputs) // 4)
+
+    prompt_chars = sum(len(json.dumps(message.get("content", ""))) for message in body.get("messages", []))
+    completion = body.get("max_tokens") or body.get("max_completion_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt_chars // 4 + int(completion)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _throttle_retries() -> int:
+    from ..config.settings import get_settings
+
+    return get_settings().openai_throttle_retries
+
+
+class RateLimitedAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport that admits each OpenAI request through the deployment's limiter."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = get_openai_limiter(_request_deployment(request))
+        priority, tokens = _request_priority(request), estimate_request_tokens(request)
+
+        for attempt in range(_throttle_retries() + 1):
+            await limiter.acquire(priority, tokens)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except BaseException:
+                limiter.release()
+                raise
+            if response.status_code != 429:
+                limiter.release()
+                return response
+            limiter.release(throttled=True, retry_after=_retry_after(response))
+            if attempt == _throttle_retries():
+                return response  # let the SDK surface the 429
+            await response.aclose()
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Blocking counterpart of ``RateLimitedAsyncTransport`` for sync clients."""
+
+    def __init__(self, transport: Optional[httpx.BaseTransport] = None):
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = get_openai_limiter(_request_deployment(request))
+        priority, tokens = _request_priority(request), estimate_request_tokens(request)
+
+        for attempt in range(_throttle_retries() + 1):
+            limiter.acquire_blocking(priority, tokens)
+            try:
+                response = self._transport.handle_request(request)
+            except BaseException:
+                limiter.release()
+                raise
+            if response.status_code != 429:
+                limiter.release()
+                return response
+            limiter.release(throttled=True, retry_after=_retry_after(response))
+            if attempt == _throttle_retries():
+                return response
+            response.close()
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def create_async_openai_client(**kwargs):
+    """``AsyncAzureOpenAI`` whose requests go through the process-wide limiter and usage ledger (and the HTTP cassette, if active)."""
+    from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+
+    from ..config.settings import get_settings
+    from .http_cassette import CassetteAsyncTransport, get_cassette
+
+    from .usage_ledger import UsageRecordingAsyncTransport
+
+    settings = get_settings()
+    cassette = get_cassette()
+    transport = CassetteAsyncTransport(cassette) if cassette is not None else None
+    if settings.openai_limiter_enabled:
+        transport = RateLimitedAsyncTransport(transport)
+    if settings.usage_ledger_enabled:
+        transport = UsageRecordingAsyncTransport(transport)
+    if transport is not None:
+        kwargs.setdefault("http_client", DefaultAsyncHttpxClient(transport=transport))
+    return AsyncAzureOpenAI(**kwargs)
+
+
+def create_openai_client(**kwargs):
+    """Sync ``AzureOpenAI`` whose requests go through the process-wide limiter and usage ledger."""
+    from openai import AzureOpenAI, DefaultHttpxClient
+
+    from ..config.settings import get_settings
+    from .http_cassette import CassetteTransport, get_cassette
+
+    from .usage_ledger import UsageRecordingTransport
+
+    settings = get_settings()
+    cassette = get_cassette()
+    transport = CassetteTransport(cassette) if cassette is not None else None
+    if settings.openai_limiter_enabled:
+        transport = RateLimitedTransport(transport)
+    if settings.usage_ledger_enabled:
+        transport = UsageRecordingTransport(transport)
+    if transport is not None:
+        kwargs.setdefault("http_client", DefaultHttpxClient(transport=transport))
+    return AzureOpenAI(**kwargs)
@@ -0,0 +1,46 @@
+"""
+Shared aio Azure SDK client pool.
+
+aio clients keep an aiohttp session that is bound to the event loop it was
+opened on, so shared instances are pooled per running loop. The app's main
+loop gets one long-lived client per service (connection reuse across requests),
+while helpers that spin up their own loop (background sync threads) get their
+own instances instead of borrowing a session from another loop. Loop-bound
+primitives that must be shared the same way (e.g. a concurrency semaphore)
+can live in the pool too; objects without ``close()`` are simply dropped.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Callable, Hashable
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[Hashable, Any]]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_client(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Return the client stored under ``key`` for the running loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.setdefault(loop, {})
+    client = pool.get(key)
+    if client is None:
+        client = factory()
+        pool[key] = client
+        logger.info("Created shared aio client", client=str(key[0] if isinstance(key, tuple) else key))
+    return client
+
+
+async def close_shared_clients() -> None:
+    """Close every shared client opened on the running loop (call from app shutdown)."""
+    pool = _pools.pop(asyncio.get_running_loop(), {})
+    for key, client in pool.items():
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            await close()
+        except Exception as e:
+            logger.warning("Failed to close shared aio client", client=str(key), error=str(e))
@@ -0,0 +1,346 @@
+"""
+Cross-process shared state.
+
+Under ``gunicorn -k uvicorn.workers.UvicornWorker -w N`` (or ``web_concurrency``
+> 1 in startup.py) every worker has its own memory, so state that must look the
+same whichever worker serves a request lives behind ``SharedState``: Bot
+Framework conversation/user state, conversation memory, sync jobs, the Sheets
+knowledge cache and debug counters. ``shared_state_url`` picks the backend:
+
+- ``""`` (default): in-process dicts. Correct for a single worker only.
+- ``sqlite:///path/to/state.db``: one SQLite file in WAL mode, shared by every
+  worker on the instance.
+- ``redis://host:6379/0`` (or ``rediss://``): shared across instances too. Needs
+  the optional ``redis`` package.
+
+Values are JSON, grouped by namespace, with an optional per-entry TTL.
+Read-modify-write cycles that other workers may race (conversation memory)
+use ``get_versioned`` / ``set_if_version``: the version is an opaque token of
+the stored entry, and the write only lands if nobody changed it since. The
+methods are synchronous (a local file or one network round trip); async
+callers wrap them in ``asyncio.to_thread``.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+try:
+    import redis
+except ImportError:  # Optional: only needed for a redis:// shared_state_url
+    redis = None
+
+logger = structlog.get_logger(__name__)
+
+
+class SharedState(ABC):
+    """Namespaced JSON key/value store with TTLs and atomic counters."""
+
+    backend = "memory"
+    shared = False  # True when other worker processes see the same data
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Any:
+        """The stored value, or None when missing or expired."""
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` (JSON-serializable), expiring after ``ttl`` seconds when given."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove an entry (no-op when missing)."""
+
+    @abstractmethod
+    def values(self, namespace: str) -> Dict[str, Any]:
+        """Every live entry of a namespace."""
+
+    @abstractmethod
+    def incr(self, namespace: str, key: str, amount: int = 1) -> int:
+        """Atomically add ``amount`` to an integer entry (missing = 0); returns the new value."""
+
+    @abstractmethod
+    def get_versioned(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        """The stored value and its version token; ``(None, None)`` when missing or expired."""
+
+    @abstractmethod
+    def set_if_version(self, namespace: str, key: str, value: Any, version: Optional[str],
+                       ttl: Optional[float] = None) -> bool:
+        """Store ``value`` only if the entry is still at ``version`` (None = still missing); False otherwise."""
+
+    def purge_expired(self) -> int:
+        """Drop expired entries that are not cleaned up on their own; returns the count."""
+        return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "shared": self.shared}
+
+
+def _expires_at(ttl: Optional[float]) -> Optional[float]:
+    return time.time() + ttl if ttl else None
+
+
+class MemorySharedState(SharedState):
+    """In-process dicts; values are stored as JSON so callers never share mutable objects."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Tuple[str, Optional[float]]]] = {}
+
+    def get(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(namespace, {}).get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return None
+        return json.loads(entry[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = (json.dumps(value), _expires_at(ttl))
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def values(self, namespace: str) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            entries = list(self._data.get(namespace, {}).items())
+        return {key: json.loads(value) for key, (value, expires_at) in entries
+                if expires_at is None or expires_at > now}
+
+    def get_versioned(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        with self._lock:
+            version = self._live_value(namespace, key)
+        return (json.loads(version), version) if version is not None else (None, None)
+
+    def set_if_version(self, namespace: str, key: str, value: Any, version: Optional[str],
+                       ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._live_value(namespace, key) != version:
+                return False
+            self._data.setdefault(namespace, {})[key] = (json.dumps(value), _expires_at(ttl))
+        return True
+
+    def _live_value(self, namespace: str, key: str) -> Optional[str]:
+        entry = self._data.get(namespace, {}).get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return None
+        return entry[0]
+
+    def incr(self, namespace: str, key: str, amount: int = 1) -> int:
+        with self._lock:
+            entries = self._data.setdefault(namespace, {})
+            value, expires_at = entries.get(key, ("0", None))
+            total = int(json.loads(value)) + amount
+            entries[key] = (json.dumps(total), expires_at)
+        return total
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        purged = 0
+        with self._lock:
+            for entries in self._data.values():
+                for key in [key for key, (_, expires_at) in entries.items()
+                            if expires_at is not None and expires_at <= now]:
+                    del entries[key]
+                    purged += 1
+        return purged
+
+
+class SQLiteSharedState(SharedState):
+    """One SQLite file in WAL mode: readers never block the writer, writers wait up to ``busy_timeout``."""
+
+    backend = "sqlite"
+    shared = True
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        with self._lock:
+            self._connect().executescript(
+                "CREATE TABLE IF NOT EXISTS shared_state ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, "
+                "PRIMARY KEY (namespace, key));"
+                "CREATE INDEX IF NOT EXISTS shared_state_expires_at ON shared_state (expires_at);"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not cross a fork (gunicorn --preload): reopen in each worker process
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                               isolation_level=None, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM shared_state WHERE namespace = ? AND key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)", (namespace, key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO shared_state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), _expires_at(ttl)),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM shared_state WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def values(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT key, value FROM shared_state WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time()),
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def incr(self, namespace: str, key: str, amount: int = 1) -> int:
+        with self._lock:
+            row = self._connect().execute(
+                "INSERT INTO shared_state (namespace, key, value, expires_at) VALUES (?, ?, ?, NULL) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value "
+                "RETURNING value",
+                (namespace, key, str(amount)),
+            ).fetchone()
+        return int(row[0])
+
+    def get_versioned(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM shared_state WHERE namespace = ? AND key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)", (namespace, key, time.time())
+            ).fetchone()
+        return (json.loads(row[0]), row[0]) if row else (None, None)
+
+    def set_if_version(self, namespace: str, key: str, value: Any, version: Optional[str],
+                       ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            if version is None:
+                # Insert, or take over an expired row; a live row means someone else wrote first
+                cursor = connection.execute(
+                    "INSERT INTO shared_state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                    "WHERE shared_state.expires_at IS NOT NULL AND shared_state.expires_at <= ?",
+                    (namespace, key, json.dumps(value), _expires_at(ttl), now),
+                )
+            else:
+                cursor = connection.execute(
+                    "UPDATE shared_state SET value = ?, expires_at = ? WHERE namespace = ? AND key = ? "
+                    "AND value = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (json.dumps(value), _expires_at(ttl), namespace, key, version, now),
+                )
+            return cursor.rowcount == 1
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._connect().execute(
+                "DELETE FROM shared_state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+
+
+class RedisSharedState(SharedState):
+    """Keys ``<prefix><namespace>:<key>``; Redis expires entries itself."""
+
+    backend = "redis"
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "dtce:"):
+        if redis is None:
+            raise RuntimeError("shared_state_url is a Redis URL but the 'redis' package is not installed")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:{key}"
+
+    def get(self, namespace: str, key: str) -> Any:
+        value = self._client.get(self._key(namespace, key))
+        return json.loads(value) if value is not None else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._client.set(self._key(namespace, key), json.dumps(value), px=math.ceil(ttl * 1000) if ttl else None)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._client.delete(self._key(namespace, key))
+
+    def values(self, namespace: str) -> Dict[str, Any]:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}{namespace}:*", count=500))
+        if not keys:
+            return {}
+        start = len(self._key(namespace, ""))
+        return {key.decode("utf-8")[start:]: json.loads(value)
+                for key, value in zip(keys, self._client.mget(keys)) if value is not None}
+
+    def incr(self, namespace: str, key: str, amount: int = 1) -> int:
+        return int(self._client.incrby(self._key(namespace, key), amount))
+
+    def get_versioned(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        value = self._client.get(self._key(namespace, key))
+        return (json.loads(value), value.decode("utf-8")) if value is not None else (None, None)
+
+    def set_if_version(self, namespace: str, key: str, value: Any, version: Optional[str],
+                       ttl: Optional[float] = None) -> bool:
+        full_key = self._key(namespace, key)
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(full_key)
+                current = pipe.get(full_key)
+                if (current.decode("utf-8") if current is not None else None) != version:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.set(full_key, json.dumps(value), px=math.ceil(ttl * 1000) if ttl else None)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+
+def create_shared_state(url: str) -> SharedState:
+    """Backend for a ``shared_state_url`` (see the module docstring)."""
+    if not url or url == "memory://":
+        return MemorySharedState()
+    if url.startswith("sqlite:///"):
+        return SQLiteSharedState(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSharedState(url)
+    raise ValueError(f"Unsupported shared_state_url: {url!r}")
+
+
+_shared_state: Optional[SharedState] = None
+
+
+def get_shared_state() -> SharedState:
+    """Process-wide shared state configured from settings (in-process when unavailable)."""
+    global _shared_state
+    if _shared_state is None:
+        from ..config.settings import get_settings
+
+        url = get_settings().shared_state_url
+        try:
+            _shared_state = create_shared_state(url)
+        except Exception as e:
+            logger.error("Shared state backend unavailable, falling back to in-process state",
+                         url=url.split("@")[-1], error=str(e))
+            _shared_state = MemorySharedState()
+    return _shared_state
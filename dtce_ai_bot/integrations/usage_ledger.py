@@ -0,0 +1,385 @@
+"""
+Token usage ledger for every Azure OpenAI call.
+
+The OpenAI clients built by ``create_async_openai_client`` /
+``create_openai_client`` pass responses through ``UsageRecordingAsyncTransport``
+(or its sync twin), which reads the ``usage`` block of each chat-completion and
+embeddings response, so call sites do not have to thread ``response.usage``
+anywhere themselves. Each call becomes a ``UsageRecord`` tagged with:
+
+* ``request_id``: the HTTP request being served (see core/request_tracing.py);
+* ``call_site``: the model-router route, else the enclosing pipeline stage,
+  else the endpoint kind;
+* ``intent``, ``user``: set by the pipeline / bot with ``tag_usage``;
+* ``deployment`` and ``kind`` (chat / embedding), from the request.
+
+Records are summed into rolling per-minute and per-day buckets kept in memory
+and, when ``usage_ledger_path`` is set, appended to a local SQLite file in
+batches so longer ranges can be queried after a restart. Streaming responses
+are passed through untouched (their usage is not in a JSON body).
+"""
+
+import asyncio
+import contextvars
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import structlog
+
+from ..utils.stage_timer import current_request_id, current_stage
+
+logger = structlog.get_logger(__name__)
+
+DIMENSIONS = ("intent", "call_site", "deployment", "user", "kind")
+PERIOD_SECONDS = {"minute": 60, "day": 86400}
+FLUSH_BATCH = 200  # Pending records that trigger a write to SQLite
+FLUSH_INTERVAL_SECONDS = 10.0
+
+_usage_tags: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("usage_tags", default={})
+
+
+@contextmanager
+def usage_tags(**tags: str):
+    """Tag the OpenAI calls made inside the block (e.g. ``call_site="intent"``)."""
+    token = _usage_tags.set({**_usage_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _usage_tags.reset(token)
+
+
+def tag_usage(**tags: str) -> None:
+    """Tag the rest of the current task's OpenAI calls (e.g. the intent once it is known)."""
+    _usage_tags.set({**_usage_tags.get(), **tags})
+
+
+@dataclass
+class UsageRecord:
+    timestamp: float
+    deployment: str
+    kind: str  # "chat" | "embedding"
+    prompt_tokens: int
+    completion_tokens: int = 0
+    request_id: str = ""
+    intent: str = ""
+    call_site: str = ""
+    user: str = ""
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def add(self, record: UsageRecord) -> None:
+        self.calls += 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+
+    def merge(self, other: "UsageTotals") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+
+    def as_dict(self) -> Dict[str, int]:
+        return {**asdict(self), "total_tokens": self.prompt_tokens + self.completion_tokens}
+
+
+class SQLiteUsageBackend:
+    """Usage events in a local SQLite file (one row per OpenAI call)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS usage_events ("
+                "timestamp REAL NOT NULL, request_id TEXT, intent TEXT, call_site TEXT, deployment TEXT, "
+                "user TEXT, kind TEXT, prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS usage_events_timestamp ON usage_events (timestamp)")
+
+    def insert_many(self, records: Sequence[UsageRecord]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO usage_events (timestamp, request_id, intent, call_site, deployment, user, kind, "
+                "prompt_tokens, completion_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r.timestamp, r.request_id, r.intent, r.call_site, r.deployment, r.user, r.kind,
+                  r.prompt_tokens, r.completion_tokens) for r in records],
+            )
+
+    def query(self, since: float, until: float, group_by: Sequence[str]) -> List[Dict[str, Any]]:
+        columns = ", ".join(group_by)
+        select = f"{columns}, " if group_by else ""
+        group = f" GROUP BY {columns} ORDER BY SUM(prompt_tokens + completion_tokens) DESC" if group_by else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {select}COUNT(*), SUM(prompt_tokens), SUM(completion_tokens) FROM usage_events "
+                f"WHERE timestamp >= ? AND timestamp < ?{group}",
+                (since, until),
+            ).fetchall()
+        results = []
+        for row in rows:
+            calls, prompt, completion = row[len(group_by):]
+            if not calls:
+                continue
+            totals = UsageTotals(calls, prompt or 0, completion or 0)
+            results.append({**dict(zip(group_by, row[:len(group_by)])), **totals.as_dict()})
+        return results
+
+    def purge(self, older_than: float) -> int:
+        with self._lock, self._connection:
+            return self._connection.execute("DELETE FROM usage_events WHERE timestamp < ?", (older_than,)).rowcount
+
+
+class UsageLedger:
+    """Rolling per-minute / per-day usage counters, optionally persisted."""
+
+    def __init__(self, backend: Optional[SQLiteUsageBackend] = None, minute_buckets: int = 180,
+                 day_buckets: int = 35, retention_days: int = 90):
+        self.backend = backend
+        self.retention_days = retention_days
+        self._limits = {"minute": minute_buckets, "day": day_buckets}
+        # period -> bucket start (epoch seconds) -> tag tuple -> totals
+        self._buckets: Dict[str, "OrderedDict[int, Dict[Tuple[str, ...], UsageTotals]]"] = {
+            period: OrderedDict() for period in PERIOD_SECONDS
+        }
+        self._pending: List[UsageRecord] = []
+        self._last_flush = time.monotonic()
+        self._flushing = False
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "persisted": 0, "persist_failures": 0}
+
+    def record(self, record: UsageRecord) -> None:
+        key = tuple(getattr(record, dimension) for dimension in DIMENSIONS)
+        with self._lock:
+            self._stats["recorded"] += 1
+            for period, seconds in PERIOD_SECONDS.items():
+                buckets = self._buckets[period]
+                start = int(record.timestamp // seconds * seconds)
+                bucket = buckets.get(start)
+                if bucket is None:
+                    bucket = buckets[start] = {}
+                    while len(buckets) > self._limits[period]:
+                        buckets.popitem(last=False)
+                bucket.setdefault(key, UsageTotals()).add(record)
+            if self.backend is not None:
+                self._pending.append(record)
+                due = (len(self._pending) >= FLUSH_BATCH
+                       or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS)
+                if due and not self._flushing:
+                    self._flushing = True
+                    self._schedule_flush()
+
+    def summary(self, period: str = "minute", group_by: Sequence[str] = ("call_site",),
+                last: int = 60) -> List[Dict[str, Any]]:
+        """Totals per bucket for the last ``last`` buckets, grouped by the given tag dimensions."""
+        if period not in PERIOD_SECONDS:
+            raise ValueError(f"Unknown period '{period}'")
+        _check_dimensions(group_by)
+        seconds = PERIOD_SECONDS[period]
+        oldest = int(time.time() // seconds * seconds) - (last - 1) * seconds
+        with self._lock:
+            buckets = [(start, dict(bucket)) for start, bucket in self._buckets[period].items() if start >= oldest]
+        results = []
+        for start, bucket in buckets:
+            for group, totals in _group(bucket, group_by).items():
+                results.append({
+                    "period_start": datetime.fromtimestamp(start, timezone.utc).isoformat(),
+                    **dict(zip(group_by, group)),
+                    **totals.as_dict(),
+                })
+        return results
+
+    def totals(self, group_by: Sequence[str] = ("call_site",), minutes: int = 60) -> List[Dict[str, Any]]:
+        """Totals over the last ``minutes`` minutes, largest consumers first."""
+        _check_dimensions(group_by)
+        oldest = int(time.time() // 60 * 60) - (minutes - 1) * 60
+        combined: Dict[Tuple[str, ...], UsageTotals] = {}
+        with self._lock:
+            buckets = [dict(bucket) for start, bucket in self._buckets["minute"].items() if start >= oldest]
+        for bucket in buckets:
+            for group, totals in _group(bucket, group_by).items():
+                combined.setdefault(group, UsageTotals()).merge(totals)
+        rows = [{**dict(zip(group_by, group)), **totals.as_dict()} for group, totals in combined.items()]
+        return sorted(rows, key=lambda row: row["total_tokens"], reverse=True)
+
+    def history(self, since: float, until: Optional[float] = None,
+                group_by: Sequence[str] = ("call_site",)) -> List[Dict[str, Any]]:
+        """Totals between two epoch times from the SQLite file (flushes pending records first)."""
+        _check_dimensions(group_by)
+        if self.backend is None:
+            return []
+        self.flush()
+        return self.backend.query(since, until if until is not None else time.time() + 1, group_by)
+
+    def flush(self) -> None:
+        """Write pending records to the backend (no-op without one)."""
+        if self.backend is None:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        try:
+            if pending:
+                self.backend.insert_many(pending)
+                self._stats["persisted"] += len(pending)
+            if self.retention_days > 0:
+                self.backend.purge(time.time() - self.retention_days * 86400)
+        except Exception as e:
+            self._stats["persist_failures"] += 1
+            logger.warning("Usage ledger write failed", error=str(e), dropped=len(pending))
+        finally:
+            self._flushing = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        last_hour = self.totals(group_by=(), minutes=60)
+        return {**self._stats, "pending": pending, "persistent": self.backend is not None,
+                "last_hour": last_hour[0] if last_hour else UsageTotals().as_dict()}
+
+    def _schedule_flush(self) -> None:
+        # SQLite writes stay off the event loop; sync clients already run in a worker thread
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=self.flush, name="usage-ledger-flush", daemon=True).start()
+            return
+        loop.run_in_executor(None, self.flush)
+
+
+def _check_dimensions(group_by: Sequence[str]) -> None:
+    unknown = set(group_by) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown usage dimensions: {sorted(unknown)}")
+
+
+def _group(bucket: Dict[Tuple[str, ...], UsageTotals], group_by: Sequence[str]) -> Dict[Tuple[str, ...], UsageTotals]:
+    indexes = [DIMENSIONS.index(dimension) for dimension in group_by]
+    grouped: Dict[Tuple[str, ...], UsageTotals] = {}
+    for key, totals in bucket.items():
+        grouped.setdefault(tuple(key[i] for i in indexes), UsageTotals()).merge(totals)
+    return grouped
+
+
+def usage_record_from_exchange(request: httpx.Request, body: bytes) -> Optional[UsageRecord]:
+    """A tagged ``UsageRecord`` for an OpenAI request and its JSON response body, or None."""
+    from .openai_limiter import _request_deployment
+
+    path = request.url.path
+    if path.endswith("/embeddings"):
+        kind = "embedding"
+    elif path.endswith("/chat/completions") or path.endswith("/completions"):
+        kind = "chat"
+    else:
+        return None
+    try:
+        usage = json.loads(body).get("usage") or {}
+    except Exception:
+        return None
+    if not usage:
+        return None
+
+    tags = _usage_tags.get()
+    return UsageRecord(
+        timestamp=time.time(),
+        deployment=_request_deployment(request),
+        kind=kind,
+        prompt_tokens=int(usage.get("prompt_tokens") or 0),
+        completion_tokens=int(usage.get("completion_tokens") or 0),
+        request_id=current_request_id(),
+        intent=tags.get("intent", ""),
+        call_site=tags.get("call_site") or current_stage() or kind,
+        user=tags.get("user", ""),
+    )
+
+
+def _is_streaming(request: httpx.Request) -> bool:
+    try:
+        return bool(json.loads(request.content).get("stream"))
+    except Exception:
+        return False
+
+
+class UsageRecordingAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records the token usage of successful OpenAI responses."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, ledger: Optional[UsageLedger] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._ledger = ledger
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        if response.status_code == 200 and not _is_streaming(request):
+            try:
+                record = usage_record_from_exchange(request, await response.aread())
+                if record is not None:
+                    (self._ledger or get_usage_ledger()).record(record)
+            except Exception as e:
+                logger.debug("Usage not recorded", error=str(e))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class UsageRecordingTransport(httpx.BaseTransport):
+    """Blocking counterpart of ``UsageRecordingAsyncTransport`` for sync clients."""
+
+    def __init__(self, transport: Optional[httpx.BaseTransport] = None, ledger: Optional[UsageLedger] = None):
+        self._transport = transport or httpx.HTTPTransport()
+        self._ledger = ledger
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        if response.status_code == 200 and not _is_streaming(request):
+            try:
+                record = usage_record_from_exchange(request, response.read())
+                if record is not None:
+                    (self._ledger or get_usage_ledger()).record(record)
+            except Exception as e:
+                logger.debug("Usage not recorded", error=str(e))
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+_usage_ledger: Optional[UsageLedger] = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Process-wide usage ledger configured from settings."""
+    global _usage_ledger
+    if _usage_ledger is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        backend = None
+        if settings.usage_ledger_path:
+            try:
+                backend = SQLiteUsageBackend(settings.usage_ledger_path)
+            except Exception as e:
+                logger.error("Usage ledger file unavailable, keeping counters in memory only", error=str(e))
+        _usage_ledger = UsageLedger(
+            backend=backend,
+            minute_buckets=settings.usage_ledger_minutes,
+            day_buckets=settings.usage_ledger_days,
+            retention_days=settings.usage_ledger_retention_days,
+        )
+    return _usage_ledger
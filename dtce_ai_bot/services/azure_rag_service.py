@@ -10,6 +10,8 @@ from azure.search.documents import SearchClient
 from azure.search.documents.models import VectorizedQuery
 from openai import AsyncAzureOpenAI
 
+from .conversation_store import get_conversation_store, recent_history
+
 logger = structlog.get_logger(__name__)
 
 
@@ -84,7 +86,7 @@ class AzureRAGService:
             context = ""
             if conversation_history:
                 # Extract relevant context from conversation
-                recent_turns = conversation_history[-3:]  # Last 3 turns
+                recent_turns = recent_history(conversation_history)  # Summary + last 3 turns
                 context = "\n".join([f"{turn['role']}: {turn['content']}" for turn in recent_turns])
             
             enhancement_prompt = f"""You are a query enhancement expert. Your job is to take a user's question and create 1-3 optimized search queries that will find the most relevant information.
@@ -357,7 +359,7 @@ Return JSON array with scores:
             # Add conversation history for context
             conversation_context = ""
             if conversation_history:
-                recent_turns = conversation_history[-3:]
+                recent_turns = recent_history(conversation_history)
                 conversation_context = "\n".join([f"{turn['role']}: {turn['content']}" for turn in recent_turns])
             
             # Generate answer with proper RAG prompt
@@ -422,7 +424,7 @@ class RAGOrchestrator:
     
     def __init__(self, search_client: SearchClient, openai_client: AsyncAzureOpenAI, model_name: str):
         self.rag_service = AzureRAGService(search_client, openai_client, model_name)
-        self.conversation_history = {}  # Store by session_id
+        self.conversation_store = get_conversation_store()  # Bounded, summarized per-session history
         
     async def process_question(self, question: str, session_id: str = "default") -> Dict[str, Any]:
         """
@@ -430,13 +432,13 @@ class RAGOrchestrator:
         """
         try:
             # Get conversation history for this session
-            history = self.conversation_history.get(session_id, [])
+            history = await self.conversation_store.get_history(session_id)
             
             # Process with RAG
             result = await self.rag_service.process_query(question, history)
             
             # Update conversation history
-            self._update_conversation_history(session_id, question, result['answer'])
+            await self.conversation_store.append(session_id, question, result['answer'])
             
             return result
             
@@ -450,20 +452,3 @@ class RAGOrchestrator:
                 'final_documents_used': 0,
                 'search_type': 'error'
             }
-    
-    def _update_conversation_history(self, session_id: str, question: str, answer: str):
-        """Update conversation history for the session"""
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = []
-        
-        history = self.conversation_history[session_id]
-        
-        # Add user question and bot answer
-        history.extend([
-            {'role': 'user', 'content': question},
-            {'role': 'assistant', 'content': answer}
-        ])
-        
-        # Keep only recent history (last 10 turns = 20 messages)
-        if len(history) > 20:
-            self.conversation_history[session_id] = history[-20:]
@@ -9,15 +9,50 @@ Architecture (following best practices):
 4. Context-Aware Answer Synthesis (GPT-4o with proper RAG prompt)
 """
 
+import asyncio
 import json
+import re
 import structlog
 from typing import List, Dict, Any, Optional
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import ResourceNotFoundError
 from azure.search.documents.aio import SearchClient
 from azure.search.documents.models import VectorizedQuery
 from openai import AsyncAzureOpenAI
 from .intent_detector_ai import IntentDetector
+from .query_normalizer import QueryNormalizer
 from ..utils.suitefiles_urls import suitefiles_converter
+from ..integrations.openai_limiter import openai_priority
+from ..integrations.usage_ledger import tag_usage
+from ..integrations.model_router import get_model_router
+from .prompt_registry import get_prompt_registry
+from .synthesis_prompts import SYNTHESIS_PROMPT
+from .conversation_store import get_conversation_store, recent_history
+from ..utils.document_fields import EXCLUDE_SYSTEM_FILES_FILTER, project_number_filter
+from ..utils.rank_fusion import QueryResultCache, reciprocal_rank_fusion
+from ..utils.answer_cache import get_answer_cache
+from ..utils.index_version import get_index_version
+from ..utils.single_flight import get_single_flight
+from ..utils.content_cache import get_document_content_cache
+from ..utils.stage_timer import stage
+from ..config.settings import get_settings
+
+# Words dropped when building the keyword-only query variant
+KEYWORD_STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'for', 'to', 'in', 'on', 'at', 'by', 'with', 'from', 'about',
+    'is', 'are', 'was', 'were', 'be', 'do', 'does', 'did', 'can', 'could', 'would', 'should', 'will',
+    'what', 'whats', 'which', 'who', 'where', 'when', 'why', 'how', 'i', 'we', 'our', 'my', 'me', 'you',
+    'your', 'us', 'it', 'this', 'that', 'there', 'any', 'some', 'please', 'tell', 'show', 'give', 'find',
+    'have', 'has', 'know',
+}
+
+# Follow-up wording that makes an answer depend on the conversation, not just the question
+FOLLOW_UP_PATTERN = re.compile(r"\b(it|its|that|those|these|them|they|he|she|his|her|above|previous|earlier|same|more)\b")
+
+SYNTHESIS_ERROR_PREFIX = "I encountered an error generating an answer"
+
+# Answers built from at most this many sources, with no conversation history, use the small-model route
+SHORT_SYNTHESIS_MAX_RESULTS = 5
 
 logger = structlog.get_logger(__name__)
 
@@ -41,7 +76,7 @@ class AzureRAGService:
             search_client: Azure AI Search async client
             openai_client: Azure OpenAI async client
             model_name: GPT model name for answer synthesis (e.g., "gpt-4o")
-            intent_model_name: GPT model for intent classification (e.g., "gpt-4o-mini")
+            intent_model_name: Large deployment intent classification escalates to (the model router tries the mini one first)
             max_retries: The maximum number of retries for OpenAI API calls.
         """
         self.search_client = search_client
@@ -50,6 +85,19 @@ class AzureRAGService:
         self.model_name = model_name
         self.embedding_model = "text-embedding-3-small"  # Azure OpenAI embedding deployment
         self.intent_detector = IntentDetector(openai_client, intent_model_name, max_retries)
+        self.query_normalizer = QueryNormalizer()  # rule-based only: variants must not add an LLM round trip
+        self.content_cache = get_document_content_cache()
+        
+        settings = get_settings()
+        self.two_phase_retrieval = settings.search_two_phase_retrieval
+        self.multi_query = settings.search_multi_query
+        self.max_query_variants = settings.search_multi_query_max_variants
+        self.rrf_k = settings.search_rrf_k
+        self.query_result_cache = QueryResultCache(ttl_seconds=settings.search_query_cache_ttl_seconds)
+        self.embedding_cache = QueryResultCache(max_entries=512, ttl_seconds=3600)
+        self.answer_cache = get_answer_cache() if settings.answer_cache_enabled else None
+        self.embedding_flight = get_single_flight("query_embedding")
+        self.search_flight = get_single_flight("hybrid_search")
         
     async def process_query(self, user_query: str, conversation_history: List[Dict] = None) -> Dict[str, Any]:
         """
@@ -72,7 +120,9 @@ class AzureRAGService:
             logger.info("Starting RAG orchestration", query=user_query)
             
             # STEP 1: Intent Classification
-            intent = await self.intent_detector.classify_intent(user_query)
+            with stage("intent"):
+                intent = await self.intent_detector.classify_intent(user_query)
+            tag_usage(intent=intent)
             
             # Handle Simple Test queries without document search
             if intent == "Simple_Test":
@@ -95,6 +145,21 @@ class AzureRAGService:
                        intent=intent,
                        filter=search_filter)
             
+            # STEP 2.5: Answer cache - same question (or a near-identical one) in the same scope
+            cache_question = None
+            index_version = get_index_version()
+            if self.answer_cache is not None and not self._is_follow_up(user_query, conversation_history):
+                with stage("answer_cache"):
+                    normalized = await self.query_normalizer.normalize_query(user_query)
+                    cache_question = normalized.get('primary_search_query') or user_query
+                    # Memoized, so the search below reuses this embedding
+                    query_embedding = await self._get_query_embedding(user_query)
+                    cached = self.answer_cache.lookup(cache_question, search_filter, index_version, query_embedding)
+                if cached:
+                    response, match, similarity = cached
+                    logger.info("Answer served from cache", query=user_query, match=match, similarity=round(similarity, 4))
+                    return {**response, 'cached': True, 'cache_match': match, 'cache_similarity': round(similarity, 4)}
+            
             # STEP 3: Detect if this is a PROJECT LISTING query (needs enumeration, not semantic search)
             is_project_listing = False
             if intent == "Project":
@@ -118,11 +183,15 @@ class AzureRAGService:
             # Use HYBRID SEARCH for all queries (enumeration not working reliably)
             search_top_k = 100 if is_all_query or is_project_listing else 50
             
-            search_results = await self._hybrid_search_with_ranking(
-                query=user_query,
-                filter_str=search_filter,
-                top_k=search_top_k
-            )
+            # Two-phase retrieval: rank candidates on metadata + captions only,
+            # full content is hydrated below for the documents actually used
+            with stage("search"):
+                search_results = await self._retrieve_candidates(
+                    user_query=user_query,
+                    intent=intent,
+                    search_filter=search_filter,
+                    top_k=search_top_k
+                )
             
             # DEBUG: Log sample results
             if search_results:
@@ -144,7 +213,6 @@ class AzureRAGService:
             ])
             
             # Also check if query is asking for projects by year (e.g., "2019 projects", "2024 projects")
-            import re
             year_pattern = re.search(r'\b(20\d{2}|21\d{2}|22\d{2})\s*(project|jobs?)', user_query.lower())
             if year_pattern:
                 is_list_query = True
@@ -160,22 +228,45 @@ class AzureRAGService:
                        results_to_use=results_to_use,
                        total_results=len(search_results))
             
+            with stage("hydration"):
+                if self.two_phase_retrieval:
+                    try:
+                        selected_results = await self._hydrate_content(search_results, results_to_use)
+                    except Exception as e:
+                        logger.error("Content hydration unavailable, falling back to single-phase retrieval", error=str(e))
+                        search_results = await self._retrieve_candidates(
+                            user_query=user_query,
+                            intent=intent,
+                            search_filter=search_filter,
+                            top_k=search_top_k,
+                            include_content=True
+                        )
+                        selected_results = search_results[:results_to_use]
+                else:
+                    selected_results = search_results[:results_to_use]
+            
             answer = await self._synthesize_answer(
                 user_query=user_query,
-                search_results=search_results[:results_to_use],
+                search_results=selected_results,
                 conversation_history=conversation_history,
                 intent=intent
             )
             
-            return {
+            response = {
                 'answer': answer,
-                'sources': [self._format_source(r) for r in search_results[:5]],
+                'sources': [self._format_source(r) for r in selected_results[:5]],
                 'intent': intent,
                 'search_filter': search_filter,
                 'total_documents': len(search_results),
                 'search_type': 'hybrid_rag_with_intent_routing'
             }
             
+            if cache_question and selected_results and not answer.startswith(SYNTHESIS_ERROR_PREFIX):
+                self.answer_cache.store(cache_question, search_filter, index_version, response,
+                                        await self._get_query_embedding(user_query))
+            
+            return {**response, 'cached': False}
+            
         except Exception as e:
             logger.error("RAG orchestration failed", error=str(e), query=user_query)
             return {
@@ -187,7 +278,84 @@ class AzureRAGService:
                 'search_type': 'error'
             }
     
-    async def _hybrid_search_with_ranking(self, query: str, filter_str: Optional[str] = None, top_k: int = 10) -> List[Dict]:
+    async def _retrieve_candidates(self, user_query: str, intent: str, search_filter: Optional[str], top_k: int,
+                                   include_content: Optional[bool] = None) -> List[Dict]:
+        """
+        STEP 3.0: Multi-Query Retrieval
+        
+        Runs every query variant (see _generate_query_variants) concurrently and
+        merges the rankings with reciprocal-rank fusion, so extra recall costs
+        no extra serial latency. Fused results are cached per question.
+        """
+        if include_content is None:
+            include_content = not self.two_phase_retrieval
+        if not self.multi_query:
+            return await self._hybrid_search_with_ranking(user_query, search_filter, top_k, include_content)
+        
+        cache_key = (user_query.strip().lower(), search_filter, top_k, include_content)
+        cached = self.query_result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Multi-query results served from cache", query=user_query)
+            return list(cached)
+        
+        variants = await self._generate_query_variants(user_query, intent, search_filter)
+        result_lists = await asyncio.gather(*[
+            self._hybrid_search_with_ranking(variant['query'], variant['filter'], top_k, include_content)
+            for variant in variants
+        ])
+        
+        fused = reciprocal_rank_fusion(result_lists, k=self.rrf_k, labels=[variant['name'] for variant in variants])[:top_k]
+        self.query_result_cache.put(cache_key, fused)
+        
+        logger.info("Multi-query retrieval fused",
+                   variants={variant['name']: variant['query'] for variant in variants},
+                   per_variant_results=[len(results) for results in result_lists],
+                   fused_results=len(fused))
+        return list(fused)
+    
+    async def _generate_query_variants(self, user_query: str, intent: str, search_filter: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Alternative forms of the question, all generated locally (no LLM call):
+        - original: the question as asked
+        - normalized: question words and possessives stripped (QueryNormalizer rules)
+        - keywords: content words only
+        - project: the question scoped to a job number / year code it mentions
+          (only when intent routing did not already scope to the project)
+        """
+        variants = [{'name': 'original', 'query': user_query, 'filter': search_filter}]
+        seen = {user_query.strip().lower()}
+        
+        def add(name: str, query: str, filter_str: Optional[str] = search_filter):
+            query = (query or '').strip()
+            if not query or (query.lower() in seen and filter_str == search_filter):
+                return
+            seen.add(query.lower())
+            variants.append({'name': name, 'query': query, 'filter': filter_str})
+        
+        normalized = await self.query_normalizer.normalize_query(user_query)
+        add('normalized', normalized.get('primary_search_query'))
+        
+        keywords = [word for word in re.findall(r"[a-z0-9][a-z0-9\-]*", user_query.lower())
+                    if word not in KEYWORD_STOPWORDS and (len(word) > 2 or word.isdigit())]
+        add('keywords', ' '.join(keywords))
+        
+        if intent != "Project":
+            project_meta = self.intent_detector.extract_project_metadata(user_query) or {}
+            project_filter = project_number_filter(project_meta.get('job_number') or project_meta.get('year') or '')
+            if project_filter:
+                add('project', user_query, f"({search_filter}) and {project_filter}" if search_filter else project_filter)
+        
+        return variants[:max(1, self.max_query_variants)]
+    
+    async def _hybrid_search_with_ranking(self, query: str, filter_str: Optional[str] = None, top_k: int = 10,
+                                          include_content: bool = True) -> List[Dict]:
+        """Hybrid search, coalesced with identical searches already in flight (see _run_hybrid_search)."""
+        key = (query, filter_str, top_k, include_content)
+        results = await self.search_flight.do(key, self._run_hybrid_search, query, filter_str, top_k, include_content)
+        return list(results)
+    
+    async def _run_hybrid_search(self, query: str, filter_str: Optional[str] = None, top_k: int = 10,
+                                 include_content: bool = True) -> List[Dict]:
         """
         STEP 3.1: Hybrid Search & Semantic Ranking
         
@@ -201,9 +369,12 @@ class AzureRAGService:
             query: The search query
             filter_str: OData filter string (e.g., "folder eq 'Policies'")
             top_k: Number of results to return
+            include_content: When False, skip the content field and return ids and
+                semantic captions instead (phase one of two-phase retrieval; see
+                _hydrate_content)
             
         Returns:
-            List of search results with content and metadata
+            List of search results with content (or id + caption) and metadata
         """
         try:
             # Generate query embedding for vector search
@@ -232,20 +403,23 @@ class AzureRAGService:
                 "query_type": "semantic",  # Enable semantic ranking
                 "semantic_configuration_name": "default",  # Use default semantic config
                 "top": top_k,
-                "select": ["content", "filename", "folder", "project_name", "blob_url", "blob_name"],  # Include blob_name for full path
+                "select": ["id", "content", "filename", "folder", "project_name", "blob_url", "blob_name"],  # Include blob_name for full path
                 "include_total_count": True
             }
+            if not include_content:
+                # Candidates only: full content is megabytes per page of 100 results
+                search_params["select"] = ["id", "filename", "folder", "project_name", "blob_url", "blob_name"]
+                search_params["query_caption"] = "extractive"
             
             # Add filter if provided (intent-based routing)
             if filter_str:
                 # CRITICAL FIX: Exclude system files (users.dat, wperms.dat, .DS_Store, etc.)
                 # These files have generic "Projects" folder paths and no project numbers
-                system_file_exclusion = "(filename ne 'users.dat' and filename ne 'wperms.dat' and filename ne '.DS_Store' and filename ne 'Thumbs.db')"
-                search_params["filter"] = f"({filter_str}) and {system_file_exclusion}"
+                search_params["filter"] = f"({filter_str}) and {EXCLUDE_SYSTEM_FILES_FILTER}"
                 logger.info("Applying search filter with system file exclusion", filter=search_params["filter"])
             else:
                 # Even without a year filter, exclude system files from general searches
-                search_params["filter"] = "(filename ne 'users.dat' and filename ne 'wperms.dat' and filename ne '.DS_Store' and filename ne 'Thumbs.db')"
+                search_params["filter"] = EXCLUDE_SYSTEM_FILES_FILTER
                 logger.info("Applying system file exclusion only", filter=search_params["filter"])
             
             # Execute hybrid search
@@ -255,22 +429,27 @@ class AzureRAGService:
             results = []
             async for result in search_results_paged:
                 filename = result.get('filename', 'Unknown Document')
-                content = result.get('content', '')
+                content = result.get('content', '') if include_content else None
                 
                 # Skip irrelevant files (placeholder and system files)
                 if self._should_skip_file_in_results(filename, content):
                     logger.debug("Skipping irrelevant file from results", filename=filename)
                     continue
                 
-                # Log if content is minimal (placeholder documents)
-                if not content or len(content) < 100:
-                    logger.warning("Search result has minimal content", 
-                                 filename=filename,
-                                 content_length=len(content))
+                if include_content and not self._has_meaningful_content(filename, content):
                     continue  # Skip files with no meaningful content
                 
+                if include_content:
+                    document = {'id': result.get('id', ''), 'content': content}
+                else:
+                    captions = result.get('@search.captions') or []
+                    document = {
+                        'id': result.get('id', ''),
+                        'caption': captions[0].text if captions else ''
+                    }
+                
                 results.append({
-                    'content': content,
+                    **document,
                     'filename': filename,
                     'folder': result.get('folder', ''),
                     'project_name': result.get('project_name', ''),
@@ -291,6 +470,77 @@ class AzureRAGService:
             logger.error("Hybrid search failed", error=str(e), query=query)
             return []
     
+    async def _hydrate_content(self, candidates: List[Dict], needed: int) -> List[Dict]:
+        """
+        STEP 3.1b: Content hydration (phase two of two-phase retrieval)
+        
+        Fetches full content for the first ``needed`` candidates, in rank order.
+        Candidates whose content turns out to be a placeholder are dropped and
+        the next ranked candidates are hydrated in their place.
+        
+        Args:
+            candidates: Ranked results from _hybrid_search_with_ranking(include_content=False)
+            needed: Number of documents the answer will be built from
+            
+        Returns:
+            Up to ``needed`` results with content, in rank order
+        """
+        hydrated = []
+        position = 0
+        
+        while len(hydrated) < needed and position < len(candidates):
+            batch = candidates[position:position + needed - len(hydrated)]
+            position += len(batch)
+            contents = await self._fetch_contents([candidate['id'] for candidate in batch])
+            
+            for candidate in batch:
+                content = contents.get(candidate['id'], '')
+                if self._has_meaningful_content(candidate['filename'], content):
+                    hydrated.append({**candidate, 'content': content})
+        
+        logger.info("Content hydrated for synthesis",
+                   requested=needed,
+                   hydrated=len(hydrated),
+                   candidates_examined=position,
+                   cache=self.content_cache.get_stats())
+        return hydrated
+    
+    async def _fetch_contents(self, document_ids: List[str]) -> Dict[str, str]:
+        """
+        Full content by document id: LRU cache first, then concurrent key lookups
+        (get_document) for everything that missed. The key field is not
+        filterable, so a search.in filter on it is rejected by the service.
+        
+        Raises the first error when every lookup failed, so the caller can fall
+        back to single-phase retrieval instead of answering from no context.
+        """
+        contents = self.content_cache.get_many(document_ids)
+        missing = [document_id for document_id in document_ids if document_id and document_id not in contents]
+        if not missing:
+            return contents
+        
+        results = await asyncio.gather(*[
+            self.search_client.get_document(key=document_id, selected_fields=["id", "content"])
+            for document_id in missing
+        ], return_exceptions=True)
+        
+        errors = []
+        for document_id, result in zip(missing, results):
+            if isinstance(result, ResourceNotFoundError):
+                contents[document_id] = ''  # Deleted since the candidate search; skipped like a placeholder
+            elif isinstance(result, Exception):
+                errors.append(result)
+            else:
+                content = result.get('content') or ''
+                contents[document_id] = content
+                self.content_cache.put(document_id, content)
+        
+        if errors:
+            logger.error("Content hydration failed", error=str(errors[0]), failed=len(errors), document_count=len(missing))
+            if len(errors) == len(missing):
+                raise errors[0]
+        return contents
+    
     async def _enumerate_projects(self, filter_str: str, max_results: int = 1000) -> List[Dict]:
         """
         SPECIAL METHOD: Project Enumeration (No Semantic Search)
@@ -304,7 +554,7 @@ class AzureRAGService:
         - High limit to get comprehensive results
         
         Args:
-            filter_str: OData filter (e.g., "folder ge 'Projects/221/' and folder lt 'Projects/222'")
+            filter_str: OData filter (e.g., "year_code eq '221'")
             max_results: Maximum documents to retrieve (default 1000)
             
         Returns:
@@ -312,8 +562,7 @@ class AzureRAGService:
         """
         try:
             # Add system file exclusion to the filter
-            system_file_exclusion = "(filename ne 'users.dat' and filename ne 'wperms.dat' and filename ne '.DS_Store' and filename ne 'Thumbs.db' and filename ne '.keep')"
-            combined_filter = f"({filter_str}) and {system_file_exclusion}"
+            combined_filter = f"({filter_str}) and {EXCLUDE_SYSTEM_FILES_FILTER}"
             
             # Build filter-only search (no semantic/vector search)
             # Use empty search ("") which means "match everything" in Azure Search
@@ -322,7 +571,7 @@ class AzureRAGService:
                 "search_text": "",  # Empty search = match all (filter-only)
                 "filter": combined_filter,
                 "top": max_results,
-                "select": ["filename", "folder", "blob_name", "content"],  # Include content for GPT to extract project numbers
+                "select": ["filename", "folder", "blob_name"],  # Content is discarded below; only paths are needed
                 "include_total_count": True
             }
             
@@ -374,12 +623,23 @@ class AzureRAGService:
         Returns:
             List of floats representing the embedding vector
         """
+        cached = self.embedding_cache.get(query)
+        if cached is not None:
+            return cached
+        
         try:
-            response = await self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=query
-            )
-            return response.data[0].embedding
+            # Concurrent requests for the same text share one embeddings call;
+            # the user is waiting on it, so it is not queued as background embedding work
+            with stage("embedding"), openai_priority("interactive"):
+                response = await self.embedding_flight.do(
+                    query,
+                    self.openai_client.embeddings.create,
+                    model=self.embedding_model,
+                    input=query
+                )
+            embedding = response.data[0].embedding
+            self.embedding_cache.put(query, embedding)
+            return embedding
             
         except Exception as e:
             logger.error("Embedding generation failed", error=str(e))
@@ -416,146 +676,25 @@ class AzureRAGService:
             if not search_results:
                 return "I don't have specific information about that in our system. You might want to check with your colleagues, HR, or the relevant project teams who may have more detailed information."
             
-            # Use ALL search results passed in (already filtered by caller based on query type)
-            # Caller decides: 20 for list queries, 5 for regular queries
-            context_chunks = []
-            for i, result in enumerate(search_results, 1):  # Use ALL results passed in
-                content = result.get('content', '')
-                filename = result.get('filename', 'Unknown')
-                folder = result.get('folder', '')
-                blob_url = result.get('blob_url', '')
-                blob_name = result.get('blob_name', '')
-                
-                # Get SuiteFiles URL for this document
-                suitefiles_url = ""
-                if blob_url:
-                    # Extract proper folder path from blob_name if available
-                    actual_folder_path = folder
-                    if blob_name and '/' in blob_name:
-                        # Extract folder path from full blob name (more accurate)
-                        actual_folder_path = blob_name.rsplit('/', 1)[0]
-                    
-                    # Use actual folder path and filename to construct proper SharePoint path
-                    suitefiles_url = suitefiles_converter.get_safe_suitefiles_url(
-                        blob_url, 
-                        folder_path=actual_folder_path, 
-                        filename=filename
-                    ) or ""
-                
-                # Use more generous truncation - try to get meaningful content
-                # Take both the beginning and end of the document to catch key info
-                if len(content) > 8000:
-                    # Take first 4000 chars and last 3000 chars with separator
-                    truncated_content = content[:4000] + "\n\n[... CONTENT TRUNCATED ...]\n\n" + content[-3000:]
-                    logger.warning("Document content truncated for synthesis", 
-                                   filename=filename,
-                                   original_length=len(content),
-                                   truncated_length=len(truncated_content))
-                else:
-                    truncated_content = content
-                
-                # Include metadata for citation formatting
-                source_metadata = f"FILENAME: {filename}\nFOLDER: {folder}"
-                if suitefiles_url:
-                    source_metadata += f"\nSUITEFILES_URL: {suitefiles_url}"
-                
-                chunk = f"[Source {i}]\n{source_metadata}\nCONTENT:\n{truncated_content}"
-                context_chunks.append(chunk)
-            
-            context = "\n\n".join(context_chunks)
+            with stage("context_build"):
+                context = self._build_context(search_results)
             
             # Build conversation context if available
             conversation_context = ""
             if conversation_history:
-                recent_turns = conversation_history[-3:]  # Last 3 turns
+                recent_turns = recent_history(conversation_history)  # Summary + last 3 turns
                 conversation_context = "\n".join([
                     f"{turn['role'].capitalize()}: {turn['content']}" 
                     for turn in recent_turns
                 ])
             
-            # RAG Synthesis Prompt (following best practices)
+            # Static system prompt first (cacheable prefix), current year at the end
             from datetime import datetime
             current_year = datetime.now().year
+            rendered = get_prompt_registry().render(SYNTHESIS_PROMPT, intent=intent, current_year=current_year,
+                                                    four_years_ago=current_year - 4)
+            system_prompt = rendered.text
             
-            system_prompt = f"""You are the DTCE AI Chatbot. Talk naturally like ChatGPT - conversational, helpful, and personable. Provide accurate answers based ONLY on the provided context.
-
-CRITICAL: The current year is {current_year}. Use this for all time-based calculations (e.g., "4 years ago" = {current_year - 4}).
-
-Conversational Style (like ChatGPT):
-1. Be Natural and Human: Write like you're having a real conversation. Use contractions (I'm, you're, there's, it's). Be warm and approachable.
-2. No Robotic Patterns: Don't start every response the same way. Vary your openings naturally - sometimes jump right into the answer, sometimes provide quick context, sometimes acknowledge the question briefly. Just be natural.
-3. Keep It Real: Use everyday language. Instead of saying "based on the documents" or "according to the information provided," just share what you know naturally. Talk like a knowledgeable colleague, not a search engine.
-4. Be Genuinely Helpful: If you find something useful but not exactly what they asked for, mention it naturally. If you don't have the info, be upfront about it and suggest where they might look.
-5. Flow Naturally: Let your responses flow. Don't force structure or formulas. Just answer naturally, provide details as needed, and wrap up in a way that feels right for that specific answer.
-6. Show Understanding: Demonstrate you understand their question by how you answer, not by restating it. If they ask about a project, talk about the project naturally.
-7. Be Conversational to the End: Keep the friendly tone throughout, including your closing. Make it easy for them to ask follow-ups if needed.
-
-Special Instructions for LIST QUERIES:
-- When asked for "project numbers", "list of projects", "all projects from X years", extract and list PROJECT NUMBERS from folder paths
-- Project numbers are 6-digit codes like 225126, 223112, 221045 found in folder paths like "Projects/225/225126/" or "Projects/219/219348/"
-- **CRITICAL: Look at the FOLDER field in EVERY source provided**
-- Extract project numbers using this pattern: "Projects/[YEAR_CODE]/[PROJECT_NUMBER]/" where PROJECT_NUMBER is the 6-digit code
-- Example folder paths to extract from:
-  * "Projects/219/219348/07_Drawings" → Extract: 219348 (2019 project)
-  * "Projects/221/221285/05_Issued" → Extract: 221285 (2021 project)
-  * "Projects/225/225126/06_Calculations" → Extract: 225126 (2025 project)
-- **IMPORTANT: If sources only contain system files (wperms.dat, users.dat, .DS_Store, etc.) with generic "Projects" folder paths, that means NO ACTUAL PROJECT DOCUMENTS were found**
-- In this case, be honest: "I couldn't find specific project documents from [YEAR] in my search. The search system might need better indexing for that year, or there may not be many projects from that period in the system."
-- For comprehensive lists, scan through ALL sources and extract EVERY unique project number you find
-- **Remove duplicates** - if you see the same project number in multiple sources, list it only once
-- Group by year for clarity (e.g., "2019 Projects: 219348, 219208, 219273...")
-- Count the unique projects and report: "I found [X] unique project numbers from [YEAR]"
-
-IMPORTANT: Handling "ALL" Queries
-- If asked for "all project numbers" or "all projects" without specific criteria, ACKNOWLEDGE the limitation
-- Say something like: "I found [X] project numbers in my search, but there are likely many more in the system. For a complete list, you can:"
-- Suggest narrowing down: "specify a year (e.g., 'projects from 2024')", "specify a client", "specify a project type"
-- This helps users get more focused results rather than partial lists that seem complete
-- Example: "I found 15 projects here, but to give you a complete view, it's better to narrow it down - like 'show me 2024 projects' or 'projects for [client name]'. What would you like to focus on?"
-
-CRITICAL: DTCE Year Code System - MEMORIZE THIS EXACT MAPPING
-The first 3 digits of project numbers map DIRECTLY to years. This is NOT a calculation - it's a fixed mapping:
-  *** 219 = 2019 (ALWAYS 2019, NEVER 2020 or 2021!) ***
-  *** 220 = 2020 (ALWAYS 2020) ***
-  *** 221 = 2021 (ALWAYS 2021) ***
-  *** 222 = 2022 (ALWAYS 2022) ***
-  *** 223 = 2023 (ALWAYS 2023) ***
-  *** 224 = 2024 (ALWAYS 2024) ***
-  *** 225 = 2025 (ALWAYS 2025) ***
-  *** 226 = 2026 (ALWAYS 2026) ***
-
-EXAMPLES OF CORRECT YEAR IDENTIFICATION:
-- Project 219348 → First 3 digits are 219 → Year is 2019
-- Project 220123 → First 3 digits are 220 → Year is 2020
-- Project 221285 → First 3 digits are 221 → Year is 2021
-- Project 225126 → First 3 digits are 225 → Year is 2025
-
-NEVER say "219 corresponds to 2020" or "219 matches 2021" - 219 is ONLY and ALWAYS 2019!
-
-Citation Rules:
-8. Grounding: Provide concise answers based ONLY on the provided text. If you can't find it, state that directly and politely.
-9. Sources MUST be embedded clickable links: Use markdown format to create clickable text without showing URLs.
-10. Source Format: Document Name (Folder) with embedded [Open Link] that uses the SUITEFILES_URL
-
-Format your response EXACTLY like this structure:
-
-ANSWER:
-[Write naturally like ChatGPT would. No formulas, no templates - just answer the question in a flowing, conversational way. Share what you know, provide helpful details, and close naturally. Think: "How would I explain this to a colleague?" not "How do I format a response?"]
-
-SOURCES:
-- Document Name (Folder) [Open Link](SUITEFILES_URL)
-- Document Name (Folder) [Open Link](SUITEFILES_URL)
-
-CRITICAL: The [Open Link](URL) creates an embedded clickable link. Users will see "Open Link" text but it will be clickable.
-
-Example of natural ChatGPT-style response:
-"I looked into Aaron from TGCS but don't have specific contact details in our system. I did find several project records that mention them though, so the project teams might have more information. HR could be worth checking too if you need to reach out to them. Anything else I can help with?"
-
-Example of correct source format:
-SOURCES:
-- Safety Manual (Health and Safety) [Open Link](https://donthomson.sharepoint.com/sites/suitefiles/AppPages/documents.aspx#/HR/Safety_Manual.pdf)
-- Project Guidelines (Templates) [Open Link](https://donthomson.sharepoint.com/sites/suitefiles/AppPages/documents.aspx#/Templates/Guidelines.docx)"""
-
             # Build conversation context separately to avoid f-string backslash issues
             conversation_section = ""
             if conversation_context:
@@ -567,21 +706,29 @@ SOURCES:
 {conversation_section}User Query: "{user_query}"
 
 Please help answer this question using the information available in our knowledge base. Be conversational and helpful."""
+            prompt_tokens = get_prompt_registry().record_request(rendered, user_prompt)
+            logger.info("Synthesis prompt built", variant=rendered.variant, prompt_tokens=prompt_tokens,
+                        cacheable_prefix_tokens=rendered.prefix_tokens)
 
-            response = await self.openai_client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,  # Slightly creative for natural language, but mostly factual
-                max_tokens=1500
-            )
-            
-            full_response = response.choices[0].message.content
+            route = "synthesis_short" if len(search_results) <= SHORT_SYNTHESIS_MAX_RESULTS and not conversation_context else "synthesis_long"
+            with stage("synthesis"):
+                completion = await get_model_router().chat(
+                    self.openai_client,
+                    route,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    parse=lambda text: text or None,  # escalate empty answers
+                    default_deployment=self.model_name,
+                    temperature=0.3  # Slightly creative for natural language, but mostly factual
+                )
+            
+            full_response = completion.text
             
             # Parse structured response but preserve sources in the answer
-            parsed_answer = self._extract_answer_with_sources(full_response)
+            with stage("post_processing"):
+                parsed_answer = self._extract_answer_with_sources(full_response)
             
             logger.info("Answer synthesized", 
                        query=user_query,
@@ -592,8 +739,58 @@ Please help answer this question using the information available in our knowledg
             
         except Exception as e:
             logger.error("Answer synthesis failed", error=str(e))
-            return f"I encountered an error generating an answer: {str(e)}"
+            return f"{SYNTHESIS_ERROR_PREFIX}: {str(e)}"
     
+    def _build_context(self, search_results: List[Dict]) -> str:
+        """Numbered source blocks (metadata, SuiteFiles link, truncated content) for the synthesis prompt."""
+        # Use ALL search results passed in (already filtered by caller based on query type)
+        # Caller decides: 20 for list queries, 5 for regular queries
+        context_chunks = []
+        for i, result in enumerate(search_results, 1):  # Use ALL results passed in
+            content = result.get('content', '')
+            filename = result.get('filename', 'Unknown')
+            folder = result.get('folder', '')
+            blob_url = result.get('blob_url', '')
+            blob_name = result.get('blob_name', '')
+            
+            # Get SuiteFiles URL for this document
+            suitefiles_url = ""
+            if blob_url:
+                # Extract proper folder path from blob_name if available
+                actual_folder_path = folder
+                if blob_name and '/' in blob_name:
+                    # Extract folder path from full blob name (more accurate)
+                    actual_folder_path = blob_name.rsplit('/', 1)[0]
+                
+                # Use actual folder path and filename to construct proper SharePoint path
+                suitefiles_url = suitefiles_converter.get_safe_suitefiles_url(
+                    blob_url, 
+                    folder_path=actual_folder_path, 
+                    filename=filename
+                ) or ""
+            
+            # Use more generous truncation - try to get meaningful content
+            # Take both the beginning and end of the document to catch key info
+            if len(content) > 8000:
+                # Take first 4000 chars and last 3000 chars with separator
+                truncated_content = content[:4000] + "\n\n[... CONTENT TRUNCATED ...]\n\n" + content[-3000:]
+                logger.warning("Document content truncated for synthesis", 
+                               filename=filename,
+                               original_length=len(content),
+                               truncated_length=len(truncated_content))
+            else:
+                truncated_content = content
+            
+            # Include metadata for citation formatting
+            source_metadata = f"FILENAME: {filename}\nFOLDER: {folder}"
+            if suitefiles_url:
+                source_metadata += f"\nSUITEFILES_URL: {suitefiles_url}"
+            
+            chunk = f"[Source {i}]\n{source_metadata}\nCONTENT:\n{truncated_content}"
+            context_chunks.append(chunk)
+        
+        return "\n\n".join(context_chunks)
+
     def _extract_answer_with_sources(self, full_response: str) -> str:
         """
         Extract answer and sources from structured response, combining them for user display.
@@ -682,7 +879,7 @@ Please help answer this question using the information available in our knowledg
         Returns:
             Formatted source dict with title, excerpt, and metadata
         """
-        content = result.get('content', '')
+        content = result.get('content') or result.get('caption', '')
         excerpt = content[:200] + '...' if len(content) > 200 else content
         
         return {
@@ -693,13 +890,13 @@ Please help answer this question using the information available in our knowledg
             'excerpt': excerpt
         }
 
-    def _should_skip_file_in_results(self, filename: str, content: str) -> bool:
+    def _should_skip_file_in_results(self, filename: str, content: Optional[str] = None) -> bool:
         """
         Determine if a file should be skipped from search results.
         
         Args:
             filename: Name of the file
-            content: File content
+            content: File content (None when it has not been fetched yet)
             
         Returns:
             True if file should be skipped
@@ -733,10 +930,24 @@ Please help answer this question using the information available in our knowledg
                 return True
         
         # Skip if content is too short to be meaningful (likely placeholder)
-        if len(content.strip()) < 50:
+        if content is not None and len(content.strip()) < 50:
             return True
             
         return False
+    
+    @staticmethod
+    def _is_follow_up(user_query: str, conversation_history: Optional[List[Dict]]) -> bool:
+        """Questions that lean on earlier turns ("what about that one?") are never answered from cache."""
+        return bool(conversation_history) and bool(FOLLOW_UP_PATTERN.search(user_query.lower()))
+    
+    def _has_meaningful_content(self, filename: str, content: str) -> bool:
+        """False (and logged) for placeholder documents with little or no content."""
+        if not content or len(content) < 100:
+            logger.warning("Search result has minimal content", 
+                         filename=filename,
+                         content_length=len(content or ''))
+            return False
+        return True
 
 
 class RAGOrchestrator:
@@ -755,7 +966,7 @@ class RAGOrchestrator:
             max_retries: The maximum number of retries for OpenAI API calls.
         """
         self.rag_service = AzureRAGService(search_client, openai_client, model_name, model_name, max_retries)
-        self.conversation_history = {}  # Store by session_id
+        self.conversation_store = get_conversation_store()  # Bounded, summarized per-session history
         
     async def process_question(self, question: str, session_id: str = "default") -> Dict[str, Any]:
         """
@@ -770,13 +981,13 @@ class RAGOrchestrator:
         """
         try:
             # Get conversation history for this session
-            history = self.conversation_history.get(session_id, [])
+            history = await self.conversation_store.get_history(session_id)
             
             # Process with RAG
             result = await self.rag_service.process_query(question, history)
             
             # Update conversation history
-            self._update_conversation_history(session_id, question, result['answer'])
+            await self.conversation_store.append(session_id, question, result['answer'])
             
             return result
             
@@ -790,27 +1001,3 @@ class RAGOrchestrator:
                 'total_documents': 0,
                 'search_type': 'error'
             }
-    
-    def _update_conversation_history(self, session_id: str, question: str, answer: str):
-        """
-        Update conversation history for the session.
-        
-        Args:
-            session_id: Conversation session identifier
-            question: User's question
-            answer: Assistant's answer
-        """
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = []
-        
-        history = self.conversation_history[session_id]
-        
-        # Add user question and bot answer
-        history.extend([
-            {'role': 'user', 'content': question},
-            {'role': 'assistant', 'content': answer}
-        ])
-        
-        # Keep only recent history (last 10 turns = 20 messages)
-        if len(history) > 20:
-            self.conversation_history[session_id] = history[-20:]
@@ -0,0 +1,385 @@
+"""
+Conversation Store
+
+Single Responsibility: Keep bounded per-session conversation memory.
+
+- Sessions live in an in-process LRU; idle sessions expire after a TTL and the
+  least recently used ones are evicted beyond ``max_sessions``, so memory stays
+  flat on a long-running instance.
+- A pluggable backend persists sessions (SQLite locally). Evicted sessions are
+  reloaded from it on their next message. With ``shared_state_url`` set, sessions
+  live in the cross-process shared state instead and are always read from it,
+  so every worker sees the latest turns.
+- Writes are compare-and-set against the version that was read, retried on a
+  conflict, so an append on another worker is never overwritten by this one.
+- Once a session has more than ``max_turns`` messages, the older ones are folded
+  into a short rolling summary (small-model call, rule-based fallback), so the
+  history sent to the model does not grow with conversation length. The fold
+  runs as a background task after the turn is saved, so the reply never waits
+  on the summarization call; until it lands the history is a turn or two longer.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from ..config.settings import get_settings
+from ..integrations.model_router import get_model_router
+from ..integrations.shared_state import SharedState, get_shared_state
+
+logger = structlog.get_logger(__name__)
+
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+SAVE_ATTEMPTS = 5  # Compare-and-set retries when another worker wrote the session in between
+
+
+def recent_history(history: Optional[List[Dict[str, str]]], turns: int = 3) -> List[Dict[str, str]]:
+    """The last ``turns`` messages of a history, keeping its leading rolling-summary entry."""
+    if not history:
+        return []
+    first = history[0]
+    if first.get('role') == 'system' and first.get('content', '').startswith(SUMMARY_PREFIX):
+        return [first] + history[1:][-turns:]
+    return history[-turns:]
+
+
+@dataclass
+class ConversationMemory:
+    summary: str = ""
+    turns: List[Dict[str, str]] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.time)
+
+    def as_history(self) -> List[Dict[str, str]]:
+        """Messages for the prompt: the rolling summary (if any) followed by the recent turns."""
+        if not self.summary:
+            return list(self.turns)
+        return [{'role': 'system', 'content': SUMMARY_PREFIX + self.summary}] + list(self.turns)
+
+
+class ConversationBackend(ABC):
+    """Persistence interface for conversation memory."""
+
+    shared = False  # True when other processes write too, so the in-process LRU cannot be trusted
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[ConversationMemory]:
+        """The stored session, or None when unknown."""
+
+    @abstractmethod
+    def save(self, session_id: str, memory: ConversationMemory) -> None:
+        """Replace the stored session."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget a session (no-op when unknown)."""
+
+    @abstractmethod
+    def purge_idle(self, older_than: float) -> int:
+        """Delete sessions not updated since ``older_than`` (epoch seconds); returns the count."""
+
+    def load_versioned(self, session_id: str) -> Tuple[Optional[ConversationMemory], Optional[str]]:
+        """The stored session and a version token for ``save_if_version`` (None when not shared)."""
+        return self.load(session_id), None
+
+    def save_if_version(self, session_id: str, memory: ConversationMemory, version: Optional[str]) -> bool:
+        """Save unless another process changed the session since ``version`` was read."""
+        self.save(session_id, memory)
+        return True
+
+
+class SQLiteConversationBackend(ConversationBackend):
+    """Sessions in a local SQLite file (one row per session)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, turns TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS conversations_updated_at ON conversations (updated_at)")
+
+    def load(self, session_id: str) -> Optional[ConversationMemory]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT summary, turns, updated_at FROM conversations WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return ConversationMemory(summary=row[0], turns=json.loads(row[1]), updated_at=row[2])
+
+    def save(self, session_id: str, memory: ConversationMemory) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO conversations (session_id, summary, turns, updated_at) VALUES (?, ?, ?, ?)",
+                (session_id, memory.summary, json.dumps(memory.turns), memory.updated_at),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,))
+
+    def purge_idle(self, older_than: float) -> int:
+        with self._lock, self._connection:
+            return self._connection.execute("DELETE FROM conversations WHERE updated_at < ?", (older_than,)).rowcount
+
+
+class SharedStateConversationBackend(ConversationBackend):
+    """Sessions in the cross-process shared state (see integrations/shared_state.py), expiring when idle."""
+
+    NAMESPACE = "conversations"
+
+    def __init__(self, state: SharedState, idle_ttl_seconds: float):
+        self.state = state
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.shared = state.shared
+
+    def load(self, session_id: str) -> Optional[ConversationMemory]:
+        data = self.state.get(self.NAMESPACE, session_id)
+        return ConversationMemory(**data) if data else None
+
+    def save(self, session_id: str, memory: ConversationMemory) -> None:
+        self.state.set(self.NAMESPACE, session_id, asdict(memory), ttl=self.idle_ttl_seconds)
+
+    def load_versioned(self, session_id: str) -> Tuple[Optional[ConversationMemory], Optional[str]]:
+        data, version = self.state.get_versioned(self.NAMESPACE, session_id)
+        return (ConversationMemory(**data) if data else None), version
+
+    def save_if_version(self, session_id: str, memory: ConversationMemory, version: Optional[str]) -> bool:
+        return self.state.set_if_version(self.NAMESPACE, session_id, asdict(memory), version,
+                                         ttl=self.idle_ttl_seconds)
+
+    def delete(self, session_id: str) -> None:
+        self.state.delete(self.NAMESPACE, session_id)
+
+    def purge_idle(self, older_than: float) -> int:
+        return self.state.purge_expired()
+
+
+def fallback_summary(previous_summary: str, turns: List[Dict[str, str]], max_chars: int) -> str:
+    """Rule-based summary: the user's earlier questions, newest kept when over ``max_chars``."""
+    questions = [turn['content'].strip()[:150] for turn in turns if turn.get('role') == 'user' and turn.get('content')]
+    summary = "; ".join(part for part in [previous_summary] + [f"User asked: {q}" for q in questions] if part)
+    return summary if len(summary) <= max_chars else "..." + summary[-(max_chars - 3):]
+
+
+class LLMConversationSummarizer:
+    """Folds older turns into the rolling summary with one small-model call."""
+
+    def __init__(self, openai_client, model_name: str, max_chars: int = 1200):
+        self.openai_client = openai_client
+        self.model_name = model_name
+        self.max_chars = max_chars
+
+    async def __call__(self, previous_summary: str, turns: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(f"{turn['role'].upper()}: {turn['content'][:600]}" for turn in turns)
+        completion = await get_model_router().chat(
+            self.openai_client,
+            "summarization",
+            messages=[
+                {"role": "system", "content": "You keep a short running memory of a conversation between a DTCE engineer and an assistant. Keep project numbers, names, documents and open questions. Plain text, no preamble."},
+                {"role": "user", "content": f"Current memory:\n{previous_summary or 'None'}\n\nNew turns:\n{transcript}\n\nUpdated memory (max {self.max_chars // 6} words):"}
+            ],
+            parse=lambda text: text or None,
+            default_deployment=self.model_name,
+            temperature=0.1
+        )
+        return (completion.text or "")[:self.max_chars]
+
+
+class ConversationStore:
+    """LRU/TTL-bounded conversation memory with an optional persistent backend and rolling summaries."""
+
+    def __init__(self, max_sessions: int = 1000, idle_ttl_seconds: float = 14400, max_turns: int = 12,
+                 keep_recent_turns: int = 6, summary_max_chars: int = 1200,
+                 backend: Optional[ConversationBackend] = None, summarizer: Optional[Summarizer] = None):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_turns = max_turns
+        self.keep_recent_turns = keep_recent_turns
+        self.summary_max_chars = summary_max_chars
+        self.backend = backend
+        self.summarizer = summarizer
+        self._sessions: "OrderedDict[str, ConversationMemory]" = OrderedDict()
+        self._summarizing: Dict[str, asyncio.Task] = {}
+        self._last_purge = time.time()
+        self._stats = {"evicted": 0, "expired": 0, "summarized": 0, "reloaded": 0}
+
+    async def get_history(self, session_id: str) -> List[Dict[str, str]]:
+        """Bounded history for the prompt (rolling summary + recent turns)."""
+        memory = await self._get(session_id)
+        return memory.as_history() if memory else []
+
+    async def append(self, session_id: str, question: str, answer: str) -> None:
+        """Record one exchange; older turns are summarized in the background once over ``max_turns``."""
+        for _ in range(SAVE_ATTEMPTS):
+            memory, version = await self._get_versioned(session_id)
+            memory = memory or ConversationMemory()
+            memory.turns.extend([
+                {'role': 'user', 'content': question},
+                {'role': 'assistant', 'content': answer}
+            ])
+            memory.updated_at = time.time()
+            if await self._save_if_version(session_id, memory, version):
+                break
+        else:
+            logger.warning("Conversation turn dropped after repeated concurrent writes", session_id=session_id)
+            return
+        self._schedule_summary(session_id, memory)
+        await self._purge_idle()
+
+    async def wait_for_summaries(self) -> None:
+        """Wait until no background summarization is running (shutdown, tests)."""
+        while self._summarizing:
+            await asyncio.gather(*list(self._summarizing.values()), return_exceptions=True)
+
+    async def clear(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.delete, session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"sessions": len(self._sessions), "persistent": self.backend is not None, **self._stats}
+
+    async def _get(self, session_id: str) -> Optional[ConversationMemory]:
+        return (await self._get_versioned(session_id))[0]
+
+    async def _get_versioned(self, session_id: str) -> Tuple[Optional[ConversationMemory], Optional[str]]:
+        """The live session (None when unknown or idle too long) and the backend version it was read at."""
+        version = None
+        memory = None if self.backend is not None and self.backend.shared else self._sessions.get(session_id)
+        if memory is None and self.backend is not None:
+            memory, version = await asyncio.to_thread(self.backend.load_versioned, session_id)
+            if memory is not None and not self.backend.shared:
+                self._stats["reloaded"] += 1
+        if memory is None:
+            return None, version
+        if time.time() - memory.updated_at > self.idle_ttl_seconds:
+            self._sessions.pop(session_id, None)
+            self._stats["expired"] += 1
+            return None, version
+        self._put(session_id, memory)
+        return memory, version
+
+    async def _save_if_version(self, session_id: str, memory: ConversationMemory, version: Optional[str]) -> bool:
+        if self.backend is not None and not await asyncio.to_thread(
+                self.backend.save_if_version, session_id, memory, version):
+            return False
+        self._put(session_id, memory)
+        return True
+
+    def _schedule_summary(self, session_id: str, memory: ConversationMemory) -> None:
+        if len(memory.turns) <= self.max_turns or session_id in self._summarizing:
+            return
+        older = memory.turns[:-self.keep_recent_turns]
+        self._summarizing[session_id] = asyncio.create_task(
+            self._fold_older_turns(session_id, memory.summary, older), name=f"conversation-summary:{session_id}")
+
+    async def _fold_older_turns(self, session_id: str, previous_summary: str, older: List[Dict[str, str]]) -> None:
+        """Background: fold ``older`` into the rolling summary, keeping turns appended meanwhile."""
+        try:
+            summary = await self._summarize(previous_summary, older)
+            for _ in range(SAVE_ATTEMPTS):
+                current, version = await self._get_versioned(session_id)
+                # Turns may have been saved since (here or on another worker); only drop the ones summarized
+                if current is None or current.summary != previous_summary or current.turns[:len(older)] != older:
+                    return
+                current.turns = current.turns[len(older):]
+                current.summary = summary
+                if await self._save_if_version(session_id, current, version):
+                    break
+            else:
+                return  # Lost every race; the next append schedules the fold again
+            self._stats["summarized"] += 1
+        except Exception as e:
+            logger.warning("Conversation summarization task failed", error=str(e))
+            return
+        finally:
+            self._summarizing.pop(session_id, None)
+        self._schedule_summary(session_id, current)  # Turns appended meanwhile may be over the limit again
+
+    def _put(self, session_id: str, memory: ConversationMemory) -> None:
+        self._sessions[session_id] = memory
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    async def _summarize(self, previous_summary: str, turns: List[Dict[str, str]]) -> str:
+        if self.summarizer is not None:
+            try:
+                summary = await self.summarizer(previous_summary, turns)
+                if summary:
+                    return summary
+            except Exception as e:
+                logger.warning("Conversation summarization failed, using fallback", error=str(e))
+        return fallback_summary(previous_summary, turns, self.summary_max_chars)
+
+    async def _purge_idle(self) -> None:
+        """Drop expired sessions from memory and the backend, at most once a minute."""
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        cutoff = now - self.idle_ttl_seconds
+        for session_id in [sid for sid, memory in self._sessions.items() if memory.updated_at < cutoff]:
+            del self._sessions[session_id]
+            self._stats["expired"] += 1
+        if self.backend is not None:
+            try:
+                await asyncio.to_thread(self.backend.purge_idle, cutoff)
+            except Exception as e:
+                logger.warning("Conversation backend purge failed", error=str(e))
+
+
+_conversation_store: Optional[ConversationStore] = None
+
+
+def get_conversation_store() -> ConversationStore:
+    """Process-wide conversation store configured from settings."""
+    global _conversation_store
+    if _conversation_store is None:
+        from ..integrations.openai_limiter import create_async_openai_client
+
+        settings = get_settings()
+        backend = None
+        if settings.shared_state_url:
+            backend = SharedStateConversationBackend(get_shared_state(), settings.conversation_idle_ttl_seconds)
+        elif settings.conversation_store_path:
+            try:
+                backend = SQLiteConversationBackend(settings.conversation_store_path)
+            except Exception as e:
+                logger.error("Conversation store backend unavailable, keeping memory only", error=str(e))
+        summarizer = None
+        if settings.azure_openai_endpoint and settings.azure_openai_api_key:
+            summarizer = LLMConversationSummarizer(
+                create_async_openai_client(
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    api_key=settings.azure_openai_api_key,
+                    api_version="2024-05-01-preview"
+                ),
+                settings.azure_openai_deployment_name,
+                settings.conversation_summary_max_chars,
+            )
+        _conversation_store = ConversationStore(
+            max_sessions=settings.conversation_max_sessions,
+            idle_ttl_seconds=settings.conversation_idle_ttl_seconds,
+            max_turns=settings.conversation_max_turns,
+            keep_recent_turns=settings.conversation_keep_recent_turns,
+            summary_max_chars=settings.conversation_summary_max_chars,
+            backend=backend,
+            summarizer=summarizer,
+        )
+    return _conversation_store
@@ -15,13 +15,18 @@ Usage:
     result = await qa_service.answer_question("What is our IT policy?")
 """
 
+import asyncio
 import time
 from typing import Dict, Any, Optional
 import structlog
-from azure.search.documents import SearchClient
-from openai import AsyncAzureOpenAI
+from azure.search.documents.aio import SearchClient
 
 from ..config.settings import get_settings
+from ..integrations.model_router import get_model_router
+from ..integrations.openai_limiter import create_async_openai_client
+from ..utils.answer_cache import normalize_question
+from ..utils.single_flight import get_single_flight
+from ..utils.stage_timer import stage
 from .google_sheets_knowledge import GoogleSheetsKnowledgeService
 
 logger = structlog.get_logger(__name__)
@@ -46,7 +51,7 @@ class DocumentQAService:
         settings = get_settings()
         
         # Initialize OpenAI client
-        self.openai_client = AsyncAzureOpenAI(
+        self.openai_client = create_async_openai_client(
             api_key=settings.azure_openai_api_key,
             api_version=settings.azure_openai_api_version,
             azure_endpoint=settings.azure_openai_endpoint
@@ -61,7 +66,39 @@ class DocumentQAService:
         # Initialize Google Sheets Knowledge Service as primary knowledge source
         self.google_sheets_service = GoogleSheetsKnowledgeService()
         
+        # Concurrent identical questions (e.g. right after an announcement) share one pipeline run
+        self.single_flight = get_single_flight("answer_question")
+        
     async def answer_question(self, question: str, project_filter: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Answer a question, coalescing concurrent identical ones.
+        
+        Requests with the same normalized question and project filter that
+        arrive while one is already being answered await that computation and
+        share its result (see utils/single_flight.py).
+        
+        Args:
+            question: The question to answer
+            project_filter: Optional project filter to limit search scope
+            
+        Returns:
+            Dictionary with answer, sources, and metadata
+        """
+        key = (normalize_question(question), project_filter)
+        try:
+            return await self.single_flight.do(key, self._answer_question, question, project_filter)
+        except asyncio.TimeoutError:
+            logger.error("Timed out waiting for in-flight answer", question=question)
+            return {
+                'answer': 'This is taking longer than expected - please try asking again in a moment.',
+                'sources': [],
+                'confidence': 'error',
+                'documents_searched': 0,
+                'search_type': 'error',
+                'processing_time': self.single_flight.timeout_seconds
+            }
+    
+    async def _answer_question(self, question: str, project_filter: Optional[str] = None) -> Dict[str, Any]:
         """
         Answer a question using Google Sheets knowledge first, then RAG as fallback.
         
@@ -82,7 +119,9 @@ class DocumentQAService:
             logger.info("Processing question", question=question, project_filter=project_filter)
             
             # Handle basic greetings (Single Responsibility)
-            if self._is_greeting(question):
+            with stage("greeting_check"):
+                is_greeting = self._is_greeting(question)
+            if is_greeting:
                 return self._get_greeting_response()
             
             # STEP 1: Check Google Sheets knowledge first (but with higher threshold for consistency)
@@ -92,10 +131,11 @@ class DocumentQAService:
             
             sheets_match = None
             if not skip_google_sheets:
-                sheets_match = await self.google_sheets_service.find_similar_question(
-                    question, 
-                    similarity_threshold=0.75  # Higher threshold for more exact matches only
-                )
+                with stage("sheets_kb"):
+                    sheets_match = await self.google_sheets_service.find_similar_question(
+                        question, 
+                        similarity_threshold=0.75  # Higher threshold for more exact matches only
+                    )
             
             if sheets_match and not skip_google_sheets:
                 logger.info("Found match in Google Sheets knowledge", 
@@ -104,9 +144,10 @@ class DocumentQAService:
                            user_question=question[:100])
                 
                 # Make the response more conversational
-                conversational_answer = await self._make_conversational_response(
-                    question, sheets_match['question'], sheets_match['answer']
-                )
+                with stage("synthesis"):
+                    conversational_answer = await self._make_conversational_response(
+                        question, sheets_match['question'], sheets_match['answer']
+                    )
                 
                 return {
                     'answer': conversational_answer,
@@ -227,17 +268,20 @@ Please provide a natural, conversational response that:
 Make it sound natural and helpful, not robotic or template-like.
 """
 
-            response = await self.openai_client.chat.completions.create(
-                model=self.model_name,
+            completion = await get_model_router().chat(
+                self.openai_client,
+                "rewrite",
                 messages=[
                     {"role": "system", "content": "You are a helpful DTCE construction industry AI assistant providing conversational responses. Never assume users mentioned documents unless they explicitly did. When users ask for full/complete/detailed lists, provide itemized details not summaries."},
                     {"role": "user", "content": conversation_prompt}
                 ],
+                parse=lambda text: text or None,  # escalate empty rewrites
+                default_deployment=self.model_name,
                 max_tokens=500,
                 temperature=0.7
             )
             
-            conversational_response = response.choices[0].message.content.strip()
+            conversational_response = completion.text
             logger.info("Generated conversational response using AI", 
                        user_question=user_question, 
                        original_answer_length=len(raw_answer),
@@ -19,9 +19,9 @@ import time
 from typing import Dict, Any, Optional
 import structlog
 from azure.search.documents import SearchClient
-from openai import AsyncAzureOpenAI
 
 from ..config.settings import get_settings
+from ..integrations.openai_limiter import create_async_openai_client
 
 logger = structlog.get_logger(__name__)
 
@@ -45,7 +45,7 @@ class DocumentQAService:
         settings = get_settings()
         
         # Initialize OpenAI client
-        self.openai_client = AsyncAzureOpenAI(
+        self.openai_client = create_async_openai_client(
             api_key=settings.azure_openai_api_key,
             api_version=settings.azure_openai_api_version,
             azure_endpoint=settings.azure_openai_endpoint
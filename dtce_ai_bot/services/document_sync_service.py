@@ -7,10 +7,11 @@ import asyncio
 from datetime import datetime
 from typing import List, Dict, Optional, Callable, Any
 import structlog
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob.aio import BlobServiceClient
 
 from ..config.settings import get_settings
 from ..integrations.microsoft_graph import MicrosoftGraphClient
+from ..utils.stage_timer import stage
 
 logger = structlog.get_logger(__name__)
 
@@ -210,10 +211,10 @@ class DocumentSyncService:
             return False
             
         try:
-            if not blob_client.exists():
+            if not await blob_client.exists():
                 return False
             
-            properties = blob_client.get_blob_properties()
+            properties = await blob_client.get_blob_properties()
             if doc.get("modified") and properties.last_modified:
                 doc_modified = doc.get("modified")
                 blob_modified = properties.last_modified.isoformat()
@@ -260,11 +261,12 @@ class DocumentSyncService:
             "is_folder_marker": "true"
         }
         
-        blob_client.upload_blob(
-            keep_file_content.encode('utf-8'), 
-            overwrite=True, 
-            metadata=metadata
-        )
+        with stage("blob_upload"):
+            await blob_client.upload_blob(
+                keep_file_content.encode('utf-8'), 
+                overwrite=True, 
+                metadata=metadata
+            )
         
         logger.debug("Created folder marker", folder=doc["name"])
     
@@ -305,7 +307,8 @@ class DocumentSyncService:
             "is_folder": "false"
         }
         
-        blob_client.upload_blob(file_content, overwrite=True, metadata=metadata)
+        with stage("blob_upload"):
+            await blob_client.upload_blob(file_content, overwrite=True, metadata=metadata)
         
         # Extract text and index for AI search
         try:
@@ -320,13 +323,13 @@ class DocumentSyncService:
     async def _process_for_ai_search(self, blob_name: str):
         """Extract text and index document for AI search."""
         from ..api.documents import extract_text, index_document
-        from ..integrations.azure_search import get_search_client
+        from ..integrations.azure_search import get_async_search_client
         
         # Extract text content
         await extract_text(blob_name, self.storage_client)
         
         # Index for search
-        search_client = get_search_client()
+        search_client = await get_async_search_client()
         await index_document(blob_name, search_client, self.storage_client)
 
 
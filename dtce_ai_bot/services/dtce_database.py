@@ -6,7 +6,7 @@ import asyncio
 import re
 from typing import List, Dict, Optional
 import structlog
-from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient
 
 logger = structlog.get_logger(__name__)
 
@@ -38,7 +38,7 @@ class ContactExtractionService:
                 
             search_query = " ".join(search_terms)
             
-            results = self.search_client.search(
+            results = await self.search_client.search(
                 search_text=search_query,
                 top=30,
                 select=["id", "filename", "content", "blob_url", "project_name", "folder"],
@@ -47,7 +47,7 @@ class ContactExtractionService:
             )
             
             builder_contacts = []
-            for result in results:
+            async for result in results:
                 doc_dict = dict(result)
                 content = doc_dict.get('content', '')
                 
@@ -89,7 +89,7 @@ class ContactExtractionService:
                 
             search_query = " ".join(search_terms)
             
-            results = self.search_client.search(
+            results = await self.search_client.search(
                 search_text=search_query,
                 top=30,
                 select=["id", "filename", "content", "blob_url", "project_name", "folder"],
@@ -98,7 +98,7 @@ class ContactExtractionService:
             )
             
             client_contacts = []
-            for result in results:
+            async for result in results:
                 doc_dict = dict(result)
                 content = doc_dict.get('content', '')
                 
@@ -8,10 +8,13 @@ from typing import List, Dict, Any, Optional
 from azure.search.documents import SearchClient
 from openai import AsyncAzureOpenAI
 
+from .prompt_registry import DEFAULT_VARIANT, get_prompt_registry
 from .smart_rag_handler import SmartRAGHandler
 
 logger = structlog.get_logger(__name__)
 
+ENGINEERING_PROMPT = "engineering_answer"
+
 
 class EnhancedEngineeringRAGHandler(SmartRAGHandler):
     """
@@ -22,6 +25,26 @@ class EnhancedEngineeringRAGHandler(SmartRAGHandler):
     def __init__(self, search_client: SearchClient, openai_client: AsyncAzureOpenAI, model_name: str):
         super().__init__(search_client, openai_client, model_name)
         
+        registry = get_prompt_registry()
+        if not registry.has(ENGINEERING_PROMPT):
+            registry.register(ENGINEERING_PROMPT, {
+                "technical_standard": self._get_nz_standards_prompt(),
+                "scenario_technical": self._get_scenario_technical_prompt(),
+                "problem_solving": self._get_problem_solving_prompt(),
+                "regulatory_precedents": self._get_regulatory_precedents_prompt(),
+                "cost_time_insights": self._get_cost_time_insights_prompt(),
+                "best_practices": self._get_best_practices_prompt(),
+                "materials_comparison": self._get_materials_comparison_prompt(),
+                "knowledge_mapping": self._get_knowledge_mapping_prompt(),
+                "project_reference": self._get_project_reference_prompt(),
+                "product_specification": self._get_product_specification_prompt(),
+                "design_discussion": self._get_design_discussion_prompt(),
+                "contractor_reference": self._get_contractor_reference_prompt(),
+                "template_access": self._get_template_access_prompt(),
+                "scope_comparison": self._get_scope_comparison_prompt(),
+                DEFAULT_VARIANT: self._get_general_engineering_prompt(),
+            })
+        
         # Engineering-specific query patterns
         self.engineering_patterns = {
             "nz_standards": {
@@ -219,37 +242,8 @@ class EnhancedEngineeringRAGHandler(SmartRAGHandler):
         
         combined_content = "\n\n".join(content_chunks)
         
-        # Generate specialized prompts based on engineering type
-        if engineering_type == "technical_standard":
-            system_prompt = self._get_nz_standards_prompt()
-        elif engineering_type == "scenario_technical":
-            system_prompt = self._get_scenario_technical_prompt()
-        elif engineering_type == "problem_solving":
-            system_prompt = self._get_problem_solving_prompt()
-        elif engineering_type == "regulatory_precedents":
-            system_prompt = self._get_regulatory_precedents_prompt()
-        elif engineering_type == "cost_time_insights":
-            system_prompt = self._get_cost_time_insights_prompt()
-        elif engineering_type == "best_practices":
-            system_prompt = self._get_best_practices_prompt()
-        elif engineering_type == "materials_comparison":
-            system_prompt = self._get_materials_comparison_prompt()
-        elif engineering_type == "knowledge_mapping":
-            system_prompt = self._get_knowledge_mapping_prompt()
-        elif engineering_type == "project_reference":
-            system_prompt = self._get_project_reference_prompt()
-        elif engineering_type == "product_specification":
-            system_prompt = self._get_product_specification_prompt()
-        elif engineering_type == "design_discussion":
-            system_prompt = self._get_design_discussion_prompt()
-        elif engineering_type == "contractor_reference":
-            system_prompt = self._get_contractor_reference_prompt()
-        elif engineering_type == "template_access":
-            system_prompt = self._get_template_access_prompt()
-        elif engineering_type == "scope_comparison":
-            system_prompt = self._get_scope_comparison_prompt()
-        else:
-            system_prompt = self._get_general_engineering_prompt()
+        # Precompiled, byte-stable system prompt per engineering type (question goes in the user message)
+        system_prompt = get_prompt_registry().render(ENGINEERING_PROMPT, variant=engineering_type).text
         
         try:
             response = await self.openai_client.chat.completions.create(
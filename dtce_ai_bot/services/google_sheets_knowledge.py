@@ -8,8 +8,11 @@ from typing import List, Dict, Any, Optional
 import structlog
 from difflib import SequenceMatcher
 import json
+import asyncio
 import httpx
 
+from ..integrations.shared_state import get_shared_state
+
 logger = structlog.get_logger(__name__)
 
 class GoogleSheetsKnowledgeService:
@@ -34,7 +37,8 @@ class GoogleSheetsKnowledgeService:
         
         logger.info(f"Google Sheets service initialized with sheet ID: {self.sheet_id}")
         
-        # Cache for storing Q&A pairs
+        # Cache for storing Q&A pairs (also published to the shared state, so one worker's
+        # download serves every worker until it expires)
         self._qa_cache = {}
         self._cache_timestamp = None
         self._cache_duration = 300  # 5 minutes cache
@@ -111,9 +115,22 @@ class GoogleSheetsKnowledgeService:
                 logger.debug("Using cached Google Sheets data")
                 return self._qa_cache
             
+            shared_state = get_shared_state()
+            try:
+                shared = await asyncio.to_thread(shared_state.get, "sheets_qa", self.sheet_id)
+            except Exception as e:
+                logger.warning("Shared Google Sheets cache unavailable", error=str(e))
+                shared = None
+            if shared and current_time - shared["fetched_at"] < self._cache_duration and shared["qa_pairs"]:
+                logger.debug("Using Google Sheets data cached by another worker")
+                self._qa_cache = shared["qa_pairs"]
+                self._cache_timestamp = shared["fetched_at"]
+                return self._qa_cache
+            
             # Use public CSV export (no API key required)
             # Format: https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid=0
-            url = f"https://docs.google.com/spreadsheets/d/{self.sheet_id}/export?format=csv&gid=0"
+            # GOOGLE_SHEETS_EXPORT_URL points it elsewhere (e.g. the load-test stand-in)
+            url = os.getenv('GOOGLE_SHEETS_EXPORT_URL') or f"https://docs.google.com/spreadsheets/d/{self.sheet_id}/export?format=csv&gid=0"
             
             # Configure client to follow redirects
             async with httpx.AsyncClient(
@@ -157,6 +174,11 @@ class GoogleSheetsKnowledgeService:
                 # Update cache
                 self._qa_cache = qa_pairs
                 self._cache_timestamp = current_time
+                try:
+                    await asyncio.to_thread(shared_state.set, "sheets_qa", self.sheet_id,
+                                            {"qa_pairs": qa_pairs, "fetched_at": current_time}, self._cache_duration)
+                except Exception as e:
+                    logger.warning("Failed to share Google Sheets cache", error=str(e))
                 
                 logger.info(f"Loaded {len(qa_pairs)} Q&A pairs from Google Sheets")
                 
@@ -189,14 +211,14 @@ class GoogleSheetsKnowledgeService:
             semantic_similarity = 0.0
             try:
                 # Use Azure OpenAI embeddings for semantic similarity
-                from openai import AzureOpenAI
+                from dtce_ai_bot.integrations.openai_limiter import create_openai_client, openai_priority
                 import math
                 
                 # Initialize Azure OpenAI client if not already done
                 if not hasattr(self, '_openai_client'):
                     from dtce_ai_bot.config.settings import get_settings
                     settings = get_settings()
-                    self._openai_client = AzureOpenAI(
+                    self._openai_client = create_openai_client(
                         api_key=settings.azure_openai_api_key,
                         api_version=settings.azure_openai_api_version,
                         azure_endpoint=settings.azure_openai_endpoint
@@ -207,14 +229,15 @@ class GoogleSheetsKnowledgeService:
                 settings = get_settings()
                 embedding_model = settings.azure_openai_embedding_model
                 
-                embedding1_response = self._openai_client.embeddings.create(
-                    model=embedding_model,
-                    input=text1
-                )
-                embedding2_response = self._openai_client.embeddings.create(
-                    model=embedding_model, 
-                    input=text2
-                )
+                with openai_priority("interactive"):  # matching the user's question, not background work
+                    embedding1_response = self._openai_client.embeddings.create(
+                        model=embedding_model,
+                        input=text1
+                    )
+                    embedding2_response = self._openai_client.embeddings.create(
+                        model=embedding_model, 
+                        input=text2
+                    )
                 
                 embedding1 = embedding1_response.data[0].embedding
                 embedding2 = embedding2_response.data[0].embedding
@@ -10,6 +10,9 @@ import json
 import re
 from datetime import datetime
 
+from ..integrations.model_router import get_model_router
+from ..utils.document_fields import odata_in, odata_literal
+
 logger = structlog.get_logger(__name__)
 
 
@@ -123,22 +126,23 @@ CRITICAL PRIORITY:
 
 Output ONLY the category name (e.g., "Template" or "Project" or "Policy" or "General_Knowledge")."""
 
-            response = await self.openai_client.chat.completions.create(
-                model=self.model_name,
+            completion = await get_model_router().chat(
+                self.openai_client,
+                "intent",
                 messages=[
                     {"role": "system", "content": "You classify queries into knowledge categories. Output ONLY the category name, nothing else."},
                     {"role": "user", "content": classification_prompt}
                 ],
-                temperature=0.1,
-                max_tokens=50
+                parse=lambda text: text if text in self.CATEGORIES else None,
+                default_deployment=self.model_name,
+                temperature=0.1
             )
+            intent = completion.parsed
             
-            intent = response.choices[0].message.content.strip()
-            
-            # Validate the intent exists
-            if intent not in self.CATEGORIES:
+            # Small and large model both returned something outside the category list
+            if intent is None:
                 logger.warning("Invalid intent returned, defaulting to General_Knowledge", 
-                             returned_intent=intent, query=user_query)
+                             returned_intent=completion.text, query=user_query)
                 intent = "General_Knowledge"
             
             logger.info("Intent classified", query=user_query, intent=intent)
@@ -249,8 +253,9 @@ Output ONLY the category name (e.g., "Template" or "Project" or "Policy" or "Gen
     def build_search_filter(self, intent: str, user_query: str) -> Optional[str]:
         """
         Step 2.3: Dynamic Filter Construction
-        Builds a robust OData filter based on the CORRECT folder structure:
-        Projects/{YEAR_CODE}/{JOB_NUMBER}. Uses range queries for folder scoping.
+        Builds an OData filter from the structured fields stored at ingest
+        (project_number, year_code, doc_category - see utils/document_fields.py),
+        so scoping is an equality / search.in lookup instead of folder range chains.
 
         Returns: OData filter string or None (for General_Knowledge and Simple_Test)
         """
@@ -264,18 +269,6 @@ Output ONLY the category name (e.g., "Template" or "Project" or "Policy" or "Gen
             logger.info("No folder-based filter needed for intent", intent=intent)
             return None
 
-        def get_upper_bound(path: str) -> str:
-            """Calculates the upper bound for a 'startswith' range query."""
-            if not path: return ""
-            parts = path.split('/')
-            last_part = parts[-1]
-            if last_part.isdigit():
-                try:
-                    incremented = str(int(last_part) + 1)
-                    return '/'.join(parts[:-1] + [incremented])
-                except (ValueError, IndexError): pass
-            return path[:-1] + chr(ord(path[-1]) + 1)
-
         # --- Project Intent Logic ---
         if intent == "Project":
             project_meta = self.extract_project_metadata(user_query)
@@ -285,20 +278,12 @@ Output ONLY the category name (e.g., "Template" or "Project" or "Policy" or "Gen
                 year_range_end = project_meta.get("year_range_end")
                 
                 if year_range_start and year_range_end:
-                    # Build filter for multiple years: Projects/221/ to Projects/225/
-                    # Use OR conditions for each year in the range
+                    # e.g., search.in(year_code, '221|222|223|224|225', '|')
                     years = range(int(year_range_start), int(year_range_end) + 1)
-                    filter_parts = []
-                    for year in years:
-                        year_str = str(year)
-                        base_path = f"Projects/{year_str}"
-                        upper_bound = get_upper_bound(base_path)
-                        filter_parts.append(f"(folder ge '{base_path}/' and folder lt '{upper_bound}')")
-                    
-                    filter_str = " or ".join(filter_parts)
+                    filter_str = odata_in("year_code", [str(year) for year in years])
                     logger.info("Built time-based project range filter", 
                                years=f"{year_range_start}-{year_range_end}",
-                               filter=filter_str[:200])
+                               filter=filter_str)
                     return filter_str
                 
                 project_code = project_meta.get("year") # This is the PROJECT_CODE, e.g., '225'
@@ -306,33 +291,24 @@ Output ONLY the category name (e.g., "Template" or "Project" or "Policy" or "Gen
 
                 # Case 1: Specific 6-digit job number found (e.g., 225221)
                 if job_num and project_code:
-                    # Correct Path: Projects/{PROJECT_CODE}/{JOB_NUMBER}
-                    base_path = f"Projects/{project_code}/{job_num}"
-                    upper_bound = get_upper_bound(base_path)
-                    # e.g., folder ge 'Projects/225/225221/' and folder lt 'Projects/225/225222'
-                    filter_str = f"folder ge '{base_path}/' and folder lt '{upper_bound}'"
+                    filter_str = f"project_number eq {odata_literal(job_num)}"
                     logger.info("Built specific project job filter", filter=filter_str)
                     return filter_str
 
                 # Case 2: Only a 3-digit project code found (e.g., 225)
                 elif project_code:
-                    # Correct Path: Projects/{PROJECT_CODE}
-                    base_path = f"Projects/{project_code}"
-                    upper_bound = get_upper_bound(base_path)
-                    # e.g., folder ge 'Projects/225/' and folder lt 'Projects/226/'
-                    filter_str = f"folder ge '{base_path}/' and folder lt '{upper_bound}'"
+                    filter_str = f"year_code eq {odata_literal(project_code)}"
                     logger.info("Built project year/code filter", filter=filter_str)
                     return filter_str
             
-            # Fallback if no metadata extracted but intent is Project
-            # Use range query to match ALL project subfolders (Projects/*)
+            # Fallback if no metadata extracted but intent is Project: everything under Projects/
             logger.warning("Project intent detected but no metadata extracted - using broad project filter", query=user_query)
-            return "folder ge 'Projects/' and folder lt 'Projects~'"  # Match all Projects/* subfolders
+            return "doc_category eq 'projects'"
 
         # --- Client Intent Logic ---
         if intent == "Client":
             client_name = self.extract_client_name(user_query)
-            base_filter = "folder ge 'Clients/' and folder lt 'Clients~'"
+            base_filter = "doc_category eq 'clients'"
             if client_name:
                 # Add client name search on top of the folder filter
                 filter_str = f"({base_filter}) and search.ismatch('{client_name}', 'content')"
@@ -345,16 +321,15 @@ Output ONLY the category name (e.g., "Template" or "Project" or "Policy" or "Gen
         # --- Standard Category Logic (Policy, Procedure, Standards, Templates) ---
         folder_values = category.get("folder_values")
         if folder_values:
-            # For each folder, match BOTH exact match AND subfolders:
-            # - folder eq 'Templates' (exact match)
-            # - folder ge 'Templates/' and folder lt 'Templates~' (subfolders)
-            or_clauses = []
+            # Top-level folders are a single search.in over doc_category; deeper
+            # folders still need a folder range (exact folder OR its subfolders)
+            top_level = [val.lower() for val in folder_values if '/' not in val]
+            or_clauses = [odata_in("doc_category", top_level)] if top_level else []
             for val in folder_values:
-                # Match both the folder itself AND its subfolders
-                clause = f"(folder eq '{val}' or (folder ge '{val}/' and folder lt '{val}~'))"
-                or_clauses.append(clause)
+                if '/' in val:
+                    or_clauses.append(f"(folder eq '{val}' or (folder ge '{val}/' and folder lt '{val}~'))")
             filter_str = " or ".join(or_clauses)
-            logger.info("Built standard category filter with exact+range match", intent=intent, filter=filter_str)
+            logger.info("Built standard category filter", intent=intent, filter=filter_str)
             return filter_str
 
         logger.warning("Could not build filter for intent", intent=intent)
@@ -7,9 +7,10 @@ import asyncio
 import re
 from typing import List, Dict, Any, Optional, Tuple
 import structlog
-from azure.search.documents import SearchClient
-from openai import AsyncAzureOpenAI
+from azure.search.documents.aio import SearchClient
+from ..integrations.openai_limiter import create_async_openai_client
 from ..config.settings import get_settings
+from ..integrations.azure_search import get_async_search_client
 
 logger = structlog.get_logger(__name__)
 
@@ -17,13 +18,13 @@ logger = structlog.get_logger(__name__)
 class ProjectScopingService:
     """Service for analyzing project scopes and finding similar past projects."""
     
-    def __init__(self, search_client: SearchClient):
+    def __init__(self, search_client: Optional[SearchClient] = None):
         """Initialize the project scoping service."""
         self.search_client = search_client
         settings = get_settings()
         
         # Initialize Azure OpenAI client
-        self.openai_client = AsyncAzureOpenAI(
+        self.openai_client = create_async_openai_client(
             api_key=settings.azure_openai_api_key,
             azure_endpoint=settings.azure_openai_endpoint,
             api_version=settings.azure_openai_api_version
@@ -146,7 +147,8 @@ class ProjectScopingService:
         
         try:
             # Perform semantic search for similar projects
-            results = self.search_client.search(
+            search_client = self.search_client or await get_async_search_client()
+            results = await search_client.search(
                 search_text=search_query,
                 select=["title", "content", "project", "file_path", "chunk_id"],
                 top=10,
@@ -154,7 +156,7 @@ class ProjectScopingService:
             )
             
             similar_projects = []
-            for result in results:
+            async for result in results:
                 similarity_score = getattr(result, "@search.score", 0)
                 if similarity_score > 0.7:  # Threshold for similarity
                     similar_projects.append({
@@ -326,7 +328,6 @@ def get_project_scoping_service() -> ProjectScopingService:
     """Get the global project scoping service instance."""
     global project_scoping_service
     if project_scoping_service is None:
-        from ..integrations.azure_search import get_search_client
-        search_client = get_search_client()
-        project_scoping_service = ProjectScopingService(search_client)
+        # No search client here - the service resolves the shared aio client per event loop
+        project_scoping_service = ProjectScopingService()
     return project_scoping_service
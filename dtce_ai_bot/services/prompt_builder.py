@@ -7,8 +7,12 @@ Single Responsibility: Build intent-specific prompts for different query categor
 from typing import Dict, Any, List
 import structlog
 
+from .prompt_registry import DEFAULT_VARIANT, get_prompt_registry
+
 logger = structlog.get_logger(__name__)
 
+INTENT_SYSTEM_PROMPT = "intent_system"
+
 
 class PromptBuilder:
     """
@@ -88,6 +92,16 @@ class PromptBuilder:
             "nz_standards": self._get_nz_standards_instructions(),
             "general": self._get_general_instructions()
         }
+        
+        # Precompile one byte-stable system prompt per intent; only the
+        # question-dependent core instructions are appended per request
+        registry = get_prompt_registry()
+        if not registry.has(INTENT_SYSTEM_PROMPT):
+            variants = {category: self._build_intent_prefix(instructions)
+                        for category, instructions in self.intent_instructions.items()}
+            variants[DEFAULT_VARIANT] = variants["general"]
+            registry.register(INTENT_SYSTEM_PROMPT, variants,
+                              suffix="**CRITICAL: ANSWER THE SPECIFIC QUESTION ASKED**\n\n{core_instructions}")
     
     def build_system_prompt(self, intent_category: str, retrieved_content: str, 
                            knowledge_section: str, project_context_section: str, 
@@ -156,25 +170,27 @@ class PromptBuilder:
         Returns:
             System prompt string with intent instructions and user priority handling
         """
-        intent_instructions = self.get_intent_instructions(intent_category)
-        
         # Analyze user question for explicit instruction overrides
         user_overrides = self._detect_user_instruction_overrides(user_question) if user_question else {}
         
         # Build core instructions with user override awareness
         core_instructions = self._build_adaptive_core_instructions(user_overrides)
         
+        # Static intent prefix first so repeated requests share a cacheable prompt prefix
+        return get_prompt_registry().render(INTENT_SYSTEM_PROMPT, variant=intent_category,
+                                            core_instructions=core_instructions).text
+    
+    def _build_intent_prefix(self, intent_instructions: str) -> str:
+        """Static part of the simple system prompt for one intent."""
         return f"""You are DTCE AI Chatbot, a helpful, professional, and knowledgeable engineering assistant for a New Zealand structural and geotechnical engineering firm. Your primary purpose is to provide accurate, comprehensive, and advisory-level guidance based on the provided documents and your professional engineering expertise.
 
-**CRITICAL: ANSWER THE SPECIFIC QUESTION ASKED**
-
-{core_instructions}
-
 ---
 
 ### **Context-Specific Instructions:**
 
-{intent_instructions}"""
+{intent_instructions}
+
+---"""
     
     def _get_policy_instructions(self) -> str:
         """Instructions for policy-related queries."""
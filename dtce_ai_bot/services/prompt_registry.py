@@ -0,0 +1,141 @@
+"""
+Prompt Registry
+
+Single Responsibility: Hold precompiled prompt templates and account for their tokens.
+
+Every template is a byte-stable static prefix plus an optional volatile suffix
+(current year, per-question instructions...). Keeping everything that changes
+at the END means consecutive requests share an identical prefix, which is what
+Azure OpenAI prompt caching matches on (prefixes of 1024+ tokens), and the
+static part is tokenized once at registration instead of on every call.
+
+A template can have named variants - e.g. a compact synthesis prompt for
+intents that never need the project-list instructions - selected per intent.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import structlog
+
+try:
+    import tiktoken  # exact counts when installed; otherwise ~4 characters per token
+except ImportError:
+    tiktoken = None
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_VARIANT = "default"
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for ``text`` (o200k_base when tiktoken is available, else an estimate)."""
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:  # encoding files unavailable offline
+            logger.warning("tiktoken encoding unavailable, estimating tokens", error=str(e))
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class PromptTemplate:
+    name: str
+    variants: Dict[str, str]  # variant name -> static prefix (never formatted, so byte-stable)
+    suffix: str = ""  # str.format template for the volatile tail
+    intent_variants: Dict[str, str] = field(default_factory=dict)  # intent -> variant name
+    prefix_tokens: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.prefix_tokens = {variant: count_tokens(text) for variant, text in self.variants.items()}
+
+
+@dataclass
+class RenderedPrompt:
+    template: str
+    variant: str
+    text: str
+    prefix_tokens: int
+    suffix_tokens: int
+
+
+class PromptRegistry:
+    """Precompiled prompt templates with per-template and per-request token accounting."""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, variants: Dict[str, str], suffix: str = "",
+                 intent_variants: Optional[Dict[str, str]] = None) -> PromptTemplate:
+        template = PromptTemplate(name, dict(variants), suffix, dict(intent_variants or {}))
+        with self._lock:
+            self._templates[name] = template
+        logger.debug("Prompt template registered", name=name, prefix_tokens=template.prefix_tokens)
+        return template
+
+    def has(self, name: str) -> bool:
+        return name in self._templates
+
+    def variant_for_intent(self, name: str, intent: Optional[str]) -> str:
+        template = self._templates[name]
+        variant = template.intent_variants.get(intent or "", DEFAULT_VARIANT)
+        return variant if variant in template.variants else DEFAULT_VARIANT
+
+    def render(self, name: str, variant: Optional[str] = None, intent: Optional[str] = None, **values) -> RenderedPrompt:
+        """
+        Static prefix for the variant (or the intent's variant) followed by the formatted suffix.
+
+        Unknown variants fall back to the default one.
+        """
+        template = self._templates[name]
+        variant = variant if variant in template.variants else self.variant_for_intent(name, intent)
+        prefix = template.variants[variant]
+        suffix = template.suffix.format(**values) if template.suffix else ""
+        rendered = RenderedPrompt(
+            template=name,
+            variant=variant,
+            text=f"{prefix}\n\n{suffix}" if suffix else prefix,
+            prefix_tokens=template.prefix_tokens[variant],
+            suffix_tokens=count_tokens(suffix),
+        )
+        self._record(f"{name}:{variant}", renders=1, prompt_tokens=rendered.prefix_tokens + rendered.suffix_tokens,
+                     prefix_tokens=rendered.prefix_tokens)
+        return rendered
+
+    def record_request(self, rendered: RenderedPrompt, *request_texts: str) -> int:
+        """Count the per-request messages sent with a rendered prompt; returns the request's total tokens."""
+        request_tokens = sum(count_tokens(text) for text in request_texts)
+        self._record(f"{rendered.template}:{rendered.variant}", request_tokens=request_tokens)
+        return rendered.prefix_tokens + rendered.suffix_tokens + request_tokens
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+    def _record(self, key: str, **increments) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(key, {"renders": 0, "prompt_tokens": 0, "prefix_tokens": 0, "request_tokens": 0})
+            for counter, value in increments.items():
+                stats[counter] += value
+
+
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Process-wide prompt registry."""
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry()
+    return _prompt_registry
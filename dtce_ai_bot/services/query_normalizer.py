@@ -14,6 +14,8 @@ from typing import List, Dict, Any, Optional, Tuple
 import structlog
 from openai import AsyncAzureOpenAI
 
+from ..integrations.model_router import get_model_router
+
 logger = structlog.get_logger(__name__)
 
 
@@ -123,24 +125,19 @@ OUTPUT FORMAT (JSON):
 
 Analyze the query and respond with JSON only:"""
 
-            response = await self.openai_client.chat.completions.create(
-                model=self.model_name,
+            completion = await get_model_router().chat(
+                self.openai_client,
+                "normalization",
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,  # Low temperature for consistent results
-                max_tokens=300
+                parse=self._parse_json_response,
+                default_deployment=self.model_name,
+                temperature=0.1  # Low temperature for consistent results
             )
-            
-            # Parse the JSON response
-            import json
-            result_text = response.choices[0].message.content.strip()
-            
-            # Clean up the response to ensure it's valid JSON
-            if result_text.startswith('```json'):
-                result_text = result_text.replace('```json', '').replace('```', '')
-            elif result_text.startswith('```'):
-                result_text = result_text.replace('```', '')
-            
-            ai_result = json.loads(result_text)
+            ai_result = completion.parsed
+            if ai_result is None:
+                logger.warning("Failed to parse AI response as JSON", response=completion.text[:200])
+                # Try to extract at least the primary query from the response
+                return await self._extract_query_from_text_response(query, completion.text)
             
             # Enhance the result with metadata
             final_result = {
@@ -162,15 +159,25 @@ Analyze the query and respond with JSON only:"""
             
             return final_result
             
-        except json.JSONDecodeError as e:
-            logger.warning("Failed to parse AI response as JSON", error=str(e), response=result_text[:200])
-            # Try to extract at least the primary query from the response
-            return await self._extract_query_from_text_response(query, result_text)
-            
         except Exception as e:
             logger.error("AI semantic normalization failed", error=str(e))
             return {'success': False}
     
+    @staticmethod
+    def _parse_json_response(result_text: str) -> Dict[str, Any]:
+        """Parse the model's JSON answer, tolerating markdown code fences (raises ValueError)."""
+        import json
+        
+        if result_text.startswith('```json'):
+            result_text = result_text.replace('```json', '').replace('```', '')
+        elif result_text.startswith('```'):
+            result_text = result_text.replace('```', '')
+        
+        result = json.loads(result_text)
+        if not isinstance(result, dict):
+            raise ValueError("expected a JSON object")
+        return result
+    
     async def _extract_query_from_text_response(self, original_query: str, ai_response: str) -> Dict[str, Any]:
         """Extract search query from AI response even if JSON parsing fails."""
         try:
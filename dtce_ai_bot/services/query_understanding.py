@@ -0,0 +1,254 @@
+"""
+Query Understanding Service
+
+Single Responsibility: Turn a user question into everything the pre-retrieval
+steps need with ONE model call - conversational flag, intent category,
+job numbers, years, client, search keywords and a rewritten search query.
+
+Replaces the serial chain of conversational check -> intent classification ->
+keyword/scope extraction. Results are validated, cached per question and
+conversation tail, and fall back to rules when the model is unavailable.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+import structlog
+from openai import AsyncAzureOpenAI
+
+from ..config.settings import get_settings
+from ..integrations.model_router import get_model_router
+from ..utils.answer_cache import normalize_question
+from ..utils.rank_fusion import QueryResultCache
+from .conversation_store import recent_history
+from .azure_rag_service_v2 import KEYWORD_STOPWORDS
+
+logger = structlog.get_logger(__name__)
+
+CATEGORIES = (
+    'project_search', 'keyword_project_search', 'template_search', 'file_analysis', 'email_search',
+    'client_info', 'client_project_history', 'scope_based_search', 'policy', 'technical_procedures',
+    'nz_standards', 'general',
+)
+
+# Replies that never need a document search, with or without history
+SHORT_CONVERSATIONAL = {
+    'really', 'ok', 'okay', 'thanks', 'thank you', 'yes', 'no', 'yeah', 'sure',
+    'got it', 'i see', 'right', 'correct', 'true', 'false', 'good', 'great',
+    'nice', 'cool', 'wow', 'hmm', 'ah', 'oh', 'what', 'why', 'how come'
+}
+
+JOB_NUMBER_PATTERN = re.compile(r'\b(2\d{2})-?(\d{3})\b')
+YEAR_PATTERN = re.compile(r'\b((?:19|20)\d{2})\b')
+
+# Ordered (category, pattern) rules for the offline fallback
+CATEGORY_RULES = [
+    ('email_search', re.compile(r'\b(email|emails|correspondence)\b')),
+    ('template_search', re.compile(r'\btemplates?\b')),
+    ('client_info', re.compile(r'\b(contact|who works with|client details)\b')),
+    ('project_search', re.compile(r'\b(project|job)\s+\d{3}')),
+    ('client_project_history', re.compile(r'\b(work|projects) (have we done |did we do )?for\b')),
+    ('keyword_project_search', re.compile(r'\bprojects? (with|involving|that)\b')),
+    ('policy', re.compile(r'\b(policy|policies|wellness|leave|h&s|health and safety)\b')),
+    ('nz_standards', re.compile(r'\b(nzs|as/nzs|standard|standards|code)\b')),
+    ('technical_procedures', re.compile(r'\b(how do i|how to|procedure|process|guide|handbook)\b')),
+]
+
+
+class QueryUnderstandingService:
+    """Single structured call that classifies a question and extracts its search parameters."""
+
+    def __init__(self, openai_client: AsyncAzureOpenAI, model_name: str):
+        self.openai_client = openai_client
+        self.model_name = model_name
+        self.cache = QueryResultCache(ttl_seconds=get_settings().search_query_cache_ttl_seconds)
+
+    async def understand(self, question: str, conversation_history: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """
+        Understand the user's question.
+
+        Args:
+            question: The user's question
+            conversation_history: Optional recent turns ({'role', 'content'})
+
+        Returns:
+            Dict with conversational, category, confidence, reasoning, job_numbers,
+            years, client_name, search_keywords, rewritten_query and method
+        """
+        question_lower = question.lower().strip()
+        if question_lower in SHORT_CONVERSATIONAL:
+            return self.rule_based_understanding(question, conversation_history)
+
+        history = self._format_history(conversation_history)
+        cache_key = (normalize_question(question), history)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        try:
+            completion = await get_model_router().chat(
+                self.openai_client,
+                "query_understanding",
+                messages=[
+                    {"role": "system", "content": "You analyse questions for an engineering firm's document search. Always respond with valid JSON."},
+                    {"role": "user", "content": self._build_prompt(question, history)}
+                ],
+                parse=lambda text: validate_understanding(text, question),
+                default_deployment=self.model_name,
+                temperature=0.1
+            )
+        except Exception as e:
+            logger.error("Query understanding failed, using rules", error=str(e))
+            return self.rule_based_understanding(question, conversation_history)
+
+        if completion.parsed is None:
+            logger.warning("Query understanding returned invalid JSON, using rules", response=completion.text[:200])
+            return self.rule_based_understanding(question, conversation_history)
+
+        understanding = completion.parsed
+        # The model cannot call a question conversational without something to converse about
+        understanding['conversational'] = understanding['conversational'] and bool(conversation_history)
+        self.cache.put(cache_key, understanding)
+        logger.info("Query understood", category=understanding['category'],
+                    conversational=understanding['conversational'],
+                    job_numbers=understanding['job_numbers'],
+                    keywords=understanding['search_keywords'])
+        return dict(understanding)
+
+    def rule_based_understanding(self, question: str, conversation_history: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Offline understanding from patterns when the model is unavailable or invalid."""
+        question_lower = question.lower().strip()
+        category, reasoning = 'general', 'No rule matched'
+        for rule_category, pattern in CATEGORY_RULES:
+            if pattern.search(question_lower):
+                category, reasoning = rule_category, f"Matched {rule_category} keywords"
+                break
+        if category == 'general' and JOB_NUMBER_PATTERN.search(question_lower):
+            category, reasoning = 'project_search', 'Question contains a job number'
+
+        keywords = [word for word in re.findall(r"[a-z0-9][a-z0-9\-&/]*", question_lower)
+                    if word not in KEYWORD_STOPWORDS and (len(word) > 2 or word.isdigit())]
+        return {
+            'conversational': question_lower in SHORT_CONVERSATIONAL,
+            'category': category,
+            'confidence': 0.6 if category != 'general' else 0.5,
+            'reasoning': reasoning,
+            'job_numbers': extract_job_numbers(question),
+            'years': extract_years(question),
+            'client_name': None,
+            'search_keywords': keywords[:6],
+            'rewritten_query': question,
+            'method': 'rules',
+        }
+
+    def _format_history(self, conversation_history: Optional[List[Dict]]) -> str:
+        """Rolling summary plus the last three turns, truncated - enough to resolve follow-ups and to key the cache."""
+        if not conversation_history:
+            return ""
+        lines = []
+        for turn in recent_history(conversation_history):
+            content = turn.get('content', '')
+            # The rolling summary is already bounded; recent turns are cut to 200 chars
+            lines.append(f"{turn.get('role', 'unknown').upper()}: {content if turn.get('role') == 'system' else content[:200]}")
+        return "\n".join(lines)
+
+    def _build_prompt(self, question: str, history: str) -> str:
+        """Build the single understanding prompt."""
+        return f"""Analyse this question from a DTCE (structural engineering consultancy) employee.
+
+RECENT CONVERSATION:
+{history or "None"}
+
+QUESTION: "{question}"
+
+CATEGORIES:
+- project_search: a specific project by number/name ("Show me project 225001")
+- keyword_project_search: projects by scope/work keywords ("projects with steel portal frames")
+- template_search: document templates ("template for PS1 report")
+- file_analysis: analysing an uploaded document
+- email_search: email correspondence ("emails with client for project 225001")
+- client_info: client contacts/relationships ("Who is the contact for project 225001?")
+- client_project_history: all projects for a client ("What work have we done for NZTA?")
+- scope_based_search: projects matching engineering scope ("seismic strengthening projects")
+- policy: company policies (H&S, HR, wellness)
+- technical_procedures: how-to guides, procedures, best practices
+- nz_standards: NZ engineering standards and codes (NZS 3101)
+- general: anything else
+
+RULES:
+- conversational is true ONLY for reactions to the conversation ("really", "thanks", "ok")
+  that need no new information. Any request for information is false.
+- job_numbers: 6-digit DTCE job numbers mentioned (e.g. "225001"); a 3-digit year code
+  alone ("project 225") is not a job number.
+- years: 4-digit calendar years mentioned or implied ("last year").
+- search_keywords: up to 6 technical/document terms useful for search.
+- rewritten_query: a standalone search query (resolve follow-ups using the conversation).
+
+Respond with JSON only:
+{{
+    "conversational": false,
+    "category": "one of the categories",
+    "confidence": 0.0-1.0,
+    "reasoning": "brief explanation",
+    "job_numbers": [],
+    "years": [],
+    "client_name": null,
+    "search_keywords": [],
+    "rewritten_query": "..."
+}}"""
+
+
+def extract_job_numbers(text: str) -> List[str]:
+    """6-digit job numbers (``225001`` or ``225-001``) in order of appearance."""
+    numbers = []
+    for year_code, sequence in JOB_NUMBER_PATTERN.findall(text):
+        number = year_code + sequence
+        if number not in numbers:
+            numbers.append(number)
+    return numbers
+
+
+def extract_years(text: str) -> List[int]:
+    return sorted({int(year) for year in YEAR_PATTERN.findall(text)})
+
+
+def validate_understanding(text: str, question: str) -> Dict[str, Any]:
+    """Parse and normalise the model's JSON; raises ValueError when it is unusable."""
+    text = text.strip()
+    if text.startswith('```'):
+        text = re.sub(r'^```(?:json)?|```$', '', text).strip()
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+
+    category = data.get('category')
+    if category not in CATEGORIES:
+        raise ValueError(f"unknown category: {category!r}")
+
+    def as_list(value) -> List:
+        return value if isinstance(value, list) else []
+
+    try:
+        confidence = min(max(float(data.get('confidence', 0.7)), 0.0), 1.0)
+    except (TypeError, ValueError):
+        confidence = 0.7
+    job_numbers = [number for number in (str(value).replace('-', '') for value in as_list(data.get('job_numbers')))
+                   if re.fullmatch(r'\d{6}', number)]
+    years = [int(year) for year in as_list(data.get('years')) if re.fullmatch(r'(19|20)\d{2}', str(year))]
+    client_name = data.get('client_name')
+    rewritten_query = data.get('rewritten_query')
+
+    return {
+        'conversational': data.get('conversational') is True,
+        'category': category,
+        'confidence': confidence,
+        'reasoning': str(data.get('reasoning', '')),
+        # Keep numbers the model missed but the question plainly contains
+        'job_numbers': list(dict.fromkeys(job_numbers + extract_job_numbers(question))),
+        'years': sorted(set(years)),
+        'client_name': client_name.strip() if isinstance(client_name, str) and client_name.strip() else None,
+        'search_keywords': [str(keyword).strip() for keyword in as_list(data.get('search_keywords')) if str(keyword).strip()][:6],
+        'rewritten_query': rewritten_query.strip() if isinstance(rewritten_query, str) and rewritten_query.strip() else question,
+        'method': 'ai',
+    }
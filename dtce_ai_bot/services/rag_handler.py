@@ -8,22 +8,29 @@ from typing import List, Dict, Any, Optional
 import structlog
 from azure.search.documents.aio import SearchClient
 from openai import AsyncAzureOpenAI
+from ..integrations.openai_limiter import create_async_openai_client
 from .semantic_search import SemanticSearchService
 from .folder_structure_service import FolderStructureService
 from .query_normalizer import QueryNormalizer
 from .google_docs_service import GoogleDocsService
-from .intent_classifier import IntentClassifier
+from .query_understanding import SHORT_CONVERSATIONAL, QueryUnderstandingService
 from .project_context_service import ProjectContextService
 from .prompt_builder import PromptBuilder
 from .document_formatter import DocumentFormatter
 from .specialized_search_service import SpecializedSearchService
 # from .rag_integration_service import RAGIntegrationService  # Temporarily commented out
 from ..utils.suitefiles_urls import suitefiles_converter
+from ..utils.document_fields import (
+    EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER,
+    is_superseded_path,
+    is_system_path,
+    odata_in,
+    project_number_filter,
+)
 from ..config.settings import Settings
-from ..integrations.azure_search import get_search_client
 from .document_qa import DocumentQAService
 from .azure_rag_service_v2 import AzureRAGService
-from azure.core.credentials import AzureKeyCredential
+from .conversation_store import recent_history
 
 logger = structlog.get_logger(__name__)
 
@@ -41,17 +48,11 @@ class RAGHandler:
             from ..config.settings import get_settings
             settings = get_settings()
         
-        # Use async clients for RAG V2
-        from ..integrations.azure_search import get_search_endpoint
-        search_endpoint = get_search_endpoint()
+        # Callers hand us the shared aio search client - reuse its connection pool
+        # instead of opening a new session per request
+        self.search_client_async = search_client
         
-        self.search_client_async = SearchClient(
-            endpoint=search_endpoint,
-            index_name=settings.azure_search_index_name,
-            credential=AzureKeyCredential(settings.azure_search_admin_key)
-        )
-        
-        self.openai_client_async = AsyncAzureOpenAI(
+        self.openai_client_async = create_async_openai_client(
             azure_endpoint=settings.azure_openai_endpoint,
             api_key=settings.azure_openai_api_key,
             api_version="2024-05-01-preview"
@@ -62,8 +63,18 @@ class RAGHandler:
             search_client=self.search_client_async,
             openai_client=self.openai_client_async,
             model_name=settings.azure_openai_deployment_name,
-            intent_model_name=settings.azure_openai_deployment_name
+            intent_model_name=settings.azure_openai_deployment_name  # Escalation target; the model router tries the mini deployment first
         )
+
+        # Intent-based path (process_rag_query): one query-understanding call feeds the specialized searches
+        self.use_enhanced_rag = False
+        self.query_understanding = QueryUnderstandingService(self.openai_client_async, settings.azure_openai_deployment_name)
+        self.specialized_search_service = SpecializedSearchService(self.search_client_async, self.openai_client_async, model_name)
+        # No LLM query router here: the understanding call already classified the question
+        self.semantic_search = SemanticSearchService(self.search_client_async)
+        self.project_context_service = ProjectContextService()
+        self.document_formatter = DocumentFormatter(self.project_context_service)
+        self.prompt_builder = PromptBuilder()
         logger.info("RAG Handler initialized with Azure RAG V2 (Intent Detection + Hybrid Search + Semantic Ranking)")
 
     def _get_knowledge_base_content(self) -> Optional[str]:
@@ -592,15 +603,14 @@ Respond with JSON:
             # Original RAG processing
             logger.info("Processing question with intent-based approach", question=question)
             
-            # STEP 0: Check if this is a conversational query that doesn't need document search
-            is_conversational = await self._is_conversational_query(question, conversation_history)
+            # STEP 0+1: ONE query-understanding call - conversational flag, intent, job numbers,
+            # client and keywords (replaces the serial conversational/intent/keyword calls)
+            intent_classification = await self.query_understanding.understand(question, conversation_history)
             
-            if is_conversational:
+            if intent_classification['conversational']:
                 logger.info("Detected conversational query - using context instead of search")
                 return await self._handle_conversational_query(question, conversation_history)
             
-            # STEP 1: INTENT CLASSIFICATION - Understand what the user is asking for
-            intent_classification = await self.intent_classifier.classify_intent(question)
             logger.info(f"Intent classified as: {intent_classification['category']}", 
                        confidence=intent_classification.get('confidence', 0),
                        reasoning=intent_classification.get('reasoning', 'No reasoning provided'))
@@ -694,12 +704,17 @@ Respond with JSON:
                 category = 'project_search'
         
         try:
-            # Route to specialized search based on intent
+            # Route to specialized search based on intent, reusing what query understanding extracted
+            job_numbers = intent_classification.get('job_numbers') or []
+            keywords = intent_classification.get('search_keywords')
+            search_query = intent_classification.get('rewritten_query') or question
+            
             if category == 'project_search':
-                return await self.specialized_search_service.execute_project_search(question)
+                return await self.specialized_search_service.execute_project_search(
+                    question, job_numbers[0] if job_numbers else None)
             
             elif category == 'keyword_project_search':
-                return await self.specialized_search_service.execute_keyword_project_search(question)
+                return await self.specialized_search_service.execute_keyword_project_search(question, keywords)
             
             elif category == 'template_search':
                 return await self.specialized_search_service.execute_template_search(question)
@@ -708,27 +723,29 @@ Respond with JSON:
                 return await self.specialized_search_service.execute_email_search(question)
             
             elif category == 'client_info':
-                return await self.specialized_search_service.execute_client_info_search(question)
+                return await self.specialized_search_service.execute_client_info_search(
+                    question, intent_classification.get('client_name'))
             
             elif category == 'client_project_history':
                 # For client project history, we use keyword search with client focus
-                return await self.specialized_search_service.execute_keyword_project_search(question)
+                client_name = intent_classification.get('client_name')
+                client_keywords = ([client_name] if client_name else []) + (keywords or [])
+                return await self.specialized_search_service.execute_keyword_project_search(question, client_keywords)
             
             elif category == 'scope_based_search':
-                return await self.specialized_search_service.execute_scope_based_search(question)
+                return await self.specialized_search_service.execute_scope_based_search(question, keywords)
             
             else:
                 # For general, policy, technical_procedures, nz_standards - use existing semantic search
-                normalized_query = self._create_consistent_search_query(question)
-                documents = await self.semantic_search.search_documents(normalized_query, None)
+                documents = await self.semantic_search.search_documents(search_query, None)
                 return documents, f"semantic_search_{category}"
                 
         except Exception as e:
             logger.error("Intent-based search failed", error=str(e), intent=category)
             # Fallback to general semantic search
             try:
-                normalized_query = self._create_consistent_search_query(question)
-                documents = await self.semantic_search.search_documents(normalized_query, None)
+                documents = await self.semantic_search.search_documents(
+                    intent_classification.get('rewritten_query') or question, None)
                 return documents, "fallback_semantic_search"
             except Exception as fallback_error:
                 logger.error("Fallback search also failed", error=str(fallback_error))
@@ -1308,7 +1325,7 @@ Please try rephrasing your question or contact support if the issue persists."""
             search_params = {
                 'search_text': search_query,
                 'top': 20,
-                'select': ["id", "filename", "content", "blob_url", "project_name", "folder"]
+                'select': ["id", "filename", "content", "blob_url", "project_name", "folder", "blob_name", "is_superseded"]
             }
             
             # Add semantic search configuration for better intent understanding
@@ -1324,40 +1341,30 @@ Please try rephrasing your question or contact support if the issue persists."""
             # Build filters
             filters = []
             
-            # Add exclusion filter for superseded/archive/trash/photos folders
-            excluded_filter = "(not search.ismatch('*superseded*', 'filename')) and (not search.ismatch('*superceded*', 'filename')) and (not search.ismatch('*archive*', 'filename')) and (not search.ismatch('*trash*', 'filename')) and (not search.ismatch('*photos*', 'filename'))"
-            filters.append(excluded_filter)
-            logger.info("Added exclusion filter for superseded folders")
+            # Exclude superseded/archive and trash/temp/photos documents via ingest-time flags
+            filters.append(EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER)
             
             # Add document type filter if specified
             if doc_types:
-                doc_filter = ' or '.join([f"search.ismatch('*.{ext}', 'filename')" for ext in doc_types])
-                filters.append(f"({doc_filter})")
+                doc_filter = odata_in('file_extension', [ext.lstrip('.').lower() for ext in doc_types])
+                filters.append(doc_filter)
                 logger.info("Added document type filter", filter=doc_filter)
             
             # Add project filter if specified - CRITICAL for project-specific searches
             if project_filter:
                 # Extract just the number from project filter (e.g., "224" from "project 224")
-                import re
                 project_number_match = re.search(r'\d+', project_filter)
                 if project_number_match:
                     project_number = project_number_match.group()
                     
-                    # Create EXTREMELY STRICT filter to prevent partial matches
-                    # For project "224": should match "224xxx-" or "/224/" but NOT "221241" or "223154"
-                    if len(project_number) == 3:
-                        # For 3-digit projects, only match at start of filename or in exact folder structure
-                        # Match patterns: "224xxx-", "/224/", "/Projects/224/"
-                        project_filter_query = f"(search.ismatch('*/Projects/{project_number}/*', 'blob_url') or search.ismatch('*/{project_number}/*', 'blob_url') or search.ismatch('{project_number}???-*', 'filename'))"
-                    elif len(project_number) == 6:
-                        # For 6-digit projects, match at start of filename or exact folder
-                        project_filter_query = f"(search.ismatch('*/{project_number}/*', 'blob_url') or search.ismatch('{project_number}-*', 'filename') or search.ismatch('{project_number}_*', 'filename'))"
-                    else:
-                        # For other lengths, be more permissive
+                    # 6-digit job number -> project_number eq, 3-digit year code -> year_code eq
+                    project_filter_query = project_number_filter(project_number)
+                    if not project_filter_query:
+                        # For other lengths, fall back to a path match
                         project_filter_query = f"(search.ismatch('*/{project_number}/*', 'blob_url') or search.ismatch('{project_number}*', 'filename'))"
                     
                     filters.append(project_filter_query)
-                    logger.info("Added ultra-precise project filter", project_number=project_number, project_length=len(project_number), filter=project_filter_query)
+                    logger.info("Added project filter", project_number=project_number, filter=project_filter_query)
             
             # Combine filters with AND logic
             if filters:
@@ -1365,62 +1372,16 @@ Please try rephrasing your question or contact support if the issue persists."""
             
             # Try semantic search first, fallback to keyword if it fails
             try:
-                results = self.search_client.search(**search_params)
-                documents = [dict(result) for result in results]
+                results = await self.search_client.search(**search_params)
+                documents = [dict(result) async for result in results]
                 
                 logger.info("Search completed successfully", 
                            search_type="semantic" if use_semantic else "keyword",
                            documents_found=len(documents),
                            filenames=[doc.get('filename', 'Unknown') for doc in documents[:5]])
                 
-                # Apply AGGRESSIVE filtering for superseded/archive documents
-                filtered_documents = []
-                for doc in documents:
-                    blob_name = doc.get('blob_name', '') or doc.get('filename', '')
-                    blob_url = doc.get('blob_url', '') or ''
-                    content = doc.get('content', '')
-                    filename = doc.get('filename', '')
-                    
-                    # Filter out ONLY true phantom/stub documents (much more specific criteria)
-                    is_phantom = False
-                    if content and len(content) < 50:  # Only check very short content
-                        # Check if content is EXACTLY just "Document: filename.pdf" (true phantom document)
-                        expected_stub = f"Document: {filename}"
-                        if content.strip() == expected_stub:
-                            is_phantom = True
-                            logger.info("EXCLUDED true phantom/stub document", 
-                                      filename=filename, 
-                                      content_length=len(content),
-                                      content_sample=content[:50])
-                    # NOTE: Real documents with short content (like policy docs) should NOT be filtered out
-                    
-                    # Check multiple fields and variations for superseded content
-                    superseded_patterns = [
-                        'superseded', 'superceded', 'archive', 'archived', 'obsolete', 
-                        'deprecated', 'old', 'backup', 'temp', 'temporary', 'draft', 
-                        'drafts', 'trash', 'deleted', 'recycle', 'legacy', 'photos'
-                    ]
-                    
-                    is_superseded = False
-                    for pattern in superseded_patterns:
-                        if (pattern.lower() in blob_name.lower() or 
-                            pattern.lower() in blob_url.lower() or
-                            pattern.capitalize() in blob_name or
-                            pattern.capitalize() in blob_url or
-                            pattern.upper() in blob_name or
-                            pattern.upper() in blob_url):
-                            is_superseded = True
-                            logger.info("EXCLUDED superseded document", 
-                                      filename=doc.get('filename'), 
-                                      blob_name=blob_name,
-                                      pattern_found=pattern)
-                            break
-                    
-                    if not is_superseded and not is_phantom:
-                        filtered_documents.append(doc)
-                
-                documents = filtered_documents
-                logger.info("After aggressive superseded filtering", documents_remaining=len(documents))
+                documents = self._drop_stub_and_superseded(documents)
+                logger.info("After superseded filtering", documents_remaining=len(documents))
                 
             except Exception as semantic_error:
                 if use_semantic:
@@ -1433,56 +1394,10 @@ Please try rephrasing your question or contact support if the issue persists."""
                     search_params.pop('query_caption', None)
                     search_params.pop('query_answer', None)
                     
-                    results = self.search_client.search(**search_params)
-                    documents = [dict(result) for result in results]
-                    
-                    # Apply AGGRESSIVE filtering for superseded/archive documents (fallback)
-                    filtered_documents = []
-                    for doc in documents:
-                        blob_name = doc.get('blob_name', '') or doc.get('filename', '')
-                        blob_url = doc.get('blob_url', '') or ''
-                        content = doc.get('content', '')
-                        filename = doc.get('filename', '')
-                        
-                        # Filter out ONLY true phantom/stub documents (much more specific criteria)
-                        is_phantom = False
-                        if content and len(content) < 50:  # Only check very short content
-                            # Check if content is EXACTLY just "Document: filename.pdf" (true phantom document)
-                            expected_stub = f"Document: {filename}"
-                            if content.strip() == expected_stub:
-                                is_phantom = True
-                                logger.info("EXCLUDED true phantom/stub document (fallback)", 
-                                          filename=filename, 
-                                          content_length=len(content),
-                                          content_sample=content[:50])
-                        # NOTE: Real documents with short content (like policy docs) should NOT be filtered out
-                        
-                        # Check multiple fields and variations for superseded content
-                        superseded_patterns = [
-                            'superseded', 'superceded', 'archive', 'archived', 'obsolete', 
-                            'deprecated', 'old', 'backup', 'temp', 'temporary', 'draft', 
-                            'drafts', 'trash', 'deleted', 'recycle', 'legacy', 'photos'
-                        ]
-                        
-                        is_superseded = False
-                        for pattern in superseded_patterns:
-                            if (pattern.lower() in blob_name.lower() or 
-                                pattern.lower() in blob_url.lower() or
-                                pattern.capitalize() in blob_name or
-                                pattern.capitalize() in blob_url or
-                                pattern.upper() in blob_name or
-                                pattern.upper() in blob_url):
-                                is_superseded = True
-                                logger.info("EXCLUDED superseded document (fallback)", 
-                                          filename=doc.get('filename'), 
-                                          blob_name=blob_name,
-                                          pattern_found=pattern)
-                                break
-                        
-                        if not is_superseded and not is_phantom:
-                            filtered_documents.append(doc)
+                    results = await self.search_client.search(**search_params)
+                    documents = [dict(result) async for result in results]
                     
-                    documents = filtered_documents
+                    documents = self._drop_stub_and_superseded(documents)
                     
                     logger.info("Keyword search fallback completed", 
                                documents_found=len(documents),
@@ -1496,6 +1411,31 @@ Please try rephrasing your question or contact support if the issue persists."""
             logger.error("Document search failed", error=str(e), search_query=search_query)
             return []
     
+    def _drop_stub_and_superseded(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Drop phantom "Document: <filename>" stubs, plus superseded/system files on
+        rows indexed before the is_superseded/is_system_file flags existed (the
+        search filter already excludes flagged rows).
+        """
+        kept = []
+        for doc in documents:
+            filename = doc.get('filename', '')
+            content = doc.get('content', '')
+            
+            # Only true phantom/stub documents; real documents with short content are kept
+            if content and len(content) < 50 and content.strip() == f"Document: {filename}":
+                logger.info("EXCLUDED true phantom/stub document", filename=filename, content_length=len(content))
+                continue
+            
+            if doc.get('is_superseded') is None:
+                path = doc.get('blob_name') or filename
+                if is_superseded_path(path) or is_system_path(path):
+                    logger.info("EXCLUDED superseded document (unflagged row)", filename=filename, blob_name=path)
+                    continue
+            
+            kept.append(doc)
+        return kept
+    
     def _get_safe_suitefiles_url(self, blob_url: str, link_type: str = "file") -> Optional[str]:
         """Get SuiteFiles URL or None if conversion fails."""
         if not blob_url:
@@ -1814,13 +1754,7 @@ Please provide a comprehensive answer using the documents above, and include pro
         question_lower = question.lower().strip()
         
         # Very short conversational responses
-        short_conversational = [
-            'really', 'ok', 'okay', 'thanks', 'thank you', 'yes', 'no', 'yeah', 'sure',
-            'got it', 'i see', 'right', 'correct', 'true', 'false', 'good', 'great',
-            'nice', 'cool', 'wow', 'hmm', 'ah', 'oh', 'what', 'why', 'how come'
-        ]
-        
-        if question_lower in short_conversational:
+        if question_lower in SHORT_CONVERSATIONAL:
             return True
         
         # If no conversation history, everything else is informational
@@ -1876,10 +1810,13 @@ Answer with just: CONVERSATIONAL or INFORMATIONAL"""
             return "No previous conversation"
         
         formatted = []
-        for turn in conversation_history[-3:]:  # Last 3 turns for context
+        for turn in recent_history(conversation_history):  # Rolling summary + last 3 turns
             role = turn.get('role', 'unknown')
             content = turn.get('content', '')
-            formatted.append(f"{role.upper()}: {content[:200]}...")  # Truncate long messages
+            if role == 'system':
+                formatted.append(f"{role.upper()}: {content}")  # The summary is already bounded
+            else:
+                formatted.append(f"{role.upper()}: {content[:200]}...")  # Truncate long messages
         
         return "\n".join(formatted)
     
@@ -2430,13 +2367,13 @@ Respond with JSON:
             enhanced_query = f"{question} {folder_filter}"
             
             # Use the search client to find relevant documents
-            search_results = self.search_client.search(
+            search_results = await self.search_client.search(
                 search_text=enhanced_query,
                 top=10,
                 include_total_count=True
             )
             
-            return list(search_results)
+            return [result async for result in search_results]
             
         except Exception as e:
             logger.error("Targeted search failed", error=str(e))
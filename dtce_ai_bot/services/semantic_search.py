@@ -9,6 +9,7 @@ import structlog
 from azure.search.documents import SearchClient
 from openai import AsyncAzureOpenAI
 from .intelligent_query_router import IntelligentQueryRouter, SearchCategory
+from ..utils.document_fields import EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER
 
 logger = structlog.get_logger(__name__)
 
@@ -143,13 +144,8 @@ class SemanticSearchService:
         """Build basic filters that work with Azure Search limitations."""
         filters = []
         
-        # Basic exclusions using filename (which is searchable)
-        filters.extend([
-            "not search.ismatch('*superseded*', 'filename')",
-            "not search.ismatch('*superceded*', 'filename')", 
-            "not search.ismatch('*archive*', 'filename')",
-            "not search.ismatch('*trash*', 'filename')"
-        ])
+        # Superseded / archive / trash exclusions via the flags stored at ingest
+        filters.append(EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER)
         
         # Add project filter if specified
         if project_filter and not ('search.ismatch' in project_filter or 'and' in project_filter):
@@ -210,12 +206,7 @@ class SemanticSearchService:
         }
         
         # Simple, reliable filters - just exclude superseded files and apply project filter
-        filters = [
-            "not search.ismatch('*superseded*', 'filename')",
-            "not search.ismatch('*superceded*', 'filename')",
-            "not search.ismatch('*archive*', 'filename')",
-            "not search.ismatch('*trash*', 'filename')"
-        ]
+        filters = [EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER]
         
         # Add project filter if specified (simple project name)
         if project_filter and not ('search.ismatch' in project_filter or 'and' in project_filter):
@@ -264,14 +255,7 @@ class SemanticSearchService:
         filters = []
         
         # Always exclude superseded/archive folders
-        base_exclusions = [
-            "(not search.ismatch('*superseded*', 'filename'))",
-            "(not search.ismatch('*superceded*', 'filename'))", 
-            "(not search.ismatch('*archive*', 'filename'))",
-            "(not search.ismatch('*trash*', 'filename'))",
-            "(not search.ismatch('*photos*', 'filename'))"
-        ]
-        filters.extend(base_exclusions)
+        filters.append(f"({EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER})")
         
         # Add project filter if specified
         if project_filter:
@@ -7,12 +7,21 @@ Single Responsibility: Handle specialized search operations for different intent
 import re
 from typing import List, Dict, Any, Optional, Tuple
 import structlog
-from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient
 from openai import AsyncAzureOpenAI
 
+from ..integrations.model_router import get_model_router
+from ..utils.document_fields import EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER, project_number_filter
+
 logger = structlog.get_logger(__name__)
 
 
+def _parse_term_list(text: str) -> Optional[List[str]]:
+    """Comma-separated model output as a list; None (escalate) when nothing usable came back."""
+    terms = [term.strip() for term in text.split(',') if term.strip()]
+    return terms or None
+
+
 class SpecializedSearchService:
     """
     Responsible for executing specialized searches based on classified user intent.
@@ -43,18 +52,21 @@ class SpecializedSearchService:
             if project_number:
                 logger.info(f"Searching for specific project: {project_number}")
                 
-                # Search with exact project number
+                # Search with exact project number (6-digit job -> project_number, 3-digit -> year_code)
                 search_query = f"project {project_number}"
-                filter_expr = f"blob_name eq '*{project_number}*'"
+                filter_expr = EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER
+                project_filter = project_number_filter(project_number.replace('-', ''))
+                if project_filter:
+                    filter_expr = f"{project_filter} and {filter_expr}"
                 
-                results = self.search_client.search(
+                results = await self.search_client.search(
                     search_text=search_query,
                     filter=filter_expr,
                     top=10,
                     search_mode="all"
                 )
                 
-                documents = list(results)
+                documents = [doc async for doc in results]
                 return documents, f"project_specific_search_{project_number}"
             
             # Fallback to general project search
@@ -64,32 +76,34 @@ class SpecializedSearchService:
             logger.error("Project search failed", error=str(e))
             return [], "project_search_failed"
     
-    async def execute_keyword_project_search(self, question: str) -> Tuple[List[Dict], str]:
+    async def execute_keyword_project_search(self, question: str, keywords: Optional[List[str]] = None) -> Tuple[List[Dict], str]:
         """
         Execute a keyword-based search for projects with similar scope.
         
         Args:
             question: The user's question containing keywords
+            keywords: Keywords already extracted by query understanding, if available
             
         Returns:
             Tuple of (documents, search_strategy_used)
         """
         try:
             # Extract engineering keywords
-            keywords = await self._extract_engineering_keywords(question)
+            if not keywords:
+                keywords = await self._extract_engineering_keywords(question)
             logger.info(f"Searching projects with keywords: {keywords}")
             
             # Build search query emphasizing scope and technical terms
             search_query = " OR ".join(keywords) if keywords else question
             
-            results = self.search_client.search(
+            results = await self.search_client.search(
                 search_text=search_query,
                 top=15,
                 search_mode="any",
                 query_type="semantic"
             )
             
-            documents = list(results)
+            documents = [doc async for doc in results]
             return documents, f"keyword_project_search_{len(keywords)}_terms"
             
         except Exception as e:
@@ -115,13 +129,13 @@ class SpecializedSearchService:
             template_terms = ["template", "format", "example", "standard", doc_type] if doc_type else ["template", "format"]
             search_query = " OR ".join(template_terms)
             
-            results = self.search_client.search(
+            results = await self.search_client.search(
                 search_text=search_query,
                 top=12,
                 search_mode="any"
             )
             
-            documents = list(results)
+            documents = [doc async for doc in results]
             return documents, f"template_search_{doc_type or 'general'}"
             
         except Exception as e:
@@ -152,25 +166,26 @@ class SpecializedSearchService:
                 
             search_query = " AND ".join(email_terms[:3])  # Limit to avoid over-complexity
             
-            results = self.search_client.search(
+            results = await self.search_client.search(
                 search_text=search_query,
                 top=10,
                 search_mode="all"
             )
             
-            documents = list(results)
+            documents = [doc async for doc in results]
             return documents, f"email_search_{context.get('type', 'general')}"
             
         except Exception as e:
             logger.error("Email search failed", error=str(e))
             return [], "email_search_failed"
     
-    async def execute_client_info_search(self, question: str) -> Tuple[List[Dict], str]:
+    async def execute_client_info_search(self, question: str, client_name: Optional[str] = None) -> Tuple[List[Dict], str]:
         """
         Execute a search for client information and contacts.
         
         Args:
             question: The user's question about client info
+            client_name: Client already extracted by query understanding, if available
             
         Returns:
             Tuple of (documents, search_strategy_used)
@@ -178,6 +193,8 @@ class SpecializedSearchService:
         try:
             # Extract client name/project context
             client_context = await self._extract_client_context(question)
+            if client_name:
+                client_context['client_name'] = client_name
             logger.info(f"Searching client info: {client_context}")
             
             # Build comprehensive search for contact information
@@ -211,18 +228,18 @@ class SpecializedSearchService:
             if project_filter:
                 search_params["filter"] = project_filter
             
-            results = self.search_client.search(**search_params)
-            documents = list(results)
+            results = await self.search_client.search(**search_params)
+            documents = [doc async for doc in results]
             
             # If no results with semantic search, try keyword approach
             if not documents and client_context.get('project'):
                 keyword_query = f"contact AND {client_context['project']}"
-                results = self.search_client.search(
+                results = await self.search_client.search(
                     search_text=keyword_query,
                     top=8,
                     search_mode="all"
                 )
-                documents = list(results)
+                documents = [doc async for doc in results]
             
             return documents, f"client_info_search_{client_context.get('client_name', 'unknown')}"
             
@@ -230,32 +247,34 @@ class SpecializedSearchService:
             logger.error("Client info search failed", error=str(e))
             return [], "client_info_search_failed"
     
-    async def execute_scope_based_search(self, question: str) -> Tuple[List[Dict], str]:
+    async def execute_scope_based_search(self, question: str, scope_terms: Optional[List[str]] = None) -> Tuple[List[Dict], str]:
         """
         Execute a search for projects with specific engineering scope.
         
         Args:
             question: The user's question about specific scope
+            scope_terms: Scope terms already extracted by query understanding, if available
             
         Returns:
             Tuple of (documents, search_strategy_used)
         """
         try:
             # Extract engineering scope keywords
-            scope_terms = await self._extract_scope_terms(question)
+            if not scope_terms:
+                scope_terms = await self._extract_scope_terms(question)
             logger.info(f"Searching by engineering scope: {scope_terms}")
             
             # Build scope-focused search
             search_query = " OR ".join(scope_terms) if scope_terms else question
             
-            results = self.search_client.search(
+            results = await self.search_client.search(
                 search_text=search_query,
                 top=15,
                 search_mode="any",
                 query_type="semantic"
             )
             
-            documents = list(results)
+            documents = [doc async for doc in results]
             return documents, f"scope_search_{len(scope_terms)}_terms"
             
         except Exception as e:
@@ -306,8 +325,9 @@ class SpecializedSearchService:
     async def _extract_engineering_keywords(self, question: str) -> List[str]:
         """Extract engineering-specific keywords using AI assistance."""
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=self.model_name,
+            completion = await get_model_router().chat(
+                self.openai_client,
+                "keyword_extraction",
                 messages=[
                     {
                         "role": "system",
@@ -318,12 +338,13 @@ class SpecializedSearchService:
                         "content": f"Question: {question}"
                     }
                 ],
+                parse=_parse_term_list,
+                default_deployment=self.model_name,
                 max_tokens=100,
                 temperature=0.1
             )
             
-            keywords_text = response.choices[0].message.content.strip()
-            keywords = [k.strip() for k in keywords_text.split(',') if k.strip()]
+            keywords = completion.parsed or []
             return keywords[:5]  # Limit to 5 most relevant terms
             
         except Exception as e:
@@ -386,8 +407,9 @@ class SpecializedSearchService:
     async def _extract_scope_terms(self, question: str) -> List[str]:
         """Extract engineering scope terms from question."""
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=self.model_name,
+            completion = await get_model_router().chat(
+                self.openai_client,
+                "keyword_extraction",
                 messages=[
                     {
                         "role": "system",
@@ -398,12 +420,13 @@ class SpecializedSearchService:
                         "content": f"Question: {question}"
                     }
                 ],
+                parse=_parse_term_list,
+                default_deployment=self.model_name,
                 max_tokens=150,
                 temperature=0.1
             )
             
-            scope_text = response.choices[0].message.content.strip()
-            scope_terms = [s.strip() for s in scope_text.split(',') if s.strip()]
+            scope_terms = completion.parsed or []
             return scope_terms[:6]
             
         except Exception as e:
@@ -413,13 +436,13 @@ class SpecializedSearchService:
     async def _general_project_search(self, question: str) -> Tuple[List[Dict], str]:
         """General project search when specific project number not found."""
         try:
-            results = self.search_client.search(
+            results = await self.search_client.search(
                 search_text=question,
                 top=10,
                 query_type="semantic"
             )
             
-            documents = list(results)
+            documents = [doc async for doc in results]
             return documents, "general_project_search"
             
         except Exception as e:
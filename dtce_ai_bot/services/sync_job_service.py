@@ -1,6 +1,9 @@
 """
 Async sync job service for handling long-running document synchronization.
 Implements background job processing with progress tracking.
+
+Jobs are written through to the cross-process shared state, so any worker can
+report on or cancel a job that another worker is running.
 """
 
 import asyncio
@@ -14,7 +17,9 @@ import threading
 from ..models.sync_job import SyncJob, SyncJobStatus, SyncJobProgress, SyncJobResult, SyncJobRequest
 from ..integrations.microsoft_graph import MicrosoftGraphClient
 from ..services.document_sync_service import get_document_sync_service
-from azure.storage.blob import BlobServiceClient
+from ..integrations.azure_storage import get_async_storage_client
+from ..integrations.shared_clients import close_shared_clients
+from ..integrations.shared_state import SharedState, get_shared_state
 
 logger = structlog.get_logger(__name__)
 
@@ -22,11 +27,30 @@ logger = structlog.get_logger(__name__)
 class SyncJobService:
     """Service for managing async document sync jobs."""
     
-    def __init__(self):
-        self.jobs: Dict[str, SyncJob] = {}
+    NAMESPACE = "sync_jobs"
+    
+    def __init__(self, state: Optional[SharedState] = None, job_ttl_seconds: Optional[float] = None):
+        self.jobs: Dict[str, SyncJob] = {}  # Jobs created or run by this process
+        self.state = state or get_shared_state()
+        self.job_ttl_seconds = job_ttl_seconds
         self.executor = ThreadPoolExecutor(max_workers=2)  # Limit concurrent syncs
         self._lock = threading.Lock()
     
+    def _save(self, job: SyncJob) -> None:
+        """Publish the job's current state to the other workers."""
+        try:
+            self.state.set(self.NAMESPACE, job.job_id, job.model_dump(mode="json"), ttl=self.job_ttl_seconds)
+        except Exception as e:
+            logger.warning("Failed to save sync job to shared state", job_id=job.job_id, error=str(e))
+    
+    def _load(self, job_id: str) -> Optional[SyncJob]:
+        try:
+            data = self.state.get(self.NAMESPACE, job_id)
+        except Exception as e:
+            logger.warning("Failed to load sync job from shared state", job_id=job_id, error=str(e))
+            return None
+        return SyncJob.model_validate(data) if data else None
+    
     def create_job(self, request: SyncJobRequest) -> SyncJob:
         """Create a new sync job."""
         job_id = str(uuid.uuid4())
@@ -41,26 +65,39 @@ class SyncJobService:
         
         with self._lock:
             self.jobs[job_id] = job
+        self._save(job)
         
         logger.info("Created sync job", job_id=job_id, path=request.path)
         return job
     
     def get_job(self, job_id: str) -> Optional[SyncJob]:
-        """Get a sync job by ID."""
+        """Get a sync job by ID (this process's copy, else the shared one)."""
         with self._lock:
-            return self.jobs.get(job_id)
+            job = self.jobs.get(job_id)
+        return job or self._load(job_id)
     
     def list_jobs(self, limit: int = 50) -> List[SyncJob]:
         """List recent sync jobs."""
+        try:
+            jobs = {job_id: SyncJob.model_validate(data) for job_id, data in self.state.values(self.NAMESPACE).items()}
+        except Exception as e:
+            logger.warning("Failed to list sync jobs from shared state", error=str(e))
+            jobs = {}
         with self._lock:
-            jobs = list(self.jobs.values())
+            jobs.update(self.jobs)
+        jobs = list(jobs.values())
         
         # Sort by creation time, newest first
         jobs.sort(key=lambda x: x.created_at, reverse=True)
         return jobs[:limit]
     
-    def start_job(self, job_id: str, graph_client: MicrosoftGraphClient, storage_client: BlobServiceClient):
-        """Start executing a sync job in the background."""
+    def start_job(self, job_id: str, graph_client: MicrosoftGraphClient):
+        """
+        Start executing a sync job in the background.
+        
+        The job runs on its own event loop in a worker thread, so it opens its own
+        aio storage client there instead of borrowing one bound to the caller's loop.
+        """
         job = self.get_job(job_id)
         if not job:
             raise ValueError(f"Job {job_id} not found")
@@ -71,9 +108,12 @@ class SyncJobService:
         # Update job status
         job.status = SyncJobStatus.RUNNING
         job.started_at = datetime.utcnow()
+        with self._lock:
+            self.jobs[job_id] = job
+        self._save(job)
         
         # Start the job in background
-        future = self.executor.submit(self._run_sync_job, job_id, graph_client, storage_client)
+        future = self.executor.submit(self._run_sync_job, job_id, graph_client)
         
         logger.info("Started sync job", job_id=job_id)
         return future
@@ -87,12 +127,13 @@ class SyncJobService:
         if job.status == SyncJobStatus.RUNNING:
             job.status = SyncJobStatus.CANCELLED
             job.completed_at = datetime.utcnow()
+            self._save(job)
             logger.info("Cancelled sync job", job_id=job_id)
             return True
         
         return False
     
-    def _run_sync_job(self, job_id: str, graph_client: MicrosoftGraphClient, storage_client: BlobServiceClient):
+    def _run_sync_job(self, job_id: str, graph_client: MicrosoftGraphClient):
         """Execute the sync job with progress tracking using centralized sync service."""
         job = self.get_job(job_id)
         if not job:
@@ -103,6 +144,10 @@ class SyncJobService:
             
             # Create progress callback to update job status
             def progress_callback(progress_data: dict):
+                if job.status != SyncJobStatus.CANCELLED:
+                    shared = self._load(job_id)  # Another worker may have cancelled it
+                    if shared is not None and shared.status == SyncJobStatus.CANCELLED:
+                        job.status, job.completed_at = shared.status, shared.completed_at
                 if job.status == SyncJobStatus.CANCELLED:
                     return
                 
@@ -117,14 +162,21 @@ class SyncJobService:
                 # Add log messages
                 if "message" in progress_data:
                     job.logs.append(progress_data["message"])
+                self._save(job)
             
             # Use centralized sync service
-            sync_service = get_document_sync_service(storage_client)
-            sync_result = asyncio.run(sync_service.sync_documents(
-                graph_client=graph_client,
-                path=job.path,
-                progress_callback=progress_callback
-            ))
+            async def run_sync():
+                try:
+                    sync_service = get_document_sync_service(await get_async_storage_client())
+                    return await sync_service.sync_documents(
+                        graph_client=graph_client,
+                        path=job.path,
+                        progress_callback=progress_callback
+                    )
+                finally:
+                    await close_shared_clients()
+            
+            sync_result = asyncio.run(run_sync())
             
             # Update job progress counts
             job.progress.successful_files = sync_result.synced_count - sync_result.error_count
@@ -146,6 +198,7 @@ class SyncJobService:
             job.completed_at = datetime.utcnow()
             job.result = job_result
             job.progress.percentage = 100.0
+            self._save(job)
             
             logger.info("Completed sync job", 
                        job_id=job_id, 
@@ -158,6 +211,7 @@ class SyncJobService:
             job.completed_at = datetime.utcnow()
             job.error_message = str(e)
             job.logs.append(f"ERROR: {str(e)}")
+            self._save(job)
 # Global service instance
 _sync_job_service = None
 
@@ -165,5 +219,6 @@ def get_sync_job_service() -> SyncJobService:
     """Get the global sync job service instance."""
     global _sync_job_service
     if _sync_job_service is None:
-        _sync_job_service = SyncJobService()
+        from ..config.settings import get_settings
+        _sync_job_service = SyncJobService(job_ttl_seconds=get_settings().sync_job_ttl_seconds)
     return _sync_job_service
@@ -0,0 +1,149 @@
+"""
+Answer cache for the RAG pipeline.
+
+Policy / procedure FAQs are asked over and over in slightly different words;
+each one used to run intent → embed → search → synthesis. Answers are cached
+per search scope (the intent filter) and looked up
+
+* exactly, by normalized question text, then
+* semantically, by cosine similarity of the question embedding above a strict
+  threshold (same scope only).
+
+The whole cache is dropped when the index version changes (see
+``index_version``), and entries also expire after ``ttl_seconds``.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, punctuation-free, single-spaced form used as the exact-match key."""
+    return re.sub(r'\s+', ' ', re.sub(r'[^a-z0-9]+', ' ', question.lower())).strip()
+
+
+@dataclass
+class CachedAnswer:
+    response: Dict[str, Any]
+    embedding: Optional[np.ndarray]  # unit-length, so dot product == cosine similarity
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+class AnswerCache:
+    """LRU of answers keyed by (scope, normalized question), invalidated by index version."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 86400, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[Tuple[str, str], CachedAnswer]" = OrderedDict()
+        self._index_version: Optional[str] = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def lookup(self, question: str, scope: Optional[str], index_version: str,
+               embedding: Optional[List[float]] = None) -> Optional[Tuple[Dict[str, Any], str, float]]:
+        """
+        Cached response for the question, or None.
+
+        Returns ``(response, match, similarity)`` where match is 'exact' or 'semantic'.
+        """
+        self._check_version(index_version)
+        scope = scope or ""
+        now = time.time()
+
+        key = (scope, normalize_question(question))
+        entry = self._entries.get(key)
+        if entry is not None and not self._expired(key, entry, now):
+            return self._hit(key, entry, 'exact', 1.0)
+
+        if embedding:
+            vector = self._unit(embedding)
+            best_key, best_similarity = None, self.similarity_threshold
+            for candidate_key, candidate in list(self._entries.items()):
+                if candidate_key[0] != scope or candidate.embedding is None or self._expired(candidate_key, candidate, now):
+                    continue
+                similarity = float(np.dot(vector, candidate.embedding))
+                if similarity >= best_similarity:
+                    best_key, best_similarity = candidate_key, similarity
+            if best_key is not None:
+                return self._hit(best_key, self._entries[best_key], 'semantic', best_similarity)
+
+        self.misses += 1
+        return None
+
+    def store(self, question: str, scope: Optional[str], index_version: str, response: Dict[str, Any],
+              embedding: Optional[List[float]] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        self._check_version(index_version)
+        key = (scope or "", normalize_question(question))
+        self._entries[key] = CachedAnswer(response=response, embedding=self._unit(embedding) if embedding else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'index_version': self._index_version,
+            'exact_hits': self.exact_hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def _check_version(self, index_version: str) -> None:
+        if index_version != self._index_version:
+            self._entries.clear()
+            self._index_version = index_version
+
+    def _expired(self, key: Tuple[str, str], entry: CachedAnswer, now: float) -> bool:
+        if now - entry.created_at <= self.ttl_seconds:
+            return False
+        del self._entries[key]
+        return True
+
+    def _hit(self, key: Tuple[str, str], entry: CachedAnswer, match: str, similarity: float):
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        if match == 'exact':
+            self.exact_hits += 1
+        else:
+            self.semantic_hits += 1
+        return entry.response, match, similarity
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide answer cache configured from settings."""
+    global _answer_cache
+    if _answer_cache is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        _answer_cache = AnswerCache(
+            max_entries=settings.answer_cache_entries,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            similarity_threshold=settings.answer_cache_similarity_threshold,
+        )
+    return _answer_cache
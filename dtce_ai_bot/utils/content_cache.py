@@ -0,0 +1,95 @@
+"""
+In-process LRU of full document content, keyed by search document id.
+
+Two-phase retrieval fetches candidates without their ``content`` field and
+hydrates only the handful the answer is built from; hot documents (policies,
+templates, the project everyone is asking about) are served from here instead
+of being pulled from Azure Search again. Entries expire after ``ttl_seconds``
+so a reindexed document is picked up without a restart.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+# Documents longer than this are not cached (they would evict dozens of normal ones)
+MAX_CACHED_DOCUMENT_CHARS = 500_000
+
+
+class DocumentContentCache:
+    """Bounded LRU (entry count and total characters) with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 512, max_total_chars: int = 50_000_000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.max_total_chars = max_total_chars
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._total_chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, document_id: str) -> Optional[str]:
+        entry = self._entries.get(document_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            if entry is not None:
+                self._evict(document_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(document_id)
+        self.hits += 1
+        return entry[1]
+
+    def get_many(self, document_ids: Iterable[str]) -> Dict[str, str]:
+        """Cached content for whichever of ``document_ids`` are present."""
+        found = {}
+        for document_id in document_ids:
+            content = self.get(document_id)
+            if content is not None:
+                found[document_id] = content
+        return found
+
+    def put(self, document_id: str, content: str) -> None:
+        if self.max_entries <= 0 or len(content) > MAX_CACHED_DOCUMENT_CHARS:
+            return
+        if document_id in self._entries:
+            self._evict(document_id)
+        self._entries[document_id] = (time.monotonic(), content)
+        self._total_chars += len(content)
+
+        while self._entries and (len(self._entries) > self.max_entries or self._total_chars > self.max_total_chars):
+            self._evict(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._total_chars = 0
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'total_chars': self._total_chars,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _evict(self, document_id: str) -> None:
+        _, content = self._entries.pop(document_id)
+        self._total_chars -= len(content)
+
+
+_document_content_cache: Optional[DocumentContentCache] = None
+
+
+def get_document_content_cache() -> DocumentContentCache:
+    """Process-wide content cache configured from settings."""
+    global _document_content_cache
+    if _document_content_cache is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        _document_content_cache = DocumentContentCache(
+            max_entries=settings.search_content_cache_entries,
+            ttl_seconds=settings.search_content_cache_ttl_seconds,
+        )
+    return _document_content_cache
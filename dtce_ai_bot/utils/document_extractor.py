@@ -8,14 +8,15 @@ import os
 import tempfile
 import mimetypes
 import asyncio
-from typing import Dict, Any, Optional, List
-from azure.ai.formrecognizer import DocumentAnalysisClient
+from typing import Dict, Any, Optional, List, Tuple
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
-from azure.storage.blob import BlobServiceClient
 import structlog
 import json
 from datetime import datetime
-import extract_msg
+
+from ..config.settings import get_settings
+from ..integrations.shared_clients import get_shared_client
 
 logger = structlog.get_logger(__name__)
 
@@ -28,15 +29,37 @@ class EnhancedDocumentExtractor:
     
     def __init__(self, form_recognizer_endpoint: str, form_recognizer_key: str):
         """Initialize the enhanced document extractor."""
-        self.client = DocumentAnalysisClient(
-            endpoint=form_recognizer_endpoint,
-            credential=AzureKeyCredential(form_recognizer_key)
-        )
+        self.form_recognizer_endpoint = form_recognizer_endpoint
+        self.form_recognizer_key = form_recognizer_key
         self.max_retries = 3
         self.retry_delay = 2.0
         # Azure Form Recognizer file size limits (in bytes)
         self.max_file_size = 50 * 1024 * 1024  # 50MB for most document types
         self.max_pdf_size = 500 * 1024 * 1024  # 500MB for PDFs specifically
+        # Page-range mode for long PDFs (see _extract_pdf_in_page_ranges)
+        settings = get_settings()
+        self.split_min_pages = settings.form_recognizer_split_min_pages
+        self.pages_per_range = settings.form_recognizer_pages_per_range
+        self.max_concurrent_analyses = settings.form_recognizer_max_concurrency
+    
+    @property
+    def client(self) -> DocumentAnalysisClient:
+        """Shared aio Form Recognizer client for the running event loop."""
+        return get_shared_client(
+            ("form_recognizer", self.form_recognizer_endpoint),
+            lambda: DocumentAnalysisClient(
+                endpoint=self.form_recognizer_endpoint,
+                credential=AzureKeyCredential(self.form_recognizer_key)
+            )
+        )
+    
+    @property
+    def analysis_semaphore(self) -> asyncio.Semaphore:
+        """Per-loop cap on in-flight analyze calls, shared by every extraction against this endpoint."""
+        return get_shared_client(
+            ("form_recognizer_semaphore", self.form_recognizer_endpoint),
+            lambda: asyncio.Semaphore(self.max_concurrent_analyses)
+        )
     
     async def extract_text_from_blob(self, blob_client, content_type: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -44,7 +67,7 @@ class EnhancedDocumentExtractor:
         Implements the retry and error logging from August 5 work log.
         
         Args:
-            blob_client: Azure blob client
+            blob_client: Azure blob client (azure.storage.blob.aio)
             content_type: MIME type of the document
             
         Returns:
@@ -54,7 +77,7 @@ class EnhancedDocumentExtractor:
         
         # Check file size before processing
         try:
-            blob_properties = blob_client.get_blob_properties()
+            blob_properties = await blob_client.get_blob_properties()
             file_size = blob_properties.size
             
             # Check if file exceeds Azure Form Recognizer limits
@@ -69,7 +92,7 @@ class EnhancedDocumentExtractor:
                     logger.info("Attempting PyPDF2 extraction for oversized PDF", blob_name=blob_name)
                     try:
                         # Download blob content for alternative extraction
-                        blob_data = blob_client.download_blob().readall()
+                        blob_data = await (await blob_client.download_blob()).readall()
                         
                         # Use PyPDF2 for text extraction
                         result = await self._extract_pdf_with_pypdf2(blob_data, blob_name)
@@ -116,7 +139,7 @@ class EnhancedDocumentExtractor:
                 logger.info("Starting text extraction", blob_name=blob_name, attempt=attempt + 1)
                 
                 # Download blob content
-                blob_data = blob_client.download_blob().readall()
+                blob_data = await (await blob_client.download_blob()).readall()
                 
                 # Enhanced extraction based on content type (August 4 implementation)
                 if content_type and content_type.startswith('text/'):
@@ -164,12 +187,32 @@ class EnhancedDocumentExtractor:
                                  blob_name=blob_name, 
                                  error=error_str)
                     
+                    # For PDFs, page-range chunks are much smaller than the whole file - try those first
+                    if content_type and 'pdf' in content_type.lower():
+                        try:
+                            page_count = await asyncio.to_thread(_count_pdf_pages, blob_data)
+                            if page_count > 1:
+                                result = await self._extract_pdf_in_page_ranges(blob_data, blob_name, page_count)
+                                result.update({
+                                    'processing_timestamp': datetime.utcnow().isoformat(),
+                                    'extraction_attempt': attempt + 1,
+                                    'blob_name': blob_name,
+                                    'content_type': content_type or 'unknown',
+                                    'extraction_success': True,
+                                    'size_limit_exceeded': True
+                                })
+                                return result
+                        except Exception as range_error:
+                            logger.warning("Page-range extraction failed for oversized PDF",
+                                         blob_name=blob_name,
+                                         error=str(range_error))
+
                     # For PDFs, try PyPDF2 extraction as fallback
                     if content_type and 'pdf' in content_type.lower():
                         logger.info("Attempting PyPDF2 fallback for oversized PDF", blob_name=blob_name)
                         try:
                             # Download blob content for fallback extraction
-                            blob_data = blob_client.download_blob().readall()
+                            blob_data = await (await blob_client.download_blob()).readall()
                             
                             # Use PyPDF2 for text extraction
                             result = await self._extract_pdf_with_pypdf2(blob_data, blob_name)
@@ -243,9 +286,14 @@ class EnhancedDocumentExtractor:
         try:
             logger.info("Extracting PDF with OCR support", blob_name=blob_name)
             
+            # Long PDFs are analyzed as concurrent page ranges instead of one serial job
+            page_count = await asyncio.to_thread(_count_pdf_pages, blob_data)
+            if page_count and page_count >= self.split_min_pages:
+                return await self._extract_pdf_in_page_ranges(blob_data, blob_name, page_count)
+            
             # Use Form Recognizer's read model for PDFs (best for OCR)
-            poller = self.client.begin_analyze_document("prebuilt-read", blob_data)
-            result = poller.result()
+            poller = await self.client.begin_analyze_document("prebuilt-read", blob_data)
+            result = await poller.result()
             
             # Extract text content
             extracted_text = ""
@@ -281,14 +329,117 @@ class EnhancedDocumentExtractor:
             logger.error("PDF OCR extraction failed", blob_name=blob_name, error=str(e))
             raise
 
+    async def _extract_pdf_in_page_ranges(self, blob_data: bytes, blob_name: str, page_count: int) -> Dict[str, Any]:
+        """
+        Extract a long PDF by analyzing page ranges concurrently.
+        
+        The PDF is split into ``pages_per_range`` chunks, each submitted as its own
+        small document under the shared concurrency cap. Failed ranges are retried
+        on their own (successful ranges are kept); ranges that still fail fall back
+        to the PDF text layer via PyPDF2. Text is reassembled in page order with
+        the same ``--- Page N ---`` markers as the PyPDF2 path.
+        """
+        ranges = _page_ranges(page_count, self.pages_per_range)
+        logger.info("Extracting PDF in page ranges", blob_name=blob_name,
+                   page_count=page_count, range_count=len(ranges),
+                   max_concurrency=self.max_concurrent_analyses)
+        
+        page_groups = [list(range(start, end + 1)) for start, end in ranges]
+        page_texts, confidence_scores, has_ocr, failed = await self._ocr_page_groups(blob_data, blob_name, page_groups)
+        
+        extracted_text = join_pdf_pages(page_texts)
+        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+        
+        return {
+            'extracted_text': extracted_text,
+            'character_count': len(extracted_text),
+            'page_count': page_count,
+            'extraction_method': 'pdf_ocr_page_ranges' if has_ocr else 'pdf_text_page_ranges',
+            'ocr_used': has_ocr,
+            'page_ranges': len(ranges),
+            'failed_page_ranges': [f"{ranges[i][0]}-{ranges[i][1]}" for i in failed],
+            'confidence_scores': confidence_scores,
+            'average_confidence': avg_confidence,
+            'quality_assessment': 'high' if avg_confidence > 0.9 else 'medium' if avg_confidence > 0.7 else 'low'
+        }
+
+    async def ocr_pdf_pages(self, blob_data: bytes, blob_name: str, pages: List[int]) -> Dict[int, str]:
+        """
+        OCR only the given 1-based pages of a PDF and return their text keyed by page number.
+        
+        Used for mixed PDFs where most pages already have a text layer.
+        """
+        step = max(1, self.pages_per_range)
+        page_groups = [pages[i:i + step] for i in range(0, len(pages), step)]
+        page_texts, _, _, _ = await self._ocr_page_groups(blob_data, blob_name, page_groups)
+        return page_texts
+
+    async def _ocr_page_groups(self, blob_data: bytes, blob_name: str,
+                               page_groups: List[List[int]]) -> Tuple[Dict[int, str], List[float], bool, List[int]]:
+        """
+        Analyze each group of pages as its own small PDF, concurrently and under the shared cap.
+        
+        Only groups that fail are retried; groups that still fail after ``max_retries``
+        rounds get their text-layer content instead and are returned as failed indexes.
+        """
+        chunks = await asyncio.to_thread(_select_pdf_pages, blob_data, page_groups)
+        
+        page_texts: Dict[int, str] = {}
+        confidence_scores: List[float] = []
+        has_ocr = False
+        pending = list(range(len(page_groups)))
+        
+        for attempt in range(self.max_retries):
+            outcomes = await asyncio.gather(
+                *(self._analyze_page_range(chunks[i], page_groups[i]) for i in pending),
+                return_exceptions=True
+            )
+            failed = []
+            for index, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.warning("Page range analysis failed", blob_name=blob_name,
+                                 pages=f"{page_groups[index][0]}-{page_groups[index][-1]}",
+                                 attempt=attempt + 1, error=str(outcome))
+                    failed.append(index)
+                    continue
+                texts, scores, range_has_ocr = outcome
+                page_texts.update(texts)
+                confidence_scores.extend(scores)
+                has_ocr = has_ocr or range_has_ocr
+            pending = failed
+            if not pending:
+                break
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self.retry_delay * (attempt + 1))
+        
+        # Whatever Form Recognizer could not read falls back to the embedded text layer
+        for index in pending:
+            fallback = await asyncio.to_thread(_pdf_text_by_page, chunks[index], page_groups[index])
+            page_texts.update(fallback)
+        
+        return page_texts, confidence_scores, has_ocr, pending
+
+    async def _analyze_page_range(self, chunk: bytes, page_numbers: List[int]) -> Tuple[Dict[int, str], List[float], bool]:
+        """Run prebuilt-read on one chunk; chunk page N maps back to ``page_numbers[N - 1]``."""
+        async with self.analysis_semaphore:
+            poller = await self.client.begin_analyze_document("prebuilt-read", chunk)
+            result = await poller.result()
+        
+        texts = {
+            page_numbers[page.page_number - 1]: "\n".join(line.content for line in page.lines)
+            for page in result.pages
+        }
+        has_ocr = any(line.polygon for page in result.pages for line in page.lines)
+        return texts, self._extract_confidence_scores(result), has_ocr
+
     async def _extract_office_document(self, blob_data: bytes, blob_name: str) -> Dict[str, Any]:
         """Extract text from Office documents (Word, Excel, PowerPoint)."""
         try:
             logger.info("Extracting Office document", blob_name=blob_name)
             
             # Use Form Recognizer's read model for Office docs
-            poller = self.client.begin_analyze_document("prebuilt-read", blob_data)
-            result = poller.result()
+            poller = await self.client.begin_analyze_document("prebuilt-read", blob_data)
+            result = await poller.result()
             
             extracted_text = ""
             for page in result.pages:
@@ -318,6 +469,7 @@ class EnhancedDocumentExtractor:
             
             try:
                 # Extract MSG content
+                import extract_msg
                 msg = extract_msg.Message(temp_file_path)
                 
                 # Build extracted text from MSG components
@@ -467,8 +619,8 @@ File can be accessed through the document management system.
         try:
             logger.info("Extracting with Form Recognizer", blob_name=blob_name)
             
-            poller = self.client.begin_analyze_document("prebuilt-read", blob_data)
-            result = poller.result()
+            poller = await self.client.begin_analyze_document("prebuilt-read", blob_data)
+            result = await poller.result()
             
             extracted_text = ""
             for page in result.pages:
@@ -774,6 +926,65 @@ File can be accessed through the document management system.
         }
 
 
+def _count_pdf_pages(blob_data: bytes) -> int:
+    """Page count from the PDF structure (0 when the file cannot be parsed)."""
+    import io
+    import PyPDF2
+    
+    try:
+        return len(PyPDF2.PdfReader(io.BytesIO(blob_data)).pages)
+    except Exception:
+        return 0
+
+
+def _page_ranges(page_count: int, pages_per_range: int) -> List[Tuple[int, int]]:
+    """Inclusive 1-based page ranges covering the whole document."""
+    step = max(1, pages_per_range)
+    return [(start, min(start + step - 1, page_count)) for start in range(1, page_count + 1, step)]
+
+
+def _select_pdf_pages(blob_data: bytes, page_groups: List[List[int]]) -> List[bytes]:
+    """Write each group of 1-based pages out as a standalone PDF."""
+    import io
+    import PyPDF2
+    
+    reader = PyPDF2.PdfReader(io.BytesIO(blob_data))
+    chunks = []
+    for pages in page_groups:
+        writer = PyPDF2.PdfWriter()
+        for page_number in pages:
+            writer.add_page(reader.pages[page_number - 1])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        chunks.append(buffer.getvalue())
+    return chunks
+
+
+def _pdf_text_by_page(chunk: bytes, page_numbers: List[int]) -> Dict[int, str]:
+    """Text-layer fallback for a chunk whose analysis kept failing."""
+    import io
+    import PyPDF2
+    
+    texts = {}
+    try:
+        for page_number, page in zip(page_numbers, PyPDF2.PdfReader(io.BytesIO(chunk)).pages):
+            try:
+                texts[page_number] = page.extract_text() or ""
+            except Exception:
+                texts[page_number] = ""
+    except Exception as e:
+        logger.warning("Text-layer fallback failed for page range", first_page=page_numbers[0], error=str(e))
+    return texts
+
+
+def join_pdf_pages(page_texts: Dict[int, str]) -> str:
+    """Reassemble per-page text in page order with ``--- Page N ---`` markers."""
+    return "".join(
+        f"\n--- Page {page} ---\n{page_texts[page]}\n"
+        for page in sorted(page_texts) if page_texts[page].strip()
+    ).strip()
+
+
 def get_document_extractor(form_recognizer_endpoint: str, form_recognizer_key: str) -> EnhancedDocumentExtractor:
     """
     Factory function to create a document extractor instance.
@@ -0,0 +1,94 @@
+"""
+Structured, filterable index fields derived from a document's blob path.
+
+Indexers store these at ingest time so the query side can use cheap equality
+and ``search.in`` filters instead of ``search.ismatch`` wildcards, folder range
+chains and per-result string scans:
+
+    project_number  '225221'  (6-digit job number, '' when not a project file)
+    year_code       '225'     (first three digits of the job number)
+    doc_category    'projects' (top-level folder, lower-cased)
+    file_extension  'pdf'
+    is_superseded   True for superseded / archive / old / draft copies
+    is_system_file  True for housekeeping files (trash, temp, lock files, photo dumps)
+
+Documents indexed before these fields existed have them unset; filters test
+``ne true`` so such rows are not silently dropped.
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from .project_parser import parse_project_path
+
+# Path tokens (folder names / filename words) that mark a superseded copy
+SUPERSEDED_TOKENS = {
+    'superseded', 'superceded', 'archive', 'archived', 'obsolete', 'deprecated',
+    'old', 'backup', 'draft', 'drafts', 'legacy',
+}
+
+# Path tokens that mark housekeeping content that should never be retrieved
+SYSTEM_TOKENS = {'trash', 'deleted', 'recycle', 'temp', 'temporary', 'photos'}
+
+SYSTEM_FILENAMES = {'users.dat', 'wperms.dat', '.ds_store', 'thumbs.db', 'desktop.ini', '.keep'}
+
+STRUCTURED_FIELD_NAMES = (
+    'project_number', 'year_code', 'doc_category', 'file_extension', 'is_superseded', 'is_system_file',
+)
+
+EXCLUDE_SUPERSEDED_FILTER = "is_superseded ne true"
+EXCLUDE_SYSTEM_FILES_FILTER = "is_system_file ne true"
+EXCLUDE_SUPERSEDED_AND_SYSTEM_FILTER = f"{EXCLUDE_SUPERSEDED_FILTER} and {EXCLUDE_SYSTEM_FILES_FILTER}"
+
+
+def _path_tokens(blob_name: str) -> set:
+    return {token for token in re.split(r'[^a-z0-9]+', blob_name.lower()) if token}
+
+
+def is_superseded_path(blob_name: str) -> bool:
+    """True when any folder or filename word marks the file as a superseded copy."""
+    return bool(_path_tokens(blob_name) & SUPERSEDED_TOKENS)
+
+
+def is_system_path(blob_name: str) -> bool:
+    """True for OS/Office housekeeping files and trash/temp/photo folders."""
+    filename = os.path.basename(blob_name).lower()
+    if filename in SYSTEM_FILENAMES or filename.startswith('~$'):
+        return True
+    return bool(_path_tokens(blob_name) & SYSTEM_TOKENS)
+
+
+def derive_document_fields(blob_name: str) -> Dict[str, Any]:
+    """Compute the structured index fields for a blob path (folder + filename)."""
+    project_info = parse_project_path(blob_name) or {}
+    top_level = blob_name.strip('/').split('/', 1)[0] if '/' in blob_name.strip('/') else ''
+
+    return {
+        'project_number': project_info.get('job_number', ''),
+        'year_code': project_info.get('year_code', ''),
+        'doc_category': top_level.strip().lower(),
+        'file_extension': os.path.splitext(blob_name)[1].lstrip('.').lower(),
+        'is_superseded': is_superseded_path(blob_name),
+        'is_system_file': is_system_path(blob_name),
+    }
+
+
+def odata_literal(value: str) -> str:
+    """Quote a string for an OData filter (single quotes doubled)."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def odata_in(field: str, values: Iterable[str]) -> str:
+    """``search.in`` filter for an exact-match set of values (pipe-delimited so commas are safe)."""
+    joined = '|'.join(str(value).replace("'", "''") for value in values)
+    return f"search.in({field}, '{joined}', '|')"
+
+
+def project_number_filter(project_number: str) -> Optional[str]:
+    """Equality filter for a 6-digit job number or a 3-digit year code; None for anything else."""
+    if re.fullmatch(r'\d{6}', project_number):
+        return f"project_number eq {odata_literal(project_number)}"
+    if re.fullmatch(r'\d{3}', project_number):
+        return f"year_code eq {odata_literal(project_number)}"
+    return None
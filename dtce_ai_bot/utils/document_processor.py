@@ -1,16 +1,14 @@
 import asyncio
 from typing import Optional, Dict, Any
-import docx
-import PyPDF2
-import openpyxl
 import io
 import structlog
-import extract_msg
 import json
 import csv
 from PIL import Image
 
 from src.models import DocumentMetadata
+from . import local_extractors
+from .extraction_pool import get_local_extraction_pool
 
 logger = structlog.get_logger(__name__)
 
@@ -99,17 +97,7 @@ class DocumentProcessor:
     async def _extract_pdf_text(self, content: bytes) -> Optional[str]:
         """Extract text from PDF file."""
         try:
-            pdf_file = io.BytesIO(content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_parts = []
-            for page in pdf_reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            
-            return "\n\n".join(text_parts) if text_parts else None
-            
+            return await get_local_extraction_pool().run(local_extractors.pdf_text, content)
         except Exception as e:
             logger.error("Failed to extract PDF text", error=str(e))
             return None
@@ -117,28 +105,7 @@ class DocumentProcessor:
     async def _extract_docx_text(self, content: bytes) -> Optional[str]:
         """Extract text from DOCX file."""
         try:
-            doc_file = io.BytesIO(content)
-            doc = docx.Document(doc_file)
-            
-            text_parts = []
-            
-            # Extract paragraph text
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-            
-            # Extract table text
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        text_parts.append(" | ".join(row_text))
-            
-            return "\n".join(text_parts) if text_parts else None
-            
+            return await get_local_extraction_pool().run(local_extractors.docx_text, content)
         except Exception as e:
             logger.error("Failed to extract DOCX text", error=str(e))
             return None
@@ -153,27 +120,7 @@ class DocumentProcessor:
     async def _extract_xlsx_text(self, content: bytes) -> Optional[str]:
         """Extract text from XLSX file."""
         try:
-            excel_file = io.BytesIO(content)
-            workbook = openpyxl.load_workbook(excel_file, data_only=True)
-            
-            text_parts = []
-            
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                text_parts.append(f"Sheet: {sheet_name}")
-                
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = []
-                    for cell_value in row:
-                        if cell_value is not None:
-                            row_text.append(str(cell_value))
-                    if row_text:
-                        text_parts.append(" | ".join(row_text))
-                
-                text_parts.append("")  # Add blank line between sheets
-            
-            return "\n".join(text_parts) if text_parts else None
-            
+            return await get_local_extraction_pool().run(local_extractors.xlsx_text, content)
         except Exception as e:
             logger.error("Failed to extract XLSX text", error=str(e))
             return None
@@ -208,6 +155,7 @@ class DocumentProcessor:
         try:
             import tempfile
             import os
+            import extract_msg
             
             # MSG files need to be saved to disk for extract_msg to read them
             with tempfile.NamedTemporaryFile(suffix='.msg', delete=False) as tmp_file:
@@ -0,0 +1,329 @@
+"""
+Process pool for local (CPU-bound) document extraction.
+
+PyPDF2 / PyMuPDF / openpyxl can spin for minutes or balloon in memory on a
+single malformed file. ``signal.alarm`` cannot interrupt that from a worker
+thread, and a thread cannot be killed, so extraction runs in warm worker
+processes instead:
+
+* every job has a real wall-clock timeout; on overrun the worker is killed and
+  replaced, and the caller gets ``ExtractionTimeout``;
+* every worker runs under an address-space cap (``RLIMIT_AS``), so a file that
+  balloons fails with ``ExtractionFailed`` instead of taking the host down;
+* workers are reused between jobs (and recycled after ``max_tasks_per_worker``);
+* callers beyond ``workers`` queue for a free worker; the wait is bounded by
+  their queue position (one job timeout per round of jobs ahead), so a stuck
+  pool fails loudly while a healthy backlog drains, and ``close()`` wakes them;
+* files that time out or blow the memory cap ``quarantine_after`` times are
+  quarantined and refused up front (optionally persisted to a JSON file so
+  reindex runs skip them too).
+
+Jobs are plain module-level functions (see ``local_extractors``) sent to the
+worker by reference.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+try:
+    import resource
+except ImportError:  # Windows - no per-process memory cap
+    resource = None
+
+logger = structlog.get_logger(__name__)
+
+# Spawned workers import the package before they can take work; that start-up
+# time is not charged to the first file's timeout
+WORKER_START_TIMEOUT_SECONDS = 120
+
+
+class LocalExtractionError(Exception):
+    """Base class for local extraction pool failures."""
+
+
+class ExtractionTimeout(LocalExtractionError):
+    """The worker overran its wall-clock budget and was killed."""
+
+
+class ExtractionQuarantined(LocalExtractionError):
+    """The file has repeatedly timed out and is no longer attempted."""
+
+
+class ExtractionFailed(LocalExtractionError):
+    """The extractor raised, or the worker died (e.g. memory cap)."""
+
+
+def _worker_main(conn, memory_limit_bytes: int) -> None:
+    """Worker loop: receive (func, args, kwargs), send back ("ok", result) or ("error", message)."""
+    if memory_limit_bytes and resource is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        except (ValueError, OSError):
+            pass
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+
+        func, args, kwargs = job
+        try:
+            conn.send(("ok", func(*args, **kwargs)))
+        except MemoryError:
+            # Heap state is unknown after a MemoryError - report and let the pool replace us
+            conn.send(("memory", "memory limit exceeded"))
+            return
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, context, memory_limit_bytes: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit_bytes), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+        if not self.conn.poll(WORKER_START_TIMEOUT_SECONDS):
+            self.stop(kill=True)
+            raise LocalExtractionError("Local extraction worker did not start")
+        try:
+            self.conn.recv()
+        except (EOFError, OSError):
+            self.stop(kill=True)
+            raise LocalExtractionError("Local extraction worker exited during start-up")
+
+    def stop(self, kill: bool = False) -> None:
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(timeout=2)
+        except Exception:
+            pass
+        finally:
+            self.conn.close()
+
+
+class LocalExtractionPool:
+    """Warm, killable worker processes with per-file timeout, memory cap and quarantine."""
+
+    def __init__(self, workers: int = 2, timeout_seconds: float = 60,
+                 memory_limit_mb: int = 1024, quarantine_after: int = 2,
+                 max_tasks_per_worker: int = 200, quarantine_path: Optional[str] = None):
+        self.workers = max(1, workers)
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024 if memory_limit_mb else 0
+        self.quarantine_after = quarantine_after
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.quarantine_path = quarantine_path
+
+        # spawn, not fork: the API process is multi-threaded and holds open sockets
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()  # None = closed sentinel
+        self._all: List[_Worker] = []
+        self._starting = 0
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._strikes: Dict[str, Dict[str, Any]] = self._load_quarantine()
+
+    async def run(self, func: Callable, *args, key: Optional[str] = None, **kwargs) -> Any:
+        """Run ``func(*args, **kwargs)`` in a worker process without blocking the event loop."""
+        return await asyncio.to_thread(self.run_sync, func, *args, key=key, **kwargs)
+
+    def run_sync(self, func: Callable, *args, key: Optional[str] = None, **kwargs) -> Any:
+        """
+        Run ``func(*args, **kwargs)`` in a worker process and wait for the result.
+
+        ``key`` identifies the file for quarantine (blob name); when omitted the
+        hash of the first bytes argument is used.
+        """
+        key = key or self._content_key(args)
+        if self.is_quarantined(key):
+            raise ExtractionQuarantined(f"{key} is quarantined after repeated extraction timeouts")
+
+        worker = self._acquire()
+        try:
+            try:
+                worker.conn.send((func, args, kwargs))
+            except (OSError, EOFError):
+                # Worker died while idle - start a fresh one and try once more
+                worker = self._replace(worker)
+                worker.conn.send((func, args, kwargs))
+            if not worker.conn.poll(self.timeout_seconds):
+                worker = self._replace(worker)
+                self._strike(key, "timeout")
+                raise ExtractionTimeout(f"Local extraction exceeded {self.timeout_seconds}s for {key}")
+
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                status, payload = "memory", "worker process died"
+
+            worker.tasks += 1
+            if status == "memory":
+                worker = self._replace(worker)
+                self._strike(key, payload)
+                raise ExtractionFailed(f"Local extraction failed for {key}: {payload}")
+            if status == "error":
+                raise ExtractionFailed(payload)
+            if worker.tasks >= self.max_tasks_per_worker:
+                worker = self._replace(worker, kill=False)
+            return payload
+        finally:
+            self._release(worker)
+
+    def is_quarantined(self, key: str) -> bool:
+        entry = self._strikes.get(key)
+        return bool(entry) and entry["strikes"] >= self.quarantine_after
+
+    def get_quarantine(self) -> Dict[str, Dict[str, Any]]:
+        """Quarantined files with strike counts and last failure reason."""
+        return {key: dict(entry) for key, entry in self._strikes.items() if entry["strikes"] >= self.quarantine_after}
+
+    def close(self) -> None:
+        """Stop every worker process."""
+        with self._lock:
+            self._closed = True
+            workers, self._all = self._all, []
+        self._idle.put(None)  # Wake callers queued for a worker
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            if self._closed:
+                raise LocalExtractionError("Local extraction pool is closed")
+            spawn = self._idle.empty() and len(self._all) + self._starting < self.workers
+            if spawn:
+                self._starting += 1
+            else:
+                budget = self._wait_budget(self._waiting)
+                self._waiting += 1
+        if not spawn:
+            try:
+                worker = self._idle.get(timeout=budget)
+            except queue.Empty:
+                raise LocalExtractionError(f"No local extraction worker became free within {budget:.0f}s") from None
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if worker is None:
+                self._idle.put(None)  # Pass the sentinel on to the next queued caller
+                raise LocalExtractionError("Local extraction pool is closed")
+            return worker
+
+        # Start outside the lock so a slow spawn does not hold up other callers
+        try:
+            worker = _Worker(self._context, self.memory_limit_bytes)
+        finally:
+            with self._lock:
+                self._starting -= 1
+        with self._lock:
+            self._all.append(worker)
+        return worker
+
+    def _wait_budget(self, ahead: int) -> float:
+        """Longest wait for a healthy pool with ``ahead`` callers queued first: one timeout per round of
+        jobs ahead, plus one worker start-up for a replacement."""
+        return (ahead // self.workers + 1) * self.timeout_seconds + WORKER_START_TIMEOUT_SECONDS
+
+    def _release(self, worker: _Worker) -> None:
+        with self._lock:
+            if worker in self._all:
+                self._idle.put(worker)
+
+    def _replace(self, worker: _Worker, kill: bool = True) -> _Worker:
+        worker.stop(kill=kill)
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            if self._closed:
+                return worker
+        replacement = _Worker(self._context, self.memory_limit_bytes)
+        with self._lock:
+            self._all.append(replacement)
+        return replacement
+
+    def _strike(self, key: str, reason: str) -> None:
+        with self._lock:
+            entry = self._strikes.setdefault(key, {"strikes": 0, "last_error": None})
+            entry["strikes"] += 1
+            entry["last_error"] = reason
+            quarantined = entry["strikes"] >= self.quarantine_after
+        logger.warning("Local extraction overran its limits", key=key, reason=reason,
+                       strikes=entry["strikes"], quarantined=quarantined)
+        if quarantined:
+            self._save_quarantine()
+
+    @staticmethod
+    def _content_key(args) -> str:
+        for arg in args:
+            if isinstance(arg, (bytes, bytearray)):
+                return "sha1:" + hashlib.sha1(arg).hexdigest()
+        return "unknown"
+
+    def _load_quarantine(self) -> Dict[str, Dict[str, Any]]:
+        if not self.quarantine_path or not os.path.exists(self.quarantine_path):
+            return {}
+        try:
+            with open(self.quarantine_path, "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except Exception as e:
+            logger.warning("Could not read extraction quarantine", path=self.quarantine_path, error=str(e))
+            return {}
+
+    def _save_quarantine(self) -> None:
+        if not self.quarantine_path:
+            return
+        try:
+            with open(self.quarantine_path, "w", encoding="utf-8") as handle:
+                json.dump(self._strikes, handle, indent=2)
+        except Exception as e:
+            logger.warning("Could not write extraction quarantine", path=self.quarantine_path, error=str(e))
+
+
+_local_extraction_pool: Optional[LocalExtractionPool] = None
+
+
+def get_local_extraction_pool() -> LocalExtractionPool:
+    """Process-wide pool configured from settings; workers start on first use."""
+    global _local_extraction_pool
+    if _local_extraction_pool is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        _local_extraction_pool = LocalExtractionPool(
+            workers=settings.local_extraction_workers,
+            timeout_seconds=settings.local_extraction_timeout_seconds,
+            memory_limit_mb=settings.local_extraction_memory_limit_mb,
+            quarantine_after=settings.local_extraction_quarantine_after,
+            quarantine_path=settings.local_extraction_quarantine_path or None,
+        )
+    return _local_extraction_pool
+
+
+def close_local_extraction_pool() -> None:
+    """Stop the process-wide pool's workers (app shutdown)."""
+    global _local_extraction_pool
+    if _local_extraction_pool is not None:
+        _local_extraction_pool.close()
+        _local_extraction_pool = None
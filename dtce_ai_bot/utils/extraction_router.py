@@ -0,0 +1,274 @@
+"""
+Cost-model extraction router.
+
+Probes each file cheaply (type, size, page count and per-page text-layer
+density) and picks the cheapest extractor that is likely to succeed, instead of
+always starting the Form Recognizer → OpenAI → local cascade at the paid end.
+Most PDFs already carry a text layer; only scanned pages need OCR, and for
+mixed PDFs only the image-only pages are sent to Form Recognizer.
+
+Per-route timings and success rates are recorded and fed back into the route
+ranking, so a route that keeps failing stops being picked first.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from .document_extractor import EnhancedDocumentExtractor, join_pdf_pages
+from .extraction_pool import get_local_extraction_pool
+from .local_extractors import docx_text, pdf_page_texts, xlsx_text
+from .stage_timer import stage
+
+logger = structlog.get_logger(__name__)
+
+# A page with fewer text-layer characters than this is treated as image-only (scanned)
+MIN_TEXT_CHARS_PER_PAGE = 40
+# Extracted text shorter than this counts as a failed extraction
+MIN_USEFUL_CHARS = 50
+
+# Relative cost per page sent through each route (local routes are effectively free)
+ROUTE_PAGE_COSTS = {
+    "plain_text": 0.0,
+    "pdf_text_layer": 0.01,
+    "docx_local": 0.01,
+    "xlsx_local": 0.01,
+    "msg_local": 0.01,
+    "pdf_mixed": 1.0,  # charged only for the image-only pages
+    "pdf_ocr": 1.0,
+    "form_recognizer": 1.0,
+    "metadata_only": 0.0,
+}
+
+PLAIN_TEXT_EXTENSIONS = {'.txt', '.md', '.csv', '.json', '.xml', '.html', '.htm', '.py', '.js', '.ts', '.log'}
+WORD_EXTENSIONS = {'.docx', '.dotx'}  # Templates are the same OOXML package
+SPREADSHEET_EXTENSIONS = {'.xlsx', '.xlsm', '.xltx'}
+FORM_RECOGNIZER_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.pptx'}
+
+
+@dataclass
+class DocumentProbe:
+    """Cheap facts about a file used to pick an extraction route."""
+
+    extension: str
+    content_type: str
+    size_bytes: int
+    page_count: int = 0
+    page_texts: Dict[int, str] = field(default_factory=dict)  # text layer, 1-based pages
+    image_only_pages: List[int] = field(default_factory=list)
+    probe_ms: float = 0.0
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.extension == '.pdf' or 'pdf' in self.content_type
+
+    @property
+    def text_pages(self) -> List[int]:
+        return [page for page in range(1, self.page_count + 1) if page not in self.image_only_pages]
+
+
+@dataclass
+class RouteStats:
+    """Rolling timings and outcomes for one route."""
+
+    attempts: int = 0
+    successes: int = 0
+    total_ms: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def success_rate(self) -> float:
+        # Laplace prior: a new route starts at 0.5 and earns its rank
+        return (self.successes + 1) / (self.attempts + 2)
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.attempts if self.attempts else 0.0
+
+
+async def probe_document(blob_data: bytes, blob_name: str, content_type: Optional[str] = None) -> DocumentProbe:
+    """
+    Inspect a file without calling any paid service.
+
+    For PDFs this reads the text layer of every page in the local extraction
+    pool (so a pathological PDF times out instead of stalling the loop); the
+    page text is kept so the text-layer route does not parse the file again.
+    """
+    started = time.perf_counter()
+    probe = DocumentProbe(
+        extension=os.path.splitext(blob_name)[1].lower(),
+        content_type=(content_type or "").lower(),
+        size_bytes=len(blob_data),
+    )
+
+    if probe.is_pdf:
+        try:
+            probe.page_texts = await get_local_extraction_pool().run(pdf_page_texts, blob_data, key=blob_name)
+            probe.page_count = len(probe.page_texts)
+            probe.image_only_pages = [
+                page for page, text in probe.page_texts.items()
+                if len(text.strip()) < MIN_TEXT_CHARS_PER_PAGE
+            ]
+        except Exception as e:
+            logger.warning("PDF probe failed", blob_name=blob_name, error=str(e))
+
+    probe.probe_ms = (time.perf_counter() - started) * 1000
+    return probe
+
+
+class ExtractionRouter:
+    """Picks and runs the cheapest extraction route likely to succeed for each file."""
+
+    def __init__(self, document_extractor: EnhancedDocumentExtractor):
+        self.document_extractor = document_extractor
+        self.stats: Dict[str, RouteStats] = {route: RouteStats() for route in ROUTE_PAGE_COSTS}
+
+    def candidate_routes(self, probe: DocumentProbe) -> List[str]:
+        """Routes that can handle this file, cheapest expected cost per success first."""
+        # Routes that would drop content (text layer of a partly scanned PDF) only run last
+        partial = []
+        if probe.is_pdf:
+            if not probe.page_count:
+                candidates = ["pdf_ocr"]
+            elif not probe.image_only_pages:
+                candidates = ["pdf_text_layer", "pdf_ocr"]
+            elif len(probe.image_only_pages) == probe.page_count:
+                candidates = ["pdf_ocr"]
+            else:
+                candidates, partial = ["pdf_mixed", "pdf_ocr"], ["pdf_text_layer"]
+        elif probe.content_type.startswith('text/') or probe.extension in PLAIN_TEXT_EXTENSIONS:
+            candidates = ["plain_text"]
+        elif probe.extension in WORD_EXTENSIONS:
+            candidates = ["docx_local", "form_recognizer"]
+        elif probe.extension in SPREADSHEET_EXTENSIONS:
+            candidates = ["xlsx_local", "form_recognizer"]
+        elif probe.extension == '.msg' or 'vnd.ms-outlook' in probe.content_type:
+            candidates = ["msg_local"]
+        elif probe.extension in FORM_RECOGNIZER_EXTENSIONS or probe.content_type.startswith('image/'):
+            candidates = ["form_recognizer"]
+        else:
+            candidates = []
+
+        candidates.sort(key=lambda route: self._expected_cost(route, probe))
+        return candidates + partial + ["metadata_only"]
+
+    def _expected_cost(self, route: str, probe: DocumentProbe) -> float:
+        pages = len(probe.image_only_pages) if route == "pdf_mixed" else max(1, probe.page_count)
+        return ROUTE_PAGE_COSTS[route] * pages / self.stats[route].success_rate
+
+    async def extract(self, blob_data: bytes, blob_name: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Probe the file, then try candidate routes in cost order until one yields useful text.
+
+        Returns the usual extractor result dict plus ``route``, ``routes_tried`` and probe facts.
+        """
+        with stage("extract_probe"):
+            probe = await probe_document(blob_data, blob_name, content_type)
+        routes_tried = []
+
+        for route in self.candidate_routes(probe):
+            routes_tried.append(route)
+            started = time.perf_counter()
+            try:
+                with stage(f"extract_{route}"):
+                    result = await self._run_route(route, probe, blob_data, blob_name)
+                succeeded = route == "metadata_only" or len(result.get('extracted_text', '').strip()) >= MIN_USEFUL_CHARS
+                error = None if succeeded else "insufficient text"
+            except Exception as e:
+                result, succeeded, error = None, False, str(e)
+            self._record(route, started, succeeded, error)
+
+            if succeeded:
+                result.update({
+                    'route': route,
+                    'routes_tried': routes_tried,
+                    'probe_ms': round(probe.probe_ms, 1),
+                    'image_only_pages': len(probe.image_only_pages),
+                })
+                logger.info("Extraction routed", blob_name=blob_name, route=route,
+                           routes_tried=routes_tried, page_count=probe.page_count,
+                           image_only_pages=len(probe.image_only_pages))
+                return result
+            logger.info("Extraction route fell through", blob_name=blob_name, route=route, error=error)
+
+        return {'extracted_text': '', 'route': None, 'routes_tried': routes_tried, 'extraction_success': False}
+
+    async def _run_route(self, route: str, probe: DocumentProbe, blob_data: bytes, blob_name: str) -> Dict[str, Any]:
+        extractor = self.document_extractor
+
+        if route == "plain_text":
+            return extractor._extract_plain_text(blob_data, probe.content_type or 'text/plain')
+        if route == "pdf_text_layer":
+            text = join_pdf_pages(probe.page_texts)
+            return self._pdf_result(text, probe, 'pdf_text_layer', ocr_pages=0)
+        if route == "pdf_mixed":
+            page_texts = dict(probe.page_texts)
+            page_texts.update(await extractor.ocr_pdf_pages(blob_data, blob_name, probe.image_only_pages))
+            return self._pdf_result(join_pdf_pages(page_texts), probe, 'pdf_mixed_ocr', ocr_pages=len(probe.image_only_pages))
+        if route == "pdf_ocr":
+            return await extractor._extract_pdf_with_ocr(blob_data, blob_name)
+        if route == "docx_local":
+            text = await get_local_extraction_pool().run(docx_text, blob_data, key=blob_name) or ""
+            return {'extracted_text': text, 'character_count': len(text), 'page_count': 1,
+                    'extraction_method': 'docx_python_docx'}
+        if route == "xlsx_local":
+            text = await get_local_extraction_pool().run(xlsx_text, blob_data, key=blob_name) or ""
+            return {'extracted_text': text, 'character_count': len(text), 'page_count': 1,
+                    'extraction_method': 'xlsx_openpyxl'}
+        if route == "msg_local":
+            return await extractor._extract_msg_file(blob_data, blob_name)
+        if route == "form_recognizer":
+            return await extractor._extract_with_form_recognizer(blob_data, blob_name)
+        return extractor._create_file_metadata(blob_name, probe.content_type or None)
+
+    @staticmethod
+    def _pdf_result(text: str, probe: DocumentProbe, method: str, ocr_pages: int) -> Dict[str, Any]:
+        return {
+            'extracted_text': text,
+            'character_count': len(text),
+            'page_count': probe.page_count,
+            'extraction_method': method,
+            'ocr_used': ocr_pages > 0,
+            'ocr_pages': ocr_pages,
+        }
+
+    def _record(self, route: str, started: float, succeeded: bool, error: Optional[str]) -> None:
+        stats = self.stats[route]
+        stats.attempts += 1
+        stats.total_ms += (time.perf_counter() - started) * 1000
+        if succeeded:
+            stats.successes += 1
+        else:
+            stats.last_error = error
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-route attempts, success rate and mean latency."""
+        return {
+            route: {
+                'attempts': stats.attempts,
+                'successes': stats.successes,
+                'success_rate': round(stats.successes / stats.attempts, 3) if stats.attempts else None,
+                'avg_ms': round(stats.avg_ms, 1),
+                'last_error': stats.last_error,
+            }
+            for route, stats in self.stats.items()
+        }
+
+
+_extraction_router: Optional[ExtractionRouter] = None
+
+
+def get_extraction_router() -> ExtractionRouter:
+    """Process-wide router (stats accumulate across requests)."""
+    global _extraction_router
+    if _extraction_router is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        _extraction_router = ExtractionRouter(
+            EnhancedDocumentExtractor(settings.azure_form_recognizer_endpoint, settings.azure_form_recognizer_key)
+        )
+    return _extraction_router
@@ -0,0 +1,106 @@
+"""
+Search index version marker.
+
+Anything that changes indexed content (document indexing/deletion, sync,
+reindex scripts) calls ``bump_index_version``; caches of derived results (the
+answer cache) compare ``get_index_version`` and drop entries built against an
+older index.
+
+The version is kept in-process, or as an atomic counter in the cross-process
+shared state when ``shared_state_url`` is set, so a document indexed through
+one worker invalidates the answer caches of every worker (each re-reads it at
+most every ``SHARED_VERSION_TTL`` seconds). When ``index_version_path`` is
+configured it is also written to that file, so reindex scripts running as
+separate processes on the same host/share invalidate the API's caches too.
+"""
+
+import os
+import time
+from typing import Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+NAMESPACE = "index_version"
+SHARED_VERSION_TTL = 1.0  # Seconds a worker reuses the shared counter before re-reading it
+
+_local_version = 0
+_shared_cache: Tuple[float, int] = (float("-inf"), 0)
+_marker_cache: Tuple[Optional[float], str] = (None, "")
+
+
+def _shared_state():
+    from ..integrations.shared_state import get_shared_state
+
+    state = get_shared_state()
+    return state if state.shared else None
+
+
+def _version_counter() -> int:
+    """This process's counter, or the shared one (briefly memoized) across workers."""
+    global _shared_cache
+    state = _shared_state()
+    if state is None:
+        return _local_version
+    now = time.monotonic()
+    if now - _shared_cache[0] >= SHARED_VERSION_TTL:
+        try:
+            _shared_cache = (now, int(state.get(NAMESPACE, "version") or 0))
+        except Exception as e:
+            logger.warning("Could not read shared index version", error=str(e))
+    return _shared_cache[1]
+
+
+def _marker_path() -> str:
+    from ..config.settings import get_settings
+
+    return get_settings().index_version_path
+
+
+def _read_marker(path: str) -> str:
+    """Marker file content, re-read only when its mtime changes."""
+    global _marker_cache
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ""
+    if _marker_cache[0] != mtime:
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                _marker_cache = (mtime, handle.read().strip())
+        except OSError:
+            return ""
+    return _marker_cache[1]
+
+
+def get_index_version() -> str:
+    """Opaque version string; changes whenever the index content changes."""
+    path = _marker_path()
+    if path:
+        return f"{_read_marker(path)}.{_version_counter()}"
+    return str(_version_counter())
+
+
+def bump_index_version(reason: str = "") -> str:
+    """Record that indexed content changed; returns the new version."""
+    global _local_version, _shared_cache
+    _local_version += 1
+    state = _shared_state()
+    if state is not None:
+        try:
+            _shared_cache = (time.monotonic(), state.incr(NAMESPACE, "version"))
+        except Exception as e:
+            logger.warning("Could not bump shared index version", error=str(e))
+
+    path = _marker_path()
+    if path:
+        try:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(str(time.time_ns()))
+        except OSError as e:
+            logger.warning("Could not write index version marker", path=path, error=str(e))
+
+    version = get_index_version()
+    logger.debug("Index version bumped", version=version, reason=reason)
+    return version
@@ -0,0 +1,227 @@
+"""
+CPU-bound local text extractors (PyPDF2 / PyMuPDF / python-docx / openpyxl).
+
+Plain synchronous module-level functions so they can be shipped to the local
+extraction pool's worker processes by reference. Nothing here touches Azure,
+the event loop or app settings; keep imports light so workers start fast.
+"""
+
+import io
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from xml.etree import ElementTree
+
+from importlib.util import find_spec
+
+# PyMuPDF gives a faster text layer than PyPDF2 when installed; imported on first PDF
+PYMUPDF_AVAILABLE = find_spec("fitz") is not None
+
+# Caps that keep spreadsheet extraction time and memory flat on huge calc workbooks
+XLSX_MAX_ROWS_PER_SHEET = 10000
+XLSX_MAX_CELLS_PER_ROW = 200
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def pdf_page_texts(content: bytes, max_pages: Optional[int] = None) -> Dict[int, str]:
+    """Embedded text of each page, keyed by 1-based page number."""
+    if PYMUPDF_AVAILABLE:
+        import fitz
+
+        doc = fitz.open(stream=content, filetype="pdf")
+        try:
+            page_count = len(doc) if max_pages is None else min(max_pages, len(doc))
+            return {number + 1: doc[number].get_text() or "" for number in range(page_count)}
+        finally:
+            doc.close()
+
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    if reader.is_encrypted and not reader.decrypt(""):
+        raise PermissionError("Encrypted PDF file (password protected)")
+
+    pages = reader.pages if max_pages is None else reader.pages[:max_pages]
+    texts = {}
+    for index, page in enumerate(pages):
+        try:
+            texts[index + 1] = page.extract_text() or ""
+        except Exception:
+            texts[index + 1] = ""
+    return texts
+
+
+def pdf_text(content: bytes) -> Optional[str]:
+    """Text layer of the whole PDF, pages separated by blank lines."""
+    text_parts = [text for text in pdf_page_texts(content).values() if text]
+    return "\n\n".join(text_parts) if text_parts else None
+
+
+def docx_text(content: bytes) -> Optional[str]:
+    """
+    Body paragraph text followed by table rows (cells joined with ' | ').
+
+    Streams ``word/document.xml`` with ``iterparse`` and drops each top-level
+    paragraph / table row once read, so memory does not grow with the document.
+    Output matches python-docx's ``doc.paragraphs`` / ``doc.tables`` walk,
+    including repeated text for horizontally and vertically merged cells.
+    """
+    paragraphs: List[str] = []
+    table_rows: List[str] = []
+    path: List[str] = []
+    cells_above: Dict[int, str] = {}
+    body = table = None
+
+    with zipfile.ZipFile(io.BytesIO(content)) as package:
+        with package.open("word/document.xml") as document_xml:
+            for event, elem in ElementTree.iterparse(document_xml, events=("start", "end")):
+                if event == "start":
+                    path.append(elem.tag)
+                    if elem.tag == _W + "body":
+                        body = elem
+                    elif elem.tag == _W + "tbl" and path[-2:-1] == [_W + "body"]:
+                        table, cells_above = elem, {}
+                    continue
+
+                path.pop()
+                parent = path[-1] if path else None
+                if elem.tag == _W + "p" and parent == _W + "body":
+                    text = _docx_paragraph_text(elem)
+                    if text.strip():
+                        paragraphs.append(text)
+                    body.remove(elem)
+                elif elem.tag == _W + "tr" and parent == _W + "tbl" and path[-2:-1] == [_W + "body"]:
+                    cells, cells_above = _docx_row_cells(elem, cells_above)
+                    row_text = [cell.strip() for cell in cells if cell.strip()]
+                    if row_text:
+                        table_rows.append(" | ".join(row_text))
+                    table.remove(elem)
+                elif elem.tag == _W + "tbl" and parent == _W + "body":
+                    body.remove(elem)
+
+    text_parts = paragraphs + table_rows
+    return "\n".join(text_parts) if text_parts else None
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    """python-docx ``Paragraph.text``: direct runs and hyperlink runs only."""
+    parts = []
+    for child in paragraph:
+        if child.tag == _W + "r":
+            parts.append(_docx_run_text(child))
+        elif child.tag == _W + "hyperlink":
+            parts.extend(_docx_run_text(run) for run in child if run.tag == _W + "r")
+    return "".join(parts)
+
+
+def _docx_run_text(run) -> str:
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _W + "t":
+            parts.append(child.text or "")
+        elif tag in (_W + "tab", _W + "ptab"):
+            parts.append("\t")
+        elif tag == _W + "cr":
+            parts.append("\n")
+        elif tag == _W + "br":
+            parts.append("\n" if child.get(_W + "type", "textWrapping") == "textWrapping" else "")
+        elif tag == _W + "noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+
+def _docx_row_cells(row, cells_above: Dict[int, str]):
+    """Cell texts for one table row, one entry per layout-grid column (python-docx ``_Row.cells``)."""
+    grid_before = row.find(f"{_W}trPr/{_W}gridBefore")
+    offset = int(grid_before.get(_W + "val", 0)) if grid_before is not None else 0
+    cells: List[str] = []
+    by_offset: Dict[int, str] = {}
+
+    for cell in row.findall(_W + "tc"):
+        properties = cell.find(_W + "tcPr")
+        span, continues_merge = 1, False
+        if properties is not None:
+            grid_span = properties.find(_W + "gridSpan")
+            if grid_span is not None:
+                span = int(grid_span.get(_W + "val", 1))
+            v_merge = properties.find(_W + "vMerge")
+            continues_merge = v_merge is not None and v_merge.get(_W + "val", "continue") == "continue"
+
+        if continues_merge:
+            text = cells_above.get(offset, "")
+        else:
+            text = "\n".join(_docx_paragraph_text(paragraph) for paragraph in cell.findall(_W + "p"))
+
+        for column in range(offset, offset + span):
+            cells.append(text)
+            by_offset[column] = text
+        offset += span
+
+    return cells, by_offset
+
+
+@dataclass
+class SheetRows:
+    """Non-empty rows of one worksheet, read in streaming mode up to the row cap."""
+
+    name: str
+    rows: List[str] = field(default_factory=list)
+    rows_read: int = 0
+    truncated: bool = False
+
+    @property
+    def summary(self) -> Optional[str]:
+        """One-line note for sheets cut off at the row cap (None when the sheet was read in full)."""
+        if not self.truncated:
+            return None
+        return f"[Sheet {self.name}: first {self.rows_read} rows indexed]"
+
+
+def iter_xlsx_sheets(content: bytes, max_rows_per_sheet: int = XLSX_MAX_ROWS_PER_SHEET,
+                     max_cells_per_row: int = XLSX_MAX_CELLS_PER_ROW) -> Iterator[SheetRows]:
+    """
+    Stream each worksheet with openpyxl ``read_only`` mode.
+
+    Rows are joined with ' | ' (empty cells skipped); reading stops at
+    ``max_rows_per_sheet`` rows and ``max_cells_per_row`` columns. The sheet's
+    ``<dimension>`` tag is ignored: writers often leave it stale (e.g. ``A1``),
+    and read-only openpyxl would otherwise stop at the range it declares.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        for sheet_name in workbook.sheetnames:
+            sheet = workbook[sheet_name]
+            if not hasattr(sheet, "iter_rows"):  # chartsheet
+                continue
+
+            sheet.reset_dimensions()
+            sheet_rows = SheetRows(name=sheet_name)
+            for row in sheet.iter_rows(values_only=True, max_col=max_cells_per_row):
+                if sheet_rows.rows_read >= max_rows_per_sheet:
+                    sheet_rows.truncated = True
+                    break
+                sheet_rows.rows_read += 1
+                row_text = [str(cell_value) for cell_value in row if cell_value is not None]
+                if row_text:
+                    sheet_rows.rows.append(" | ".join(row_text))
+            yield sheet_rows
+    finally:
+        workbook.close()
+
+
+def xlsx_text(content: bytes) -> Optional[str]:
+    """Every non-empty row of every sheet (up to the caps), cells joined with ' | '."""
+    text_parts = []
+
+    for sheet in iter_xlsx_sheets(content):
+        text_parts.append(f"Sheet: {sheet.name}")
+        text_parts.extend(sheet.rows)
+        if sheet.summary:
+            text_parts.append(sheet.summary)
+        text_parts.append("")  # Add blank line between sheets
+
+    return "\n".join(text_parts) if text_parts else None
@@ -0,0 +1,172 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+A heartbeat task sleeps ``interval`` at a time on the loop and records how late
+each wake-up was (``dtce_event_loop_lag_seconds``). A watchdog thread watches
+the heartbeat: when the loop has not got back to it for longer than
+``block_threshold``, something is running on the loop without yielding. The
+watchdog then grabs the loop thread's current Python stack and logs it with
+the request being served, so a stall points at a file and line rather than
+"the bot is slow". When the loop comes back, the total stall is logged too.
+
+The request id is found by walking the blocked stack up to the tracing
+middleware's ``StageRecorder``. Python 3.11 gives no way to read another task's
+contextvars from a different thread. Work in tasks spawned outside a request
+is reported with the task's name instead.
+
+``debug=True`` also turns on asyncio debug mode with ``slow_callback_duration``
+set to the threshold, so asyncio itself logs every slow callback. That is useful
+when hunting, but too expensive to leave on.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+import structlog
+
+from .metrics import MetricsRegistry, get_metrics_registry
+from .stage_timer import StageRecorder
+
+logger = structlog.get_logger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STACK_LIMIT = 40  # Innermost frames kept in the logged stack
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.25, debug: bool = False,
+                 registry: Optional[MetricsRegistry] = None):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.debug = debug
+        registry = registry or get_metrics_registry()
+        self.lag_seconds = registry.histogram(
+            "dtce_event_loop_lag_seconds", "How late event-loop heartbeats wake up", buckets=LAG_BUCKETS)
+        self.blocked = registry.counter(
+            "dtce_event_loop_blocked_total", "Times the event loop was blocked past the threshold")
+        self.max_lag = 0.0
+        self.last_block: Optional[Dict[str, Any]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._block_reported = False
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start on the running loop (call from a coroutine, e.g. a startup hook)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if self.debug:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.block_threshold
+        self._stopping.clear()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info("Event loop monitor started", interval_ms=self.interval * 1000,
+                    block_threshold_ms=self.block_threshold * 1000, debug=self.debug)
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 2 + 1)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            # Measured from the previous beat (or start), so a stall before the first beat still counts
+            expected = self._last_beat + self.interval
+            await asyncio.sleep(max(0.0, expected - time.monotonic()))
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            self.lag_seconds.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if self._block_reported:
+                self._block_reported = False
+                logger.warning("Event loop unblocked", blocked_ms=round(lag * 1000, 1),
+                               request_id=(self.last_block or {}).get("request_id", ""),
+                               location=(self.last_block or {}).get("location", ""))
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.block_threshold / 4)
+        while not self._stopping.wait(poll):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled >= self.block_threshold and not self._block_reported:
+                self._block_reported = True
+                self._report_block(stalled)
+
+    def _report_block(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.format_stack(frame, limit=STACK_LIMIT)
+        innermost = traceback.extract_stack(frame, limit=1)[-1]
+        self.blocked.inc()
+        self.last_block = {
+            "at": time.time(),
+            "stalled_ms": round(stalled * 1000, 1),
+            "request_id": _request_id_from_stack(frame) or self._current_task_name(),
+            "location": f"{innermost.filename}:{innermost.lineno} in {innermost.name}",
+            "stack": "".join(stack),
+        }
+        logger.warning("Event loop blocked", stalled_ms=self.last_block["stalled_ms"],
+                       request_id=self.last_block["request_id"], location=self.last_block["location"],
+                       stack=self.last_block["stack"])
+
+    def _current_task_name(self) -> str:
+        # Read from the watchdog thread; a stale answer only affects the log label
+        task = asyncio.tasks._current_tasks.get(self._loop) if self._loop is not None else None
+        return f"task:{task.get_name()}" if task is not None else ""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "blocked": int(self.blocked.value()),
+            "last_block": {key: value for key, value in (self.last_block or {}).items() if key != "stack"},
+        }
+
+
+def _request_id_from_stack(frame) -> str:
+    """The request id of the ``StageRecorder`` held by a frame on the blocked stack, if any."""
+    while frame is not None:
+        recorder = frame.f_locals.get("recorder")
+        if isinstance(recorder, StageRecorder) and recorder.request_id:
+            return recorder.request_id
+        frame = frame.f_back
+    return ""
+
+
+_loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """Process-wide monitor configured from settings."""
+    global _loop_monitor
+    if _loop_monitor is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        _loop_monitor = LoopMonitor(
+            interval=settings.loop_monitor_interval_ms / 1000,
+            block_threshold=settings.loop_block_threshold_ms / 1000,
+            debug=settings.loop_monitor_debug,
+        )
+    return _loop_monitor
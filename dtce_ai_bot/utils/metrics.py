@@ -0,0 +1,177 @@
+"""
+Process-wide metrics in the Prometheus text exposition format.
+
+Counters and histograms are updated as requests run (see
+core/request_tracing.py); components that already keep their own stats (model
+router, OpenAI limiter, caches, single-flight groups) are read by collectors
+when ``/metrics`` is scraped instead of being double-counted. No
+``prometheus_client`` dependency: the format is a few lines of text and the
+set of series here is small and fixed.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Seconds; spans from a cache hit (~1ms) up to a slow synthesis (~30s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+@dataclass
+class MetricFamily:
+    """One metric and its samples, as produced by a collector."""
+    name: str
+    kind: str  # "counter" | "gauge" | "histogram"
+    help: str
+    samples: List[Tuple[str, Dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels) -> None:
+        self.samples.append((self.name + suffix, {key: str(val) for key, val in labels.items()}, float(value)))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "counter", self.help)
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                family.add(value, **dict(zip(self.labelnames, key)))
+        return family
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[bisect_left(self.buckets, value)] += 1
+            self._sums[key] += value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(tuple(str(labels.get(name, "")) for name in self.labelnames), ()))
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "histogram", self.help)
+        with self._lock:
+            for key, counts in sorted(self._counts.items()):
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    family.add(cumulative, "_bucket", **labels, le=_format_value(bound))
+                family.add(self._sums[key], "_sum", **labels)
+                family.add(cumulative, "_count", **labels)
+        return family
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Named counters/histograms plus scrape-time collectors."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        with self._lock:
+            metrics, collectors = list(self._metrics.values()), list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                # One broken component must not take the whole scrape down
+                logger.warning("Metrics collector failed", collector=getattr(collector, "__name__", repr(collector)),
+                               error=str(e))
+        return families
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for family in self.collect():
+            if not family.samples:
+                continue
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples:
+                if labels:
+                    label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide registry that ``/metrics`` renders."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
@@ -11,11 +11,9 @@ from typing import Dict, Any, Optional, List
 import structlog
 import json
 from datetime import datetime
-from openai import AsyncAzureOpenAI
 import base64
-import PyPDF2
 import io
-from docx import Document
+from ..integrations.openai_limiter import create_async_openai_client
 
 logger = structlog.get_logger(__name__)
 
@@ -27,7 +25,7 @@ class OpenAIDocumentExtractor:
     
     def __init__(self, openai_endpoint: str, openai_key: str, deployment_name: str = "gpt-35-turbo"):
         """Initialize the OpenAI document extractor."""
-        self.client = AsyncAzureOpenAI(
+        self.client = create_async_openai_client(
             azure_endpoint=openai_endpoint,
             api_key=openai_key,
             api_version="2024-02-15-preview"
@@ -41,7 +39,7 @@ class OpenAIDocumentExtractor:
         Extract text from a blob using OpenAI and local libraries.
         
         Args:
-            blob_client: Azure blob client
+            blob_client: Azure blob client (azure.storage.blob.aio)
             content_type: MIME type of the document
             
         Returns:
@@ -54,7 +52,7 @@ class OpenAIDocumentExtractor:
                 logger.info("Starting OpenAI text extraction", blob_name=blob_name, attempt=attempt + 1)
                 
                 # Download blob content
-                blob_data = blob_client.download_blob().readall()
+                blob_data = await (await blob_client.download_blob()).readall()
                 
                 # Extract based on content type
                 if content_type and content_type.startswith('text/'):
@@ -150,6 +148,8 @@ class OpenAIDocumentExtractor:
     async def _extract_pdf_text(self, blob_data: bytes, blob_name: str) -> Dict[str, Any]:
         """Extract text from PDF using PyPDF2."""
         try:
+            import PyPDF2
+
             pdf_file = io.BytesIO(blob_data)
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             
@@ -185,6 +185,8 @@ class OpenAIDocumentExtractor:
     async def _extract_docx_text(self, blob_data: bytes, blob_name: str) -> Dict[str, Any]:
         """Extract text from DOCX using python-docx."""
         try:
+            from docx import Document
+
             docx_file = io.BytesIO(blob_data)
             doc = Document(docx_file)
             
@@ -0,0 +1,75 @@
+"""
+Reciprocal-rank fusion of several ranked result lists, plus a small per-question
+cache for the fused lists.
+
+Multi-query retrieval runs a few variants of the same question (as asked,
+normalized, keywords only, project-scoped) concurrently; RRF merges their
+rankings without having to compare scores across queries:
+
+    score(doc) = sum over lists of 1 / (k + rank_in_list)
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+DEFAULT_RRF_K = 60
+
+
+def document_key(document: Dict[str, Any]) -> str:
+    """Identity of a search result across queries (index key, else blob path)."""
+    return document.get('id') or document.get('blob_name') or document.get('filename', '')
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[Dict[str, Any]]], k: int = DEFAULT_RRF_K,
+                           key: Callable[[Dict[str, Any]], str] = document_key,
+                           labels: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Merge ranked lists into one, best fused score first.
+
+    The first copy seen of each document is kept, with ``rrf_score`` and
+    ``matched_queries`` (labels of the lists it appeared in) added.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+
+    for list_index, results in enumerate(result_lists):
+        label = labels[list_index] if labels else str(list_index)
+        for rank, document in enumerate(results, 1):
+            doc_key = key(document)
+            if doc_key not in fused:
+                fused[doc_key] = {**document, 'rrf_score': 0.0, 'matched_queries': []}
+            entry = fused[doc_key]
+            if label in entry['matched_queries']:
+                continue  # a list should not vote twice for the same document
+            entry['rrf_score'] += 1.0 / (k + rank)
+            entry['matched_queries'].append(label)
+
+    # sorted() is stable, so ties keep first-seen (best single-list) order
+    return sorted(fused.values(), key=lambda document: document['rrf_score'], reverse=True)
+
+
+class QueryResultCache:
+    """Small LRU with expiry for per-question retrieval results."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, cache_key) -> Optional[Any]:
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        return entry[1]
+
+    def put(self, cache_key, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[cache_key] = (time.monotonic(), value)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,244 @@
+"""
+On-demand request profiling with a bounded on-disk profile store.
+
+``RequestProfiler.session()`` profiles one request: with pyinstrument installed
+it samples only the request's own task (``async_mode="enabled"``) and stores
+an HTML flame view plus a speedscope JSON; without it, cProfile is used and the
+``.prof`` dump plus a cumulative-time text summary are stored. cProfile sees
+the whole thread while it is on, so other requests running concurrently show
+up in its output.
+
+One profile runs at a time; a request that asks while another is being
+profiled runs normally. Profiles are written under ``profiling_dir`` and the
+oldest are deleted once ``profiling_max_profiles`` or ``profiling_max_total_mb``
+is exceeded.
+"""
+
+import asyncio
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import structlog
+
+try:
+    import pyinstrument  # sampling, async-aware; cProfile is the fallback
+except ImportError:
+    pyinstrument = None
+
+logger = structlog.get_logger(__name__)
+
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-zA-Z_-]{1,40}$")
+# File extension -> media type for downloads
+PROFILE_FILES = {
+    "html": "text/html",
+    "speedscope.json": "application/json",
+    "prof": "application/octet-stream",
+    "txt": "text/plain",
+}
+SUMMARY_LINES = 80
+
+
+@dataclass
+class ProfileResult:
+    profile_id: str
+    files: Dict[str, bytes]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ProfileStore:
+    """Profiles as ``<id>.<ext>`` files plus an ``<id>.meta.json`` sidecar, oldest pruned first."""
+
+    def __init__(self, directory: str, max_profiles: int = 50, max_total_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self.max_total_bytes = max_total_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, result: ProfileResult) -> None:
+        with self._lock:
+            for extension, content in result.files.items():
+                with open(self._path(result.profile_id, extension), "wb") as handle:
+                    handle.write(content)
+            metadata = {**result.metadata, "id": result.profile_id, "files": sorted(result.files),
+                        "bytes": sum(len(content) for content in result.files.values())}
+            with open(self._path(result.profile_id, "meta.json"), "w", encoding="utf-8") as handle:
+                json.dump(metadata, handle)
+            self._prune()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first."""
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".meta.json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as handle:
+                    profiles.append(json.load(handle))
+            except (OSError, ValueError):
+                continue
+        return sorted(profiles, key=lambda profile: profile.get("id", ""), reverse=True)
+
+    def file_path(self, profile_id: str, extension: str) -> Optional[str]:
+        """Path of a stored profile file, or None (ids and extensions are validated, not joined blindly)."""
+        if not PROFILE_ID.match(profile_id) or extension not in PROFILE_FILES:
+            return None
+        path = self._path(profile_id, extension)
+        return path if os.path.isfile(path) else None
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def _prune(self) -> None:
+        profiles = sorted(self.list(), key=lambda profile: profile["id"])
+        total = sum(profile.get("bytes", 0) for profile in profiles)
+        while profiles and (len(profiles) > self.max_profiles or total > self.max_total_bytes):
+            oldest = profiles.pop(0)
+            total -= oldest.get("bytes", 0)
+            for extension in list(oldest.get("files", [])) + ["meta.json"]:
+                try:
+                    os.remove(self._path(oldest["id"], extension))
+                except OSError:
+                    pass
+
+
+class _Session:
+    """One running profile; ``stop()`` returns the rendered files."""
+
+    def __init__(self, interval: float):
+        if pyinstrument is not None:
+            self._profiler = pyinstrument.Profiler(interval=interval, async_mode="enabled")
+            self._profiler.start()
+            self.engine = "pyinstrument"
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            self.engine = "cprofile"
+
+    def stop(self) -> None:
+        if self.engine == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def render(self) -> Dict[str, bytes]:
+        if self.engine == "pyinstrument":
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            return {
+                "html": self._profiler.output_html().encode("utf-8"),
+                "speedscope.json": self._profiler.output(renderer=SpeedscopeRenderer()).encode("utf-8"),
+            }
+        summary = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(SUMMARY_LINES)
+        with tempfile.NamedTemporaryFile(suffix=".prof", delete=False) as handle:
+            dump_path = handle.name
+        try:
+            stats.dump_stats(dump_path)
+            with open(dump_path, "rb") as handle:
+                dump = handle.read()
+        finally:
+            os.remove(dump_path)
+        return {"prof": dump, "txt": summary.getvalue().encode("utf-8")}
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores the results."""
+
+    def __init__(self, store: ProfileStore, sample_every: int = 0, sample_paths: Optional[List[str]] = None,
+                 interval_seconds: float = 0.001, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self.sample_paths = list(sample_paths or [])
+        self.interval_seconds = interval_seconds
+        self._seen = 0
+        self._busy = threading.Lock()
+        self._stats = {"profiled": 0, "skipped_busy": 0, "failed": 0}
+
+    def should_sample(self, path: str) -> bool:
+        """Whether this request is the one-in-N sampled one."""
+        if not self.enabled or self.sample_every <= 0:
+            return False
+        if self.sample_paths and not any(path.startswith(prefix) for prefix in self.sample_paths):
+            return False
+        self._seen += 1
+        return self._seen % self.sample_every == 0
+
+    @asynccontextmanager
+    async def session(self, profile_id: str, metadata: Dict[str, Any]) -> AsyncIterator[bool]:
+        """Profile the block; yields False (and profiles nothing) if another profile is running."""
+        if not self._busy.acquire(blocking=False):
+            self._stats["skipped_busy"] += 1
+            yield False
+            return
+        started = time.perf_counter()
+        try:
+            session = _Session(self.interval_seconds)
+        except Exception as e:
+            self._busy.release()
+            self._stats["failed"] += 1
+            logger.warning("Profiler could not start", error=str(e))
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            session.stop()
+            self._busy.release()
+            metadata = {**metadata, "engine": session.engine,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+            try:
+                # Rendering and writing are CPU/disk work; keep them off the event loop
+                files = await asyncio.to_thread(session.render)
+                await asyncio.to_thread(self.store.save, ProfileResult(profile_id, files, metadata))
+                self._stats["profiled"] += 1
+                logger.info("Request profiled", profile_id=profile_id, engine=session.engine,
+                            duration_ms=metadata["duration_ms"])
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.warning("Profile could not be stored", profile_id=profile_id, error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "enabled": self.enabled, "sample_every": self.sample_every,
+                "sample_paths": self.sample_paths, "engine": "pyinstrument" if pyinstrument is not None else "cprofile",
+                "directory": self.store.directory}
+
+
+def new_profile_id(request_id: str) -> str:
+    """Sortable profile id: UTC timestamp plus a filesystem-safe request id."""
+    safe = re.sub(r"[^0-9a-zA-Z_-]", "", request_id)[:40] or "request"
+    return f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{safe}"
+
+
+_request_profiler: Optional[RequestProfiler] = None
+
+
+def get_request_profiler() -> RequestProfiler:
+    """Process-wide profiler configured from settings."""
+    global _request_profiler
+    if _request_profiler is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        directory = settings.profiling_dir or os.path.join(tempfile.gettempdir(), "dtce-profiles")
+        _request_profiler = RequestProfiler(
+            ProfileStore(directory, settings.profiling_max_profiles, settings.profiling_max_total_mb * 1024 * 1024),
+            sample_every=settings.profiling_sample_every,
+            sample_paths=settings.profiling_sample_paths,
+            interval_seconds=settings.profiling_interval_ms / 1000,
+            enabled=settings.profiling_enabled,
+        )
+    return _request_profiler
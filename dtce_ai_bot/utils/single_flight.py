@@ -0,0 +1,77 @@
+"""
+Single-flight request coalescing.
+
+When an announcement goes out, many users ask the same thing within seconds.
+Concurrent calls with the same key share one in-flight computation instead of
+each running the full pipeline:
+
+* the computation runs as its own task, so a caller that gives up (timeout,
+  client disconnect) does not cancel it for the others;
+* every caller waits at most ``timeout_seconds`` (``asyncio.TimeoutError``);
+* an exception raised by the computation is raised to every caller;
+* once it completes the key is released - this is coalescing, not caching.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key onto one task."""
+
+    def __init__(self, name: str, timeout_seconds: Optional[float] = None):
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await ``func(*args, **kwargs)``, or the identical call already in flight for ``key``."""
+        task = self._in_flight.get(key)
+        # A task left over from another event loop (tests, worker restarts) cannot be awaited here
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            task = None
+
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._release(key, done))
+            follower = False
+        else:
+            self.followers += 1
+            follower = True
+            logger.info("Coalesced onto in-flight request", group=self.name)
+
+        result = await asyncio.wait_for(asyncio.shield(task), self.timeout_seconds)
+        # Followers get their own copy so callers that annotate the result do not collide
+        return copy.copy(result) if follower else result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'in_flight': len(self._in_flight), 'leaders': self.leaders, 'followers': self.followers}
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so an error nobody is still waiting for is not reported as unhandled
+            logger.debug("Single-flight computation failed", group=self.name, error=str(task.exception()))
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Process-wide coalescing group, shared by every service instance using the same name."""
+    group = _groups.get(name)
+    if group is None:
+        from ..config.settings import get_settings
+
+        group = _groups[name] = SingleFlight(name, get_settings().single_flight_timeout_seconds or None)
+    return group
@@ -0,0 +1,135 @@
+"""
+Per-stage timing for the question pipeline.
+
+The pipeline wraps its steps in ``stage("search")`` blocks. When a
+``StageRecorder`` is active for the current task (``record_stages()``), each
+block adds its wall-clock and process-CPU time to it; otherwise a block costs one
+contextvar lookup, so the instrumentation stays in place for benchmarks and
+tracing to opt into.
+
+Stages can nest (the query embedding is computed inside search), so their
+durations are not meant to add up to the end-to-end time. Each block is also
+kept as a span (id, parent span, offset from the start of the recording) so a
+request's timeline can be returned with the response; the HTTP middleware in
+core/request_tracing.py opens one recorder per request, tagged with the request
+id, and folds its stages into the process-wide /metrics histograms.
+"""
+
+import contextvars
+import itertools
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float  # Seconds since the recorder was opened
+    wall: float
+    cpu: float
+
+
+@dataclass
+class StageRecorder:
+    wall_seconds: Dict[str, List[float]] = field(default_factory=dict)
+    cpu_seconds: Dict[str, float] = field(default_factory=dict)
+    values: Dict[str, float] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
+    request_id: str = ""
+    report_timings: bool = False  # The caller asked for timings in the response body
+    started: float = field(default_factory=time.perf_counter)
+
+    def add(self, name: str, wall: float, cpu: float) -> None:
+        self.wall_seconds.setdefault(name, []).append(wall)
+        self.cpu_seconds[name] = self.cpu_seconds.get(name, 0.0) + cpu
+
+    def count(self, name: str, value: float) -> None:
+        """Accumulate a per-request quantity (e.g. prompt tokens)."""
+        self.values[name] = self.values.get(name, 0.0) + value
+
+    def totals(self) -> Dict[str, float]:
+        """Total wall seconds per stage (repeated stages summed)."""
+        return {name: sum(durations) for name, durations in self.wall_seconds.items()}
+
+    def timings(self) -> Dict[str, Any]:
+        """JSON-ready stage totals and spans, in milliseconds."""
+        return {
+            "request_id": self.request_id,
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages_ms": {name: round(total * 1000, 1) for name, total in self.totals().items()},
+            "values": dict(self.values),
+            "spans": [
+                {"name": span.name, "id": span.span_id, "parent": span.parent_id,
+                 "start_ms": round(span.start * 1000, 1), "duration_ms": round(span.wall * 1000, 1),
+                 "cpu_ms": round(span.cpu * 1000, 1)}
+                for span in sorted(self.spans, key=lambda span: span.start)
+            ],
+        }
+
+
+_recorder: contextvars.ContextVar[Optional[StageRecorder]] = contextvars.ContextVar("stage_recorder", default=None)
+_current_span: contextvars.ContextVar[Optional[Tuple[int, str]]] = contextvars.ContextVar("stage_span", default=None)
+
+
+@contextmanager
+def record_stages(recorder: Optional[StageRecorder] = None) -> Iterator[StageRecorder]:
+    """Collect the stages run inside the block (and tasks it spawns) into ``recorder``."""
+    recorder = recorder or StageRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as pipeline stage ``name`` when a recorder is active."""
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+    span_id, parent = next(_span_ids), _current_span.get()
+    parent_id = parent[0] if parent is not None else None
+    token = _current_span.set((span_id, name))
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        _current_span.reset(token)
+        recorder.add(name, wall, cpu)
+        recorder.spans.append(Span(name, span_id, parent_id, wall_start - recorder.started, wall, cpu))
+
+
+def count(name: str, value: float) -> None:
+    """Add ``value`` to the active recorder's ``name`` counter (no-op without one)."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.count(name, value)
+
+
+def current_request_id() -> str:
+    """Request id of the active recorder ("" outside a traced request)."""
+    recorder = _recorder.get()
+    return recorder.request_id if recorder is not None else ""
+
+
+def current_stage() -> str:
+    """Name of the innermost stage being recorded ("" outside one)."""
+    span = _current_span.get()
+    return span[1] if span is not None else ""
+
+
+def requested_timings() -> Optional[Dict[str, Any]]:
+    """The active recorder's timings if the caller asked for them, else None."""
+    recorder = _recorder.get()
+    if recorder is None or not recorder.report_timings:
+        return None
+    return recorder.timings()
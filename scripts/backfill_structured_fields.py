@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Backfill the structured filter fields (project_number, year_code, doc_category,
+file_extension, is_superseded, is_system_file) on documents that were indexed
+before the indexers started writing them.
+
+Only blob names are listed - no content is downloaded or re-extracted - and
+the fields are written with 'merge' so everything else in the index is kept.
+Run once after deploying the new index schema (create_search_index adds the fields).
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents import SearchClient
+from azure.storage.blob import BlobServiceClient
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from dtce_ai_bot.config.settings import get_settings
+from dtce_ai_bot.utils.document_fields import derive_document_fields
+from dtce_ai_bot.utils.index_version import bump_index_version
+
+
+def document_id_for(blob_name: str) -> str:
+    """Same key sanitisation the indexers use."""
+    document_id = re.sub(r'[^a-zA-Z0-9_-]', '_', blob_name)
+    return re.sub(r'_+', '_', document_id).strip('_')
+
+
+def upload_batch(search_client: SearchClient, batch: list) -> tuple:
+    results = search_client.merge_documents(documents=batch)
+    succeeded = sum(1 for result in results if result.succeeded)
+    return succeeded, len(results) - succeeded
+
+
+def backfill(prefix: str, batch_size: int):
+    settings = get_settings()
+
+    storage_client = BlobServiceClient.from_connection_string(settings.azure_storage_connection_string)
+    search_client = SearchClient(
+        endpoint=f"https://{settings.azure_search_service_name}.search.windows.net",
+        index_name=settings.azure_search_index_name,
+        credential=AzureKeyCredential(settings.azure_search_admin_key)
+    )
+    container_client = storage_client.get_container_client(settings.azure_storage_container)
+
+    print(f"🔧 Backfilling structured fields for blobs under '{prefix or '/'}'")
+    batch, updated, missing = [], 0, 0
+
+    for blob in container_client.list_blobs(name_starts_with=prefix or None):
+        batch.append({"id": document_id_for(blob.name), **derive_document_fields(blob.name)})
+        if len(batch) >= batch_size:
+            succeeded, failed = upload_batch(search_client, batch)
+            updated, missing = updated + succeeded, missing + failed
+            print(f"  📤 {updated} updated, {missing} not in index")
+            batch = []
+
+    if batch:
+        succeeded, failed = upload_batch(search_client, batch)
+        updated, missing = updated + succeeded, missing + failed
+
+    print(f"\n✅ Updated: {updated}")
+    print(f"⏭️ Not in index (skipped): {missing}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill structured filter fields in the search index.")
+    parser.add_argument("--prefix", default="", help="Only blobs under this folder prefix (e.g. 'Projects/225').")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per merge batch.")
+    args = parser.parse_args()
+
+    try:
+        backfill(args.prefix, args.batch_size)
+    finally:
+        bump_index_version("backfill_structured_fields")
@@ -18,6 +18,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from dtce_ai_bot.config.settings import get_settings
+from dtce_ai_bot.utils.document_fields import derive_document_fields
+from dtce_ai_bot.utils.index_version import bump_index_version
 
 async def emergency_reindex():
     """Re-index all blobs immediately."""
@@ -100,7 +102,8 @@ async def emergency_reindex():
                 "last_modified": blob.last_modified.isoformat(),
                 "created_date": blob.creation_time.isoformat() if blob.creation_time else blob.last_modified.isoformat(),
                 "project_name": project_name,
-                "year": year
+                "year": year,
+                **derive_document_fields(blob.name)
             }
             
             # Upload to search index
@@ -129,4 +132,7 @@ async def emergency_reindex():
         print(f"\n💥 No documents were indexed - check the errors above")
 
 if __name__ == "__main__":
-    asyncio.run(emergency_reindex())
+    try:
+        asyncio.run(emergency_reindex())
+    finally:
+        bump_index_version("emergency_reindex")
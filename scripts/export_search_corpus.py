@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Export the Azure Search index to a JSONL corpus snapshot for the local search
+backend (search_backend=local, local_search_corpus_path=<file>).
+
+One document per line with every retrievable field, including content_vector,
+so offline runs see the same text, metadata and vectors as production.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents import SearchClient
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from dtce_ai_bot.config.settings import get_settings
+from dtce_ai_bot.integrations.azure_search import get_search_endpoint
+
+
+def export(output_path: str, filter_expression: str, limit: int):
+    settings = get_settings()
+    search_client = SearchClient(
+        endpoint=get_search_endpoint(),
+        index_name=settings.azure_search_index_name,
+        credential=AzureKeyCredential(settings.azure_search_admin_key)
+    )
+
+    print(f"📦 Exporting '{settings.azure_search_index_name}' to {output_path}")
+    exported = 0
+    with open(output_path, "w", encoding="utf-8") as corpus:
+        for result in search_client.search("*", filter=filter_expression or None, order_by=["id"]):
+            document = {key: value for key, value in result.items() if not key.startswith("@search.")}
+            corpus.write(json.dumps(document, default=str) + "\n")
+            exported += 1
+            if exported % 1000 == 0:
+                print(f"  ... {exported} documents")
+            if limit and exported >= limit:
+                break
+
+    print(f"✅ Exported {exported} documents")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the search index to a JSONL corpus snapshot")
+    parser.add_argument("output", help="Path of the JSONL file to write")
+    parser.add_argument("--filter", default="", help="Optional OData filter (e.g. \"folder ge 'Projects/225/'\")")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many documents (0 = all)")
+    args = parser.parse_args()
+    export(args.output, args.filter, args.limit)
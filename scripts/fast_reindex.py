@@ -7,7 +7,6 @@ Optimized for speed with smart filtering and batch processing
 import os
 import sys
 import asyncio
-import io
 from dotenv import load_dotenv
 from azure.storage.blob import BlobServiceClient
 from azure.search.documents import SearchClient
@@ -15,8 +14,6 @@ from azure.core.credentials import AzureKeyCredential
 import re
 from datetime import datetime, timezone
 import time
-import PyPDF2
-import docx
 from openai import AsyncAzureOpenAI
 from azure.core.exceptions import ServiceResponseError
 from azure.ai.formrecognizer import DocumentAnalysisClient
@@ -27,12 +24,11 @@ from typing import List, Dict, Optional
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Try to import additional libraries
-try:
-    import fitz  # PyMuPDF
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
+from dtce_ai_bot.utils.extraction_pool import close_local_extraction_pool
+from dtce_ai_bot.utils.extraction_router import get_extraction_router
+from dtce_ai_bot.utils.document_fields import derive_document_fields
+from dtce_ai_bot.utils.index_version import bump_index_version
+from dtce_ai_bot.integrations.openai_limiter import create_async_openai_client
 
 # Load environment variables
 load_dotenv()
@@ -40,8 +36,7 @@ load_dotenv()
 # Configuration for FAST processing
 MAX_WORKERS = 8  # Parallel processing
 BATCH_SIZE = 50  # Process in batches
-SKIP_FORM_RECOGNIZER_BY_DEFAULT = True  # Only use for truly problematic PDFs
-FAST_PDF_TIMEOUT = 10  # Max seconds per PDF
+MAX_ROUTED_FILE_BYTES = 50 * 1024 * 1024  # Larger PDFs/DOCX are indexed by name only
 
 # Global counters
 processed_count = 0
@@ -96,104 +91,6 @@ def document_needs_update(blob, existing_docs: Dict[str, Dict]) -> bool:
     
     return False  # Document is current and has good content
 
-def fast_extract_pdf_content(blob_data: bytes) -> str:
-    """Fast PDF extraction with timeout and fallback."""
-    try:
-        # Quick size check - skip huge files that will be slow
-        if len(blob_data) > 50 * 1024 * 1024:  # 50MB
-            return "Large PDF file (content extraction skipped for performance)"
-        
-        # Try PyMuPDF first (fastest)
-        if PYMUPDF_AVAILABLE:
-            try:
-                import signal
-                
-                def timeout_handler(signum, frame):
-                    raise TimeoutError("PDF extraction timeout")
-                
-                # Set timeout for PDF processing
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(FAST_PDF_TIMEOUT)
-                
-                try:
-                    with open(os.devnull, 'w') as devnull:
-                        import sys
-                        old_stderr = sys.stderr
-                        sys.stderr = devnull
-                        
-                        doc = fitz.open(stream=blob_data, filetype="pdf")
-                        text_content = ""
-                        
-                        # Only process first 10 pages for speed
-                        max_pages = min(10, len(doc))
-                        for page_num in range(max_pages):
-                            page = doc[page_num]
-                            page_text = page.get_text()
-                            if page_text and page_text.strip():
-                                text_content += page_text[:2000]  # Limit per page
-                                if len(text_content) > 8000:  # Stop if we have enough
-                                    break
-                        
-                        doc.close()
-                        sys.stderr = old_stderr
-                        
-                        if len(text_content.strip()) > 50:
-                            return text_content.strip()
-                            
-                finally:
-                    signal.alarm(0)  # Cancel timeout
-                    
-            except (TimeoutError, Exception):
-                pass  # Fall back to PyPDF2
-        
-        # Fallback to PyPDF2 (simpler, more reliable)
-        pdf_stream = io.BytesIO(blob_data)
-        pdf_reader = PyPDF2.PdfReader(pdf_stream)
-        
-        if pdf_reader.is_encrypted:
-            try:
-                pdf_reader.decrypt("")
-            except:
-                return "Encrypted PDF file (password protected)"
-        
-        text_content = ""
-        max_pages = min(5, len(pdf_reader.pages))  # Only first 5 pages for speed
-        
-        for page_num in range(max_pages):
-            try:
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text()
-                if page_text and page_text.strip():
-                    text_content += page_text[:2000]  # Limit per page
-                    if len(text_content) > 6000:  # Stop if we have enough
-                        break
-            except:
-                continue
-        
-        if len(text_content.strip()) > 50:
-            return text_content.strip()
-        else:
-            return "PDF file (limited text content - may be image-based)"
-            
-    except Exception as e:
-        return f"PDF file (extraction failed: {str(e)[:100]})"
-
-def fast_extract_docx_content(blob_data: bytes) -> str:
-    """Fast DOCX extraction."""
-    try:
-        docx_stream = io.BytesIO(blob_data)
-        doc = docx.Document(docx_stream)
-        
-        text_content = ""
-        for paragraph in doc.paragraphs[:100]:  # Limit paragraphs for speed
-            text_content += paragraph.text + "\n"
-            if len(text_content) > 8000:  # Stop if we have enough
-                break
-        
-        return text_content.strip() or "Word document (no text content found)"
-    except Exception as e:
-        return f"Word document (extraction failed: {str(e)[:100]})"
-
 def fast_extract_text_content(blob_data: bytes) -> str:
     """Fast text file extraction."""
     try:
@@ -212,17 +109,17 @@ def fast_extract_text_content(blob_data: bytes) -> str:
         except:
             return ""
 
-def fast_extract_document_content(blob_name: str, blob_data: bytes) -> str:
+async def fast_extract_document_content(blob_name: str, blob_data: bytes) -> str:
     """Fast document content extraction."""
     filename = blob_name.lower()
     
-    # PDF files
-    if filename.endswith('.pdf'):
-        return fast_extract_pdf_content(blob_data)
-    
-    # Word documents
-    elif filename.endswith(('.docx', '.dotx')):
-        return fast_extract_docx_content(blob_data)
+    # PDFs and Word documents: the extraction router keeps text-layer pages local
+    # and sends only image-only pages to Form Recognizer
+    if filename.endswith(('.pdf', '.docx', '.dotx')):
+        if len(blob_data) > MAX_ROUTED_FILE_BYTES:
+            return "Large file (content extraction skipped for performance)"
+        result = await get_extraction_router().extract(blob_data, blob_name)
+        return result.get('extracted_text', '')
     
     # Text files
     elif filename.endswith(('.txt', '.md', '.csv', '.log', '.py', '.js', '.html', '.xml', '.json')):
@@ -249,7 +146,7 @@ async def generate_embeddings_fast(openai_client: AsyncAzureOpenAI, text: str) -
         print(f"    ⚠️ Embedding generation failed: {e}")
         return []
 
-def process_blob_batch(blob_batch: List, search_client, openai_client, existing_docs: Dict[str, Dict]) -> List[Dict]:
+async def process_blob_batch(blob_batch: List, search_client, openai_client, existing_docs: Dict[str, Dict]) -> List[Dict]:
     """Process a batch of blobs in parallel."""
     global processed_count, skipped_count, error_count
     
@@ -272,7 +169,7 @@ def process_blob_batch(blob_batch: List, search_client, openai_client, existing_
             blob_client = search_client._client._client.get_blob_client(blob=blob.name)
             blob_data = blob_client.download_blob().readall()
             
-            content = fast_extract_document_content(blob.name, blob_data)
+            content = await fast_extract_document_content(blob.name, blob_data)
             
             # Extract metadata
             folder_path = blob.name.rsplit('/', 1)[0] if '/' in blob.name else ''
@@ -296,12 +193,7 @@ def process_blob_batch(blob_batch: List, search_client, openai_client, existing_
             content_vector = []
             if content and len(content.strip()) > 50:
                 try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    content_vector = loop.run_until_complete(
-                        generate_embeddings_fast(openai_client, content)
-                    )
-                    loop.close()
+                    content_vector = await generate_embeddings_fast(openai_client, content)
                 except:
                     pass  # Skip embeddings if failed
             
@@ -322,7 +214,8 @@ def process_blob_batch(blob_batch: List, search_client, openai_client, existing_
                 "last_modified": blob.last_modified.isoformat(),
                 "created_date": blob.creation_time.isoformat() if blob.creation_time else blob.last_modified.isoformat(),
                 "project_name": project_name,
-                "year": year
+                "year": year,
+                **derive_document_fields(blob.name)
             }
             
             documents_to_upload.append(search_document)
@@ -363,7 +256,7 @@ async def fast_reindex():
         credential=AzureKeyCredential(search_key)
     )
     
-    openai_client = AsyncAzureOpenAI(
+    openai_client = create_async_openai_client(
         api_key=os.getenv("AZURE_OPENAI_API_KEY"),
         api_version="2024-02-15-preview",
         azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
@@ -435,7 +328,7 @@ async def fast_reindex():
         print(f"\n📦 Processing batch {batch_num}/{total_batches} ({len(batch)} documents)")
         
         # Process batch
-        documents_to_upload = process_blob_batch(batch, search_client, openai_client, existing_docs)
+        documents_to_upload = await process_blob_batch(batch, search_client, openai_client, existing_docs)
         
         # Upload batch to search index
         if documents_to_upload:
@@ -474,4 +367,8 @@ async def fast_reindex():
         print(f"\n🤖 Bot should now have updated content!")
 
 if __name__ == "__main__":
-    asyncio.run(fast_reindex())
+    try:
+        asyncio.run(fast_reindex())
+    finally:
+        close_local_extraction_pool()
+        bump_index_version("fast_reindex")
@@ -7,7 +7,6 @@ Run this in parallel with other file type scripts
 import os
 import sys
 import asyncio
-import io
 from dotenv import load_dotenv
 from azure.storage.blob import BlobServiceClient
 from azure.search.documents import SearchClient
@@ -15,18 +14,16 @@ from azure.core.credentials import AzureKeyCredential
 import re
 from datetime import datetime, timezone
 import time
-import PyPDF2
 from openai import AsyncAzureOpenAI
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Try to import PyMuPDF
-try:
-    import fitz
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
+from dtce_ai_bot.utils.extraction_pool import ExtractionQuarantined, ExtractionTimeout, LocalExtractionPool
+from dtce_ai_bot.utils.local_extractors import PYMUPDF_AVAILABLE, pdf_page_texts
+from dtce_ai_bot.utils.document_fields import derive_document_fields
+from dtce_ai_bot.utils.index_version import bump_index_version
+from dtce_ai_bot.integrations.openai_limiter import create_async_openai_client
 
 # Load environment variables
 load_dotenv()
@@ -34,7 +31,11 @@ load_dotenv()
 # Configuration
 MAX_PAGES_PER_PDF = 10  # Speed limit
 MAX_CHARS_PER_PAGE = 2000  # Content limit
-PDF_TIMEOUT = 15  # Max seconds per PDF
+PDF_TIMEOUT = 15  # Max seconds per PDF (the extraction worker is killed on overrun)
+QUARANTINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extraction_quarantine.json")
+
+# PDF parsing runs in a killable worker process so a pathological file cannot hang the run
+extraction_pool = LocalExtractionPool(workers=1, timeout_seconds=PDF_TIMEOUT, quarantine_path=QUARANTINE_FILE)
 
 def fast_extract_pdf_content(blob_data: bytes, filename: str) -> str:
     """Ultra-fast PDF extraction optimized for speed."""
@@ -46,91 +47,28 @@ def fast_extract_pdf_content(blob_data: bytes, filename: str) -> str:
         
         print(f"    📄 Extracting PDF content ({size_mb:.1f}MB)...")
         
-        # Method 1: Try PyMuPDF (fastest but can be problematic)
-        if PYMUPDF_AVAILABLE:
-            try:
-                import signal
-                
-                def timeout_handler(signum, frame):
-                    raise TimeoutError("PDF timeout")
-                
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(PDF_TIMEOUT)
-                
-                try:
-                    # Suppress PyMuPDF errors
-                    with open(os.devnull, 'w') as devnull:
-                        old_stderr = sys.stderr
-                        sys.stderr = devnull
-                        
-                        doc = fitz.open(stream=blob_data, filetype="pdf")
-                        text_content = ""
-                        pages_processed = 0
-                        
-                        max_pages = min(MAX_PAGES_PER_PDF, len(doc))
-                        
-                        for page_num in range(max_pages):
-                            try:
-                                page = doc[page_num]
-                                page_text = page.get_text()
-                                
-                                if page_text and page_text.strip():
-                                    clean_text = page_text.strip()[:MAX_CHARS_PER_PAGE]
-                                    text_content += f"\\n--- Page {page_num + 1} ---\\n{clean_text}"
-                                    pages_processed += 1
-                                    
-                                    if len(text_content) > 8000:  # Stop if enough content
-                                        break
-                            except:
-                                continue
-                        
-                        doc.close()
-                        sys.stderr = old_stderr
-                        
-                        if pages_processed > 0:
-                            print(f"    ✅ PyMuPDF: {pages_processed} pages, {len(text_content)} chars")
-                            return text_content.strip()
-                        
-                finally:
-                    signal.alarm(0)
-                    
-            except (TimeoutError, Exception) as e:
-                print(f"    ⚠️  PyMuPDF failed: {str(e)[:50]}")
-        
-        # Method 2: PyPDF2 fallback (more reliable)
-        print(f"    📄 Trying PyPDF2...")
-        pdf_stream = io.BytesIO(blob_data)
-        pdf_reader = PyPDF2.PdfReader(pdf_stream)
-        
-        # Handle encryption
-        if pdf_reader.is_encrypted:
-            try:
-                if not pdf_reader.decrypt(""):
-                    return "Encrypted PDF file (password protected)"
-            except:
-                return "Encrypted PDF file (cannot decrypt)"
+        try:
+            page_texts = extraction_pool.run_sync(pdf_page_texts, blob_data, max_pages=MAX_PAGES_PER_PDF, key=filename)
+        except ExtractionQuarantined:
+            return "PDF file (skipped - quarantined after repeated extraction timeouts)"
+        except ExtractionTimeout:
+            print(f"    ⚠️  PDF extraction timed out after {PDF_TIMEOUT}s - worker killed")
+            return "PDF file (extraction timed out)"
         
         text_content = ""
         pages_processed = 0
-        max_pages = min(MAX_PAGES_PER_PDF, len(pdf_reader.pages))
         
-        for page_num in range(max_pages):
-            try:
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text()
+        for page_number, page_text in page_texts.items():
+            if page_text and page_text.strip():
+                clean_text = page_text.strip()[:MAX_CHARS_PER_PAGE]
+                text_content += f"\\n--- Page {page_number} ---\\n{clean_text}"
+                pages_processed += 1
                 
-                if page_text and page_text.strip():
-                    clean_text = page_text.strip()[:MAX_CHARS_PER_PAGE]
-                    text_content += f"\\n--- Page {page_num + 1} ---\\n{clean_text}"
-                    pages_processed += 1
-                    
-                    if len(text_content) > 8000:
-                        break
-            except Exception as e:
-                continue
+                if len(text_content) > 8000:  # Stop if enough content
+                    break
         
         if pages_processed > 0:
-            print(f"    ✅ PyPDF2: {pages_processed} pages, {len(text_content)} chars")
+            print(f"    ✅ {'PyMuPDF' if PYMUPDF_AVAILABLE else 'PyPDF2'}: {pages_processed} pages, {len(text_content)} chars")
             return text_content.strip()
         else:
             return "PDF file (no extractable text - may be image-based or corrupted)"
@@ -200,7 +138,7 @@ async def process_pdfs():
         credential=AzureKeyCredential(search_key)
     )
     
-    openai_client = AsyncAzureOpenAI(
+    openai_client = create_async_openai_client(
         api_key=os.getenv("AZURE_OPENAI_API_KEY"),
         api_version="2024-02-15-preview",
         azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
@@ -307,7 +245,8 @@ async def process_pdfs():
                 "last_modified": blob.last_modified.isoformat(),
                 "created_date": blob.creation_time.isoformat() if blob.creation_time else blob.last_modified.isoformat(),
                 "project_name": project_name,
-                "year": year
+                "year": year,
+                **derive_document_fields(blob.name)
             }
             
             # Upload to search
@@ -342,4 +281,8 @@ async def process_pdfs():
     print(f"📈 Rate: {rate:.1f} PDFs/minute")
 
 if __name__ == "__main__":
-    asyncio.run(process_pdfs())
+    try:
+        asyncio.run(process_pdfs())
+    finally:
+        extraction_pool.close()
+        bump_index_version("reindex_pdfs")
@@ -14,19 +14,9 @@ from azure.core.credentials import AzureKeyCredential
 import re
 from datetime import datetime
 import time
-import PyPDF2
-import docx
 from openai import AsyncAzureOpenAI
 from azure.core.exceptions import ServiceResponseError
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
 
-# Try to import additional PDF libraries for better extraction
-try:
-    import fitz  # PyMuPDF - better PDF text extraction
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
 try:
     import openpyxl
     EXCEL_SUPPORT = True
@@ -48,368 +38,12 @@ except ImportError:
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-
-def clean_extracted_text(text: str) -> str:
-    """Clean up text extracted from PDFs."""
-    if not text:
-        return ""
-    
-    # Remove excessive whitespace while preserving meaningful line breaks
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)  # Multiple line breaks to double
-    text = re.sub(r' +', ' ', text)  # Multiple spaces to single space
-    text = re.sub(r'\t+', ' ', text)  # Tabs to spaces
-    
-    # Remove common PDF artifacts
-    text = re.sub(r'[^\w\s\-.,!?()[\]{}:;"\'/\\&@#$%+=<>|~`]', ' ', text)  # Keep only readable chars
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace again
-    
-    return text.strip()
-
-
-# Global rate limiting for Form Recognizer
-FORM_RECOGNIZER_REQUESTS = 0
-FORM_RECOGNIZER_PAGES_PROCESSED = 0
-FORM_RECOGNIZER_MAX_REQUESTS_PER_MINUTE = 15  # Conservative limit
-FORM_RECOGNIZER_MAX_PAGES_PER_HOUR = 1000    # Cost management
-FORM_RECOGNIZER_LAST_REQUEST_TIME = 0
-
-def should_use_form_recognizer(estimated_pages: int = 1) -> bool:
-    """Determine if we should use Form Recognizer based on rate limits and cost."""
-    global FORM_RECOGNIZER_REQUESTS, FORM_RECOGNIZER_PAGES_PROCESSED, FORM_RECOGNIZER_LAST_REQUEST_TIME
-    
-    current_time = time.time()
-    
-    # Reset counters every hour
-    if current_time - FORM_RECOGNIZER_LAST_REQUEST_TIME > 3600:  # 1 hour
-        FORM_RECOGNIZER_PAGES_PROCESSED = 0
-        print(f"  🔄 Resetting Form Recognizer hourly limits")
-    
-    # Reset request counter every minute
-    if current_time - FORM_RECOGNIZER_LAST_REQUEST_TIME > 60:  # 1 minute
-        FORM_RECOGNIZER_REQUESTS = 0
-    
-    # Check rate limits
-    if FORM_RECOGNIZER_REQUESTS >= FORM_RECOGNIZER_MAX_REQUESTS_PER_MINUTE:
-        print(f"  ⏸️  Form Recognizer rate limit reached (requests/min)")
-        return False
-        
-    if FORM_RECOGNIZER_PAGES_PROCESSED + estimated_pages > FORM_RECOGNIZER_MAX_PAGES_PER_HOUR:
-        print(f"  💰 Form Recognizer page limit reached (cost management)")
-        return False
-    
-    return True
-
-
-def extract_pdf_content_form_recognizer(blob_data: bytes, form_recognizer_client) -> str:
-    """Extract PDF content using Azure Form Recognizer with rate limiting."""
-    global FORM_RECOGNIZER_REQUESTS, FORM_RECOGNIZER_PAGES_PROCESSED, FORM_RECOGNIZER_LAST_REQUEST_TIME
-    
-    if not form_recognizer_client:
-        return None
-    
-    # Quick check of PDF size to estimate pages (rough estimate: 50KB per page)
-    estimated_pages = max(1, len(blob_data) // 51200)
-    
-    if not should_use_form_recognizer(estimated_pages):
-        return None
-        
-    try:
-        print(f"  📄 Using Azure Form Recognizer (est. {estimated_pages} pages)...")
-        
-        # Rate limiting - add delay if needed
-        current_time = time.time()
-        if current_time - FORM_RECOGNIZER_LAST_REQUEST_TIME < 4:  # 4 seconds between requests
-            sleep_time = 4 - (current_time - FORM_RECOGNIZER_LAST_REQUEST_TIME)
-            print(f"  ⏱️  Rate limiting: waiting {sleep_time:.1f}s...")
-            time.sleep(sleep_time)
-        
-        # Update counters
-        FORM_RECOGNIZER_REQUESTS += 1
-        FORM_RECOGNIZER_LAST_REQUEST_TIME = time.time()
-        
-        # Use Form Recognizer's prebuilt-read model
-        poller = form_recognizer_client.begin_analyze_document(
-            "prebuilt-read", document=blob_data
-        )
-        result = poller.result()
-        
-        if not result.content:
-            return None
-            
-        # Form Recognizer provides the text content directly
-        text_content = result.content
-        
-        # Count actual pages and update counter
-        actual_pages = len(result.pages) if result.pages else 1
-        FORM_RECOGNIZER_PAGES_PROCESSED += actual_pages
-        
-        char_count = len(text_content)
-        
-        if char_count > 10:
-            print(f"  ✅ Form Recognizer extracted {char_count} characters from {actual_pages} pages")
-            print(f"  📊 Usage: {FORM_RECOGNIZER_REQUESTS}/{FORM_RECOGNIZER_MAX_REQUESTS_PER_MINUTE} req/min, {FORM_RECOGNIZER_PAGES_PROCESSED}/{FORM_RECOGNIZER_MAX_PAGES_PER_HOUR} pages/hour")
-            # Clean the text
-            cleaned_text = clean_extracted_text(text_content)
-            return cleaned_text
-        else:
-            return None
-            
-    except Exception as e:
-        print(f"  Warning: Form Recognizer extraction failed: {e}")
-        return None
-
-
-def extract_pdf_content_pymupdf(blob_data: bytes) -> str:
-    """Alternative PDF extraction using PyMuPDF (if available)."""
-    if not PYMUPDF_AVAILABLE:
-        return None
-        
-    try:
-        # Suppress PyMuPDF warnings and error messages
-        import sys
-        import os
-        from contextlib import redirect_stderr, redirect_stdout
-        
-        # Redirect stderr to suppress PyMuPDF error messages
-        with redirect_stderr(open(os.devnull, 'w')), redirect_stdout(open(os.devnull, 'w')):
-            doc = fitz.open(stream=blob_data, filetype="pdf")
-        
-        text_content = ""
-        pages_with_text = 0
-        total_chars_extracted = 0
-        
-        for page_num in range(len(doc)):
-            try:
-                # Suppress individual page errors too
-                with redirect_stderr(open(os.devnull, 'w')):
-                    page = doc[page_num]
-                    page_text = page.get_text()
-                
-                if page_text and page_text.strip():
-                    cleaned_text = clean_extracted_text(page_text)
-                    if len(cleaned_text) > 10:
-                        text_content += f"\n--- Page {page_num + 1} ---\n{cleaned_text}"
-                        pages_with_text += 1
-                        total_chars_extracted += len(cleaned_text)
-            except Exception:
-                # Skip problematic pages silently
-                continue
-        
-        doc.close()
-        
-        if pages_with_text > 0:
-            print(f"  ✅ PyMuPDF extracted text from {pages_with_text} pages ({total_chars_extracted} characters)")
-            return text_content.strip()
-        else:
-            print(f"  ⚠️  PyMuPDF found no extractable text (corrupted PDF or all images)")
-            return None
-            
-    except Exception as e:
-        print(f"  ⚠️  PyMuPDF extraction failed - PDF may be corrupted, trying other methods...")
-        return None
-
-
-def is_likely_scanned_pdf(blob_data: bytes) -> bool:
-    """Heuristic to determine if PDF is likely scanned and needs Form Recognizer."""
-    try:
-        # Quick check using PyPDF2 - if it extracts very little text, likely scanned
-        pdf_stream = io.BytesIO(blob_data)
-        pdf_reader = PyPDF2.PdfReader(pdf_stream)
-        
-        if len(pdf_reader.pages) == 0:
-            return False
-            
-        # Sample first page
-        first_page = pdf_reader.pages[0]
-        sample_text = first_page.extract_text()
-        
-        # If very little text relative to estimated page size, likely scanned
-        text_density = len(sample_text.strip()) / max(1, len(blob_data) // 10000)
-        
-        return text_density < 10  # Low text density suggests scanned document
-        
-    except:
-        return False  # If we can't analyze, assume not scanned
-
-
-def extract_pdf_content(blob_data: bytes, form_recognizer_client=None) -> str:
-    """Extract text content from PDF blob data with intelligent method selection."""
-    
-    print(f"  📄 Analyzing PDF ({len(blob_data)//1024}KB)...")
-    
-    # Strategy 1: For likely scanned documents, try Form Recognizer first if available
-    if form_recognizer_client and is_likely_scanned_pdf(blob_data):
-        print(f"  🔍 Detected likely scanned PDF - prioritizing Form Recognizer...")
-        fr_result = extract_pdf_content_form_recognizer(blob_data, form_recognizer_client)
-        if fr_result and len(fr_result.strip()) > 50:  # Good extraction
-            return fr_result
-    
-    # Strategy 2: Try PyMuPDF for regular PDFs (fast and good quality)
-    if PYMUPDF_AVAILABLE:
-        print(f"  📄 Trying PyMuPDF extraction...")
-        pymupdf_result = extract_pdf_content_pymupdf(blob_data)
-        if pymupdf_result and len(pymupdf_result.strip()) > 50:
-            return pymupdf_result
-        elif pymupdf_result is None:
-            print(f"  ⚠️  PyMuPDF couldn't extract text - PDF may be corrupted or image-based")
-    
-    # Strategy 3: Try PyPDF2 as backup
-    print(f"  📄 Trying PyPDF2 extraction...")
-    pypdf2_result = extract_pdf_content_pypdf2(blob_data)
-    if pypdf2_result and len(pypdf2_result.strip()) > 50:
-        return pypdf2_result
-    
-    # Strategy 4: If all else fails and we haven't tried Form Recognizer yet, try it now
-    if form_recognizer_client and not is_likely_scanned_pdf(blob_data):
-        print(f"  🆘 Last resort: trying Form Recognizer for difficult PDF...")
-        fr_result = extract_pdf_content_form_recognizer(blob_data, form_recognizer_client)
-        if fr_result:
-            return fr_result
-    
-    # If we get here, the PDF likely has no extractable text
-    return f"PDF file (no extractable text found - may be scanned images or protected)"
-
-
-def extract_pdf_content_pypdf2(blob_data: bytes) -> str:
-    """PyPDF2 extraction method (renamed for clarity)."""
-    try:
-        pdf_stream = io.BytesIO(blob_data)
-        pdf_reader = PyPDF2.PdfReader(pdf_stream)
-        
-        # Check if PDF is encrypted
-        if pdf_reader.is_encrypted:
-            print(f"  📄 PDF is encrypted - attempting to decrypt...")
-            try:
-                # Try empty password first (common case)
-                if pdf_reader.decrypt(""):
-                    print(f"  ✅ Successfully decrypted with empty password")
-                else:
-                    return None  # Let other methods try
-            except Exception as decrypt_error:
-                return None  # Let other methods try
-        
-        num_pages = len(pdf_reader.pages)
-        
-        text_content = ""
-        pages_with_text = 0
-        total_chars_extracted = 0
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            try:
-                # Try multiple extraction methods for each page
-                page_text = ""
-                
-                # Method 1: Standard extract_text()
-                standard_text = page.extract_text()
-                if standard_text and standard_text.strip():
-                    page_text = standard_text
-                
-                # Method 2: Try different orientations
-                if not page_text.strip():
-                    try:
-                        if hasattr(page, 'extract_text'):
-                            alt_text = page.extract_text(orientations=(0, 90, 180, 270))
-                            if alt_text and alt_text.strip():
-                                page_text = alt_text
-                    except:
-                        pass
-                
-                # Clean and add the extracted text
-                if page_text and page_text.strip():
-                    cleaned_text = clean_extracted_text(page_text)
-                    
-                    if len(cleaned_text) > 10:  # Only count pages with meaningful content
-                        text_content += f"\n--- Page {page_num + 1} ---\n{cleaned_text}"
-                        pages_with_text += 1
-                        total_chars_extracted += len(cleaned_text)
-                    
-            except Exception as e:
-                continue
-        
-        if pages_with_text == 0:
-            return None  # No text found
-        else:
-            print(f"  ✅ PyPDF2 extracted text from {pages_with_text}/{num_pages} pages ({total_chars_extracted} characters)")
-        
-        return text_content.strip()
-        
-    except Exception as e:
-        return None  # Let other methods try
-
-
-def extract_docx_content(blob_data: bytes) -> str:
-    """Extract text content from DOCX blob data with fallback options."""
-    try:
-        # First, try standard DOCX extraction
-        docx_stream = io.BytesIO(blob_data)
-        doc = docx.Document(docx_stream)
-        
-        text_content = ""
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_content += paragraph.text + "\n"
-        
-        # Also extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = []
-                for cell in row.cells:
-                    if cell.text.strip():
-                        row_text.append(cell.text.strip())
-                if row_text:
-                    text_content += " | ".join(row_text) + "\n"
-        
-        return text_content.strip()
-        
-    except Exception as e:
-        print(f"  Error extracting DOCX with python-docx: {e}")
-        
-        # Fallback 1: Try to extract as ZIP and read document.xml directly
-        try:
-            import zipfile
-            import xml.etree.ElementTree as ET
-            
-            docx_stream = io.BytesIO(blob_data)
-            with zipfile.ZipFile(docx_stream, 'r') as zip_file:
-                # Read the main document XML
-                if 'word/document.xml' in zip_file.namelist():
-                    xml_content = zip_file.read('word/document.xml')
-                    root = ET.fromstring(xml_content)
-                    
-                    # Extract text from XML (basic extraction)
-                    text_parts = []
-                    for elem in root.iter():
-                        if elem.text:
-                            text_parts.append(elem.text)
-                    
-                    extracted_text = ' '.join(text_parts).strip()
-                    if extracted_text:
-                        print(f"  ✅ Extracted via XML fallback ({len(extracted_text)} chars)")
-                        return extracted_text
-                        
-        except Exception as fallback_e:
-            print(f"  Fallback XML extraction also failed: {fallback_e}")
-        
-        # Fallback 2: Try legacy Office extraction for potentially misnamed files
-        try:
-            legacy_content = extract_legacy_office_content(blob_data, 'doc')
-            if legacy_content and len(legacy_content.strip()) > 20:
-                print(f"  ✅ Extracted as legacy format ({len(legacy_content)} chars)")
-                return legacy_content
-        except Exception as legacy_e:
-            print(f"  Legacy extraction also failed: {legacy_e}")
-        
-        # Fallback 3: Basic text extraction
-        try:
-            text_content = extract_text_content(blob_data)
-            if text_content and len(text_content.strip()) > 10:
-                print(f"  ✅ Extracted as plain text ({len(text_content)} chars)")
-                return text_content
-        except Exception as text_e:
-            print(f"  Text extraction also failed: {text_e}")
-        
-        print(f"  ❌ All extraction methods failed for DOCX file")
-        return f"DOCX file (extraction failed - possibly corrupted: {str(e)})"
+from dtce_ai_bot.utils.extraction_pool import close_local_extraction_pool
+from dtce_ai_bot.utils.extraction_router import get_extraction_router
+from dtce_ai_bot.utils.local_extractors import iter_xlsx_sheets
+from dtce_ai_bot.utils.document_fields import derive_document_fields
+from dtce_ai_bot.utils.index_version import bump_index_version
+from dtce_ai_bot.integrations.openai_limiter import create_async_openai_client
 
 
 def extract_legacy_office_content(blob_data: bytes, file_type: str) -> str:
@@ -486,23 +120,15 @@ def extract_excel_content(blob_data: bytes) -> str:
         return "Excel file (openpyxl not available for content extraction)"
     
     try:
-        excel_stream = io.BytesIO(blob_data)
-        workbook = openpyxl.load_workbook(excel_stream, data_only=True)
-        
-        text_content = ""
-        for sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
-            text_content += f"\n--- Sheet: {sheet_name} ---\n"
-            
-            for row in sheet.iter_rows(values_only=True):
-                row_text = []
-                for cell in row:
-                    if cell is not None:
-                        row_text.append(str(cell))
-                if row_text:
-                    text_content += " | ".join(row_text) + "\n"
-        
-        return text_content.strip()
+        # read_only streaming with row/column caps; truncated sheets get a summary line
+        text_parts = []
+        for sheet in iter_xlsx_sheets(blob_data):
+            text_parts.append(f"\n--- Sheet: {sheet.name} ---")
+            text_parts.extend(sheet.rows)
+            if sheet.summary:
+                text_parts.append(sheet.summary)
+        
+        return "\n".join(text_parts).strip()
     except Exception as e:
         print(f"  Error extracting Excel: {e}")
         return f"Excel file (content extraction failed: {str(e)})"
@@ -676,17 +302,17 @@ def should_skip_file(blob_name: str) -> bool:
     return any(filename.endswith(ext) for ext in skip_extensions)
 
 
-def extract_document_content(blob_name: str, blob_data: bytes, form_recognizer_client=None) -> str:
+async def extract_document_content(blob_name: str, blob_data: bytes) -> str:
     """Extract content from document based on file extension."""
     filename = blob_name.lower()
     
-    # PDF files
-    if filename.endswith('.pdf'):
-        return extract_pdf_content(blob_data, form_recognizer_client)
+    # PDFs and Word documents go through the API's extraction router: text-layer
+    # pages stay local, only image-only pages are sent to Form Recognizer
+    if filename.endswith(('.pdf', '.docx', '.dotx')):  # Include Word templates
+        result = await get_extraction_router().extract(blob_data, blob_name)
+        return result.get('extracted_text', '')
     
     # Modern Office formats (Office 2007+)
-    elif filename.endswith(('.docx', '.dotx')):  # Include Word templates
-        return extract_docx_content(blob_data)
     elif filename.endswith(('.xlsx', '.xlsm', '.xltx')):  # Include Excel templates
         return extract_excel_content(blob_data)
     elif filename.endswith(('.pptx', '.pptm', '.potx')):  # Include PowerPoint templates
@@ -769,10 +395,6 @@ async def production_reindex():
 
     search_key = os.getenv("AZURE_SEARCH_ADMIN_KEY") or os.getenv("AZURE_SEARCH_API_KEY")
     index_name = os.getenv("AZURE_SEARCH_INDEX_NAME", "dtce-documents-index")
-    
-    # Form Recognizer settings
-    form_recognizer_endpoint = os.getenv("AZURE_FORM_RECOGNIZER_ENDPOINT")
-    form_recognizer_key = os.getenv("AZURE_FORM_RECOGNIZER_KEY")
     container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME", "dtce-documents")
     
     if not connection_string or not search_key or not search_service_name:
@@ -789,26 +411,15 @@ async def production_reindex():
     )
     
     # Initialize OpenAI client for embeddings
-    openai_client = AsyncAzureOpenAI(
+    openai_client = create_async_openai_client(
         api_key=os.getenv("AZURE_OPENAI_API_KEY"),
         api_version="2024-02-15-preview",
         azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
     )
     
-    # Initialize Form Recognizer client for better PDF text extraction
-    form_recognizer_client = None
-    if form_recognizer_endpoint and form_recognizer_key:
-        try:
-            form_recognizer_client = DocumentAnalysisClient(
-                endpoint=form_recognizer_endpoint,
-                credential=AzureKeyCredential(form_recognizer_key)
-            )
-            print(f"✅ Form Recognizer client initialized for enhanced PDF extraction")
-        except Exception as e:
-            print(f"⚠️  Form Recognizer client initialization failed: {e}")
-            print(f"  Will fall back to basic PDF extraction methods")
-    else:
-        print(f"⚠️  Form Recognizer credentials not found, using basic PDF extraction")
+    # Form Recognizer (AZURE_FORM_RECOGNIZER_ENDPOINT / _KEY) is configured through the extraction router's settings
+    if not get_extraction_router().document_extractor.form_recognizer_endpoint:
+        print(f"⚠️  Form Recognizer credentials not found, scanned PDF pages will not be OCR'd")
     
     container_client = storage_client.get_container_client(container_name)
     
@@ -943,7 +554,7 @@ async def production_reindex():
             print(f"  📄 Downloading and extracting content...")
             try:
                 blob_data = blob_client.download_blob().readall()
-                content = extract_document_content(blob.name, blob_data, form_recognizer_client)
+                content = await extract_document_content(blob.name, blob_data)
                 
                 if not content or len(content.strip()) < 50:
                     print(f"  ⚠️  Minimal content extracted ({len(content)} chars)")
@@ -990,7 +601,8 @@ async def production_reindex():
                 "last_modified": blob.last_modified.isoformat(),
                 "created_date": blob.creation_time.isoformat() if blob.creation_time else blob.last_modified.isoformat(),
                 "project_name": project_name,
-                "year": year
+                "year": year,
+                **derive_document_fields(blob.name)
             }
             
             # Upload to search index with retry
@@ -1035,4 +647,8 @@ async def production_reindex():
         print(f"\n💥 No documents were indexed - check credentials and permissions")
 
 if __name__ == "__main__":
-    asyncio.run(production_reindex())
+    try:
+        asyncio.run(production_reindex())
+    finally:
+        close_local_extraction_pool()
+        bump_index_version("reindex_production")
@@ -38,36 +38,26 @@ os.environ.setdefault("ENVIRONMENT", "production")
 os.environ.setdefault("API_HOST", "0.0.0.0")
 os.environ.setdefault("API_PORT", "8000")
 
-print("🚀 Starting DTCE AI Bot on Azure App Service (v2025-01-20-DEBUG-SYNTAX)...")
+print("🚀 Starting DTCE AI Bot on Azure App Service...")
 
-# Debug: Check teams_bot.py syntax before importing
-try:
-    import ast
-    with open('dtce_ai_bot/bot/teams_bot.py', 'r') as f:
-        source = f.read()
-    
-    # Compile check
-    compile(source, 'dtce_ai_bot/bot/teams_bot.py', 'exec')
-    print("✅ teams_bot.py syntax is valid")
-    
-    # AST parse check  
-    ast.parse(source)
-    print("✅ teams_bot.py AST parsing successful")
-    
-except Exception as e:
-    print(f"❌ teams_bot.py syntax issue: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Import and create the app
-from dtce_ai_bot.core.app import create_app
-
-# Create the FastAPI application
-app = create_app()
+# core.app builds the application at import; creating it again here would
+# construct every router, client and cache twice on each cold start
+from dtce_ai_bot.core.app import app
 
 # For Azure App Service, the application should be available as 'app'
 if __name__ == "__main__":
     import uvicorn
+    from dtce_ai_bot.config.settings import get_settings
     port = int(os.environ.get("PORT", 8000))
-    print(f"🌐 Starting server on 0.0.0.0:{port}")
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    settings = get_settings()
+    if settings.web_concurrency > 1 and not settings.shared_state_url:
+        # Per-worker bot state and index versions would serve stale conversations and cached answers
+        print("⚠️ WEB_CONCURRENCY > 1 needs SHARED_STATE_URL; starting a single worker")
+    if settings.web_concurrency > 1 and settings.shared_state_url:
+        # Same as gunicorn -k uvicorn.workers.UvicornWorker -w N; workers share bot state,
+        # conversations, jobs and the index version through shared_state_url
+        print(f"🌐 Starting {settings.web_concurrency} workers on 0.0.0.0:{port}")
+        uvicorn.run("dtce_ai_bot.core.app:app", host="0.0.0.0", port=port, workers=settings.web_concurrency)
+    else:
+        print(f"🌐 Starting server on 0.0.0.0:{port}")
+        uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
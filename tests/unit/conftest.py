@@ -0,0 +1,18 @@
+"""
+Shared fixtures for the offline unit tests.
+
+Importing ``dtce_ai_bot`` builds the bot endpoints (and their OpenAI/Search
+clients) at import time, so give settings harmless placeholder values before
+any test module imports the package. Real values from the environment win.
+"""
+
+import os
+
+for _name, _value in {
+    "AZURE_OPENAI_API_KEY": "unit-test",
+    "AZURE_OPENAI_ENDPOINT": "https://unit-test.openai.azure.com",
+    "AZURE_SEARCH_SERVICE_ENDPOINT": "https://unit-test.search.windows.net",
+    "AZURE_SEARCH_API_KEY": "unit-test",
+    "OPENAI_API_KEY": "unit-test",
+}.items():
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,88 @@
+"""
+Tests for the answer cache: exact and embedding-similarity lookup, scoping by
+search filter, and invalidation by index version.
+"""
+
+import asyncio
+
+from dtce_ai_bot.services.azure_rag_service_v2 import AzureRAGService
+from dtce_ai_bot.utils.answer_cache import AnswerCache, normalize_question
+
+POLICY_FILTER = "search.in(doc_category, 'policy', '|')"
+
+
+def test_exact_match_ignores_case_and_punctuation():
+    cache = AnswerCache()
+    cache.store("Wellness policy?", POLICY_FILTER, "1", {"answer": "See the wellness policy."})
+
+    response, match, _ = cache.lookup("wellness   POLICY", POLICY_FILTER, "1")
+
+    assert normalize_question("Wellness policy?") == "wellness policy"
+    assert response["answer"] == "See the wellness policy."
+    assert match == "exact"
+
+
+def test_semantic_match_requires_threshold_and_same_scope():
+    cache = AnswerCache(similarity_threshold=0.95)
+    cache.store("wellness policy", POLICY_FILTER, "1", {"answer": "cached"}, embedding=[1.0, 0.0, 0.0])
+
+    near = cache.lookup("health and wellbeing policy", POLICY_FILTER, "1", embedding=[0.99, 0.05, 0.0])
+    far = cache.lookup("leave policy", POLICY_FILTER, "1", embedding=[0.7, 0.7, 0.0])
+    other_scope = cache.lookup("health and wellbeing policy", None, "1", embedding=[0.99, 0.05, 0.0])
+
+    assert near[1] == "semantic" and near[2] >= 0.95
+    assert far is None
+    assert other_scope is None
+
+
+def test_index_version_change_and_ttl_drop_entries():
+    cache = AnswerCache()
+    cache.store("wellness policy", None, "1", {"answer": "cached"})
+
+    assert cache.lookup("wellness policy", None, "2") is None
+    assert cache.get_stats()["entries"] == 0
+
+    expired = AnswerCache(ttl_seconds=-1)
+    expired.store("wellness policy", None, "1", {"answer": "cached"})
+    assert expired.lookup("wellness policy", None, "1") is None
+
+
+class FakeOpenAI:
+    max_retries = 0
+
+
+def test_repeat_question_skips_search_and_synthesis():
+    service = AzureRAGService(None, FakeOpenAI(), "gpt", "gpt-mini")
+    service.answer_cache = AnswerCache()
+    calls = {"synthesis": 0}
+
+    async def classify_intent(query):
+        return "Policy"
+
+    async def embedding(query):
+        return [1.0, 0.0]
+
+    async def retrieve(**kwargs):
+        return [{"id": "a", "filename": "Wellness.pdf", "content": "x" * 200}]
+
+    async def synthesize(**kwargs):
+        calls["synthesis"] += 1
+        return "Our wellness policy covers..."
+
+    service.intent_detector.classify_intent = classify_intent
+    service._get_query_embedding = embedding
+    service._retrieve_candidates = retrieve
+    service.two_phase_retrieval = False
+    service._synthesize_answer = synthesize
+
+    async def scenario():
+        first = await service.process_query("What's the wellness policy?")
+        second = await service.process_query("wellness policy")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert calls["synthesis"] == 1
+    assert first["cached"] is False
+    assert second["cached"] is True and second["cache_match"] == "exact"
+    assert second["answer"] == first["answer"]
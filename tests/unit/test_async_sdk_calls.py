@@ -0,0 +1,155 @@
+"""
+Guard against blocking Azure SDK calls inside coroutines.
+
+Every module on the request path must use the aio Search/Blob/Form Recognizer
+clients and await their I/O. A sync SDK call inside ``async def`` stalls every
+other in-flight request on the worker, so this test fails the build when one
+sneaks back in.
+"""
+
+import ast
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2] / "dtce_ai_bot"
+
+REQUEST_PATH_MODULES = [
+    "api/documents.py",
+    "api/project_scoping.py",
+    "bot/endpoints.py",
+    "bot/teams_bot.py",
+    "core/app.py",
+    "integrations/microsoft_graph.py",
+    "services/azure_rag_service_v2.py",
+    "services/document_qa.py",
+    "services/document_sync_service.py",
+    "services/dtce_database.py",
+    "services/project_scoping.py",
+    "services/rag_handler.py",
+    "services/specialized_search_service.py",
+    "services/sync_job_service.py",
+    "utils/document_extractor.py",
+    "utils/openai_document_extractor.py",
+]
+
+# SDK methods that perform network I/O; on aio clients they return awaitables.
+BLOCKING_METHODS = {
+    "begin_analyze_document",
+    "delete_blob",
+    "delete_documents",
+    "download_blob",
+    "exists",
+    "get_blob_properties",
+    "merge_or_upload_documents",
+    "readall",
+    "result",
+    "search",
+    "upload_blob",
+    "upload_documents",
+}
+
+# Only flag calls made on SDK-looking receivers (skips re.search, os.path.exists, ...).
+SDK_RECEIVER_HINTS = ("client", "blob", "poller", "downloader")
+
+SYNC_CLIENT_IMPORTS = {
+    ("azure.search.documents", "SearchClient"),
+    ("azure.storage.blob", "BlobServiceClient"),
+    ("azure.ai.formrecognizer", "DocumentAnalysisClient"),
+}
+
+
+def _receiver_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        # blob_client.download_blob().readall() -> judge by blob_client
+        return _receiver_name(node.func.value)
+    return ""
+
+
+class _CoroutineCallVisitor(ast.NodeVisitor):
+    """Collect un-awaited SDK calls lexically inside ``async def`` bodies."""
+
+    def __init__(self):
+        self.violations = []
+        self._awaited = set()
+        self._async_depth = 0
+
+    def visit_AsyncFunctionDef(self, node):
+        self._async_depth += 1
+        self.generic_visit(node)
+        self._async_depth -= 1
+
+    def visit_FunctionDef(self, node):
+        # Sync helpers nested in a coroutine run wherever they are called from.
+        saved, self._async_depth = self._async_depth, 0
+        self.generic_visit(node)
+        self._async_depth = saved
+
+    visit_Lambda = visit_FunctionDef
+
+    def visit_Await(self, node):
+        self._awaited.add(id(node.value))
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        if (
+            self._async_depth
+            and id(node) not in self._awaited
+            and isinstance(func, ast.Attribute)
+            and func.attr in BLOCKING_METHODS
+            and any(hint in _receiver_name(func.value).lower() for hint in SDK_RECEIVER_HINTS)
+        ):
+            self.violations.append(f"line {node.lineno}: {ast.unparse(func)}()")
+        self.generic_visit(node)
+
+
+def find_blocking_calls(source: str):
+    """Return human-readable descriptions of un-awaited SDK calls in coroutines."""
+    visitor = _CoroutineCallVisitor()
+    visitor.visit(ast.parse(source))
+    return visitor.violations
+
+
+def find_sync_client_imports(source: str):
+    """Return sync Azure client imports (the aio variants live in ``*.aio``)."""
+    found = []
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if (node.module, alias.name) in SYNC_CLIENT_IMPORTS:
+                    found.append(f"line {node.lineno}: from {node.module} import {alias.name}")
+    return found
+
+
+@pytest.mark.parametrize("module", REQUEST_PATH_MODULES)
+def test_no_blocking_sdk_calls_in_coroutines(module):
+    source = (PACKAGE_ROOT / module).read_text(encoding="utf-8")
+    assert find_blocking_calls(source) == []
+
+
+@pytest.mark.parametrize("module", REQUEST_PATH_MODULES)
+def test_request_path_uses_aio_clients(module):
+    source = (PACKAGE_ROOT / module).read_text(encoding="utf-8")
+    assert find_sync_client_imports(source) == []
+
+
+def test_guard_flags_sync_calls():
+    source = (
+        "async def handler(blob_client, search_client, poller):\n"
+        "    data = blob_client.download_blob().readall()\n"
+        "    results = search_client.search('x')\n"
+        "    ok = await blob_client.exists()\n"
+        "    result = await poller.result()\n"
+        "    def helper():\n"
+        "        return blob_client.exists()\n"
+    )
+    assert find_blocking_calls(source) == [
+        "line 2: blob_client.download_blob().readall()",
+        "line 2: blob_client.download_blob()",
+        "line 3: search_client.search()",
+    ]
@@ -0,0 +1,69 @@
+"""
+Tests for the per-stage timer and a zero-latency smoke run of the benchmark suite.
+"""
+
+import asyncio
+import json
+
+from benchmarks import compare, run
+from benchmarks.stubs import stub_embedding, stub_reply
+from dtce_ai_bot.utils.stage_timer import count, record_stages, stage
+
+
+def test_stages_are_recorded_only_inside_a_recorder():
+    with stage("search"):
+        count("prompt_tokens", 10)
+
+    async def pipeline():
+        with stage("search"):
+            await asyncio.sleep(0)
+        with stage("search"):
+            count("prompt_tokens", 5)
+
+    with record_stages() as recorder:
+        asyncio.run(pipeline())
+        count("prompt_tokens", 7)
+
+    assert len(recorder.wall_seconds["search"]) == 2
+    assert recorder.values == {"prompt_tokens": 12}
+    assert set(recorder.totals()) == {"search"}
+
+
+def test_stubs_are_deterministic():
+    assert stub_embedding("seismic", 8) == stub_embedding("seismic", 8) != stub_embedding("timber", 8)
+    intent = stub_reply([{"role": "system", "content": "You classify queries into knowledge categories."},
+                         {"role": "user", "content": 'User Query: "Where is the PS1 template?"'}])
+    assert intent == "Template"
+
+
+def test_percentiles_interpolate():
+    assert run.percentile([1, 2, 3, 4], 50) == 2.5
+    assert run.percentile([5], 99) == 5
+    assert run.percentile([], 95) == 0.0
+
+
+def test_zero_latency_run_reports_every_stage_and_diffs(tmp_path):
+    config = run.BenchmarkConfig(
+        repeat=1, warmup=0, openai_latency_ms=0, embedding_latency_ms=0, search_latency_ms=0, sheets_latency_ms=0,
+        documents=40, dimensions=16, categories=["Online References", "Greetings"],
+    )
+
+    report = run.build_report(config, asyncio.run(run.run_benchmark(config)))
+
+    qa, rag = report["targets"]["document_qa"], report["targets"]["rag_service"]
+    assert qa["requests"] == rag["requests"] == 3
+    assert {"greeting_check", "sheets_kb", "intent", "search", "embedding", "context_build", "synthesis",
+            "post_processing"} <= set(qa["stages"])
+    assert qa["stages"]["sheets_kb"]["requests"] == 2  # the greeting returns before the Sheets lookup
+    assert rag["prompt_tokens"]["total"] > 0 and rag["peak_alloc_kb"]["max"] > 0
+    assert report["meta"]["config"]["targets"] == ["document_qa", "rag_service"]
+
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps(report))
+    slower = json.loads(path.read_text())
+    slower["targets"]["rag_service"]["end_to_end_ms"]["p95"] = rag["end_to_end_ms"]["p95"] * 2 + 10
+    slower_path = tmp_path / "slower.json"
+    slower_path.write_text(json.dumps(slower))
+
+    assert compare.main([str(path), str(path)]) == 0
+    assert compare.main([str(path), str(slower_path)]) == 1
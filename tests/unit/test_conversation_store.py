@@ -0,0 +1,151 @@
+"""
+Tests for bounded conversation memory: LRU/TTL eviction, SQLite persistence
+and rolling summarization.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from dtce_ai_bot.services import azure_rag_service_v2
+from dtce_ai_bot.services.azure_rag_service_v2 import AzureRAGService
+from dtce_ai_bot.services.conversation_store import ConversationStore, SQLiteConversationBackend, recent_history
+
+
+def test_least_recently_used_and_idle_sessions_are_evicted():
+    store = ConversationStore(max_sessions=2, idle_ttl_seconds=3600)
+
+    async def scenario():
+        for session in ("a", "b", "c"):
+            await store.append(session, f"question {session}", "answer")
+        evicted = await store.get_history("a")
+        store._sessions["b"].updated_at -= 7200  # idle for two hours
+        return evicted, await store.get_history("b"), await store.get_history("c")
+
+    evicted, idle, active = asyncio.run(scenario())
+
+    assert evicted == [] and idle == []
+    assert [turn["content"] for turn in active] == ["question c", "answer"]
+    assert store.get_stats()["evicted"] == 1 and store.get_stats()["expired"] == 1
+
+
+def test_older_turns_are_folded_into_a_rolling_summary():
+    seen = []
+
+    async def summarizer(previous_summary, turns):
+        seen.append((previous_summary, len(turns)))
+        return f"{previous_summary}+{len(turns)}".strip("+")
+
+    store = ConversationStore(max_turns=6, keep_recent_turns=2, summarizer=summarizer)
+
+    async def scenario():
+        for i in range(10):
+            await store.append("s", f"q{i}", f"a{i}")
+        await store.wait_for_summaries()
+        return await store.get_history("s")
+
+    history = asyncio.run(scenario())
+
+    assert len(history) <= 7  # summary + at most max_turns messages, however long the conversation
+    assert history[0]["role"] == "system" and "Summary of the earlier conversation" in history[0]["content"]
+    assert history[-1]["content"] == "a9"
+    assert seen[0] == ("", 6)
+
+
+def test_summarizer_failure_falls_back_to_earlier_questions():
+    async def broken(previous_summary, turns):
+        raise RuntimeError("model unavailable")
+
+    store = ConversationStore(max_turns=4, keep_recent_turns=2, summarizer=broken)
+
+    async def scenario():
+        for i in range(3):
+            await store.append("s", f"what about project 22500{i}", "answer")
+        await store.wait_for_summaries()
+        return await store.get_history("s")
+
+    history = asyncio.run(scenario())
+
+    assert "User asked: what about project 225000" in history[0]["content"]
+
+
+def test_sessions_survive_eviction_through_the_sqlite_backend(tmp_path):
+    backend = SQLiteConversationBackend(str(tmp_path / "conversations.db"))
+    store = ConversationStore(max_sessions=1, backend=backend)
+
+    async def scenario():
+        await store.append("a", "wellness policy?", "here it is")
+        await store.append("b", "other", "question")  # evicts "a" from memory
+        return await store.get_history("a")
+
+    history = asyncio.run(scenario())
+
+    assert [turn["content"] for turn in history] == ["wellness policy?", "here it is"]
+    assert store.get_stats()["reloaded"] == 1
+    assert backend.purge_idle(older_than=float("inf")) == 2
+
+
+def test_append_does_not_wait_for_summarization_and_keeps_turns_added_meanwhile():
+    release = None
+
+    async def slow_summarizer(previous_summary, turns):
+        await release.wait()
+        return f"{len(turns)} earlier messages"
+
+    store = ConversationStore(max_turns=4, keep_recent_turns=2, summarizer=slow_summarizer)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        for i in range(3):
+            await asyncio.wait_for(store.append("s", f"q{i}", f"a{i}"), timeout=1)  # would hang if awaited inline
+        await store.append("s", "q3", "a3")  # arrives while the summary is still running
+        release.set()
+        await store.wait_for_summaries()
+        return await store.get_history("s")
+
+    history = asyncio.run(scenario())
+
+    assert history[0]["content"].endswith("earlier messages")
+    assert history[-1]["content"] == "a3" and len(history) <= 5
+    assert store.get_stats()["summarized"] >= 1
+
+
+class FakeOpenAI:
+    max_retries = 0
+
+
+class RecordingRouter:
+    def __init__(self):
+        self.messages = []
+
+    async def chat(self, client, call_site, messages, **kwargs):
+        self.messages.append(messages)
+        return SimpleNamespace(text="Answer.")
+
+
+def test_summary_of_a_summarized_session_reaches_the_synthesis_prompt(monkeypatch):
+    async def summarizer(previous_summary, turns):
+        return "Discussing project 219 retaining wall design"
+
+    store = ConversationStore(max_turns=6, keep_recent_turns=4, summarizer=summarizer)
+    router = RecordingRouter()
+    monkeypatch.setattr(azure_rag_service_v2, "get_model_router", lambda: router)
+    service = AzureRAGService(None, FakeOpenAI(), "gpt", "gpt-mini")
+
+    async def scenario():
+        for i in range(5):
+            await store.append("s", f"q{i}", f"a{i}")
+        await store.wait_for_summaries()
+        history = await store.get_history("s")
+        await service._synthesize_answer("what about the footings?", [{"filename": "Calcs.pdf", "content": "x"}],
+                                         conversation_history=history)
+        return history
+
+    history = asyncio.run(scenario())
+    user_prompt = router.messages[-1][-1]["content"]
+
+    assert len(history) > 4 and history[0]["role"] == "system"
+    assert "project 219 retaining wall" in user_prompt
+    assert "a4" in user_prompt and "q1" not in user_prompt
+    assert recent_history(history) == [history[0]] + history[-3:]
+    assert recent_history([{"role": "user", "content": "hi"}] * 5) == [{"role": "user", "content": "hi"}] * 3
@@ -0,0 +1,109 @@
+"""
+Tests for page-range Form Recognizer extraction of long PDFs.
+"""
+
+import asyncio
+import io
+from types import SimpleNamespace
+
+import PyPDF2
+import pytest
+
+from dtce_ai_bot.utils.document_extractor import EnhancedDocumentExtractor, _page_ranges
+
+
+def make_pdf(page_count: int) -> bytes:
+    """Blank PDF whose page N is (100 + N) points wide, so a fake OCR can tell pages apart."""
+    writer = PyPDF2.PdfWriter()
+    for number in range(1, page_count + 1):
+        writer.add_blank_page(width=100 + number, height=100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class FakeAnalysisClient:
+    """Stands in for the aio DocumentAnalysisClient; 'reads' each page as 'text of page N'."""
+
+    def __init__(self, fail_once_on_page=None, fail_always_on_page=None):
+        self.fail_once_on_page = fail_once_on_page
+        self.fail_always_on_page = fail_always_on_page
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def begin_analyze_document(self, model_id, document):
+        reader = PyPDF2.PdfReader(io.BytesIO(document))
+        numbers = [int(float(page.mediabox.width)) - 100 for page in reader.pages]
+        self.calls.append(numbers[0])
+        client = self
+
+        class Poller:
+            async def result(self):
+                client.in_flight += 1
+                client.max_in_flight = max(client.max_in_flight, client.in_flight)
+                await asyncio.sleep(0.01)
+                client.in_flight -= 1
+                if numbers[0] == client.fail_always_on_page:
+                    raise RuntimeError("analysis failed")
+                if numbers[0] == client.fail_once_on_page:
+                    client.fail_once_on_page = None
+                    raise RuntimeError("transient failure")
+                return SimpleNamespace(pages=[
+                    SimpleNamespace(
+                        page_number=index + 1,
+                        lines=[SimpleNamespace(content=f"text of page {number}", polygon=[1], confidence=0.95)]
+                    )
+                    for index, number in enumerate(numbers)
+                ])
+
+        return Poller()
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    def build(fake):
+        monkeypatch.setattr(EnhancedDocumentExtractor, "client", property(lambda self: fake))
+        instance = EnhancedDocumentExtractor("https://unit-test.cognitiveservices.azure.com", "key")
+        instance.pages_per_range = 10
+        instance.max_concurrent_analyses = 2
+        instance.retry_delay = 0
+        return instance
+    return build
+
+
+def test_page_ranges_cover_every_page():
+    assert _page_ranges(25, 10) == [(1, 10), (11, 20), (21, 25)]
+    assert _page_ranges(3, 10) == [(1, 3)]
+
+
+def test_ranges_reassembled_in_page_order_under_concurrency_cap(extractor):
+    fake = FakeAnalysisClient()
+    result = asyncio.run(extractor(fake)._extract_pdf_in_page_ranges(make_pdf(45), "spec.pdf", 45))
+
+    text = result["extracted_text"]
+    positions = [text.index(f"--- Page {n} ---\ntext of page {n}") for n in range(1, 46)]
+    assert positions == sorted(positions)
+    assert result["page_ranges"] == 5
+    assert result["failed_page_ranges"] == []
+    assert result["extraction_method"] == "pdf_ocr_page_ranges"
+    assert fake.max_in_flight <= 2
+
+
+def test_only_failed_ranges_are_retried(extractor):
+    fake = FakeAnalysisClient(fail_once_on_page=11)
+    result = asyncio.run(extractor(fake)._extract_pdf_in_page_ranges(make_pdf(30), "spec.pdf", 30))
+
+    assert sorted(fake.calls) == [1, 11, 11, 21]
+    assert result["failed_page_ranges"] == []
+    assert "text of page 15" in result["extracted_text"]
+
+
+def test_range_that_keeps_failing_falls_back_to_text_layer(extractor):
+    fake = FakeAnalysisClient(fail_always_on_page=11)
+    result = asyncio.run(extractor(fake)._extract_pdf_in_page_ranges(make_pdf(30), "spec.pdf", 30))
+
+    assert result["failed_page_ranges"] == ["11-20"]
+    assert "text of page 10" in result["extracted_text"]
+    assert "text of page 21" in result["extracted_text"]
+    assert "text of page 15" not in result["extracted_text"]
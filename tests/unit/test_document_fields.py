@@ -0,0 +1,55 @@
+"""
+Tests for the structured index fields derived from blob paths.
+"""
+
+from dtce_ai_bot.utils.document_fields import (
+    derive_document_fields,
+    is_superseded_path,
+    is_system_path,
+    odata_in,
+    project_number_filter,
+)
+
+
+def test_project_file_fields():
+    fields = derive_document_fields("Projects/225/225221/Superseded/Calc Sheet.PDF")
+
+    assert fields == {
+        'project_number': '225221',
+        'year_code': '225',
+        'doc_category': 'projects',
+        'file_extension': 'pdf',
+        'is_superseded': True,
+        'is_system_file': False,
+    }
+
+
+def test_non_project_file_has_empty_project_fields():
+    fields = derive_document_fields("Engineering/Templates/Beam Design.xlsx")
+
+    assert fields['project_number'] == ''
+    assert fields['year_code'] == ''
+    assert fields['doc_category'] == 'engineering'
+    assert fields['is_superseded'] is False
+    assert fields['is_system_file'] is False
+
+
+def test_flags_match_whole_words_only():
+    # 'Templates' is not 'temp', 'Holdings' is not 'old'
+    assert not is_system_path("Engineering/Templates/Letter.docx")
+    assert not is_superseded_path("Clients/Smith Holdings/Report.pdf")
+
+    assert is_system_path("Projects/225/225221/Photos/IMG_001.jpg")
+    assert is_system_path("Projects/225/225221/~$Report.docx")
+    assert is_system_path("Projects/users.dat")
+    assert is_superseded_path("Projects/225/225221/Report OLD.pdf")
+
+
+def test_project_number_filter():
+    assert project_number_filter("225221") == "project_number eq '225221'"
+    assert project_number_filter("225") == "year_code eq '225'"
+    assert project_number_filter("2252") is None
+
+
+def test_odata_in_escapes_quotes():
+    assert odata_in("doc_category", ["policy", "o'brien"]) == "search.in(doc_category, 'policy|o''brien', '|')"
@@ -0,0 +1,116 @@
+"""
+Tests for the killable local extraction process pool.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dtce_ai_bot.utils import extraction_pool
+from dtce_ai_bot.utils.extraction_pool import (
+    ExtractionFailed,
+    ExtractionQuarantined,
+    ExtractionTimeout,
+    LocalExtractionError,
+    LocalExtractionPool,
+)
+
+
+def hang(content: bytes) -> str:
+    time.sleep(30)
+    return "never"
+
+
+def upper(content: bytes) -> str:
+    return content.decode().upper()
+
+
+def nap(content: bytes) -> str:
+    time.sleep(0.5)
+    return content.decode()
+
+
+def explode(content: bytes) -> str:
+    raise ValueError("corrupt xref table")
+
+
+@pytest.fixture
+def pool(tmp_path):
+    instance = LocalExtractionPool(workers=1, timeout_seconds=1.5, memory_limit_mb=0, quarantine_after=2,
+                                   quarantine_path=str(tmp_path / "quarantine.json"))
+    yield instance
+    instance.close()
+
+
+def test_worker_is_reused_between_jobs(pool):
+    assert pool.run_sync(upper, b"first") == "FIRST"
+    worker = pool._all[0]
+    assert pool.run_sync(upper, b"second") == "SECOND"
+    assert pool._all == [worker]
+
+
+def test_hung_file_is_killed_replaced_and_then_quarantined(pool, tmp_path):
+    started = time.monotonic()
+    with pytest.raises(ExtractionTimeout):
+        pool.run_sync(hang, b"bad", key="projects/bad.pdf")
+    assert time.monotonic() - started < 10
+
+    # The replacement worker serves the next file
+    assert pool.run_sync(upper, b"ok") == "OK"
+
+    with pytest.raises(ExtractionTimeout):
+        pool.run_sync(hang, b"bad", key="projects/bad.pdf")
+    with pytest.raises(ExtractionQuarantined):
+        pool.run_sync(hang, b"bad", key="projects/bad.pdf")
+
+    assert "projects/bad.pdf" in pool.get_quarantine()
+    reloaded = LocalExtractionPool(quarantine_after=2, quarantine_path=str(tmp_path / "quarantine.json"))
+    assert reloaded.is_quarantined("projects/bad.pdf")
+
+
+def test_extractor_errors_surface_without_quarantine(pool):
+    with pytest.raises(ExtractionFailed, match="corrupt xref"):
+        pool.run_sync(explode, b"data", key="broken.pdf")
+    assert not pool.is_quarantined("broken.pdf")
+    assert pool.run_sync(upper, b"still fine") == "STILL FINE"
+
+
+def test_more_callers_than_workers_all_complete():
+    instance = LocalExtractionPool(workers=2, timeout_seconds=1, memory_limit_mb=0)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as callers:
+            results = list(callers.map(lambda i: instance.run_sync(nap, f"file-{i}".encode()), range(8)))
+    finally:
+        instance.close()
+
+    # Four rounds of half-second jobs: the last callers wait well past one job's timeout
+    assert results == [f"file-{i}" for i in range(8)]
+
+
+def test_waiting_for_a_stuck_pool_gives_up_after_its_queue_budget(pool, monkeypatch):
+    busy = pool._acquire()
+    monkeypatch.setattr(extraction_pool, "WORKER_START_TIMEOUT_SECONDS", 0)
+    started = time.monotonic()
+    with pytest.raises(LocalExtractionError, match="No local extraction worker"):
+        pool.run_sync(upper, b"queued")
+    assert 1.4 < time.monotonic() - started < 10
+
+    pool._release(busy)
+    assert pool.run_sync(upper, b"queued") == "QUEUED"
+
+
+def test_close_wakes_callers_queued_for_a_worker(pool):
+    pool._acquire()
+    errors = []
+    waiter = threading.Thread(target=lambda: errors.append(pytest.raises(LocalExtractionError, pool.run_sync,
+                                                                          upper, b"queued")))
+    waiter.start()
+    time.sleep(0.3)
+    started = time.monotonic()
+    pool.close()
+    waiter.join(timeout=10)
+
+    assert not waiter.is_alive() and time.monotonic() - started < 5
+    assert "closed" in str(errors[0].value)
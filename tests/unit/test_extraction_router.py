@@ -0,0 +1,137 @@
+"""
+Tests for the cost-model extraction router.
+"""
+
+import asyncio
+import io
+
+import openpyxl
+import pytest
+
+from dtce_ai_bot.utils import extraction_router
+from dtce_ai_bot.utils.extraction_router import ExtractionRouter, probe_document
+
+PAGE_TEXT = "Structural calculations for the northern retaining wall, sheet {}."
+
+
+class FakeExtractor:
+    """Records which paid paths the router takes."""
+
+    def __init__(self, ocr_text="ocr text for a scanned drawing page with enough characters", ocr_fails=False):
+        self.ocr_text = ocr_text
+        self.ocr_fails = ocr_fails
+        self.ocr_page_requests = []
+        self.full_ocr_calls = 0
+
+    async def ocr_pdf_pages(self, blob_data, blob_name, pages):
+        self.ocr_page_requests.append(list(pages))
+        if self.ocr_fails:
+            raise RuntimeError("Form Recognizer unavailable")
+        return {page: self.ocr_text for page in pages}
+
+    async def _extract_pdf_with_ocr(self, blob_data, blob_name):
+        self.full_ocr_calls += 1
+        return {'extracted_text': self.ocr_text * 2, 'extraction_method': 'pdf_ocr'}
+
+    def _create_file_metadata(self, blob_name, content_type):
+        return {'extracted_text': f"File: {blob_name}", 'extraction_method': 'metadata_only'}
+
+
+class FakePool:
+    """Local extraction pool stand-in that 'reads' a fixed text layer."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def run(self, func, *args, key=None, **kwargs):
+        return dict(self.pages)
+
+
+@pytest.fixture
+def text_layer(monkeypatch):
+    """Pretend the PDF has the given per-page text layer (blank test PDFs have none)."""
+    def install(pages):
+        monkeypatch.setattr(extraction_router, "get_local_extraction_pool", lambda: FakePool(pages))
+    return install
+
+
+def test_text_pdf_uses_text_layer_without_ocr(text_layer):
+    text_layer({1: PAGE_TEXT.format(1), 2: PAGE_TEXT.format(2)})
+    fake = FakeExtractor()
+    result = asyncio.run(ExtractionRouter(fake).extract(b"%PDF", "calc.pdf", "application/pdf"))
+
+    assert result['route'] == "pdf_text_layer"
+    assert result['ocr_used'] is False
+    assert "sheet 2" in result['extracted_text']
+    assert fake.ocr_page_requests == [] and fake.full_ocr_calls == 0
+
+
+def test_mixed_pdf_sends_only_image_only_pages_to_ocr(text_layer):
+    text_layer({1: PAGE_TEXT.format(1), 2: "", 3: PAGE_TEXT.format(3), 4: "  "})
+    fake = FakeExtractor()
+    result = asyncio.run(ExtractionRouter(fake).extract(b"%PDF", "drawings.pdf", "application/pdf"))
+
+    assert result['route'] == "pdf_mixed"
+    assert fake.ocr_page_requests == [[2, 4]]
+    assert result['ocr_pages'] == 2
+    text = result['extracted_text']
+    assert text.index("sheet 1") < text.index("ocr text") < text.index("sheet 3")
+
+
+def test_scanned_pdf_goes_straight_to_ocr(text_layer):
+    text_layer({1: "", 2: ""})
+    fake = FakeExtractor()
+    result = asyncio.run(ExtractionRouter(fake).extract(b"%PDF", "scan.pdf", "application/pdf"))
+
+    assert result['route'] == "pdf_ocr"
+    assert fake.full_ocr_calls == 1
+
+
+def test_failed_route_falls_through_and_is_recorded(text_layer):
+    text_layer({1: PAGE_TEXT.format(1), 2: ""})
+    fake = FakeExtractor(ocr_fails=True)
+    router = ExtractionRouter(fake)
+    result = asyncio.run(router.extract(b"%PDF", "drawings.pdf", "application/pdf"))
+
+    assert result['routes_tried'][0] == "pdf_mixed"
+    assert result['route'] == "pdf_ocr"
+    stats = router.get_stats()
+    assert stats['pdf_mixed']['attempts'] == 1
+    assert stats['pdf_mixed']['successes'] == 0
+    assert stats['pdf_mixed']['last_error'] == "Form Recognizer unavailable"
+
+
+def test_plain_text_probe_skips_pdf_parsing():
+    probe = asyncio.run(probe_document(b"hello", "notes.txt", "text/plain"))
+    assert not probe.is_pdf
+    assert ExtractionRouter(FakeExtractor()).candidate_routes(probe) == ["plain_text", "metadata_only"]
+
+
+def test_word_templates_are_extracted_locally_like_documents():
+    router = ExtractionRouter(FakeExtractor())
+    for name in ("Report.docx", "Templates/Calc Sheet.dotx"):
+        probe = asyncio.run(probe_document(b"PK", name))
+        assert router.candidate_routes(probe)[0] == "docx_local"
+
+
+class InlinePool:
+    async def run(self, func, *args, key=None, **kwargs):
+        return func(*args, **kwargs)
+
+
+def test_spreadsheets_are_read_locally_before_form_recognizer(monkeypatch):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Loads"
+    for row in range(1, 6):
+        workbook.active.append([f"Beam B{row}", "UDL kN/m", row * 2.5])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    monkeypatch.setattr(extraction_router, "get_local_extraction_pool", lambda: InlinePool())
+    router = ExtractionRouter(FakeExtractor())
+
+    result = asyncio.run(router.extract(buffer.getvalue(), "Projects/219/Loads.xlsx"))
+
+    assert result['route'] == "xlsx_local" and result['routes_tried'] == ["xlsx_local"]
+    assert "Beam B5 | UDL kN/m | 12.5" in result['extracted_text']
+    assert router.candidate_routes(asyncio.run(probe_document(b"PK", "Loads.xlsx"))) == [
+        "xlsx_local", "form_recognizer", "metadata_only"]
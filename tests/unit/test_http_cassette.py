@@ -0,0 +1,156 @@
+"""
+Tests for HTTP record/replay: normalised keys, redaction, ordered replay and the
+httpx (OpenAI), azure-core (Search) and aiohttp-style (Graph) hooks.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import AsyncHttpTransport
+from azure.search.documents.aio import SearchClient
+from openai import AsyncAzureOpenAI
+
+from dtce_ai_bot.integrations.http_cassette import (
+    Cassette, CassetteAsyncHttpTransport, CassetteAsyncTransport, CassetteClientSession, CassetteMiss,
+    _BufferedAsyncResponse, normalize_request
+)
+
+CHAT_REPLY = {
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Recorded answer"}}],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+}
+
+
+def test_keys_ignore_host_query_order_json_layout_and_secrets():
+    first = normalize_request("post", "https://prod.example.com/docs?b=2&a=1&sig=abc", b'{"x": 1, "y": [1, 2]}')
+    second = normalize_request("POST", "https://dev.example.com/docs?a=1&b=2&sig=xyz", b'{"y":[1,2],"x":1}')
+    other = normalize_request("POST", "https://dev.example.com/docs?a=1&b=2", b'{"y":[1,2],"x":2}')
+
+    assert first == second
+    assert first[0] != other[0]
+    assert "abc" not in first[1]
+
+
+def test_openai_calls_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "cassette.json")
+    live_calls = []
+
+    def live(request):
+        live_calls.append(request)
+        reply = dict(CHAT_REPLY, choices=[dict(CHAT_REPLY["choices"][0], message={
+            "role": "assistant", "content": f"answer {len(live_calls)}"})])
+        return httpx.Response(200, json=reply, headers={"x-request-id": "r1", "retry-after": "0",
+                                                        "set-cookie": "session=secret"})
+
+    async def ask(cassette, transport=None, endpoint="https://prod.openai.azure.com"):
+        client = AsyncAzureOpenAI(
+            azure_endpoint=endpoint, api_key="sk-secret", api_version="2024-05-01-preview", max_retries=0,
+            http_client=httpx.AsyncClient(transport=CassetteAsyncTransport(cassette, transport)))
+        answers = []
+        for _ in range(2):
+            completion = await client.chat.completions.create(
+                model="gpt-4o", messages=[{"role": "user", "content": "q"}], temperature=0)
+            answers.append(completion.choices[0].message.content)
+        return answers
+
+    recorder = Cassette(path, "record")
+    assert asyncio.run(ask(recorder, httpx.MockTransport(live))) == ["answer 1", "answer 2"]
+    recorder.save()
+
+    saved = open(path).read()
+    assert "sk-secret" not in saved and "session=secret" not in saved and "x-request-id" not in saved
+
+    player = Cassette(path, "replay")
+    assert asyncio.run(ask(player, endpoint="https://dev.openai.azure.com")) == ["answer 1", "answer 2"]
+    assert player.get_stats()["replayed"] == 2
+
+
+def test_unrecorded_request_is_a_miss(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text(json.dumps({"version": 1, "interactions": {}}))
+    cassette = Cassette(str(path), "replay")
+
+    with pytest.raises(CassetteMiss):
+        asyncio.run(cassette.replay("openai", "GET", "https://x/models", None))
+
+
+class FakeSearchService(AsyncHttpTransport):
+    """Inner azure-core transport standing in for the live Search service while recording."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def send(self, request, **kwargs):
+        self.requests.append(request)
+        body = json.dumps({"value": [{"id": "doc-1", "@search.score": 2.5}], "@odata.count": 1}).encode()
+        return _BufferedAsyncResponse(request, 200, {"content-type": "application/json"}, body)
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def test_search_client_records_and_replays_through_azure_core_transport(tmp_path):
+    path = str(tmp_path / "search.json")
+
+    async def search(transport):
+        client = SearchClient("https://prod.search.windows.net", "idx", AzureKeyCredential("admin-key"),
+                              transport=transport)
+        results = await client.search("seismic", include_total_count=True, top=1)
+        rows = [row async for row in results]
+        count = await results.get_count()
+        await client.close()
+        return [row["id"] for row in rows], count
+
+    recorder = Cassette(path, "record")
+    service = FakeSearchService()
+    assert asyncio.run(search(CassetteAsyncHttpTransport(recorder, service))) == (["doc-1"], 1)
+    recorder.save()
+    assert "admin-key" not in open(path).read()
+
+    assert asyncio.run(search(CassetteAsyncHttpTransport(Cassette(path, "replay")))) == (["doc-1"], 1)
+    assert len(service.requests) == 1
+
+
+def test_graph_session_replays_and_redacts_tokens(tmp_path):
+    path = str(tmp_path / "graph.json")
+    recorder = Cassette(path, "record")
+    recorder.record("graph", "GET", "https://graph.microsoft.com/v1.0/sites?tempauth=abc", None, "", 200,
+                    {"Content-Type": "application/json"},
+                    b'{"value": [{"id": "site-1"}], "access_token": "eyJsecret"}', 0.25)
+    recorder.save()
+    assert "eyJsecret" not in open(path).read() and "tempauth=abc" not in open(path).read()
+
+    async def list_sites():
+        async with CassetteClientSession(Cassette(path, "replay", replay_latency="recorded")) as session:
+            async with session.get("https://graph.example/v1.0/sites?tempauth=other") as response:
+                return response.status, (await response.json())["value"]
+
+    assert asyncio.run(list_sites()) == (200, [{"id": "site-1"}])
+
+
+def test_sampled_latency_is_seeded(tmp_path):
+    path = str(tmp_path / "latency.json")
+    recorder = Cassette(path, "record")
+    for index, latency in enumerate([0.1, 0.2, 0.3]):
+        recorder.record("search", "GET", f"https://s/docs/{index}", None, "", 200, {}, b"{}", latency)
+    recorder.save()
+
+    def delays():
+        cassette = Cassette(path, "replay", replay_latency="sampled", seed=7)
+        return [cassette._next("search", "GET", "https://s/docs/0", None, "")[1] for _ in range(5)]
+
+    assert delays() == delays()
+    assert set(delays()) <= {0.1, 0.2, 0.3}
@@ -0,0 +1,46 @@
+"""
+Import-time budget: importing the app must stay cheap and must not load the
+document-format libraries, which are only needed once a file is extracted.
+"""
+
+import os
+import subprocess
+import sys
+
+# Cumulative seconds for ``import dtce_ai_bot.core.app`` (about 2.4s on a dev box);
+# override on slow CI runners with DTCE_IMPORT_BUDGET_SECONDS.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("DTCE_IMPORT_BUDGET_SECONDS", "5.0"))
+LAZY_PACKAGES = {"pandas", "openpyxl", "PyPDF2", "fitz", "extract_msg", "docx"}
+
+
+def _importtime(statement: str):
+    """Run ``statement`` in a fresh interpreter; return ``(module, cumulative_us, depth)`` per import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=os.environ.copy(), timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        rows.append((name.strip(), int(cumulative), (len(name) - len(name.lstrip())) // 2))
+    return rows
+
+
+def test_app_import_skips_document_libraries_and_fits_the_budget():
+    rows = _importtime("import dtce_ai_bot.core.app")
+
+    loaded = {name.split(".")[0] for name, _, _ in rows}
+    assert not loaded & LAZY_PACKAGES, f"imported at startup: {sorted(loaded & LAZY_PACKAGES)}"
+    total = sum(cumulative for _, cumulative, depth in rows if depth == 0) / 1e6
+    slowest = sorted(((cumulative, name) for name, cumulative, depth in rows if depth == 0), reverse=True)[:5]
+    assert total < IMPORT_BUDGET_SECONDS, f"imports took {total:.2f}s; slowest: {slowest}"
+
+
+def test_extraction_worker_imports_do_not_build_the_app():
+    rows = _importtime("import dtce_ai_bot.utils.local_extractors")
+
+    loaded = {name.split(".")[0] for name, _, _ in rows}
+    assert not loaded & {"fastapi", "botbuilder", "openai"}
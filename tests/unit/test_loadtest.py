@@ -0,0 +1,114 @@
+"""
+Tests for the load-test stand-ins (driven through the real SDK / HTTP) and the
+load-test report aggregation.
+"""
+
+import asyncio
+import json
+import socket
+
+import httpx
+import pytest
+from aiohttp import web
+from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
+from azure.search.documents.aio import SearchClient
+
+from benchmarks.loadtest import LoadConfig, LoadTest, RequestRecord, build_report, message_activity
+from benchmarks.standins import StandinConfig, Standins
+
+FAST = dict(openai_latency_ms=0, embedding_latency_ms=0, search_latency_ms=0, connector_latency_ms=0,
+            sheets_latency_ms=0, documents=30, dimensions=8)
+
+
+async def _serve(standins: Standins):
+    runner = web.AppRunner(standins.build_app())
+    await runner.setup()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_search_standin_answers_the_azure_sdk():
+    async def scenario():
+        runner, url = await _serve(Standins(StandinConfig(**FAST)))
+        client = SearchClient(url, "dtce-documents-index", AzureKeyCredential("key"))
+        try:
+            results = await client.search("seismic", include_total_count=True, top=3, query_type="semantic",
+                                          query_caption="extractive", select=["id", "filename"])
+            rows = [row async for row in results]
+            document = await client.get_document(rows[0]["id"], selected_fields=["id", "content"])
+            return rows, await results.get_count(), document
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    rows, count, document = asyncio.run(scenario())
+    assert 0 < len(rows) <= 3 and count >= len(rows)
+    assert rows[0]["@search.reranker_score"] is not None
+    assert document["content"]
+
+
+def test_search_standin_injects_outages():
+    async def scenario():
+        runner, url = await _serve(Standins(StandinConfig(search_error_rate=1.0, **FAST)))
+        client = SearchClient(url, "idx", AzureKeyCredential("key"), retry_total=0)
+        try:
+            with pytest.raises(HttpResponseError):
+                [row async for row in await client.search("seismic")]
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_openai_standin_throttles_and_counts():
+    async def scenario():
+        standins = Standins(StandinConfig(openai_429_rate=1.0, **FAST))
+        runner, url = await _serve(standins)
+        try:
+            async with httpx.AsyncClient(base_url=url) as client:
+                throttled = await client.post("/openai/deployments/gpt-4o/chat/completions",
+                                              json={"messages": [{"role": "user", "content": "hi"}]})
+                standins.config.openai_429_rate = 0.0
+                answered = await client.post("/openai/deployments/gpt-4o/chat/completions",
+                                             json={"messages": [{"role": "user", "content": "hi"}]})
+                embedded = await client.post("/openai/deployments/text-embedding-3-small/embeddings",
+                                             json={"input": ["a", "b"]})
+                stats = (await client.get("/__stats")).json()
+            return throttled, answered, embedded, stats
+        finally:
+            await runner.cleanup()
+
+    throttled, answered, embedded, stats = asyncio.run(scenario())
+    assert throttled.status_code == 429 and throttled.headers["retry-after"] == "1.0"
+    assert answered.json()["choices"][0]["message"]["content"] and answered.json()["usage"]["prompt_tokens"] > 0
+    assert [len(item["embedding"]) for item in embedded.json()["data"]] == [8, 8]
+    assert stats["requests"]["openai_chat"] == 2 and stats["throttled"] == {"openai_chat": 1}
+
+
+def test_report_groups_requests_by_step_and_second(tmp_path):
+    test = LoadTest(LoadConfig(users=[1, 2], step_seconds=2))
+    test.epoch_start = 1000.0
+    test.lag_log = str(tmp_path / "lag.jsonl")
+    with open(test.lag_log, "w") as log:
+        for t, lag in [(999.0, 900.0), (1000.5, 5.0), (1002.5, 40.0)]:
+            log.write(json.dumps({"t": t, "lag_ms": lag}) + "\n")
+    test.records = [
+        RequestRecord(0.1, 1, "ask", 0.5, 200),
+        RequestRecord(2.2, 2, "message", 1.0, 200),
+        RequestRecord(2.3, 2, "ask", 0.2, 500),
+        RequestRecord(2.4, 2, "greeting", 0.1, 200, error="degraded"),
+    ]
+
+    report = build_report(test, {"requests": {}})
+
+    first, second = report["steps"]
+    assert (first["requests"], first["error_rate"], first["loop_lag_ms"]["max"]) == (1, 0.0, 5.0)
+    assert (second["requests"], second["error_rate"], second["loop_lag_ms"]["max"]) == (3, 0.6667, 40.0)
+    assert second["by_kind"]["ask"]["statuses"] == {"500": 1}
+    assert [bucket["completed"] for bucket in report["timeline"]] == [1, 0, 2, 1]
+    assert message_activity("hi", 3, 1, "http://connector")["from"]["id"] == "load-user-3"
@@ -0,0 +1,121 @@
+"""
+Tests for the streaming XLSX / DOCX extractors.
+"""
+
+import io
+import re
+import zipfile
+
+import docx
+import openpyxl
+
+from dtce_ai_bot.utils.local_extractors import docx_text, iter_xlsx_sheets, xlsx_text
+
+
+def reference_docx_text(content: bytes) -> str:
+    """The previous full-DOM python-docx extraction."""
+    doc = docx.Document(io.BytesIO(content))
+    text_parts = [paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()]
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if row_text:
+                text_parts.append(" | ".join(row_text))
+    return "\n".join(text_parts) if text_parts else None
+
+
+def reference_xlsx_text(content: bytes) -> str:
+    """The previous full-load openpyxl extraction."""
+    workbook = openpyxl.load_workbook(io.BytesIO(content), data_only=True)
+    text_parts = []
+    for sheet_name in workbook.sheetnames:
+        text_parts.append(f"Sheet: {sheet_name}")
+        for row in workbook[sheet_name].iter_rows(values_only=True):
+            row_text = [str(value) for value in row if value is not None]
+            if row_text:
+                text_parts.append(" | ".join(row_text))
+        text_parts.append("")
+    return "\n".join(text_parts) if text_parts else None
+
+
+def make_docx() -> bytes:
+    doc = docx.Document()
+    doc.add_heading("Retaining wall specification", level=1)
+    paragraph = doc.add_paragraph("Concrete grade ")
+    paragraph.add_run("C40").bold = True
+    paragraph.add_run("\tcover 50mm\nline two")
+    doc.add_paragraph("   ")
+
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).text = "Member"
+    table.cell(0, 1).text = "Size"
+    table.cell(0, 2).text = "Grade"
+    table.cell(1, 0).text = "Beam B1"
+    table.cell(1, 1).merge(table.cell(1, 2)).text = "450x900 / 300 grade"
+    table.cell(1, 0).merge(table.cell(2, 0))
+    table.cell(2, 1).text = "Note"
+    table.cell(2, 1).add_paragraph("second paragraph")
+
+    doc.add_paragraph("Closing paragraph after the table")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_xlsx(rows_per_sheet: int) -> bytes:
+    workbook = openpyxl.Workbook()
+    loads = workbook.active
+    loads.title = "Loads"
+    loads.append(["Case", "kN", None, "Note"])
+    for number in range(rows_per_sheet):
+        loads.append([f"LC{number}", number * 1.5, None, None])
+    workbook.create_sheet("Empty")
+    summary = workbook.create_sheet("Summary")
+    summary.append([None, None])
+    summary.append(["Total", 42])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_streaming_docx_matches_python_docx():
+    content = make_docx()
+    assert docx_text(content) == reference_docx_text(content)
+    assert "Beam B1 | 450x900 / 300 grade | 450x900 / 300 grade" in docx_text(content)
+
+
+def test_streaming_xlsx_matches_full_load():
+    content = make_xlsx(rows_per_sheet=25)
+    assert xlsx_text(content) == reference_xlsx_text(content)
+
+
+def test_xlsx_row_cap_adds_sheet_summary():
+    sheets = list(iter_xlsx_sheets(make_xlsx(rows_per_sheet=50), max_rows_per_sheet=10))
+
+    loads = sheets[0]
+    assert loads.truncated and loads.rows_read == 10
+    assert loads.summary == "[Sheet Loads: first 10 rows indexed]"
+    assert [sheet.summary for sheet in sheets[1:]] == [None, None]
+    assert sheets[2].rows_read == 2 and not sheets[2].truncated
+
+
+def with_stale_dimension(content: bytes) -> bytes:
+    """Rewrite every worksheet's <dimension> to A1, as some writers leave it."""
+    source, buffer = zipfile.ZipFile(io.BytesIO(content)), io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', data)
+            target.writestr(item, data)
+    return buffer.getvalue()
+
+
+def test_stale_dimension_tag_does_not_truncate_sheets():
+    content = with_stale_dimension(make_xlsx(rows_per_sheet=9))
+    assert b'<dimension ref="A1"' in zipfile.ZipFile(io.BytesIO(content)).read("xl/worksheets/sheet1.xml")
+
+    loads = next(iter_xlsx_sheets(content))
+
+    assert loads.rows_read == 10 and not loads.truncated
+    assert xlsx_text(content) == reference_xlsx_text(content)
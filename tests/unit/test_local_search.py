@@ -0,0 +1,116 @@
+"""
+Tests for the offline search backend: BM25, the OData filter subset, vectors,
+facets/select/paging and the sync/aio client surface.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+from dtce_ai_bot.integrations.local_search import (
+    AsyncLocalSearchClient, LocalSearchClient, LocalSearchIndex, parse_filter
+)
+
+DOCUMENTS = [
+    {"id": "a", "filename": "225001 Seismic Report.pdf", "folder": "Projects/225/225001/",
+     "content": "Seismic assessment of the steel portal frame. Foundations are adequate.",
+     "project_number": "225001", "year": 2025, "is_superseded": False, "content_vector": [1.0, 0.0, 0.0]},
+    {"id": "b", "filename": "Wellness Policy.docx", "folder": "Policies/HR/",
+     "content": "Staff wellness policy and leave entitlements.",
+     "project_number": None, "year": 2023, "is_superseded": False, "content_vector": [0.0, 1.0, 0.0]},
+    {"id": "c", "filename": "225002 Drawings Superseded.pdf", "folder": "Projects/225/225002/",
+     "content": "Steel connection drawings, superseded by revision B.",
+     "project_number": "225002", "year": 2025, "is_superseded": True, "content_vector": [0.8, 0.0, 0.6]},
+    {"id": "d", "filename": "224010 Calcs.pdf", "folder": "Projects/224/224010/",
+     "content": "Timber retaining wall calculations.",
+     "project_number": "224010", "year": 2024, "is_superseded": False},
+]
+
+
+def ids(results):
+    return [result["id"] for result in results]
+
+
+@pytest.fixture
+def client():
+    return LocalSearchClient(LocalSearchIndex(DOCUMENTS))
+
+
+def test_bm25_ranks_by_term_weight_and_search_mode(client):
+    assert ids(client.search("seismic steel")) == ["a", "c"]
+    assert ids(client.search("seismic steel", search_mode="all")) == ["a"]
+    assert ids(client.search("wellness OR policy")) == ["b"]
+    assert ids(client.search("superse*")) == ["c"]
+    assert len(list(client.search("*"))) == 4
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("folder ge 'Projects/225/' and folder lt 'Projects/225~'", {"a", "c"}),
+    ("is_superseded ne true", {"a", "b", "d"}),
+    ("project_number eq '225001' or year lt 2024", {"a", "b"}),
+    ("not (year ge 2025) and project_number ne null", {"d"}),
+    ("search.in(id, 'a|d', '|')", {"a", "d"}),
+    ("search.ismatch('*225*', 'folder')", {"a", "c"}),
+    ("search.ismatch('wellness')", {"b"}),
+    ("project_number eq 'O''Brien'", set()),
+])
+def test_odata_subset(expression, expected):
+    predicate = parse_filter(expression)
+    assert {doc["id"] for doc in DOCUMENTS if predicate(doc)} == expected
+
+
+def test_invalid_filter_raises_like_azure(client):
+    with pytest.raises(HttpResponseError):
+        client.search("*", filter="year gt")
+
+
+def test_select_paging_count_facets_and_order(client):
+    results = client.search("*", filter="is_superseded ne true", select=["id", "year"], top=2, skip=1,
+                            order_by=["year desc"], facets=["year,count:5"], include_total_count=True)
+
+    rows = list(results)
+    assert [(row["id"], row["year"]) for row in rows] == [("d", 2024), ("b", 2023)]
+    assert set(rows[0]) == {"id", "year", "@search.score", "@search.reranker_score"}
+    assert results.get_count() == 3
+    assert results.get_facets()["year"] == [{"value": 2023, "count": 1}, {"value": 2024, "count": 1},
+                                            {"value": 2025, "count": 1}]
+
+
+def test_vector_knn_respects_filter_and_fuses_with_text(client):
+    vector_query = SimpleNamespace(vector=[1.0, 0.0, 0.0], k_nearest_neighbors=2, fields="content_vector")
+
+    assert ids(client.search(None, vector_queries=[vector_query])) == ["a", "c"]
+    assert ids(client.search(None, vector_queries=[vector_query], filter="is_superseded ne true")) == ["a", "b"]
+    hybrid = list(client.search("wellness", vector_queries=[vector_query]))
+    assert ids(hybrid)[0] == "a" and "b" in ids(hybrid)
+
+
+def test_semantic_captions_and_highlights(client):
+    row = next(iter(client.search("foundations", query_type="semantic", query_caption="extractive",
+                                  highlight_fields="content")))
+
+    assert row["@search.captions"][0].text == "Foundations are adequate."
+    assert row["@search.highlights"]["content"] == ["<em>Foundations</em> are adequate."]
+    assert row["@search.reranker_score"] == 4.0
+
+
+def test_async_client_loaded_from_jsonl_supports_writes(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text("\n".join(json.dumps(doc) for doc in DOCUMENTS) + "\n\n")
+    client = AsyncLocalSearchClient(LocalSearchIndex.from_jsonl(str(corpus)))
+
+    async def run():
+        results = await client.search("timber", include_total_count=True)
+        found = [row["id"] async for row in results]
+        count = await results.get_count()
+        await client.merge_documents([{"id": "d", "content": "Concrete retaining wall."}])
+        deleted = await client.delete_documents([{"id": "a"}])
+        after = [row["id"] async for row in await client.search("timber OR concrete")]
+        with pytest.raises(ResourceNotFoundError):
+            await client.get_document("a")
+        return found, count, deleted[0].succeeded, after, await client.get_document_count()
+
+    assert asyncio.run(run()) == (["d"], 1, True, ["d"], 3)
@@ -0,0 +1,53 @@
+"""
+Tests for the event-loop lag monitor and blocking-call detector.
+"""
+
+import asyncio
+import time
+
+from dtce_ai_bot.utils.loop_monitor import LoopMonitor
+from dtce_ai_bot.utils.metrics import MetricsRegistry
+from dtce_ai_bot.utils.stage_timer import StageRecorder
+
+
+async def blocking_handler():
+    recorder = StageRecorder(request_id="req-7")  # what the tracing middleware holds for a request
+    await asyncio.sleep(0)
+    time.sleep(0.3)  # a synchronous SDK call on the loop
+    return recorder
+
+
+def test_blocked_loop_is_reported_with_stack_and_request_id():
+    registry = MetricsRegistry()
+    monitor = LoopMonitor(interval=0.01, block_threshold=0.1, registry=registry)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await blocking_handler()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    block = monitor.last_block
+    assert block["request_id"] == "req-7"
+    assert "blocking_handler" in block["location"] and "time.sleep(0.3)" in block["stack"]
+    assert monitor.get_stats()["blocked"] == 1 and monitor.get_stats()["max_lag_ms"] >= 200
+    text = registry.render()
+    assert "dtce_event_loop_blocked_total 1" in text
+    assert 'dtce_event_loop_lag_seconds_bucket{le="+Inf"}' in text
+
+
+def test_debug_mode_turns_on_asyncio_slow_callback_reporting():
+    monitor = LoopMonitor(interval=0.01, block_threshold=0.2, debug=True, registry=MetricsRegistry())
+
+    async def scenario():
+        monitor.start()
+        loop = asyncio.get_running_loop()
+        settings = (loop.get_debug(), loop.slow_callback_duration)
+        await monitor.stop()
+        return settings
+
+    assert asyncio.run(scenario()) == (True, 0.2)
+    assert monitor.get_stats()["running"] is False
@@ -0,0 +1,92 @@
+"""
+Tests for the metrics registry, stage spans and the request tracing middleware.
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dtce_ai_bot.core.request_tracing import RequestTracingMiddleware
+from dtce_ai_bot.utils.metrics import MetricFamily, MetricsRegistry
+from dtce_ai_bot.utils.stage_timer import StageRecorder, current_request_id, record_stages, requested_timings, stage
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs", ("kind",)).inc(2, kind='say "hi"')
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 3.0):
+        latency.observe(value)
+
+    def broken():
+        raise RuntimeError("component down")
+
+    def pool_size():
+        family = MetricFamily("pool_size", "gauge", "Pool size")
+        family.add(4, pool="local")
+        return [family]
+
+    registry.add_collector(broken)
+    registry.add_collector(pool_size)
+    text = registry.render()
+
+    assert '# TYPE jobs_total counter\njobs_total{kind="say \\"hi\\""} 2\n' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1\nlatency_seconds_bucket{le="1"} 2\nlatency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 3.55\nlatency_seconds_count 3" in text
+    assert 'pool_size{pool="local"} 4' in text
+
+
+def test_spans_nest_and_carry_the_request_id():
+    with record_stages(StageRecorder(request_id="req-1", report_timings=True)):
+        with stage("search"):
+            with stage("embedding"):
+                assert current_request_id() == "req-1"
+        timings = requested_timings()
+
+    search, embedding = timings["spans"]
+    assert (search["name"], embedding["name"]) == ("search", "embedding")
+    assert embedding["parent"] == search["id"] and search["parent"] is None
+    assert set(timings["stages_ms"]) == {"search", "embedding"} and timings["request_id"] == "req-1"
+    assert requested_timings() is None and current_request_id() == ""
+
+
+def _traced_app(registry: MetricsRegistry) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestTracingMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with stage("search"):
+            pass
+        return {"item": item_id, "request_id": current_request_id(), "timings": requested_timings()}
+
+    return app
+
+
+def test_middleware_tags_requests_and_records_metrics():
+    registry = MetricsRegistry()
+    client = TestClient(_traced_app(registry))
+
+    plain = client.get("/items/1", headers={"X-Request-ID": "abc"})
+    debug = client.get("/items/2?debug_timings=1")
+    client.get("/missing")
+
+    assert plain.headers["x-request-id"] == plain.json()["request_id"] == "abc"
+    assert plain.json()["timings"] is None and "server-timing" not in plain.headers
+    assert debug.json()["timings"]["stages_ms"].keys() == {"search"}
+    assert debug.headers["server-timing"].startswith("search;dur=")
+
+    text = registry.render()
+    assert 'dtce_http_requests_total{route="/items/{item_id}",method="GET",status="200"} 2' in text
+    assert 'dtce_http_requests_total{route="unmatched",method="GET",status="404"} 1' in text
+    assert 'dtce_stage_duration_seconds_count{stage="search"} 2' in text
+
+
+def test_app_serves_metrics_from_component_stats():
+    from dtce_ai_bot.core.app import app
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    assert 'dtce_cache_hit_ratio{cache="answer"}' in response.text
+    assert '# TYPE dtce_cache_hits_total counter' in response.text
+    assert response.headers["x-request-id"]
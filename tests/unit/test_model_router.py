@@ -0,0 +1,81 @@
+"""
+Tests for tiered model routing: small-tier deployment selection, escalation on
+unparsable output or errors, and per-route stats.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from dtce_ai_bot.integrations.model_router import DEFAULT_ROUTES, ModelRouter
+
+
+class ScriptedOpenAI:
+    """Returns the scripted reply per deployment (an Exception instance is raised)."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        self.calls.append((model, kwargs))
+        reply = self.replies[model]
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=reply))],
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=1000),
+        )
+
+
+def make_router():
+    return ModelRouter(dict(DEFAULT_ROUTES), small_deployment="gpt-4o-mini", large_deployment="gpt-4o",
+                       token_costs={"gpt-4o-mini": [0.1, 0.2]})
+
+
+def test_small_routes_use_the_mini_deployment_and_route_defaults():
+    router = make_router()
+    client = ScriptedOpenAI({"gpt-4o-mini": "Policy"})
+
+    completion = asyncio.run(router.chat(client, "intent", [{"role": "user", "content": "q"}],
+                                         parse=lambda text: text if text == "Policy" else None))
+
+    assert (completion.parsed, completion.deployment, completion.escalated) == ("Policy", "gpt-4o-mini", False)
+    assert client.calls == [("gpt-4o-mini", {"max_tokens": 50})]
+    stats = router.get_stats()["intent"]
+    assert stats["calls"] == 1 and stats["cost_usd"] == pytest.approx(0.3)
+
+
+def test_unparsable_small_output_escalates_to_the_caller_deployment():
+    router = make_router()
+    client = ScriptedOpenAI({"gpt-4o-mini": "I think it is a policy", "gpt-4-big": "Policy"})
+
+    completion = asyncio.run(router.chat(client, "intent", [], parse=lambda text: text if text == "Policy" else None,
+                                         default_deployment="gpt-4-big"))
+
+    assert (completion.parsed, completion.deployment, completion.escalated) == ("Policy", "gpt-4-big", True)
+    assert router.get_stats()["intent"]["escalations"] == 1
+
+
+def test_failed_small_call_escalates_and_last_error_is_raised():
+    router = make_router()
+    client = ScriptedOpenAI({"gpt-4o-mini": RuntimeError("timeout"), "gpt-4o": "answer"})
+    assert asyncio.run(router.chat(client, "synthesis_short", [])).text == "answer"
+
+    client = ScriptedOpenAI({"gpt-4o-mini": RuntimeError("timeout"), "gpt-4o": RuntimeError("down")})
+    with pytest.raises(RuntimeError, match="down"):
+        asyncio.run(router.chat(client, "synthesis_short", []))
+    assert router.get_stats()["synthesis_short"]["failures"] == 3
+
+
+def test_without_a_mini_deployment_everything_uses_the_large_one_once():
+    router = ModelRouter(dict(DEFAULT_ROUTES), large_deployment="gpt-4o")
+    client = ScriptedOpenAI({"gpt-4o": "not json"})
+
+    completion = asyncio.run(router.chat(client, "normalization", [], parse=lambda text: None))
+
+    assert completion.parsed is None
+    assert [model for model, _ in client.calls] == ["gpt-4o"]
+    assert router.deployments_for("synthesis_long") == ["gpt-4o"]
@@ -0,0 +1,65 @@
+"""
+Tests for multi-query retrieval: local query variants, concurrent execution and
+reciprocal-rank fusion.
+"""
+
+import asyncio
+
+from dtce_ai_bot.services.azure_rag_service_v2 import AzureRAGService
+from dtce_ai_bot.utils.rank_fusion import reciprocal_rank_fusion
+
+
+class FakeOpenAI:
+    max_retries = 0
+
+
+def docs(*ids):
+    return [{"id": doc_id} for doc_id in ids]
+
+
+def test_rrf_rewards_documents_found_by_several_queries():
+    fused = reciprocal_rank_fusion([docs("a", "b", "c"), docs("c", "d"), docs("c", "b")], k=60,
+                                   labels=["original", "keywords", "normalized"])
+
+    assert [doc["id"] for doc in fused] == ["c", "b", "a", "d"]
+    assert fused[0]["matched_queries"] == ["original", "keywords", "normalized"]
+
+
+def test_variants_are_local_and_deduplicated():
+    service = AzureRAGService(None, FakeOpenAI(), "gpt", "gpt-mini")
+
+    variants = asyncio.run(service._generate_query_variants(
+        "What's our wellness policy for job 225221?", "Policy", "doc_category eq 'policy'"))
+    by_name = {variant["name"]: variant for variant in variants}
+
+    assert list(by_name) == ["original", "normalized", "keywords", "project"]
+    assert by_name["keywords"]["query"] == "wellness policy job 225221"
+    assert by_name["project"]["filter"] == "(doc_category eq 'policy') and project_number eq '225221'"
+
+
+def test_variants_run_concurrently_and_fused_results_are_cached():
+    service = AzureRAGService(None, FakeOpenAI(), "gpt", "gpt-mini")
+    calls = []
+    in_flight = {"now": 0, "peak": 0}
+
+    async def fake_search(query, filter_str=None, top_k=10, include_content=True):
+        calls.append(query)
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return docs(query, "shared")
+
+    service._hybrid_search_with_ranking = fake_search
+
+    async def scenario():
+        first = await service._retrieve_candidates("How do I design a timber beam?", "Engineering", None, 10)
+        second = await service._retrieve_candidates("How do I design a timber beam?", "Engineering", None, 10)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert in_flight["peak"] == len(calls) > 1
+    assert first[0]["id"] == "shared"
+    assert [doc["id"] for doc in second] == [doc["id"] for doc in first]
+    assert len(calls) == in_flight["peak"]  # second call served from the cache
@@ -0,0 +1,111 @@
+"""
+Tests for the process-wide Azure OpenAI limiter: priority ordering, RPM budget,
+AIMD on 429s and transparent re-queueing of throttled requests.
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from dtce_ai_bot.integrations import openai_limiter
+from dtce_ai_bot.integrations.openai_limiter import (
+    PRIORITIES,
+    DeploymentLimiter,
+    RateLimitedAsyncTransport,
+    estimate_request_tokens,
+    openai_priority,
+)
+
+CHAT_URL = "https://example.openai.azure.com/openai/deployments/gpt-4o/chat/completions"
+
+
+def test_queued_requests_are_granted_by_priority():
+    limiter = DeploymentLimiter("gpt-4o", initial_concurrency=1, max_concurrency=1)
+    order = []
+
+    async def call(name):
+        await limiter.acquire(PRIORITIES[name], 10)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        limiter.release()
+
+    async def scenario():
+        first = asyncio.ensure_future(call("interactive"))
+        await asyncio.sleep(0)  # holds the only slot
+        waiting = [asyncio.ensure_future(call(name)) for name in ("background", "classification", "interactive")]
+        await asyncio.gather(first, *waiting)
+
+    asyncio.run(scenario())
+
+    assert order == ["interactive", "interactive", "classification", "background"]
+
+
+def test_rpm_budget_queues_instead_of_failing():
+    limiter = DeploymentLimiter("gpt-4o", requests_per_minute=2)
+
+    async def scenario():
+        for _ in range(2):
+            await limiter.acquire(0, 10)
+            limiter.release()
+        third = asyncio.ensure_future(limiter.acquire(0, 10))
+        await asyncio.sleep(0.05)
+        blocked = not third.done()
+        third.cancel()
+        return blocked
+
+    assert asyncio.run(scenario())
+    assert limiter.get_stats()["requests_last_minute"] == 2
+
+
+def test_429_halves_concurrency_and_successes_grow_it_back():
+    limiter = DeploymentLimiter("gpt-4o", initial_concurrency=8, max_concurrency=8)
+    limiter.in_flight = 1
+    limiter.release(throttled=True, retry_after=0)
+    assert limiter.concurrency_limit == 4
+
+    for _ in range(20):
+        limiter.in_flight = 1
+        limiter.release()
+    assert 4 < limiter.concurrency_limit <= 8
+
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Answers 429 (retry-after-ms: 10) for the first ``throttled`` requests, then 200."""
+
+    def __init__(self, throttled):
+        self.throttled = throttled
+        self.requests = 0
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        if self.requests <= self.throttled:
+            return httpx.Response(429, headers={"retry-after-ms": "10"}, json={"error": "throttled"})
+        return httpx.Response(200, json={"ok": True})
+
+
+def test_throttled_requests_are_requeued_transparently(monkeypatch):
+    limiter = DeploymentLimiter("gpt-4o")
+    monkeypatch.setattr(openai_limiter, "get_openai_limiter", lambda deployment: limiter)
+    inner = ScriptedTransport(throttled=2)
+    transport = RateLimitedAsyncTransport(inner)
+    body = json.dumps({"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 50})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=transport) as client:
+            with openai_priority("classification"):
+                return await client.post(CHAT_URL, content=body)
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert inner.requests == 3
+    assert limiter.get_stats()["throttled"] == 2
+    assert limiter.get_stats()["in_flight"] == 0
+
+
+def test_token_estimate_counts_prompt_and_completion_allowance():
+    request = httpx.Request("POST", CHAT_URL, content=json.dumps(
+        {"messages": [{"role": "user", "content": "x" * 398}], "max_tokens": 100}))
+
+    assert estimate_request_tokens(request) == 200
@@ -0,0 +1,60 @@
+"""
+Tests for the prompt registry: byte-stable prefixes, per-intent variants and
+token accounting.
+"""
+
+from dtce_ai_bot.services.prompt_builder import PromptBuilder
+from dtce_ai_bot.services.prompt_registry import PromptRegistry, count_tokens, get_prompt_registry
+from dtce_ai_bot.services.synthesis_prompts import SYNTHESIS_PROMPT
+
+
+def test_volatile_values_only_change_the_tail():
+    registry = PromptRegistry()
+    registry.register("answer", {"default": "STATIC " * 50}, suffix="The current year is {current_year}.")
+
+    first = registry.render("answer", current_year=2025)
+    second = registry.render("answer", current_year=2026)
+
+    assert first.text.startswith("STATIC " * 50) and second.text.startswith("STATIC " * 50)
+    assert first.text.endswith("2025.") and second.text.endswith("2026.")
+    assert first.prefix_tokens == count_tokens("STATIC " * 50)
+
+
+def test_intents_select_variants_and_unknown_ones_fall_back_to_default():
+    registry = PromptRegistry()
+    registry.register("answer", {"default": "full", "compact": "short"}, intent_variants={"Policy": "compact"})
+
+    assert registry.render("answer", intent="Policy").text == "short"
+    assert registry.render("answer", intent="Project").text == "full"
+    assert registry.render("answer", variant="missing").text == "full"
+
+
+def test_request_tokens_are_accounted_per_template_variant():
+    registry = PromptRegistry()
+    registry.register("answer", {"default": "x" * 400})
+
+    rendered = registry.render("answer")
+    total = registry.record_request(rendered, "y" * 40)
+
+    assert total == count_tokens("x" * 400) + count_tokens("y" * 40)
+    stats = registry.get_stats()["answer:default"]
+    assert stats["renders"] == 1 and stats["request_tokens"] == count_tokens("y" * 40)
+
+
+def test_synthesis_compact_variant_drops_project_list_sections():
+    registry = get_prompt_registry()
+    full = registry.render(SYNTHESIS_PROMPT, intent="Project", current_year=2026, four_years_ago=2022)
+    compact = registry.render(SYNTHESIS_PROMPT, intent="Policy", current_year=2026, four_years_ago=2022)
+
+    assert "Year Code System" in full.text and "Year Code System" not in compact.text
+    assert compact.prefix_tokens < full.prefix_tokens
+    assert full.text.endswith('"4 years ago" = 2022).')
+
+
+def test_intent_system_prompt_keeps_question_dependent_instructions_last():
+    builder = PromptBuilder()
+    plain = builder.build_simple_system_prompt("policy", "what is our wellness policy")
+    no_links = builder.build_simple_system_prompt("policy", "what is our wellness policy, no links please")
+
+    prefix_length = plain.index("**CRITICAL: ANSWER THE SPECIFIC QUESTION ASKED**")
+    assert plain[:prefix_length] == no_links[:prefix_length]
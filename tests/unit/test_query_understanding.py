@@ -0,0 +1,81 @@
+"""
+Tests for the single query-understanding call: validated JSON, caching and
+the rule-based fallback.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from dtce_ai_bot.services.query_understanding import QueryUnderstandingService, validate_understanding
+
+
+class FakeOpenAI:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))], usage=None)
+
+
+MODEL_REPLY = json.dumps({
+    "conversational": False,
+    "category": "client_info",
+    "confidence": 0.9,
+    "reasoning": "asks for a contact",
+    "job_numbers": ["225-001", "12"],
+    "years": [2024, "n/a"],
+    "client_name": "NZTA",
+    "search_keywords": ["contact", "NZTA"],
+    "rewritten_query": "NZTA contact project 225001",
+})
+
+
+def test_one_call_returns_validated_understanding_and_is_cached():
+    client = FakeOpenAI(f"```json\n{MODEL_REPLY}\n```")
+    service = QueryUnderstandingService(client, "gpt-4o")
+
+    first = asyncio.run(service.understand("Who is the NZTA contact for project 225001?"))
+    second = asyncio.run(service.understand("who is the NZTA contact for project 225001"))
+
+    assert client.calls == 1
+    assert first == second
+    assert first["category"] == "client_info"
+    assert first["job_numbers"] == ["225001"]
+    assert first["years"] == [2024]
+    assert first["client_name"] == "NZTA"
+    assert first["rewritten_query"] == "NZTA contact project 225001"
+    assert first["method"] == "ai"
+
+
+def test_invalid_category_is_rejected():
+    with pytest.raises(ValueError):
+        validate_understanding(json.dumps({"category": "weather"}), "q")
+
+
+def test_model_failure_falls_back_to_rules():
+    service = QueryUnderstandingService(FakeOpenAI(RuntimeError("unavailable")), "gpt-4o")
+
+    understanding = asyncio.run(service.understand("Find emails with the client for job 224-050"))
+
+    assert understanding["method"] == "rules"
+    assert understanding["category"] == "email_search"
+    assert understanding["job_numbers"] == ["224050"]
+    assert "emails" in understanding["search_keywords"]
+
+
+def test_short_replies_are_conversational_without_a_model_call():
+    client = FakeOpenAI(MODEL_REPLY)
+    service = QueryUnderstandingService(client, "gpt-4o")
+
+    understanding = asyncio.run(service.understand("Thanks", [{"role": "assistant", "content": "Here you go"}]))
+
+    assert understanding["conversational"] is True
+    assert client.calls == 0
@@ -0,0 +1,101 @@
+"""
+Tests for the request profiler: profile store bounds, header/sampled triggering
+and the admin endpoints.
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dtce_ai_bot.api.profiles import router as profiles_router
+from dtce_ai_bot.config.settings import get_settings
+from dtce_ai_bot.core.request_profiling import RequestProfilingMiddleware
+from dtce_ai_bot.utils import request_profiler
+from dtce_ai_bot.utils.request_profiler import ProfileResult, ProfileStore, RequestProfiler
+
+
+def _busy_python_work() -> int:
+    return sum(len(str(i)) for i in range(20000))
+
+
+TOKEN = "s3cret"
+ADMIN = {"X-Admin-Token": TOKEN}
+
+
+def _app(profiler: RequestProfiler, token: str = TOKEN) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestProfilingMiddleware, profiler=profiler, token=token)
+    app.include_router(profiles_router, prefix="/admin/profiles")
+
+    @app.get("/documents/ask")
+    async def ask():
+        await asyncio.sleep(0)
+        return {"work": _busy_python_work()}
+
+    return app
+
+
+def test_store_prunes_oldest_and_validates_names(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    for second in range(3):
+        store.save(ProfileResult(f"20260101T00000{second}-req", {"txt": b"profile"}, {"path": "/x"}))
+
+    assert [profile["id"] for profile in store.list()] == ["20260101T000002-req", "20260101T000001-req"]
+    assert store.file_path("20260101T000000-req", "txt") is None
+    assert store.file_path("20260101T000002-req", "txt")
+    assert store.file_path("../../etc/passwd", "txt") is None
+    assert store.file_path("20260101T000002-req", "meta.json") is None
+
+
+def test_header_and_sampling_trigger_profiles(tmp_path):
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)), sample_every=2, sample_paths=["/documents"])
+    client = TestClient(_app(profiler))
+
+    plain = client.get("/documents/ask")
+    sampled = client.get("/documents/ask")
+    requested = client.get("/documents/ask", headers={"X-Profile": "1", **ADMIN})
+
+    assert "x-profile-id" not in plain.headers
+    assert sampled.headers["x-profile-id"] and requested.headers["x-profile-id"]
+    profiles = profiler.store.list()
+    assert len(profiles) == 2 and profiles[0]["path"] == "/documents/ask"
+    assert profiler.get_stats()["profiled"] == 2
+
+
+def test_admin_endpoints_list_download_and_require_the_token(tmp_path, monkeypatch):
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)))
+    monkeypatch.setattr(request_profiler, "_request_profiler", profiler)
+    monkeypatch.setattr(get_settings(), "admin_token", TOKEN)
+    client = TestClient(_app(profiler), headers=ADMIN)
+
+    profile_id = client.get("/documents/ask", headers={"X-Profile": "1"}).headers["x-profile-id"]
+    listing = client.get("/admin/profiles/").json()
+    kind = listing["profiles"][0]["files"][0]
+    download = client.get(f"/admin/profiles/{profile_id}/{kind}")
+
+    assert listing["profiles"][0]["id"] == profile_id
+    assert download.status_code == 200 and download.content
+    if listing["profiler"]["engine"] == "cprofile":
+        assert "_busy_python_work" in client.get(f"/admin/profiles/{profile_id}/txt").text
+    assert client.get(f"/admin/profiles/{profile_id}/exe").status_code == 404
+    assert client.post("/admin/profiles/settings", params={"sample_every": 5}).json()["sample_every"] == 5
+
+    anonymous = TestClient(_app(profiler))
+    assert "x-profile-id" not in anonymous.get("/documents/ask", headers={"X-Profile": "1"}).headers
+    assert anonymous.get("/admin/profiles/").status_code == 403
+    assert anonymous.get("/admin/profiles/", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_without_a_configured_token_profiling_and_admin_endpoints_are_refused(tmp_path, monkeypatch):
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)))
+    monkeypatch.setattr(request_profiler, "_request_profiler", profiler)
+    assert get_settings().admin_token == ""
+    client = TestClient(_app(profiler, token=""))
+
+    profiled = client.get("/documents/ask", headers={"X-Profile": "1", "X-Admin-Token": ""})
+
+    assert "x-profile-id" not in profiled.headers and profiler.store.list() == []
+    assert client.get("/admin/profiles/").status_code == 403
+    assert client.post("/admin/profiles/settings", params={"sample_every": 1}).status_code == 403
+    assert profiler.sample_every == 0
@@ -0,0 +1,38 @@
+"""
+Tests for the per-event-loop aio client pool.
+"""
+
+import asyncio
+
+from dtce_ai_bot.integrations.shared_clients import close_shared_clients, get_shared_client
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_client_is_shared_within_a_loop_and_closed_on_shutdown():
+    async def scenario():
+        first = get_shared_client(("fake", "a"), FakeClient)
+        second = get_shared_client(("fake", "a"), FakeClient)
+        other = get_shared_client(("fake", "b"), FakeClient)
+        await close_shared_clients()
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+    assert first is second
+    assert other is not first
+    assert first.closed and other.closed
+
+
+def test_each_loop_gets_its_own_client():
+    async def grab():
+        client = get_shared_client(("fake", "loop"), FakeClient)
+        await close_shared_clients()
+        return client
+
+    assert asyncio.run(grab()) is not asyncio.run(grab())
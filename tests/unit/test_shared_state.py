@@ -0,0 +1,221 @@
+"""
+Tests for cross-process shared state: two worker processes see the same
+conversation, counters stay exact under concurrent workers, an index bump on
+one worker invalidates the others, and bot state and sync jobs go through the
+shared backend.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from dtce_ai_bot.bot.state_storage import SharedStateStorage
+from dtce_ai_bot.integrations import shared_state
+from dtce_ai_bot.integrations.shared_state import MemorySharedState, SharedState, create_shared_state
+from dtce_ai_bot.models.sync_job import SyncJobRequest, SyncJobStatus
+from dtce_ai_bot.services.conversation_store import (
+    ConversationBackend, ConversationStore, SharedStateConversationBackend,
+)
+from dtce_ai_bot.services.sync_job_service import SyncJobService
+from dtce_ai_bot.utils import index_version
+
+WORKER = textwrap.dedent("""
+    import asyncio, json, sys
+    from dtce_ai_bot.integrations.shared_state import create_shared_state
+    from dtce_ai_bot.services.conversation_store import ConversationStore, SharedStateConversationBackend
+
+    async def main(url, session):
+        store = ConversationStore(backend=SharedStateConversationBackend(create_shared_state(url), 3600))
+        seen = await store.get_history(session)
+        await store.append(session, "and the second one?", "answer from worker 2")
+        print(json.dumps(seen))
+
+    asyncio.run(main(sys.argv[1], sys.argv[2]))
+""")
+
+COUNTER = textwrap.dedent("""
+    import sys
+    from dtce_ai_bot.integrations.shared_state import create_shared_state
+    state = create_shared_state(sys.argv[1])
+    for _ in range(50):
+        state.incr("bot_calls", "count")
+""")
+
+BUMP = textwrap.dedent("""
+    from dtce_ai_bot.utils.index_version import bump_index_version
+    bump_index_version("indexed on worker 2")
+""")
+
+
+def _run_worker(script: str, *args: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-c", script, *args], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, text=True, env=os.environ.copy())
+
+
+def test_two_workers_see_the_same_conversation(tmp_path):
+    url = f"sqlite:///{tmp_path / 'state.db'}"
+    store = ConversationStore(backend=SharedStateConversationBackend(create_shared_state(url), 3600))
+
+    asyncio.run(store.append("teams:conv-1", "first question", "answer from worker 1"))
+    worker = _run_worker(WORKER, url, "teams:conv-1")
+    out, err = worker.communicate(timeout=120)
+    assert worker.returncode == 0, err[-2000:]
+    history = asyncio.run(store.get_history("teams:conv-1"))
+
+    assert [turn["content"] for turn in json.loads(out.splitlines()[-1])] == ["first question", "answer from worker 1"]
+    assert [turn["content"] for turn in history] == [
+        "first question", "answer from worker 1", "and the second one?", "answer from worker 2"]
+
+
+def test_counters_are_exact_across_concurrent_workers(tmp_path):
+    url = f"sqlite:///{tmp_path / 'state.db'}"
+    workers = [_run_worker(COUNTER, url) for _ in range(3)]
+    for worker in workers:
+        assert worker.wait(timeout=120) == 0, worker.stderr.read()[-2000:]
+
+    assert create_shared_state(url).get("bot_calls", "count") == 150
+
+
+def test_entries_expire_and_purge(tmp_path):
+    for state in (MemorySharedState(), create_shared_state(f"sqlite:///{tmp_path / 'state.db'}")):
+        state.set("sheets_qa", "sheet", {"qa_pairs": []}, ttl=0.01)
+        state.set("sheets_qa", "other", [1, 2])
+        asyncio.run(asyncio.sleep(0.02))
+
+        assert state.get("sheets_qa", "sheet") is None
+        assert state.values("sheets_qa") == {"other": [1, 2]}
+        assert state.purge_expired() == 1
+
+
+def test_set_if_version_rejects_writes_based_on_a_stale_read(tmp_path):
+    for state in (MemorySharedState(), create_shared_state(f"sqlite:///{tmp_path / 'state.db'}")):
+        assert state.set_if_version("conversations", "s", {"turns": 1}, None)
+        assert not state.set_if_version("conversations", "s", {"turns": 9}, None)
+
+        value, version = state.get_versioned("conversations", "s")
+        state.set("conversations", "s", {"turns": 2})  # another worker writes in between
+
+        assert value == {"turns": 1}
+        assert not state.set_if_version("conversations", "s", {"turns": 3}, version)
+        _, version = state.get_versioned("conversations", "s")
+        assert state.set_if_version("conversations", "s", {"turns": 3}, version)
+        assert state.get("conversations", "s") == {"turns": 3}
+
+
+class RacingBackend(SharedStateConversationBackend):
+    """Lets another worker append right after the next read, before this worker writes back."""
+
+    race = None
+
+    def load_versioned(self, session_id):
+        loaded = super().load_versioned(session_id)
+        if self.race is not None:
+            race, self.race = self.race, None
+            race()
+        return loaded
+
+
+def test_summary_fold_keeps_a_turn_appended_on_another_worker_meanwhile(tmp_path):
+    url = f"sqlite:///{tmp_path / 'state.db'}"
+    backend = RacingBackend(create_shared_state(url), 3600)
+    other_worker = ConversationStore(backend=SharedStateConversationBackend(create_shared_state(url), 3600))
+
+    async def summarizer(previous_summary, turns):
+        backend.race = lambda: asyncio.run(other_worker.append("s", "q-other", "a-other"))
+        return "earlier questions"
+
+    store = ConversationStore(max_turns=4, keep_recent_turns=2, backend=backend, summarizer=summarizer)
+
+    async def scenario():
+        for i in range(3):
+            await store.append("s", f"q{i}", f"a{i}")
+        await store.wait_for_summaries()
+        return await store.get_history("s")
+
+    history = asyncio.run(scenario())
+
+    assert history[0]["content"].endswith("earlier questions")
+    assert [turn["content"] for turn in history[1:]] == ["q2", "a2", "q-other", "a-other"]
+
+
+def test_incomplete_backends_fail_at_construction():
+    class GetOnlyState(SharedState):
+        def get(self, namespace, key):
+            return None
+
+    class LoadOnlyBackend(ConversationBackend):
+        def load(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyState()
+    with pytest.raises(TypeError):
+        LoadOnlyBackend()
+
+
+def test_bot_state_storage_round_trips_and_rejects_stale_e_tags():
+    storage = SharedStateStorage(MemorySharedState())
+
+    async def scenario():
+        await storage.write({"conv/1": {"state": {"turns": 1}, "e_tag": "*"}})
+        first = (await storage.read(["conv/1", "missing"]))["conv/1"]
+        await storage.write({"conv/1": {"state": {"turns": 2}, "e_tag": first["e_tag"]}})
+        try:
+            await storage.write({"conv/1": {"state": {"turns": 3}, "e_tag": "stale"}})
+        except KeyError:
+            conflict = True
+        else:
+            conflict = False
+        current = (await storage.read(["conv/1"]))["conv/1"]
+        await storage.delete(["conv/1"])
+        return first, current, conflict, await storage.read(["conv/1"])
+
+    first, current, conflict, deleted = asyncio.run(scenario())
+
+    assert first["state"] == {"turns": 1}
+    assert current["state"] == {"turns": 2} and current["e_tag"] != first["e_tag"]
+    assert conflict and deleted == {}
+
+
+def test_bot_state_expires_after_the_idle_ttl():
+    state = MemorySharedState()
+    storage = SharedStateStorage(state, ttl_seconds=0.01)
+
+    asyncio.run(storage.write({"conv/1": {"state": {"turns": 1}}}))
+    asyncio.run(asyncio.sleep(0.02))
+
+    assert asyncio.run(storage.read(["conv/1"])) == {}
+    assert state.purge_expired() == 1
+
+
+def test_sync_jobs_are_visible_and_cancellable_from_another_worker():
+    state = MemorySharedState()
+    running_worker, other_worker = SyncJobService(state), SyncJobService(state)
+
+    job = running_worker.create_job(SyncJobRequest(path="Projects/219"))
+    job.status = SyncJobStatus.RUNNING
+    running_worker._save(job)
+
+    assert other_worker.get_job(job.job_id).path == "Projects/219"
+    assert [listed.job_id for listed in other_worker.list_jobs()] == [job.job_id]
+    assert other_worker.cancel_job(job.job_id)
+    assert running_worker._load(job.job_id).status == SyncJobStatus.CANCELLED
+
+
+def test_index_bumped_on_one_worker_invalidates_the_others(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'state.db'}"
+    monkeypatch.setattr(shared_state, "_shared_state", create_shared_state(url))
+    monkeypatch.setattr(index_version, "SHARED_VERSION_TTL", 0)
+    monkeypatch.setattr(index_version, "_shared_cache", (float("-inf"), 0))
+    before = index_version.get_index_version()
+
+    monkeypatch.setenv("SHARED_STATE_URL", url)
+    worker = _run_worker(BUMP)
+    assert worker.wait(timeout=120) == 0, worker.stderr.read()[-2000:]
+
+    assert index_version.get_index_version() != before
@@ -0,0 +1,65 @@
+"""
+Tests for single-flight coalescing of concurrent identical requests.
+"""
+
+import asyncio
+
+import pytest
+
+from dtce_ai_bot.utils.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def compute(question):
+        calls.append(question)
+        await asyncio.sleep(0.02)
+        return {"answer": question.upper()}
+
+    async def scenario():
+        results = await asyncio.gather(*[flight.do("q", compute, "wellness policy") for _ in range(5)])
+        again = await flight.do("q", compute, "wellness policy")  # released after completion
+        return results, again
+
+    results, again = asyncio.run(scenario())
+
+    assert calls == ["wellness policy", "wellness policy"]
+    assert all(result == {"answer": "WELLNESS POLICY"} for result in results)
+    assert results[0] is not results[1]  # followers get their own copy
+    assert flight.get_stats() == {"in_flight": 0, "leaders": 2, "followers": 4}
+
+
+def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("search unavailable")
+
+    async def scenario():
+        return await asyncio.gather(*[flight.do("q", compute) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_a_timed_out_waiter_does_not_cancel_the_shared_computation():
+    flight = SingleFlight("test", timeout_seconds=0.01)
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        impatient = asyncio.ensure_future(flight.do("q", compute))
+        await asyncio.sleep(0)
+        flight.timeout_seconds = None  # the next caller waits without a deadline
+        result = await flight.do("q", compute)
+        with pytest.raises(asyncio.TimeoutError):
+            await impatient
+        return result
+
+    assert asyncio.run(scenario()) == "done"
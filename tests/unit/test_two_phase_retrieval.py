@@ -0,0 +1,114 @@
+"""
+Tests for two-phase retrieval: candidate search without content, then hydration
+of only the documents used, through the in-process content LRU.
+"""
+
+import asyncio
+
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+from dtce_ai_bot.services.azure_rag_service_v2 import AzureRAGService
+from dtce_ai_bot.utils.content_cache import DocumentContentCache
+
+LONG_TEXT = "Structural calculation notes. " * 10
+
+
+class FakeSearchClient:
+    """Answers get_document key lookups from a dict of id -> content."""
+
+    def __init__(self, contents, error=None):
+        self.contents = contents
+        self.error = error
+        self.calls = []
+
+    async def get_document(self, key, selected_fields=None):
+        self.calls.append((key, selected_fields))
+        if self.error is not None:
+            raise self.error
+        if key not in self.contents:
+            raise ResourceNotFoundError(message=f"Document '{key}' not found")
+        return {"id": key, "content": self.contents[key]}
+
+
+class FakeOpenAI:
+    max_retries = 0
+
+
+def make_service(contents, cache=None, error=None):
+    service = AzureRAGService(FakeSearchClient(contents, error), FakeOpenAI(), "gpt", "gpt-mini")
+    service.content_cache = cache or DocumentContentCache()
+    return service
+
+
+def candidates(*ids):
+    return [{"id": doc_id, "filename": f"{doc_id}.pdf", "caption": ""} for doc_id in ids]
+
+
+def test_hydrates_only_the_documents_used_by_key():
+    service = make_service({doc_id: LONG_TEXT for doc_id in "abcdef"})
+
+    hydrated = asyncio.run(service._hydrate_content(candidates(*"abcdef"), needed=2))
+
+    assert [doc["id"] for doc in hydrated] == ["a", "b"]
+    assert all(doc["content"] == LONG_TEXT for doc in hydrated)
+    assert service.search_client.calls == [("a", ["id", "content"]), ("b", ["id", "content"])]
+
+
+def test_placeholder_and_deleted_documents_are_replaced_by_the_next_candidates():
+    service = make_service({"a": LONG_TEXT, "b": "stub", "d": LONG_TEXT, "e": LONG_TEXT})
+
+    hydrated = asyncio.run(service._hydrate_content(candidates("a", "b", "c", "d", "e"), needed=3))
+
+    assert [doc["id"] for doc in hydrated] == ["a", "d", "e"]
+
+
+def test_cached_content_skips_the_lookup():
+    service = make_service({"a": LONG_TEXT, "b": LONG_TEXT})
+
+    asyncio.run(service._hydrate_content(candidates("a", "b"), needed=2))
+    asyncio.run(service._hydrate_content(candidates("a", "b"), needed=2))
+
+    assert len(service.search_client.calls) == 2
+    assert service.content_cache.get_stats()["hits"] == 2
+
+
+def test_failed_hydration_falls_back_to_single_phase_results():
+    service = make_service({}, error=HttpResponseError(message="Service unavailable"))
+    retrieved = []
+
+    async def classify_intent(query):
+        return "Policy"
+
+    async def retrieve(**kwargs):
+        retrieved.append(kwargs.get("include_content"))
+        row = {"id": "a", "filename": "Wellness.pdf", "caption": ""}
+        return [{**row, "content": LONG_TEXT} if kwargs.get("include_content") else row]
+
+    async def synthesize(search_results, **kwargs):
+        return f"answer from {len(search_results)} documents with content" if search_results[0].get("content") else "no context"
+
+    service.answer_cache = None
+    service.intent_detector.classify_intent = classify_intent
+    service._retrieve_candidates = retrieve
+    service._synthesize_answer = synthesize
+
+    result = asyncio.run(service.process_query("What's the wellness policy?"))
+
+    assert retrieved == [None, True]
+    assert result["answer"] == "answer from 1 documents with content"
+
+
+def test_cache_evicts_least_recently_used_and_expired_entries():
+    cache = DocumentContentCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    expired = DocumentContentCache(ttl_seconds=-1)
+    expired.put("a", "1")
+    assert expired.get("a") is None
+    assert expired.get_stats()["entries"] == 0
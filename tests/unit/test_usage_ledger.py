@@ -0,0 +1,96 @@
+"""
+Tests for the token usage ledger: transport capture, tagging, rolling buckets,
+SQLite persistence and the admin endpoint.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from dtce_ai_bot.integrations.usage_ledger import (
+    SQLiteUsageBackend, UsageLedger, UsageRecord, UsageRecordingAsyncTransport, tag_usage, usage_tags,
+)
+from dtce_ai_bot.utils.stage_timer import StageRecorder, record_stages, stage
+
+ENDPOINT = "https://example.openai.azure.com/openai/deployments"
+
+
+def _openai(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/embeddings"):
+        return httpx.Response(200, json={"data": [{"embedding": [0.1]}], "usage": {"prompt_tokens": 7, "total_tokens": 7}})
+    if json.loads(request.content).get("stream"):
+        return httpx.Response(200, text="data: [DONE]\n\n")
+    return httpx.Response(200, json={"choices": [{"message": {"content": "hi"}}],
+                                     "usage": {"prompt_tokens": 100, "completion_tokens": 20}})
+
+
+def test_transport_records_tagged_usage_and_leaves_the_body_readable():
+    ledger = UsageLedger()
+
+    async def scenario():
+        transport = UsageRecordingAsyncTransport(httpx.MockTransport(_openai), ledger)
+        async with httpx.AsyncClient(transport=transport) as client:
+            with record_stages(StageRecorder(request_id="req-9")):
+                tag_usage(user="aad-1", intent="Policy")
+                with usage_tags(call_site="synthesis"):
+                    chat = await client.post(f"{ENDPOINT}/gpt-4o/chat/completions", json={"messages": []})
+                with stage("embedding"):
+                    await client.post(f"{ENDPOINT}/text-embedding-3-small/embeddings", json={"input": "q"})
+                await client.post(f"{ENDPOINT}/gpt-4o/chat/completions", json={"messages": [], "stream": True})
+        return chat.json()
+
+    body = asyncio.run(scenario())
+
+    assert body["choices"][0]["message"]["content"] == "hi"
+    rows = {row["call_site"]: row for row in ledger.totals(group_by=("call_site", "kind", "deployment"))}
+    assert set(rows) == {"synthesis", "embedding"}  # the streamed call is passed through unrecorded
+    assert (rows["synthesis"]["prompt_tokens"], rows["synthesis"]["completion_tokens"]) == (100, 20)
+    assert (rows["embedding"]["kind"], rows["embedding"]["deployment"]) == ("embedding", "text-embedding-3-small")
+    assert ledger.totals(group_by=("user", "intent")) == [
+        {"user": "aad-1", "intent": "Policy", "calls": 2, "prompt_tokens": 107, "completion_tokens": 20,
+         "total_tokens": 127}]
+
+
+def test_buckets_roll_per_minute_and_per_day():
+    ledger = UsageLedger(minute_buckets=2)
+    now = time.time()
+    for minutes_ago in (3, 1, 0):
+        ledger.record(UsageRecord(now - minutes_ago * 60, "gpt-4o", "chat", 10, 1, call_site="intent"))
+
+    minutes = ledger.summary("minute", ("call_site",), last=10)
+    days = ledger.summary("day", (), last=2)
+
+    assert [row["calls"] for row in minutes] == [1, 1]  # the oldest minute bucket was dropped
+    assert sum(row["calls"] for row in days) == 3
+
+
+def test_ledger_persists_to_sqlite(tmp_path):
+    path = str(tmp_path / "usage.sqlite")
+    ledger = UsageLedger(SQLiteUsageBackend(path))
+    ledger.record(UsageRecord(time.time(), "gpt-4o-mini", "chat", 40, 2, intent="Template", call_site="intent"))
+    ledger.record(UsageRecord(time.time(), "gpt-4o", "chat", 900, 300, intent="Template", call_site="synthesis"))
+    ledger.flush()
+
+    reopened = UsageLedger(SQLiteUsageBackend(path))
+    rows = reopened.history(time.time() - 60, group_by=("call_site",))
+
+    assert [(row["call_site"], row["total_tokens"]) for row in rows] == [("synthesis", 1200), ("intent", 42)]
+    assert reopened.history(time.time() - 60, group_by=())[0]["calls"] == 2
+    assert reopened.get_stats()["persistent"] is True
+
+
+def test_admin_endpoint_requires_the_token_and_validates_dimensions(monkeypatch):
+    from dtce_ai_bot.config.settings import get_settings
+    from dtce_ai_bot.core.app import app
+
+    assert TestClient(app).get("/admin/usage/top", params={"group_by": "user"}).status_code == 403
+    monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+    assert TestClient(app, headers={"X-Admin-Token": "wrong"}).get("/admin/usage/stats").status_code == 403
+    client = TestClient(app, headers={"X-Admin-Token": "s3cret"})
+
+    assert client.get("/admin/usage/top", params={"group_by": "intent,deployment"}).status_code == 200
+    assert client.get("/admin/usage/", params={"group_by": "colour"}).status_code == 400
+    assert "last_hour" in client.get("/admin/usage/stats").json()